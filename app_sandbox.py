@@ -0,0 +1,15 @@
+"""
+Für Tests gegen mietrecht_full: Datenbank und Dokumentablage liegen in einem
+temporären Verzeichnis statt in juris_mind.db und blobs/ im Repository.
+Vor dem ersten Import von mietrecht_full importieren - pytest lädt alle
+Testdateien in einen Prozess, und der erste Import legt die Pfade fest.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+SANDBOX_DIR = tempfile.mkdtemp(prefix="jurismind-test-")
+os.environ["DB_PATH"] = os.path.join(SANDBOX_DIR, "juris_mind.db")
+os.environ["BLOB_STORE"] = os.path.join(SANDBOX_DIR, "blobs")
+atexit.register(shutil.rmtree, SANDBOX_DIR, True)
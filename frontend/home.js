@@ -0,0 +1,1119 @@
+let currentSelectedTopic = '';
+let paypalAuthorized = false;
+let currentPaymentMethod = '';
+let conversationHistory = []; // Needed for persistence simulation
+let lastAnalysisData = null;
+// Verweis auf das zuletzt hochgeladene Dokument (Hash statt Inhalt), wird mitgebucht
+let lastDocument = null;
+let lastTopic = '';
+
+const TOPICS_CONFIG = [
+    { id: 'Kündigung', label: 'Kündigungsschutz', icon: 'fa-gavel', color: '#1976d2' },
+    { id: 'Mietminderung', label: 'Mietminderung', icon: 'fa-house-crack', color: '#2e7d32' },
+    { id: 'Nebenkosten', label: 'Nebenkosten', icon: 'fa-receipt', color: '#d32f2f' },
+    { id: 'Kaution', label: 'Kaution', icon: 'fa-vault', color: '#ed6c02' },
+    { id: 'Mietvertrag', label: 'Mietvertrag', icon: 'fa-file-lines', color: '#9c27b0' },
+    { id: 'Renovierung', label: 'Renovierung', icon: 'fa-paint-roller', color: '#0288d1' },
+    { id: 'Mieterhöhung', label: 'Mieterhöhung', icon: 'fa-chart-line', color: '#c62828' },
+    { id: 'Hausordnung', label: 'Hausordnung', icon: 'fa-list-check', color: '#388e3c' },
+    { id: 'Lärm', label: 'Lärm', icon: 'fa-volume-high', color: '#1976d2' }
+];
+
+const LAWYERS_DATA = [
+    { id: 1, name: 'Dr. Hans-Werner Meyer', title: 'Fachanwalt für Miet- & WEG-Recht', exp: '18 Jahre', rating: '4.9', reviews: 142, focus: ['Kaution', 'Kündigung', 'Renovierung'], location: 'Berlin', address: 'Friedrichstraße 12, 10117 Berlin', img: '/static/images/lawyer_meyer.png' },
+    { id: 2, name: 'Sabine Schulze', title: 'Rechtsanwältin für Immobilienrecht', exp: '12 Jahre', rating: '4.8', reviews: 98, focus: ['Mietminderung', 'Nebenkosten', 'Wohnfläche'], location: 'Hamburg', address: 'Neuer Wall 34, 20354 Hamburg', img: '/static/images/lawyer_schulze.png' },
+    { id: 3, name: 'Markus Weber', title: 'Fachanwalt für Wohnungsrecht', exp: '15 Jahre', rating: '5.0', reviews: 210, focus: ['Lärm', 'Tierhaltung', 'Hausordnung', 'Kündigung'], location: 'München', address: 'Maximilianstraße 1, 80539 München', img: '/static/images/lawyer_weber.png' },
+    { id: 4, name: 'Elena Petrova', title: 'Expertin für gewerbliches Mietrecht', exp: '10 Jahre', rating: '4.7', reviews: 76, focus: ['Mietvertrag', 'Modernisierung', 'Wasserschaden'], location: 'Köln', address: 'Schildergasse 8, 50667 Köln', img: '/static/images/lawyer_petrova.png' },
+    { id: 5, name: 'Christian Wagner', title: 'Fachanwalt für Bau- & Architektenrecht', exp: '22 Jahre', rating: '4.9', reviews: 185, focus: ['Modernisierung', 'Mängel', 'Renovierung'], location: 'Frankfurt', address: 'Zeil 100, 60313 Frankfurt', img: '/static/images/lawyer_wagner.png' },
+    { id: 6, name: 'Julia Hoffmann', title: 'Rechtsanwältin für Mietrecht', exp: '8 Jahre', rating: '4.6', reviews: 54, focus: ['Kaution', 'Hausordnung', 'Tierhaltung'], location: 'Stuttgart', address: 'Königstraße 2, 70173 Stuttgart', img: '/static/images/lawyer_hoffmann.png' },
+    { id: 7, name: 'Thomas Müller', title: 'Fachanwalt für Erbrecht & Immobilien', exp: '25 Jahre', rating: '5.0', reviews: 312, focus: ['Mietvertrag', 'Wohnrecht', 'Räumung'], location: 'Düsseldorf', address: 'Königsallee 10, 40212 Düsseldorf', img: 'https://ui-avatars.com/api/?name=Thomas+Mueller&background=0288d1&color=fff' },
+    { id: 8, name: 'Andreas Bauer', title: 'Spezialist für Mieterschutz', exp: '14 Jahre', rating: '4.8', reviews: 126, focus: ['Mietminderung', 'Nebenkosten', 'Kündigung'], location: 'Leipzig', address: 'Grimmaische Str. 1, 04109 Leipzig', img: 'https://ui-avatars.com/api/?name=Andreas+Bauer&background=2e7d32&color=fff' },
+    { id: 9, name: 'Melanie Schmidt', title: 'Rechtsanwältin für privates Mietrecht', exp: '11 Jahre', rating: '4.7', reviews: 89, focus: ['Lärm', 'Tierhaltung', 'Wohnfläche'], location: 'Bremen', address: 'Sögestraße 5, 28195 Bremen', img: 'https://ui-avatars.com/api/?name=Melanie+Schmidt&background=7b1fa2&color=fff' },
+    { id: 10, name: 'Stefan Klein', title: 'Experte für Immobilienverwaltung', exp: '9 Jahre', rating: '4.5', reviews: 42, focus: ['Nebenkosten', 'Modernisierung', 'Kaution'], location: 'Hannover', address: 'Georgstraße 1, 30159 Hannover', img: 'https://ui-avatars.com/api/?name=Stefan+Klein&background=ed6c02&color=fff' }
+];
+
+const grid = document.getElementById('topics-grid');
+TOPICS_CONFIG.forEach(topic => {
+    const card = document.createElement('div');
+    card.className = 'topic-card glass-card p-6 rounded-3xl border border-transparent hover:border-blue-200 cursor-pointer text-center transition-premium group bg-white';
+    card.onclick = () => loadTopic(topic.id);
+    card.innerHTML = `
+        <div class="w-12 h-12 rounded-2xl bg-slate-50 flex items-center justify-center mx-auto mb-4 group-hover:bg-blue-50 transition-premium" style="color: ${topic.color}">
+            <i class="fas ${topic.icon} text-2xl group-hover:scale-110 transition-premium"></i>
+        </div>
+        <span class="text-[11px] font-black uppercase tracking-widest text-slate-500 group-hover:text-blue-600">${topic.label}</span>
+    `;
+    grid.appendChild(card);
+});
+
+document.getElementById('current-date').innerText = new Date().toLocaleDateString('de-DE');
+
+// Eingabevorschläge: Auswahl führt direkt zur kuratierten Themenantwort
+let suggestTimer = null;
+const questionInput = document.getElementById('question');
+const suggestionBox = document.getElementById('question-suggestions');
+questionInput.addEventListener('input', () => {
+    clearTimeout(suggestTimer);
+    suggestTimer = setTimeout(() => loadSuggestions(questionInput.value), 120);
+});
+questionInput.addEventListener('blur', () => setTimeout(() => suggestionBox.classList.add('hidden'), 200));
+
+async function loadSuggestions(q) {
+    if (q.trim().length < 2) {
+        suggestionBox.classList.add('hidden');
+        return;
+    }
+    try {
+        const res = await fetch(`api/suggest?q=${encodeURIComponent(q)}`);
+        const data = await res.json();
+        if (questionInput.value !== q || !data.suggestions.length) {
+            if (!data.suggestions.length) suggestionBox.classList.add('hidden');
+            return;
+        }
+        suggestionBox.innerHTML = '';
+        data.suggestions.forEach(s => {
+            const item = document.createElement('button');
+            item.type = 'button';
+            item.className = 'w-full text-left px-6 py-3 text-sm font-medium text-slate-700 hover:bg-blue-50 flex items-center justify-between';
+            item.innerHTML = `<span></span><span class="text-[10px] font-black uppercase tracking-widest text-slate-400"></span>`;
+            item.firstChild.textContent = s.text;
+            item.lastChild.textContent = s.topic;
+            item.onmousedown = (e) => {
+                e.preventDefault();
+                pickSuggestion(s);
+            };
+            suggestionBox.appendChild(item);
+        });
+        suggestionBox.classList.remove('hidden');
+    } catch (err) {
+        suggestionBox.classList.add('hidden');
+    }
+}
+
+function pickSuggestion(s) {
+    suggestionBox.classList.add('hidden');
+    questionInput.value = s.text;
+    fetch('api/suggest/pick', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ text: s.text })
+    }).catch(() => {});
+    loadTopic(s.topic);
+}
+
+// Alle Themen mit einer (per ETag revalidierten) Anfrage laden
+let allTopicsPromise = null;
+function loadAllTopics() {
+    if (!allTopicsPromise) {
+        allTopicsPromise = fetch('api/topics?include=all')
+            .then(res => res.ok ? res.json() : {})
+            .catch(() => {
+                allTopicsPromise = null;
+                return {};
+            });
+    }
+    return allTopicsPromise;
+}
+
+async function loadTopic(id) {
+    currentSelectedTopic = id;
+    lastTopic = id;
+    const results = document.getElementById('results-content');
+    results.innerHTML = '<div class="animate-pulse flex flex-col items-center py-6"><div class="w-8 h-8 bg-blue-100 rounded-full mb-2"></div><div class="h-2 w-24 bg-blue-100 rounded"></div></div>';
+    
+    try {
+        const all = await loadAllTopics();
+        const data = all[id] || await (await fetch(`api/topic/${encodeURIComponent(id)}`)).json();
+        lastAnalysisData = data;
+        displayResults(id, data);
+    } catch (err) {
+        results.innerHTML = '<p class="text-red-500">Fehler beim Laden.</p>';
+    }
+}
+
+function displayResults(topic, data) {
+    const results = document.getElementById('results-content');
+    
+    // Be flexible with keys (Gemini/OpenAI might return variations)
+    let kiText = data['KI-Einschätzung'] || data['KI-Einschaetzung'] || data['ki_evaluation'] || data['summary'] || data['ki_assessment'] || data['result'];
+    
+    // Show error if data contains one
+    if (data.error) {
+        kiText = `Fehler: ${data.error}`;
+    }
+
+    if (!kiText) {
+        kiText = 'Eine Analyse wird vorbereitet. Bitte wechseln Sie zur professionellen Analyse für Details.';
+    }
+
+    let html = `<div class="w-full text-left p-4 scale-up">
+        <div class="mb-6 p-6 bg-blue-50/50 rounded-[30px] border-l-8 border-blue-500 shadow-inner">
+            <p class="text-[10px] font-black uppercase text-blue-600 tracking-widest mb-3">KI-Einschätzung (Schritt 1)</p>
+            <p class="text-base leading-relaxed text-slate-700 font-medium italic">"${kiText}"</p>
+        </div>
+        <button onclick="prepareAndGoToAnalysis('${topic.replace(/'/g, "\'")}')" class="w-full py-5 bg-slate-900 text-white rounded-[25px] text-xs font-black uppercase tracking-widest shadow-2xl hover:bg-blue-600 transition-all flex items-center justify-center space-x-3 hover:scale-[1.02] active:scale-95">
+            <span>Professionelle Fachanalyse</span>
+            <i class="fas fa-arrow-right"></i>
+        </button>
+        <p class="text-[9px] text-slate-400 text-center mt-4 font-black uppercase tracking-widest">Klicken Sie für BGB-Referenzen & Urteile</p>
+    </div>`;
+    results.innerHTML = html;
+}
+
+function prepareAndGoToAnalysis(topic, dataInput) {
+    const data = dataInput || lastAnalysisData;
+    const grid = document.getElementById('analysis-grid');
+    grid.innerHTML = '';
+    
+    // 1. Professionelle Analyse (Prominent)
+    if (data['Professionelle Analyse']) {
+        const item = document.createElement('div');
+        item.className = 'col-span-full bg-blue-50/30 p-8 rounded-[35px] border border-blue-100 shadow-inner mb-2';
+        item.innerHTML = `
+            <p class="text-[10px] font-black uppercase text-blue-600 tracking-widest mb-4">Rechtliche Fachanalyse (§§ BGB)</p>
+            <p class="text-xl leading-relaxed text-slate-800 font-bold">${data['Professionelle Analyse']}</p>
+        `;
+        grid.appendChild(item);
+    }
+
+    // 2. Gerichtsurteile (Dark Style)
+    if (data['Gerichtsurteile']) {
+        const item = document.createElement('div');
+        item.className = 'col-span-full bg-slate-900 text-white p-8 rounded-[35px] shadow-2xl mb-6 relative overflow-hidden';
+        item.innerHTML = `
+            <div class="absolute top-0 right-0 p-6 opacity-10">
+                <i class="fas fa-gavel text-6xl"></i>
+            </div>
+            <div class="flex items-center space-x-3 mb-4 relative z-10">
+                <div class="w-8 h-8 bg-amber-400 rounded-lg flex items-center justify-center text-slate-900 text-xs">
+                    <i class="fas fa-balance-scale"></i>
+                </div>
+                <p class="text-[10px] font-black uppercase text-amber-400 tracking-widest">Wichtige Gerichtsurteile</p>
+            </div>
+            <p class="text-sm leading-relaxed text-slate-300 font-medium relative z-10">${data['Gerichtsurteile']}</p>
+        `;
+        grid.appendChild(item);
+    }
+
+    // 3. Andere Felder (Fallback)
+    for (const key in data) {
+        if (['KI-Einschätzung', 'Professionelle Analyse', 'Gerichtsurteile'].includes(key)) continue;
+        const item = document.createElement('div');
+        item.className = 'bg-slate-50 p-6 rounded-2xl border border-slate-100';
+        item.innerHTML = `
+            <p class="text-[10px] font-black uppercase text-slate-400 tracking-widest mb-2">${key}</p>
+            <p class="text-sm leading-relaxed text-slate-700 font-medium">${data[key]}</p>
+        `;
+        grid.appendChild(item);
+    }
+    
+    document.getElementById('analysis-title').innerText = `Professionelle Analyse: ${topic}`;
+    
+    // Professional Risk & Recommendation Engine
+    const analysisProfiles = {
+        'Kaution': {
+            risk: 'Unnötige Verzögerungen bei der Rückzahlung führen zu Zinsverlusten. Bei Einbehalt ohne Grund droht ein Rechtsstreit. Achten Sie auf die 6-Monats-Frist.',
+            rec: 'Setzen Sie dem Vermieter schriftlich eine 14-tägige Frist zur Abrechnung/Rückzahlung. Fordern Sie ggf. Verzugszinsen nach BGB.'
+        },
+        'Kündigung': {
+            risk: 'Höchstes Risiko bei Formfehlern (Schriftform!) und Fristberechnung. Eine unwirksame Kündigung kann monatelange Mietfortzahlungen bedeuten.',
+            rec: 'Prüfen Sie unbedingt die Zustellung (Einschreiben). Lassen Sie die Begründung (z.B. Eigenbedarf) rechtlich auf Wirksamkeit prüfen.'
+        },
+        'Mietminderung': {
+            risk: 'Risiko der fristlosen Kündigung durch den Vermieter, falls die Minderung zu hoch angesetzt wird (Zahlungsverzug von > 1 Monat).',
+            rec: 'Zahlen Sie die Miete nur unter Vorbehalt. Nutzen Sie eine anerkannte Mietminderungstabelle und dokumentieren Sie Mängel mit Fotos/Zeugen.'
+        },
+        'Nebenkosten': {
+            risk: 'Verwirkung von Einwendungsrechten nach 12 Monaten nach Erhalt der Abrechnung. Hohes Risiko durch unzulässige Umlageschlüssel.',
+            rec: 'Fordern Sie Belegeinsicht an. Vergleichen Sie die Kosten mit dem Vorjahr und dem regionalen Betriebskostenspiegel.'
+        },
+        'Mietvertrag': {
+            risk: 'Hohes Risiko bei unwirksamen Renovierungsklauseln. Mieter renovieren oft unnötig. Prüfen Sie die Fristenpläne und Endrenovierungspflichten gemäß aktueller BGH-Rechtsprechung.',
+            rec: 'Lassen Sie Ihren Mietvertrag auf "starre Fristen" prüfen. Dokumentieren Sie den Zustand bei Einzug (unrenoviert übergeben?).'
+        },
+        'Untervermietung': {
+            risk: 'Abmahngefahr bei unerlaubter Untervermietung (§ 540 BGB). Fristlose Kündigung möglich, wenn die Erlaubnis vorsätzlich nicht eingeholt wurde.',
+            rec: 'Prüfen Sie Ihr "berechtigtes Interesse" gemäß § 553 BGB. Stellen Sie eine schriftliche Anfrage an den Vermieter mit Details zum Untermieter.'
+        },
+        'Eigentümerwechsel': {
+            risk: 'Unsicherheit bezüglich der Kautionsrückzahlung (§ 566a BGB) und möglicher Eigenbedarfskündigungen durch den neuen Eigentümer.',
+            rec: 'Prüfen Sie den Grundbucheintrag. Stellen Sie sicher, dass die Miete erst nach formeller Mitteilung an den neuen Eigentümer gezahlt wird.'
+        },
+        'Wohnungsübergabe': {
+            risk: 'Streit um Schönheitsreparaturen und Kautionseinbehalt wegen (angeblicher) Schäden. Verjährungsfrist von 6 Monaten (§ 548 BGB) beachten.',
+            rec: 'Bestehen Sie auf ein gemeinsames Übergabeprotokoll mit Fotos. Nehmen Sie Zeugen zur Übergabe mit.'
+        },
+        'Renovierung': {
+            risk: 'Kostenrisiko von mehreren tausend Euro bei Durchführung nicht geschuldeter Arbeiten oder Schadensersatz bei unterlassener wirksamer Renovierung.',
+            rec: 'Prüfen Sie, ob die Renovierungsklausel starr ist (unwirksam). Führen Sie beim Auszug ein Übergabeprotokoll mit dem Vermieter.'
+        },
+        'Mieterhöhung': {
+            risk: 'Kostenrisiko bei unberechtigter Mieterhöhung. Bei Widerspruch droht Klage. Bei Zustimmung zu hoher Miete über Jahre hinweg.',
+            rec: 'Prüfen Sie die Form und Begründung der Mieterhöhung. Vergleichen Sie mit dem Mietspiegel. Widersprechen Sie fristgerecht.'
+        },
+        'Hausordnung': {
+            risk: 'Abmahngefahr und Kündigungsrisiko bei wiederholten Verstößen gegen Ruhezeiten oder Reinigungspflichten.',
+            rec: 'Dokumentieren Sie ggf. Gegenbeweise bei ungerechtfertigten Vorwürfen. Suchen Sie das Gespräch mit der Hausverwaltung.'
+        },
+        'Lärm': {
+            risk: 'Beweisnotstand bei fehlender Dokumentation. Risiko der Eskalation mit Nachbarn ohne rechtliche Grundlage.',
+            rec: 'Führen Sie ein exaktes Lärmprotokoll über mindestens 2 Wochen. Informieren Sie den Vermieter schriftlich über die Beeinträchtigung.'
+        },
+        'Modernisierung': {
+            risk: 'Erhebliche dauerhafte Mieterhöhung (8% der Kosten). Risiko durch unzureichende Ankündigung oder fehlende Härtefallprüfung.',
+            rec: 'Prüfen Sie die Ankündigungsfrist (3 Monate). Machen Sie ggf. wirtschaftliche Härtegründe innerhalb der Frist geltend.'
+        },
+        'Tierhaltung': {
+            risk: 'Rechtsstreit um die Entfernung des Tieres bei fehlender oder verweigerter Zustimmung trotz berechtigtem Interesse.',
+            rec: 'Holen Sie die Zustimmung schriftlich ein. Ein generelles Verbot im Vertrag ist meist unwirksam, eine Einzelfallprüfung ist Pflicht.'
+        },
+        'Wohnfläche': {
+            risk: 'Überzahlung von Miete und Nebenkosten über Jahre hinweg bei falscher Flächenangabe im Mietvertrag.',
+            rec: 'Messen Sie nach (Wohnflächenverordnung). Bei >10% Abweichung fordern Sie Rückzahlung und Anpassung für die Zukunft.'
+        },
+        'Wasserschaden': {
+            risk: 'Haftungsrisiko für Folgeschäden (Schimmel, Substanzschäden) bei verspäteter Schadensmeldung durch den Mieter.',
+            rec: 'Melden Sie den Schaden sofort (Telefon + E-Mail). Fordern Sie Trocknungsgeräte an und mindern Sie die Miete für die Dauer der Arbeiten.'
+        },
+        'Vermieterfragen': {
+            risk: 'Diskriminierungsgefahr und Verletzung der Privatsphäre. Unzulässige Fragen im Bewerbungsprozess können Schadensersatzansprüche nach dem AGG auslösen.',
+            rec: 'Antworten Sie auf unzulässige Fragen (z.B. Familienplanung) zurückhaltend oder nutzen Sie Ihr Recht zur Lüge. Lassen Sie sich bei Diskriminierung rechtlich beraten.'
+        }
+    };
+
+    const profile = analysisProfiles[topic] || {
+        risk: 'Es besteht ein allgemeines rechtliches Risiko. Handeln Sie nicht ohne Klärung der Sachlage.',
+        rec: 'Wir empfehlen eine detaillierte Prüfung durch einen spezialisierten Anwalt, um Ihre Rechte zu wahren.'
+    };
+
+    document.getElementById('analysis-risk').innerText = profile.risk;
+    document.getElementById('analysis-recommendation').innerText = profile.rec;
+    
+    document.getElementById('to-lawyer-btn').onclick = () => renderLawyers(topic);
+
+    goToStep(2);
+}
+
+function renderLawyers(topic) {
+    // Just transition to Step 3, matching happens via form
+    document.getElementById('lawyer-match-text').innerText = `Experten-Matching für "${topic}" vorbereitet...`;
+    goToStep(3);
+}
+
+function performExpertMatching() {
+    const list = document.getElementById('lawyer-list');
+    const vorname = document.getElementById('user-vorname');
+    const nachname = document.getElementById('user-nachname');
+    const email = document.getElementById('user-email');
+    const phone = document.getElementById('user-phone');
+    const plz = document.getElementById('user-plz');
+    const ort = document.getElementById('user-ort');
+    const scope = document.querySelector('input[name="search-scope"]:checked').value;
+    const matchBtn = document.querySelector('button[onclick="performExpertMatching()"]');
+
+    // Reset errors
+    [vorname, nachname, email, phone, plz, ort].forEach(el => el.classList.remove('input-error'));
+    matchBtn.classList.remove('shake');
+
+    let isValid = true;
+    const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+    const plzRegex = /^\d{5}$/;
+
+    if (!vorname.value.trim()) { vorname.classList.add('input-error'); isValid = false; }
+    if (!nachname.value.trim()) { nachname.classList.add('input-error'); isValid = false; }
+    if (!emailRegex.test(email.value.trim())) { email.classList.add('input-error'); isValid = false; }
+    if (!phone.value.trim()) { phone.classList.add('input-error'); isValid = false; }
+    if (!plzRegex.test(plz.value.trim())) { plz.classList.add('input-error'); isValid = false; }
+    if (!ort.value.trim()) { ort.classList.add('input-error'); isValid = false; }
+
+    if (!isValid) {
+        matchBtn.classList.add('shake');
+        // Add a temporary error text below the button if not present
+        return;
+    }
+
+    list.innerHTML = '<div class="col-span-full py-12 text-center animate-pulse text-blue-500 font-bold italic">Suche Experten in Ihrer Region...</div>';
+    
+    setTimeout(() => {
+        list.innerHTML = '';
+        let matches = [];
+        
+        if(scope === 'local') {
+            // Simulate local search (showing lawyers from same "region" or top matches)
+            matches = LAWYERS_DATA.filter(l => l.focus.includes(currentSelectedTopic) || l.rating >= 4.8);
+        } else {
+            // National - Show all specialized or top-rated (now showing up to 10)
+            matches = [...LAWYERS_DATA].sort((a,b) => b.rating - a.rating);
+        }
+
+        matches.slice(0, 10).forEach(lawyer => {
+            const card = document.createElement('div');
+            card.className = 'bg-white p-6 rounded-2xl shadow-sm border border-slate-100 hover:shadow-md transition-all flex flex-col scale-in';
+            
+            // Fake distance if local
+            const distance = scope === 'local' ? `${(Math.random() * 5 + 1).toFixed(1)} km entfernt` : lawyer.location;
+
+            card.innerHTML = `
+                <div class="flex items-center space-x-4 mb-6">
+                    <div class="w-16 h-16 rounded-full overflow-hidden border-2 border-slate-100 flex-shrink-0">
+                        <img src="${lawyer.img}" alt="${lawyer.name}" class="w-full h-full object-cover" onerror="this.src='https://ui-avatars.com/api/?name=${encodeURIComponent(lawyer.name)}&background=random'">
+                    </div>
+                    <div>
+                        <h4 class="font-bold text-slate-900 leading-tight text-sm">${lawyer.name}</h4>
+                        <p class="text-[10px] text-blue-600 font-bold uppercase tracking-wide">${lawyer.title}</p>
+                    </div>
+                </div>
+                <div class="space-y-3 mb-6 flex-1">
+                    <div class="flex justify-between text-xs">
+                        <span class="text-slate-400">Erfahrung</span>
+                        <span class="font-bold">${lawyer.exp}</span>
+                    </div>
+                    <div class="flex justify-between text-xs">
+                        <span class="text-slate-400">Bewertung</span>
+                        <span class="text-yellow-500 font-bold"><i class="fas fa-star mr-1"></i>${lawyer.rating}</span>
+                    </div>
+                    <div class="flex justify-between text-xs">
+                        <span class="text-slate-400">Standort</span>
+                        <span class="font-bold text-blue-600">${distance}</span>
+                    </div>
+                </div>
+                <button onclick="contactLawyer('${lawyer.name}')" class="w-full py-3 bg-slate-900 text-white rounded-xl text-xs font-bold hover:bg-slate-800 transition-colors">
+                    Jetzt kontaktieren
+                </button>
+            `;
+            list.appendChild(card);
+        });
+
+        document.getElementById('lawyer-match-text').innerText = `${matches.length} passende Experten in ${ort || 'Ihrer Region'} für "${currentSelectedTopic}" gefunden`;
+    }, 1500);
+}
+
+let selectedConsultationType = '';
+let currentPrice = 0;
+let currentLawyer = null;
+
+function contactLawyer(name) {
+    // Find lawyer in data
+    currentLawyer = LAWYERS_DATA.find(l => l.name === name);
+    if(!currentLawyer) return;
+
+    // Sync to Step 4 UI
+    document.getElementById('step4-lawyer-name').innerText = currentLawyer.name;
+    document.getElementById('step4-lawyer-img').src = currentLawyer.img;
+    document.getElementById('step4-lawyer-title').innerText = currentLawyer.title;
+    document.getElementById('step4-lawyer-rating').innerText = currentLawyer.rating;
+    document.getElementById('step4-lawyer-exp').innerText = `${currentLawyer.exp} Erfahrung`;
+    document.getElementById('step4-lawyer-address').innerText = currentLawyer.address;
+
+    goToStep(4);
+}
+
+function selectPayment(el) {
+    const method = el.querySelector('span').innerText.trim();
+    console.log('Payment method selected:', method);
+    
+    document.querySelectorAll('.payment-opt').forEach(opt => opt.classList.remove('border-blue-500', 'bg-blue-50'));
+    el.classList.add('border-blue-500', 'bg-blue-50');
+    
+    // Reset Forms
+    document.getElementById('cc-form').classList.add('hidden');
+    document.getElementById('sepa-form').classList.add('hidden');
+    
+    currentPaymentMethod = method;
+    
+    const methodLower = method.toLowerCase();
+    if (methodLower.includes('paypal')) {
+        showLoading('Verbindung zu PayPal wird hergestellt...');
+        setTimeout(() => {
+            hideLoading();
+            openPaypalModal();
+        }, 1200);
+    } else if (methodLower.includes('überweisung') || methodLower.includes('sofort')) {
+        showLoading('SOFORT wird vorbereitet...');
+        setTimeout(() => {
+            hideLoading();
+            openSofortModal();
+        }, 1000);
+    } else if (methodLower.includes('kreditkarte')) {
+        document.getElementById('cc-form').classList.remove('hidden');
+    } else if (methodLower.includes('sepa')) {
+        document.getElementById('sepa-form').classList.remove('hidden');
+    }
+}
+
+function openPaypalModal() {
+    document.getElementById('paypal-modal-backdrop').style.display = 'block';
+    document.getElementById('paypal-modal').style.display = 'block';
+    document.getElementById('paypal-login-view').classList.remove('hidden');
+    document.getElementById('paypal-checkout-view').classList.add('hidden');
+    document.getElementById('paypal-email').focus();
+}
+
+function closePaypalModal() {
+    document.getElementById('paypal-modal-backdrop').style.display = 'none';
+    document.getElementById('paypal-modal').style.display = 'none';
+}
+
+function handlePaypalLogin() {
+    const email = document.getElementById('paypal-email').value;
+    if (!email || !email.includes('@')) {
+        alert('Bitte geben Sie eine gültige E-Mail-Adresse ein.');
+        return;
+    }
+    
+    showLoading('Konto wird verifiziert...');
+    
+    setTimeout(() => {
+        hideLoading();
+        // Transition to Yellow Checkout Page
+        document.getElementById('paypal-login-view').classList.add('hidden');
+        document.getElementById('paypal-checkout-view').classList.remove('hidden');
+        document.getElementById('paypal-checkout-amount').innerText = currentPrice.toFixed(2) + ' €';
+    }, 1500);
+}
+
+function finalizePaypalPayment() {
+    closePaypalModal();
+    showLoading('Zahlung wird autorisiert...');
+    
+    setTimeout(() => {
+        hideLoading();
+        paypalAuthorized = true;
+        // Visual feedback on the booking button
+        const btn = document.querySelector('button[onclick="confirmBooking()"]');
+        btn.innerHTML = '<i class="fas fa-check"></i> <span>Zahlung autorisiert - Jetzt buchen</span>';
+        btn.classList.remove('bg-blue-600');
+        btn.classList.add('bg-green-600');
+    }, 2000);
+}
+
+function openSofortModal() {
+    document.getElementById('sofort-modal-backdrop').style.display = 'block';
+    document.getElementById('sofort-modal').style.display = 'block';
+    document.getElementById('sofort-price').innerText = currentPrice.toFixed(2) + ' €';
+}
+
+function closeSofortModal() {
+    document.getElementById('sofort-modal-backdrop').style.display = 'none';
+    document.getElementById('sofort-modal').style.display = 'none';
+}
+
+function handleSofortRedirect() {
+    closeSofortModal();
+    showLoading('Weiterleitung zu Ihrer Bank...');
+    
+    setTimeout(() => {
+        showLoading('Warten auf Bank-Autorisierung...');
+        setTimeout(() => {
+            hideLoading();
+            paypalAuthorized = true; // Use same flag
+            const btn = document.querySelector('button[onclick="confirmBooking()"]');
+            btn.innerHTML = '<i class="fas fa-check"></i> <span>Zahlung autorisiert - Jetzt buchen</span>';
+            btn.classList.remove('bg-blue-600');
+            btn.classList.add('bg-green-600');
+            alert('Zahlung erfolgreich über SOFORT autorisiert.');
+        }, 2000);
+    }, 1500);
+}
+
+function showLoading(text) {
+    document.getElementById('loading-text').innerText = text;
+    document.getElementById('loading-overlay').style.display = 'flex';
+}
+
+function hideLoading() {
+    document.getElementById('loading-overlay').style.display = 'none';
+}
+
+function selectConsultation(type, price) {
+    selectedConsultationType = type;
+    currentPrice = price;
+    document.getElementById('summary-type').innerText = type;
+    document.getElementById('summary-price').innerText = price.toFixed(2) + ' €';
+    document.getElementById('final-price').innerText = price.toFixed(2) + ' €';
+    
+    // Sync Lawyer to Step 5
+    if(currentLawyer) {
+        document.getElementById('step5-header-lawyer-name').innerText = currentLawyer.name;
+        document.getElementById('step5-header-lawyer-img').src = currentLawyer.img;
+        document.getElementById('step5-header-lawyer-title').innerText = currentLawyer.title;
+        document.getElementById('step5-header-lawyer-rating').innerText = currentLawyer.rating;
+        document.getElementById('step5-header-lawyer-exp').innerText = `${currentLawyer.exp} Erfahrung`;
+        document.getElementById('step5-header-lawyer-address').innerText = currentLawyer.address;
+        
+        document.getElementById('step5-lawyer-name').innerText = currentLawyer.name;
+        document.getElementById('step5-lawyer-img').src = currentLawyer.img;
+        document.getElementById('step5-lawyer-title').innerText = currentLawyer.title;
+        document.getElementById('step5-lawyer-address-sidebar').innerText = currentLawyer.address;
+    }
+
+    // Sync data from Step 3
+    const vorname = document.getElementById('user-vorname').value || '';
+    const nachname = document.getElementById('user-nachname').value || '';
+    const strasse = document.getElementById('user-strasse').value || '';
+    const plz = document.getElementById('user-plz').value || '';
+    const ort = document.getElementById('user-ort').value || '';
+    const phone = document.getElementById('user-phone').value || '';
+    const email = document.getElementById('user-email').value || '';
+
+    document.getElementById('display-user-name').innerText = `${vorname} ${nachname}`.trim() || 'Nicht angegeben';
+    document.getElementById('display-user-address').innerText = strasse ? `${strasse}, ${plz} ${ort}` : 'Nicht angegeben';
+    document.getElementById('display-user-phone').innerText = phone || 'Nicht angegeben';
+    document.getElementById('display-user-email').innerText = email || 'Nicht angegeben';
+
+    renderCalendar();
+    goToStep(5);
+}
+
+function renderCalendar() {
+    const grid = document.getElementById('calendar-grid');
+    grid.innerHTML = '<span>Mo</span><span>Di</span><span>Mi</span><span>Do</span><span>Fr</span><span>Sa</span><span>So</span>';
+    
+    const today = new Date();
+    const holidays = ["1.1."]; // Mock holiday list
+    
+    // Add padding for correct day alignment (Mo=1, Di=2 ... So=0)
+    // Need (today.getDay() + 6) % 7 empty slots
+    const padding = (today.getDay() + 6) % 7;
+    for(let p=0; p<padding; p++) {
+        const span = document.createElement('span');
+        grid.appendChild(span);
+    }
+
+    for(let i=0; i<14; i++) {
+        const d = new Date();
+        d.setDate(today.getDate() + i);
+        const dayNum = d.getDate();
+        const monthNum = d.getMonth() + 1;
+        const dateStr = dayNum + '.' + monthNum + '.';
+        
+        const fullDateStr = d.toLocaleDateString('de-DE', { day: 'numeric', month: 'long' });
+        const isoDateStr = d.toISOString().split('T')[0];
+        
+        const isSunday = d.getDay() === 0;
+        const isSaturday = d.getDay() === 6;
+        const isHoliday = holidays.includes(dateStr);
+        const isInactive = isSunday || isHoliday;
+        
+        const btn = document.createElement('button');
+        btn.innerText = dayNum;
+        btn.setAttribute('data-full-date', fullDateStr);
+        btn.setAttribute('data-iso-date', isoDateStr);
+        
+        if (isInactive) btn.disabled = true;
+        
+        const updateStyles = (active) => {
+            let classes = "p-4 rounded-2xl border transition-premium text-sm font-black ";
+            if (isInactive) {
+                classes += "bg-slate-50 text-slate-200 border-slate-50 cursor-not-allowed opacity-30";
+            } else if (active) {
+                classes += "bg-blue-600 text-white border-blue-600 shadow-xl shadow-blue-500/20 scale-105";
+            } else if (isSaturday) {
+                classes += "bg-white text-blue-600 border-blue-100 hover:border-blue-400";
+            } else {
+                classes += "bg-white hover:border-blue-400 border-slate-100 text-slate-600 shadow-sm";
+            }
+            btn.className = classes;
+        };
+
+        updateStyles(i === 0);
+        if (isInactive) btn.disabled = true;
+
+        btn.onclick = () => {
+            if (isInactive) return;
+            document.querySelectorAll('#calendar-grid button').forEach(b => {
+                if (b.btnRedraw) b.btnRedraw(false);
+            });
+            updateStyles(true);
+        };
+        
+        btn.btnRedraw = (active) => updateStyles(active);
+        grid.appendChild(btn);
+    }
+}
+
+function selectTime(btn) {
+    const time = btn.innerText.trim();
+    console.log('Time selected:', time);
+    
+    // Reset all slots
+    document.querySelectorAll('.time-slot').forEach(b => {
+        b.classList.remove('bg-blue-600', 'text-white', 'shadow-xl', 'shadow-blue-500/30', 'border-blue-600', 'scale-105');
+        b.classList.add('bg-slate-50/50', 'text-slate-700', 'border-transparent');
+    });
+    
+    // Set active slot
+    btn.classList.remove('bg-slate-50/50', 'text-slate-700', 'border-transparent');
+    btn.classList.add('bg-blue-600', 'text-white', 'shadow-xl', 'shadow-blue-500/30', 'border-blue-600', 'scale-105');
+    
+    // Update display
+    const selectedDayBtn = document.querySelector('#calendar-grid button.bg-blue-600');
+    const fullDate = selectedDayBtn?.getAttribute('data-full-date') || '-';
+    const bookingDisplay = document.getElementById('booking-time-display');
+    if (bookingDisplay) {
+        bookingDisplay.innerText = `${fullDate} um ${time} Uhr`;
+        bookingDisplay.setAttribute('data-iso-date', selectedDayBtn?.getAttribute('data-iso-date'));
+        bookingDisplay.setAttribute('data-time', time);
+    }
+}
+
+async function confirmBooking() {
+    if (!currentPaymentMethod) {
+        alert('Bitte wählen Sie eine Zahlungsmethode.');
+        return;
+    }
+
+    if (currentPaymentMethod === 'PayPal' && !paypalAuthorized) {
+        openPaypalModal();
+        return;
+    }
+
+    showLoading(currentPaymentMethod === 'PayPal' ? 'Zahlung wird abgeschlossen...' : `Weiterleitung zu ${currentPaymentMethod}...`);
+    
+    // Prepare Case Data for Lawyer Dashboard
+    const bookingData = {
+        timestamp: new Date().toISOString(),
+        userName: document.getElementById('user-vorname').value + ' ' + document.getElementById('user-nachname').value,
+        userEmail: document.getElementById('user-email').value,
+        userPhone: document.getElementById('user-phone').value,
+        userAddress: document.getElementById('user-strasse').value + ', ' + document.getElementById('user-plz').value + ' ' + document.getElementById('user-ort').value,
+        topic: lastTopic,
+        analysis: lastAnalysisData['Professionelle Analyse'],
+        risk: document.getElementById('analysis-risk').innerText,
+        recommendation: document.getElementById('analysis-recommendation').innerText,
+        lawyer: currentLawyer?.name,
+        consultationType: selectedConsultationType,
+        price: currentPrice,
+        bookingTime: document.getElementById('booking-time-display').innerText,
+        documents: lastDocument ? [lastDocument] : []
+    };
+
+    try {
+        const response = await fetch('api/book', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(bookingData)
+        });
+        const result = await response.json();
+        console.log('Booking saved:', result);
+    } catch (err) {
+        console.error('Error saving booking:', err);
+    }
+
+    setTimeout(() => {
+        hideLoading();
+        const results = document.getElementById('view-step-6');
+        results.innerHTML = `
+        <div class="max-w-3xl mx-auto text-center py-12 fade-in">
+            <div class="w-24 h-24 bg-green-50 text-green-500 rounded-[32px] flex items-center justify-center text-5xl mx-auto mb-8 shadow-premium floating border border-green-100">
+                <i class="fas fa-check"></i>
+            </div>
+            <h2 class="text-5xl font-black text-slate-900 mb-4 tracking-tight">Termin bestätigt!</h2>
+            <p class="text-slate-500 mb-10 text-lg font-medium">Vielen Dank für Ihr Vertrauen. <br>Ihre Beratung wurde erfolgreich reserviert.</p>
+            
+            <div class="flex items-center justify-center space-x-4 mb-10 p-6 glass-card border-green-100 shadow-sm border-left-4 border-l-green-500">
+                <div class="w-12 h-12 bg-green-50 rounded-2xl flex items-center justify-center text-green-600 shadow-sm">
+                    <i class="fas fa-envelope-circle-check text-xl"></i>
+                </div>
+                <div class="text-left">
+                    <p class="text-[10px] font-black uppercase text-slate-400 tracking-widest leading-none mb-1">E-Mail Bestätigung</p>
+                    <p class="text-sm font-black text-slate-700">Gesendet an <span class="text-blue-600">${bookingData.userEmail}</span></p>
+                </div>
+            </div>
+            
+            <div class="grid grid-cols-1 md:grid-cols-2 gap-8 mb-12">
+                <div class="glass-card p-10 border-2 border-dashed border-slate-200 group hover:border-blue-500 transition-premium flex flex-col justify-between bg-white/50">
+                    <div class="flex items-center justify-between mb-8">
+                        <div class="text-left">
+                            <p class="text-[10px] font-black uppercase text-blue-600 tracking-widest">Bereit zum Download</p>
+                            <h4 class="font-bold text-slate-900">Analyse_${lastTopic.replace(/\s+/g, '_')}.txt</h4>
+                        </div>
+                        <i class="fas fa-file-alt text-4xl text-blue-500"></i>
+                    </div>
+                    <button onclick="generateLegalDocument()" class="w-full py-4 bg-blue-600 text-white rounded-2xl font-black uppercase tracking-widest shadow-xl hover:bg-blue-700 transition-all flex items-center justify-center space-x-3">
+                        <i class="fas fa-download"></i>
+                        <span>Download</span>
+                    </button>
+                </div>
+
+                <div class="bg-amber-50 p-8 rounded-[35px] border-2 border-dashed border-amber-200 group hover:border-amber-400 transition-all flex flex-col justify-between">
+                    <div class="flex items-center justify-between mb-6">
+                        <div class="text-left">
+                            <p class="text-[10px] font-black uppercase text-amber-600 tracking-widest">Kalender Export</p>
+                            <h4 class="font-bold text-slate-900">Termin.ics</h4>
+                        </div>
+                        <i class="fas fa-calendar-check text-4xl text-amber-500"></i>
+                    </div>${fristField()}
+                    <button onclick="downloadICS()" class="w-full py-4 bg-amber-500 text-white rounded-2xl font-black uppercase tracking-widest shadow-xl hover:bg-amber-600 transition-all flex items-center justify-center space-x-3">
+                        <i class="fas fa-calendar-plus"></i>
+                        <span>Exportieren</span>
+                    </button>
+                </div>
+            </div>
+
+            <div class="flex flex-col space-y-4">
+                <button onclick="location.reload()" class="text-slate-400 hover:text-slate-600 text-xs font-bold uppercase tracking-widest">
+                    Zurück zum Dashboard
+                </button>
+                <a href="/lawyer" target="_blank" class="text-blue-600 hover:text-blue-800 text-xs font-bold uppercase tracking-widest">
+                    <i class="fas fa-external-link-alt mr-1"></i> Anwalts-Dashboard öffnen
+                </a>
+            </div>
+        </div>
+    `;
+        loadFristLabel();
+        const progress = document.getElementById('progress-bar');
+        progress.style.width = '100%';
+        document.getElementById('progress-text').innerText = '100%';
+    }, 2000);
+}
+
+function generateLegalDocument() {
+    const vorname = document.getElementById('user-vorname').value || 'Max';
+    const nachname = document.getElementById('user-nachname').value || 'Mustermann';
+    const date = new Date().toLocaleDateString('de-DE');
+    
+    const content = `
+JURISMIND SMARTLAW AGENT - RECHTSSICHERES DOKUMENT
+Datum: ${date}
+Mandant: ${vorname} ${nachname}
+Thema: ${lastTopic}
+
+GEGENSTAND DER ANALYSE:
+------------------------
+${lastAnalysisData['Professionelle Analyse'] || 'Individuelle Fallprüfung'}
+
+RECHTLICHE BEURTEILUNG:
+------------------------
+${lastAnalysisData['KI-Einschätzung'] || ''}
+
+RECHTSPRECHUNG:
+------------------------
+${lastAnalysisData['Gerichtsurteile'] || 'Es gelten die allgemeinen BGH-Grundsätze.'}
+
+HINWEIS:
+Dieses Dokument wurde automatisiert erstellt und dient der Vorbereitung Ihres Anwaltstermins.
+JurisMind GmbH - Ihr Partner für digitales Mietrecht.
+    `;
+    
+    const blob = new Blob([content], { type: 'text/plain' });
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    const safeTopic = lastTopic.replace(/\s+/g, '_');
+    a.download = `JurisMind_Analyse_${safeTopic}.txt`;
+    document.body.appendChild(a);
+    a.click();
+    window.URL.revokeObjectURL(url);
+    alert('Ihr Dokument wurde generiert und heruntergeladen.');
+}
+
+function downloadICS() {
+    const bookingDisplay = document.getElementById('booking-time-display');
+    const isoDate = bookingDisplay?.getAttribute('data-iso-date'); // YYYY-MM-DD
+    const time = bookingDisplay?.getAttribute('data-time'); // HH:MM
+    
+    if (!isoDate || !time) {
+        alert('Fehler beim Generieren des Kalendereintrags.');
+        return;
+    }
+
+    const startDateTime = isoDate.replace(/-/g, '') + 'T' + time.replace(':', '') + '00';
+    
+    // End time 30 mins later
+    const [hh, mm] = time.split(':').map(Number);
+    const endDate = new Date(isoDate);
+    endDate.setHours(hh);
+    endDate.setMinutes(mm + 30);
+    const endDateTime = endDate.toISOString().replace(/[-:]/g, '').split('.')[0] + 'Z';
+    // Wait, toISOString is UTC, isoDate is local... let's keep it simple for mock
+    const simpleEnd = isoDate.replace(/-/g, '') + 'T' + (mm >= 30 ? (hh+1).toString().padStart(2,'0') : hh.toString().padStart(2,'0')) + (mm >= 30 ? (mm-30).toString().padStart(2,'0') : (mm+30).toString().padStart(2,'0')) + '00';
+
+    const lawyerName = currentLawyer?.name || 'Rechtsanwalt';
+    const lawyerAddress = currentLawyer?.address || '';
+    const summary = `Erstberatung: ${lastTopic} - JurisMind`;
+    const description = `Ihr gebuchter Termin bei ${lawyerName}.\\nThema: ${lastTopic}\\nAnschrift: ${lawyerAddress}`;
+
+    const icsContent = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//JurisMind//SmartLaw Agent//DE',
+        'BEGIN:VEVENT',
+        `DTSTART:${simpleEnd.startsWith('T') ? startDateTime : isoDate.replace(/-/g, '') + 'T' + time.replace(':', '') + '00'}`,
+        `DTEND:${simpleEnd}`,
+        `SUMMARY:${summary}`,
+        `DESCRIPTION:${description}`,
+        `LOCATION:${lawyerAddress}`,
+        'END:VEVENT',
+        'END:VCALENDAR'
+    ].join('\n');
+
+    // Mit Ereignisdatum kommt die Frist zum Thema in dieselbe Datei
+    const fristType = TOPIC_FRISTEN[lastTopic];
+    const eventDate = document.getElementById('frist-event-date')?.value;
+    if (fristType && eventDate) {
+        downloadFristenICS([{ type: fristType, date: eventDate }], null, icsContent);
+        return;
+    }
+    saveICS(icsContent, 'JurisMind_Termin.ics');
+}
+
+// Frist zum Thema der Beratung; das auslösende Ereignis (z.B. Zugang der Kündigung) gibt der Mandant an
+const TOPIC_FRISTEN = {
+    'Kündigung': 'kuendigung_mieter',
+    'Nebenkosten': 'nebenkosten_abrechnung',
+    'Mieterhöhung': 'zustimmung_mieterhoehung',
+    'Modernisierung': 'modernisierung_ankuendigung',
+    'Wohnungsübergabe': 'verjaehrung_rueckgabe'
+};
+
+function fristField() {
+    if (!TOPIC_FRISTEN[lastTopic]) return '';
+    return `
+                    <label class="block text-left mb-6">
+                        <span id="frist-event-label" class="block text-[10px] font-black uppercase text-amber-600 tracking-widest mb-2">Frist mit exportieren: Datum des Ereignisses</span>
+                        <input type="date" id="frist-event-date" class="w-full p-3 rounded-xl border border-amber-200 bg-white text-sm font-bold text-slate-700">
+                    </label>`;
+}
+
+async function loadFristLabel() {
+    const type = TOPIC_FRISTEN[lastTopic];
+    const label = document.getElementById('frist-event-label');
+    if (!type || !label) return;
+    try {
+        const frist = (await (await fetch('api/fristen')).json())[type];
+        label.innerText = `${frist.label} (${frist.norm}): ${frist.ereignis}`;
+    } catch (err) {
+        // Allgemeine Beschriftung bleibt stehen
+    }
+}
+
+// Fristen werden serverseitig berechnet (Feiertage je Bundesland, § 193 BGB);
+// mit appointmentICS landen sie zusammen mit dem Beratungstermin in einer Datei
+async function downloadFristenICS(events, bundesland, appointmentICS = null) {
+    try {
+        const response = await fetch('api/fristen?format=ics', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ events: events, bundesland: bundesland })
+        });
+        if (!response.ok) throw new Error('Fristberechnung fehlgeschlagen');
+        const fristenICS = await response.text();
+        if (appointmentICS) {
+            saveICS(mergeICS(appointmentICS, fristenICS), 'JurisMind_Termin.ics');
+        } else {
+            saveICS(fristenICS, 'JurisMind_Fristen.ics');
+        }
+    } catch (error) {
+        if (appointmentICS) saveICS(appointmentICS, 'JurisMind_Termin.ics');
+        alert('Die Frist konnte nicht berechnet werden.');
+    }
+}
+
+// Hängt die VEVENTs aus extra an den Kalender base an
+function mergeICS(base, extra) {
+    const events = extra.replace(/\r\n/g, '\n').match(/BEGIN:VEVENT[\s\S]*?END:VEVENT/g) || [];
+    return base.replace(/END:VCALENDAR\s*$/, events.join('\n') + '\nEND:VCALENDAR');
+}
+
+function saveICS(icsContent, filename) {
+    const blob = new Blob([icsContent], { type: 'text/calendar;charset=utf-8' });
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = filename;
+    document.body.appendChild(a);
+    a.click();
+    window.URL.revokeObjectURL(url);
+}
+
+function goToStep(num) {
+    const steps = [
+        document.getElementById('view-step-1'),
+        document.getElementById('view-step-2'),
+        document.getElementById('view-step-3'),
+        document.getElementById('view-step-4'),
+        document.getElementById('view-step-5'),
+        document.getElementById('view-step-6')
+    ];
+    const progress = document.getElementById('progress-bar');
+    const progText = document.getElementById('progress-text');
+    const stepInfo = document.getElementById('step-info');
+
+    // Reset
+    steps.forEach(el => el && el.classList.add('step-hidden'));
+    
+    const configs = {
+        1: { width: '17%', info: 'Schritt 1 von 6 • 17%' },
+        2: { width: '34%', info: 'Schritt 2 von 6 • 34%' },
+        3: { width: '51%', info: 'Schritt 3 von 6 • 51%' },
+        4: { width: '68%', info: 'Schritt 4 von 6 • 68%' },
+        5: { width: '85%', info: 'Schritt 5 von 6 • 85%' },
+        6: { width: '95%', info: 'Schritt 6 von 6 • 95%' }
+    };
+
+    if(steps[num-1]) {
+        steps[num-1].classList.remove('step-hidden');
+        progress.style.width = configs[num].width;
+        progText.innerText = configs[num].width;
+        stepInfo.innerText = configs[num].info;
+        setStepper(num);
+        window.scrollTo({ top: 0, behavior: 'smooth' });
+    }
+}
+
+function setStepper(num) {
+    const steppers = [
+        document.getElementById('stepper-1'),
+        document.getElementById('stepper-2'),
+        document.getElementById('stepper-3'),
+        document.getElementById('stepper-4'),
+        document.getElementById('stepper-5'),
+        document.getElementById('stepper-6')
+    ];
+    
+    steppers.forEach(el => {
+        if(!el) return;
+        el.classList.add('opacity-50');
+        el.classList.remove('stepper-active');
+    });
+    
+    for(let i=0; i<num; i++) {
+        if(steppers[i]) {
+            steppers[i].classList.remove('opacity-50');
+            if(i === num-1) steppers[i].classList.add('stepper-active');
+        }
+    }
+}
+
+async function askQuestion() {
+    const q = document.getElementById('question').value;
+    if(!q) return;
+    
+    const results = document.getElementById('results-content');
+    results.innerHTML = '<p class="animate-pulse">Analysiere Fragestellung...</p>';
+    
+    const qLower = q.toLowerCase();
+    const topics = TOPICS_CONFIG.map(t => t.id);
+    let found = topics.find(t => qLower.includes(t.toLowerCase()));
+    
+    // Erweitere Suche für Aliase
+    if (!found) {
+        if (qLower.includes('miete erhöhen') || qLower.includes('mieterhöhung')) found = 'Mieterhöhung';
+        else if (qLower.includes('nebenkosten') || qLower.includes('betriebskosten')) found = 'Nebenkosten';
+        else if (qLower.includes('mietminderung') || qLower.includes('mängel') || (qLower.includes('miete') && qLower.includes('minder'))) found = 'Mietminderung';
+        else if (qLower.includes('schönheitsreparaturen') || qLower.includes('renovierung') || qLower.includes('streichen')) found = 'Renovierung';
+        else if (qLower.includes('untermieter') || qLower.includes('untervermietung') || qLower.includes('untervermieten')) found = 'Untervermietung';
+        else if (qLower.includes('hausverkauf') || qLower.includes('neuer eigentümer') || qLower.includes('eigentümerwechsel') || qLower.includes('verkauft')) found = 'Eigentümerwechsel';
+        else if (qLower.includes('übergabe') || qLower.includes('wohnungsübergabe') || qLower.includes('auszug') || qLower.includes('einzug')) found = 'Wohnungsübergabe';
+        else if (qLower.includes('vertrag') || qLower.includes('abkommen')) found = 'Mietvertrag';
+        else if (qLower.includes('unwirksam') || qLower.includes('ungültig') || qLower.includes('klausel')) found = 'Unwirksame Klauseln';
+        else if (qLower.includes('reparatur') || qLower.includes('kleinreparatur')) found = 'Kleinreparaturen';
+        else if (qLower.includes('verzich') || qLower.includes('kündigungsausschluss')) found = 'Kündigungsverzicht';
+        else if (qLower.includes('pauschal')) found = 'Pauschalen';
+        else if (qLower.includes('schlüssel') || qLower.includes('zutritt') || qLower.includes('betreten')) found = 'Wohnungsschlüssel';
+        else if (qLower.includes('wie hoch') || qLower.includes('mietpreis') || qLower.includes('miethöhe') || qLower.includes('bremse')) found = 'Mietpreis';
+        else if (qLower.includes('frage') || qLower.includes('selbstauskunft') || qLower.includes('wissen') || qLower.includes('auskunft')) found = 'Vermieterfragen';
+        else if (qLower.includes('kündigung') || qLower.includes('kündigen')) found = 'Kündigung';
+        else if (qLower.includes('kaution') || qLower.includes('sicherheit')) found = 'Kaution';
+        // Check for E-Bike specific (mapped to Mängel/Mietminderung if no direct topic)
+        else if (qLower.includes('e-bike') || qLower.includes('laden')) {
+            // We forcedly let it fall through to /api/analyze-custom for specific AI analysis
+            found = null; 
+        }
+    }
+
+    if(found) {
+        console.log('Matching topic found:', found);
+        loadTopic(found);
+    } else {
+        console.log('No matching topic, calling custom AI analysis...');
+        results.innerHTML = '<div class="flex flex-col items-center py-6 scale-in"><div class="w-12 h-12 border-4 border-blue-500 border-t-transparent rounded-full animate-spin mb-4"></div><p class="text-sm font-bold text-blue-600 animate-pulse uppercase tracking-widest">Live KI-Analyse wird generiert...</p></div>';
+        
+        try {
+            const response = await fetch('api/analyze-custom', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ question: q })
+            });
+            
+            if (!response.ok) {
+                const errData = await response.json();
+                throw new Error(errData.error || 'Server Fehler');
+            }
+
+            const data = await response.json();
+            console.log('AI Analysis Result:', data);
+            lastAnalysisData = data;
+            lastTopic = 'Spezifische Analyse';
+            setTimeout(() => {
+                displayResults('Spezifische Analyse', data);
+            }, 500);
+        } catch (err) {
+            console.error('AI Analysis Error:', err);
+            results.innerHTML = `<div class="p-6 bg-red-50 rounded-2xl border border-red-100"><p class="text-xs font-bold text-red-600 uppercase tracking-widest mb-2">Analyse-Fehler</p><p class="text-sm text-red-500">${err.message || 'Die KI ist aktuell nicht erreichbar.'}</p></div>`;
+        }
+    }
+}
+
+function quickAction(action) {
+    const results = document.getElementById('results-content');
+    results.scrollIntoView({ behavior: 'smooth', block: 'center' });
+    loadTopic(action);
+}
+
+async function handleFileUpload(input) {
+    const file = input.files[0];
+    if (!file) return;
+
+    const results = document.getElementById('results-content');
+    results.innerHTML = `
+        <div class="flex flex-col items-center py-6 scale-in">
+            <div class="w-12 h-12 border-4 border-blue-500 border-t-transparent rounded-full animate-spin mb-4"></div>
+            <p class="text-sm font-bold text-blue-600 animate-pulse uppercase tracking-widest">Dokument wird digitalisiert...</p>
+            <p class="text-[10px] text-slate-400 mt-2 font-bold">${file.name}</p>
+        </div>
+    `;
+
+    const reader = new FileReader();
+    reader.onload = async function(e) {
+        const base64Data = e.target.result.split(',')[1];
+        const mimeType = file.type;
+
+        try {
+            const response = await fetch('api/analyze-document', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ 
+                    file_content: base64Data,
+                    mime_type: mimeType,
+                    file_name: file.name
+                })
+            });
+
+            if (!response.ok) throw new Error('Analyse fehlgeschlagen');
+
+            const data = await response.json();
+            lastAnalysisData = data;
+            lastDocument = data.document || null;
+            lastTopic = 'Dokumenten-Analyse';
+            displayResults('Dokumenten-Analyse', data);
+
+        } catch (err) {
+            results.innerHTML = `<div class="p-6 bg-red-50 rounded-2xl border border-red-100"><p class="text-xs font-bold text-red-600 uppercase tracking-widest mb-2">OCR-Fehler</p><p class="text-sm text-red-500">${err.message}</p></div>`;
+        }
+    };
+    reader.readAsDataURL(file);
+}
+
+// Register Service Worker for PWA
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register('/static/sw.js')
+            .then(reg => console.log('Service Worker registered', reg))
+            .catch(err => console.log('Service Worker registration failed', err));
+    });
+}
+
+// Initialize app
+goToStep(1);
@@ -0,0 +1,154 @@
+// Listenansicht ohne Analysetexte; Details werden beim Öffnen einzeln geladen
+const CASE_FIELDS = 'id,timestamp,status,user.name,case.topic,booking.type,booking.price,booking.time';
+const CASE_LIST_URL = `api/cases?fields=${CASE_FIELDS}&limit=50`;
+let nextCaseCursor = null;
+// Stand des Änderungsfeeds, bis zu dem die Tabelle aktuell ist
+let caseVersion = null;
+// Während einer Suche zeigt die Tabelle Treffer statt der neuesten Fälle
+let caseSearchActive = false;
+let caseSearchTimer = null;
+let statsTimer = null;
+
+function caseNumber(caseId) {
+    return Number(caseId.split('-')[1]);
+}
+
+function renderCaseRow(c) {
+    const row = document.createElement('tr');
+    row.dataset.caseId = c.id;
+    row.className = 'border-b border-slate-50 hover:bg-slate-50/50 transition-colors cursor-pointer';
+    row.innerHTML = `
+        <td class="p-6 font-black text-slate-400 text-xs">${c.id}</td>
+        <td class="p-6">
+            <p class="font-bold text-slate-900">${c.user.name}</p>
+            <p class="text-[10px] text-blue-600 font-bold uppercase tracking-wider">${c.case.topic}</p>
+            ${c.snippet ? `<p class="text-xs text-slate-500 mt-2">${c.snippet}</p>` : ''}
+        </td>
+        <td class="p-6">
+            <p class="text-sm font-bold text-slate-700">${c.booking.type}</p>
+            <p class="text-[10px] font-black text-slate-400 uppercase tracking-widest">${c.booking.price} €</p>
+        </td>
+        <td class="p-6">
+            <span class="px-3 py-1 bg-blue-50 text-blue-600 text-[10px] font-black rounded-full uppercase tracking-widest">${c.booking.time}</span>
+        </td>
+        <td class="p-6">
+            <span class="px-3 py-1 bg-green-50 text-green-600 text-[10px] font-black rounded-full uppercase tracking-widest">${c.status}</span>
+        </td>
+        <td class="p-6">
+            <button onclick="showCase('${c.id}')" class="w-10 h-10 bg-slate-900 text-white rounded-xl hover:bg-blue-600 transition-colors">
+                <i class="fas fa-eye"></i>
+            </button>
+        </td>
+    `;
+    return row;
+}
+
+async function loadCases(more = false) {
+    const url = more && nextCaseCursor ? `${CASE_LIST_URL}&cursor=${nextCaseCursor}` : CASE_LIST_URL;
+    const res = await fetch(url);
+    const page = await res.json();
+    const body = document.getElementById('case-table-body');
+    
+    if (!more) {
+        caseSearchActive = false;
+        document.getElementById('case-search').value = '';
+    }
+    nextCaseCursor = page.next_cursor;
+    if (!more) caseVersion = page.version;
+    document.getElementById('load-more-cases').classList.toggle('hidden', !nextCaseCursor);
+    if (!more) body.innerHTML = '';
+    page.cases.forEach(c => body.appendChild(renderCaseRow(c)));
+}
+
+// Kopfzahlen vom Server (Zähler je Status und Tag) statt aus der geladenen Liste;
+// "In Bearbeitung" sind bezahlte, noch nicht erledigte Fälle
+async function loadStats() {
+    const res = await fetch('api/dashboard/stats');
+    if (!res.ok) return;
+    const stats = await res.json();
+    document.getElementById('stat-new').innerText = stats.status['Neu'] || 0;
+    document.getElementById('stat-progress').innerText = stats.status['Bezahlt'] || 0;
+    document.getElementById('stat-revenue').innerText =
+        stats.today.revenue.toLocaleString('de-DE', { style: 'currency', currency: 'EUR' });
+}
+
+// Bei vielen Änderungen hintereinander höchstens einmal je Sekunde nachladen
+function scheduleStats() {
+    if (!statsTimer) statsTimer = setTimeout(() => { statsTimer = null; loadStats(); }, 1000);
+}
+
+function onCaseSearch(value) {
+    clearTimeout(caseSearchTimer);
+    caseSearchTimer = setTimeout(() => searchCases(value.trim()), 250);
+}
+
+// Volltextsuche über alle Fälle, Treffer nach Relevanz mit hervorgehobenem Ausschnitt
+async function searchCases(q) {
+    if (!q) return loadCases();
+    const res = await fetch(`api/cases/search?q=${encodeURIComponent(q)}&limit=50`);
+    if (!res.ok) return;
+    const result = await res.json();
+    const body = document.getElementById('case-table-body');
+    caseSearchActive = true;
+    body.innerHTML = '';
+    result.cases.forEach(c => body.appendChild(renderCaseRow(c)));
+    document.getElementById('load-more-cases').classList.add('hidden');
+}
+
+function applyCaseChange(c) {
+    if (caseSearchActive) return;
+    const body = document.getElementById('case-table-body');
+    const existing = body.querySelector(`tr[data-case-id="${c.id}"]`);
+    if (existing) {
+        existing.replaceWith(renderCaseRow(c));
+    } else {
+        // Unbekannter Fall: an seine Stelle in der id-Reihenfolge wie nach einem Neuladen.
+        // Worker vergeben ids blockweise, ein neuer Fall steht daher nicht immer oben.
+        // Liegt er hinter der letzten geladenen Zeile, kommt er über "Mehr laden"
+        const number = caseNumber(c.id);
+        const next = [...body.children].find(row => caseNumber(row.dataset.caseId) < number);
+        if (next) body.insertBefore(renderCaseRow(c), next);
+        else if (!nextCaseCursor) body.appendChild(renderCaseRow(c));
+    }
+}
+
+// Holt nur Änderungen seit caseVersion und patcht die betroffenen Zeilen
+async function syncCases() {
+    if (caseVersion === null) return loadCases();
+    let more = true;
+    while (more) {
+        const res = await fetch(`api/cases/changes?since=${caseVersion}&fields=${CASE_FIELDS}`);
+        const feed = await res.json();
+        feed.cases.forEach(applyCaseChange);
+        caseVersion = feed.version;
+        more = feed.more;
+        if (feed.cases.length) scheduleStats();
+    }
+}
+
+// Server-Push; Reconnects übernimmt der Browser (Last-Event-ID), ohne SSE wird gepollt
+function subscribeCases() {
+    if (!window.EventSource) {
+        setInterval(syncCases, 10000);
+        return;
+    }
+    const source = new EventSource(`api/cases/events?since=${caseVersion}`);
+    source.addEventListener('case', event => {
+        applyCaseChange(JSON.parse(event.data));
+        caseVersion = Number(event.lastEventId);
+        scheduleStats();
+    });
+    source.onerror = () => {
+        // Endgültig geschlossen, z.B. 503 bei zu vielen offenen Streams: pollen
+        if (source.readyState === EventSource.CLOSED) setInterval(syncCases, 10000);
+    };
+}
+
+async function showCase(caseId) {
+    const res = await fetch(`api/cases/${encodeURIComponent(caseId)}`);
+    if (!res.ok) return;
+    const c = await res.json();
+    alert(`Fall-Details:\nTopic: ${c.case.topic}\nAnalyse: ${(c.case.analysis || '').substring(0, 100).replace(/\n/g, ' ')}...`);
+}
+loadStats();
+loadCases().then(subscribeCases);
@@ -0,0 +1,22 @@
+# gunicorn-Konfiguration für mietrecht_full (Dockerfile.flask):
+#     gunicorn -c gunicorn.conf.py mietrecht_full:app
+#
+# Die Event-Streams der Dashboards (/api/cases/events) bleiben offen und belegen je
+# einen Thread. Der sync-Worker hätte nur einen Thread je Prozess - ein Dashboard
+# blockierte ihn ganz. gthread gibt jedem Worker GUNICORN_THREADS Threads; davon
+# nehmen Streams höchstens MAX_EVENT_STREAMS, der Rest bleibt für normale Anfragen.
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 64))
+# Bei gthread überwacht timeout nur den Worker, nicht die Dauer einer Anfrage; offene
+# Streams senden ohnehin alle 15 s einen Heartbeat
+timeout = 120
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
+
+# Platz für normale Anfragen freihalten (case_events.MAX_STREAMS ist 48 bei 64 Threads)
+os.environ.setdefault("MAX_EVENT_STREAMS", str(max(threads - 16, 1)))
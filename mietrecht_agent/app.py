@@ -1,11 +1,28 @@
-from flask import Flask, render_template, jsonify, request, redirect, url_for
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from flask import Flask, Response, render_template, jsonify, request, redirect, url_for, send_file
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, verify_jwt_in_request
 from config import Config
 from services.gemini_service import GeminiService
 from services.data_service import DataService
 from services.stripe_service import StripeService
+from services.fristen_service import FristenService, FRISTEN
+from services.nebenkosten_service import NebenkostenChecker, MAX_STATEMENTS
+from services.citation_graph import parse_citation
+from services.case_store import case_query_from_args, change_query_from_args
+from services.case_search import search_query_from_args
+from services.case_export import EXPORT_FORMATS, export_filename, export_query_from_args, export_stream
+from services.case_events import (
+    CaseEventBroker, backend_from_config, case_event_stream, EVENT_FIELDS, STREAM_TICKET_TTL,
+    issue_stream_ticket, check_stream_ticket
+)
+from services.storage import storage_from_config
+from services.blob_store import blob_store_from_config, start_blob_gc, case_document, check_digest, document_ref
 import os
+import io
+import base64
 import json
+import atexit
+from collections import Counter
+from urllib.parse import quote
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -15,8 +32,26 @@ jwt = JWTManager(app)
 
 # Initialize Services
 ai_service = GeminiService(app.config['GOOGLE_API_KEY'], app.config['OPENAI_API_KEY'])
-data_service = DataService(app.config['DB_PATH'])
+storage = storage_from_config(app.config['DATABASE_URL'], app.config['DB_PATH'])
+case_events = CaseEventBroker(backend_from_config(
+    app.config['CASE_EVENTS_BACKEND'], app.config['DB_PATH'], app.config['REDIS_URL'], storage
+), app.config['MAX_EVENT_STREAMS'])
+# Dokumente inhaltsadressiert; Blobs ohne Verweis aus einem Fall räumt start_blob_gc weg
+blob_store = blob_store_from_config(app.config['BLOB_STORE'])
+start_blob_gc(blob_store, storage)
+data_service = DataService(
+    app.config['DB_PATH'], app.config['WISSEN_PATH'], case_events, app.config['BOOKING_QUEUE_DIR'],
+    app.config['CASE_ARCHIVE_PATH'], app.config['CASE_ARCHIVE_AFTER_DAYS'], storage, blob_store,
+    app.config['DB_BACKUP_DIR'], app.config['DB_BACKUP_KEEP']
+)
+if data_service.booking_queue is not None:
+    atexit.register(data_service.booking_queue.close)
 stripe_service = StripeService(app.config['STRIPE_API_KEY'])
+fristen_service = FristenService()
+fristen_service.warmup()
+nebenkosten_checker = NebenkostenChecker(fristen_service)
+# Auswahlhäufigkeit der Eingabevorschläge (über Reloads hinweg)
+suggest_popularity = Counter()
 
 @app.route("/")
 def index():
@@ -89,6 +124,8 @@ def create_checkout():
             }
         )
         return jsonify({"checkout_url": checkout_url})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -116,24 +153,114 @@ def stripe_webhook():
         print(f"Webhook Error: {e}")
         return jsonify(error=str(e)), 400
 
+def cached_json(entry, version):
+    status, body, headers = entry.respond(
+        request.headers.get("If-None-Match"), request.headers.get("Accept-Encoding")
+    )
+    headers["X-KB-Version"] = version
+    return Response(body, status=status, headers=headers, mimetype="application/json")
+
 @app.route("/api/topics")
 def get_topics():
-    return jsonify(data_service.get_topics())
+    snapshot = data_service.knowledge_base.snapshot
+    if request.args.get("include") == "all":
+        return cached_json(snapshot.topic_cache.all_topics, snapshot.version)
+    return cached_json(snapshot.topic_cache.topic_list, snapshot.version)
 
 @app.route("/api/topic/<topic_name>")
 def get_topic(topic_name):
-    data = data_service.get_topic_data(topic_name)
-    if data:
-        return jsonify(data)
+    snapshot = data_service.knowledge_base.snapshot
+    entry = snapshot.topic_cache.topic(topic_name)
+    if entry:
+        return cached_json(entry, snapshot.version)
+    # Tippfehler ("Mitminderung", "Kaustion") auf das ähnlichste Thema abbilden
+    matches = snapshot.fuzzy_matcher.match(topic_name, limit=1)
+    if matches:
+        response = cached_json(snapshot.topic_cache.topic(matches[0][0]), snapshot.version)
+        response.headers["X-Resolved-Topic"] = quote(matches[0][0])
+        return response
     return jsonify({"error": "Thema nicht gefunden"}), 404
 
+@app.route("/api/search")
+def search_topics():
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Kein Suchbegriff übermittelt"}), 400
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+    return jsonify({"query": query, "version": data_service.knowledge_base.version,
+                    "results": data_service.search_topics(query, limit)})
+
+@app.route("/api/suggest")
+def suggest():
+    query = request.args.get("q", "")
+    limit = min(max(request.args.get("limit", 8, type=int), 1), 20)
+    suggestions = data_service.knowledge_base.snapshot.suggest_index.suggest(query, limit, suggest_popularity)
+    return jsonify({"query": query, "suggestions": suggestions})
+
+@app.route("/api/suggest/pick", methods=["POST"])
+def suggest_pick():
+    text = (request.json or {}).get("text", "")
+    if text not in data_service.knowledge_base.snapshot.suggest_index:
+        return jsonify({"error": "Unbekannter Vorschlag"}), 400
+    suggest_popularity[text] += 1
+    return jsonify(success=True)
+
+@app.route("/api/citations")
+def get_citation():
+    ref = request.args.get("ref", "").strip()
+    if parse_citation(ref) is None:
+        return jsonify({"error": "Kein gültiges Aktenzeichen oder keine Norm übermittelt"}), 400
+    result = data_service.knowledge_base.snapshot.citation_graph.lookup(ref)
+    if result is None:
+        return jsonify({"error": "Zitat nicht in der Wissensdatenbank"}), 404
+    return jsonify(result)
+
+def with_citation_check(result):
+    """Ergänzt eine KI-Antwort um die Prüfung ihrer Zitate gegen die Wissensdatenbank."""
+    if isinstance(result, dict) and "error" not in result:
+        text = " ".join(str(result.get(field, "")) for field in ("Professionelle Analyse", "Gerichtsurteile"))
+        result["citations"] = data_service.knowledge_base.snapshot.citation_graph.validate(text)
+    return result
+
+@app.route("/api/fristen")
+def get_fristen():
+    return jsonify(FRISTEN)
+
+@app.route("/api/fristen", methods=["POST"])
+def compute_fristen():
+    data = request.json or {}
+    events = data.get("events")
+    if not isinstance(events, list) or not events:
+        return jsonify({"error": "Keine Ereignisse übermittelt"}), 400
+    if len(events) > app.config['MAX_FRISTEN_BATCH']:
+        return jsonify({"error": f"Maximal {app.config['MAX_FRISTEN_BATCH']} Ereignisse pro Anfrage"}), 413
+
+    results = fristen_service.compute_many(events, data.get("bundesland"))
+    if request.args.get("format") == "ics":
+        return Response(
+            fristen_service.to_ics(results),
+            mimetype="text/calendar",
+            headers={"Content-Disposition": "attachment; filename=JurisMind_Fristen.ics"}
+        )
+    return jsonify({"fristen": results})
+
+@app.route("/api/nebenkosten/check", methods=["POST"])
+def check_nebenkosten():
+    data = request.json or {}
+    statements = data.get("statements")
+    if not isinstance(statements, list) or not statements:
+        return jsonify({"error": "Keine Abrechnungen übermittelt"}), 400
+    if len(statements) > MAX_STATEMENTS:
+        return jsonify({"error": f"Maximal {MAX_STATEMENTS} Abrechnungen pro Anfrage"}), 413
+    return jsonify({"results": nebenkosten_checker.check_batch(statements)})
+
 @app.route("/api/analyze-custom", methods=["POST"])
 def analyze_custom():
     data = request.json
     question = data.get("question", "")
     try:
         response = ai_service.analyze_custom_question(question)
-        return jsonify(response)
+        return jsonify(with_citation_check(response))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -147,22 +274,150 @@ def analyze_document():
         return jsonify({"error": "Keine Datei hochgeladen"}), 400
 
     try:
-        response = ai_service.analyze_document(file_content, mime_type)
+        # Ablegen, damit die Buchung auf das Dokument verweisen kann (nur der Hash landet im Fall)
+        digest, size = blob_store.put(io.BytesIO(base64.b64decode(file_content)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        response = with_citation_check(ai_service.analyze_document(file_content, mime_type))
+        response["document"] = document_ref(digest, size, data.get("file_name"), mime_type)
         return jsonify(response)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/documents", methods=["POST"])
+def upload_document():
+    # multipart/form-data, Feld "file"; wird blockweise gehasht und abgelegt
+    upload = request.files.get("file")
+    if upload is None:
+        return jsonify({"error": "Keine Datei hochgeladen"}), 400
+    try:
+        digest, size = blob_store.put(upload.stream)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(document_ref(digest, size, upload.filename, upload.mimetype)), 201
+
 @app.route("/api/cases")
 @jwt_required()
 def get_cases():
     try:
-        return jsonify(data_service.get_all_cases())
+        query = case_query_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        cases, next_cursor, version = data_service.list_cases(**query)
+        return jsonify({"cases": cases, "next_cursor": next_cursor, "version": version})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/cases/search")
+@jwt_required()
+def search_case_list():
+    try:
+        query = search_query_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    cases, next_offset, complete = data_service.search_cases(**query)
+    return jsonify({"cases": cases, "next_offset": next_offset, "complete": complete})
+
+@app.route("/api/cases/export")
+@jwt_required()
+def export_case_list():
+    # Alle Fälle als Download (format=csv|ndjson|parquet|arrow, from, to, status, fields),
+    # blockweise gestreamt statt als eine Liste im Speicher
+    try:
+        fmt, query = export_query_from_args(request.args)
+        stream = export_stream(data_service.export_cases(**query), fmt, query["fields"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 501
+    filename = export_filename(fmt, query["date_from"], query["date_to"])
+    return Response(stream, content_type=EXPORT_FORMATS[fmt][0],
+                    headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"})
+
+@app.route("/api/dashboard/stats")
+@jwt_required()
+def get_dashboard_stats():
+    return jsonify(data_service.dashboard_stats(request.args.get("day")))
+
+@app.route("/api/cases/changes")
+@jwt_required()
+def get_case_changes():
+    try:
+        query = change_query_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        cases, version, more = data_service.list_changes(**query)
+        return jsonify({"cases": cases, "version": version, "more": more})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/cases/events/ticket", methods=["POST"])
+@jwt_required()
+def get_case_events_ticket():
+    # Kein Platz für einen weiteren Stream: das Dashboard fällt auf Polling zurück
+    if case_events.full:
+        return jsonify({"error": "Zu viele offene Event-Streams"}), 503, {"Retry-After": "30"}
+    ticket = issue_stream_ticket(app.config['JWT_SECRET_KEY'], get_jwt_identity())
+    return jsonify({"ticket": ticket, "expires_in": STREAM_TICKET_TTL})
+
+@app.route("/api/cases/events")
+def get_case_events():
+    # EventSource kann keinen Authorization-Header setzen: ?ticket=<Ticket> aus
+    # /api/cases/events/ticket statt des JWT in der URL; andere Clients schicken den Header
+    if check_stream_ticket(app.config['JWT_SECRET_KEY'], request.args.get("ticket")) is None:
+        verify_jwt_in_request()
+    since = request.headers.get("Last-Event-ID") or request.args.get("since")
+    try:
+        since = int(since) if since else data_service.case_version()
+    except ValueError:
+        return jsonify({"error": "Ungültige Version"}), 400
+    # Jeder Stream hält einen Server-Thread
+    if not case_events.open_stream():
+        return jsonify({"error": "Zu viele offene Event-Streams"}), 503, {"Retry-After": "30"}
+    stream = case_event_stream(
+        case_events, lambda version: data_service.list_changes(since=version, fields=EVENT_FIELDS), since
+    )
+    response = Response(stream, mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.call_on_close(case_events.close_stream)
+    return response
+
+@app.route("/api/cases/<case_id>")
+@jwt_required()
+def get_case(case_id):
+    case = data_service.get_case(case_id, request.args.get("archive") == "1")
+    if case is None:
+        return jsonify({"error": "Fall nicht gefunden"}), 404
+    return jsonify(case)
+
+@app.route("/api/cases/<case_id>/documents/<digest>")
+@jwt_required()
+def get_case_document(case_id, digest):
+    try:
+        check_digest(digest)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    document = case_document(data_service.get_case(case_id, include_archive=True), digest)
+    if document is None or not blob_store.exists(digest):
+        return jsonify({"error": "Dokument nicht gefunden"}), 404
+    path = blob_store.local_path(digest)
+    if path is not None:
+        # Lokale Datei: der WSGI-Server schickt sie per sendfile, ohne sie in Python zu lesen
+        return send_file(path, mimetype=document["mime_type"], as_attachment=True,
+                         download_name=document["name"], etag=digest)
+    return Response(blob_store.iter_chunks(digest), content_type=document["mime_type"],
+                    headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(document['name'])}",
+                             "ETag": f'"{digest}"'})
+
 @app.route("/health")
 def health():
-    return jsonify({"status": "online", "topics": len(data_service.get_topics())})
+    return jsonify({"status": "online", "topics": len(data_service.get_topics()), "db": data_service.storage.stats(),
+                    "booking_queue": data_service.booking_queue.stats() if data_service.booking_queue else None,
+                    "read_cache": data_service.read_cache.stats(),
+                    "blob_store": blob_store.stats()})
 @app.route('/.well-known/assetlinks.json')
 def serve_assetlinks():
     return send_from_directory(
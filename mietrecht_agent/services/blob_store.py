@@ -0,0 +1,410 @@
+"""
+Inhaltsadressierter Speicher für hochgeladene Dokumente. Eine Datei wird unter
+ihrem SHA-256 abgelegt; Fälle speichern nur den Verweis in case_data.documents
+({"hash", "name", "mime_type", "size"}), nie den Inhalt. Gleiche Dateien liegen
+einmal vor, egal wie oft sie hochgeladen werden.
+
+Backends (gleiche Methoden, siehe blob_store_from_config):
+    LocalBlobStore   Verzeichnis mit Unterordnern root/ab/cd/<hash>; Downloads
+                     über send_file (wsgi.file_wrapper/sendfile, ohne den Inhalt
+                     in Python zu lesen)
+    S3BlobStore      S3-kompatibler Bucket (AWS, MinIO), boto3 optional
+
+Verweise zählen Trigger auf cases in blob_refs mit (siehe BLOB_REFS_SCHEMA und
+postgres_storage); collect_garbage() löscht Blobs ohne Verweis nach einer
+Schonfrist.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+try:
+    import boto3
+    import botocore.exceptions
+except ImportError:     # optional, nur für S3BlobStore
+    boto3 = None
+
+logger = logging.getLogger(__name__)
+
+# Block beim Schreiben, Hashen und Streamen
+BLOB_CHUNK_SIZE = 1024 * 1024
+MAX_BLOB_SIZE = 25 * 1024 * 1024
+MAX_DOCUMENTS = 20
+# Hochgeladen, aber noch nicht gebucht: so lange bleibt ein Blob ohne Verweis erhalten
+GC_GRACE_PERIOD = 24 * 3600
+GC_INTERVAL = 6 * 3600
+GC_BATCH_SIZE = 500
+# S3: Dateien bis zu dieser Größe im Speicher puffern, größere in einer temporären Datei
+S3_SPOOL_SIZE = 8 * 1024 * 1024
+DEFAULT_MIME_TYPE = "application/octet-stream"
+_DIGEST = re.compile(r"[0-9a-f]{64}\Z")
+_MIME_TYPE = re.compile(r"[\w.+-]+/[\w.+-]+\Z")
+_TMP_DIR = "tmp"
+
+
+def check_digest(digest):
+    """SHA-256 als 64 Hex-Zeichen (klein); alles andere wäre ein Pfad oder Schlüssel von außen."""
+    if not isinstance(digest, str) or not _DIGEST.match(digest):
+        raise ValueError("Ungültiger Dokument-Hash")
+    return digest
+
+
+def _copy_hashed(source, out, max_size):
+    """Kopiert source blockweise nach out und hasht dabei: (Hash, Größe)."""
+    sha = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: source.read(BLOB_CHUNK_SIZE), b""):
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise ValueError(f"Dokument größer als {max_size // (1024 * 1024)} MB")
+        sha.update(chunk)
+        out.write(chunk)
+    return sha.hexdigest(), size
+
+
+class LocalBlobStore:
+    """
+    Blobs als Dateien unter root/ab/cd/<hash> (zwei Ebenen à 256 Ordner, damit
+    kein Verzeichnis zu groß wird). Geschrieben wird in root/tmp und erst nach
+    fsync per rename an den endgültigen Pfad - ein Blob ist also immer
+    vollständig, auch für andere Worker. Verzeichnisse entstehen beim ersten put().
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._tmp = os.path.join(root, _TMP_DIR)
+        self._lock = threading.Lock()
+        self._stored = 0
+        self._deduplicated = 0
+
+    def path(self, digest):
+        check_digest(digest)
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def local_path(self, digest):
+        """Dateipfad für send_file, None bei fehlendem Blob."""
+        path = self.path(digest)
+        return path if os.path.exists(path) else None
+
+    def put(self, source, max_size=MAX_BLOB_SIZE):
+        """Liest source (file-like) blockweise und legt es ab: (Hash, Größe)."""
+        os.makedirs(self._tmp, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                digest, size = _copy_hashed(source, out, max_size)
+                out.flush()
+                os.fsync(out.fileno())
+            if self.refresh(digest) is not None:
+                deduplicated = True
+            else:
+                path = self.path(digest)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp, path)
+                tmp = None
+                deduplicated = False
+        finally:
+            if tmp is not None:
+                os.unlink(tmp)
+        with self._lock:
+            self._stored += 1
+            self._deduplicated += deduplicated
+        return digest, size
+
+    def refresh(self, digest):
+        """Startet die Schonfrist der Müllabfuhr neu; Größe oder None, wenn der Blob fehlt."""
+        path = self.path(digest)
+        try:
+            os.utime(path)
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return None
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def iter_chunks(self, digest):
+        with open(self.path(digest), "rb") as f:
+            for chunk in iter(lambda: f.read(BLOB_CHUNK_SIZE), b""):
+                yield chunk
+
+    def delete(self, digest, older_than=None):
+        """Löscht den Blob, mit older_than nur bei älterem mtime (sonst neu hochgeladen). True, wenn gelöscht."""
+        path = self.path(digest)
+        try:
+            if older_than is not None and os.stat(path).st_mtime >= older_than:
+                return False
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def iter_blobs(self):
+        """Alle Blobs als (Hash, mtime), ohne Reihenfolge."""
+        for first in _scandir(self.root):
+            if first.name == _TMP_DIR or not first.is_dir():
+                continue
+            for second in _scandir(first.path):
+                for entry in _scandir(second.path):
+                    if _DIGEST.match(entry.name):
+                        yield entry.name, entry.stat().st_mtime
+
+    def purge_temp(self, older_than):
+        """Reste abgebrochener Uploads entfernen; gibt die Zahl der Dateien zurück."""
+        removed = 0
+        for entry in _scandir(self._tmp):
+            try:
+                if entry.stat().st_mtime < older_than:
+                    os.unlink(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "local", "stored": self._stored, "deduplicated": self._deduplicated}
+
+
+def _scandir(path):
+    try:
+        with os.scandir(path) as entries:
+            return list(entries)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+class S3BlobStore:
+    """
+    Blobs als Objekte <prefix><hash> in einem S3-kompatiblen Bucket. Uploads
+    werden beim Hashen zwischengespeichert (der Schlüssel steht erst danach
+    fest) und per Multipart hochgeladen; Downloads streamen den Objektinhalt
+    blockweise durch.
+    """
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, client=None):
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("S3-Dokumentenspeicher benötigt boto3 (pip install boto3)")
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stored = 0
+        self._deduplicated = 0
+
+    def _key(self, digest):
+        return self.prefix + check_digest(digest)
+
+    def local_path(self, digest):
+        return None
+
+    def put(self, source, max_size=MAX_BLOB_SIZE):
+        with tempfile.SpooledTemporaryFile(max_size=S3_SPOOL_SIZE) as spool:
+            digest, size = _copy_hashed(source, spool, max_size)
+            deduplicated = self.refresh(digest) is not None
+            if not deduplicated:
+                spool.seek(0)
+                self.client.upload_fileobj(spool, self.bucket, self._key(digest))
+        with self._lock:
+            self._stored += 1
+            self._deduplicated += deduplicated
+        return digest, size
+
+    def _head(self, digest):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(digest))
+        except botocore.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def refresh(self, digest):
+        head = self._head(digest)
+        if head is None:
+            return None
+        # Kopie auf sich selbst setzt LastModified neu (Schonfrist der Müllabfuhr)
+        key = self._key(digest)
+        self.client.copy_object(Bucket=self.bucket, Key=key, CopySource={"Bucket": self.bucket, "Key": key},
+                                MetadataDirective="REPLACE")
+        return head["ContentLength"]
+
+    def exists(self, digest):
+        return self._head(digest) is not None
+
+    def iter_chunks(self, digest):
+        body = self.client.get_object(Bucket=self.bucket, Key=self._key(digest))["Body"]
+        try:
+            yield from body.iter_chunks(BLOB_CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def delete(self, digest, older_than=None):
+        head = self._head(digest)
+        if head is None or (older_than is not None and head["LastModified"].timestamp() >= older_than):
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(digest))
+        return True
+
+    def iter_blobs(self):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", ()):
+                digest = obj["Key"][len(self.prefix):]
+                if _DIGEST.match(digest):
+                    yield digest, obj["LastModified"].timestamp()
+
+    def purge_temp(self, older_than):
+        # Abgebrochene Uploads hinterlassen nichts im Bucket (Multipart-Reste per Lifecycle-Regel)
+        return 0
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "s3", "bucket": self.bucket, "stored": self._stored,
+                    "deduplicated": self._deduplicated}
+
+
+def blob_store_from_config(location):
+    """s3://bucket/prefix (Endpunkt aus S3_ENDPOINT_URL, z.B. MinIO) oder ein lokales Verzeichnis."""
+    if location.startswith("s3://"):
+        bucket, _, prefix = location[len("s3://"):].partition("/")
+        if prefix and not prefix.endswith("/"):
+            prefix += "/"
+        return S3BlobStore(bucket, prefix, os.environ.get("S3_ENDPOINT_URL"))
+    return LocalBlobStore(location)
+
+
+def document_ref(digest, size, name=None, mime_type=None):
+    """Verweis auf ein Dokument, wie er in case_data.documents steht."""
+    name = os.path.basename(str(name or "")).strip()[:255]
+    if not isinstance(mime_type, str) or not _MIME_TYPE.match(mime_type):
+        mime_type = DEFAULT_MIME_TYPE
+    return {"hash": digest, "name": name or digest, "mime_type": mime_type, "size": size}
+
+
+def document_refs(documents, store):
+    """
+    Prüft die an eine Buchung gehängten Dokumente ([{"hash", "name", "mime_type"}])
+    und gibt die Verweise für case_data.documents zurück. Jeder Blob muss
+    vorhanden sein; seine Schonfrist beginnt neu, damit die Müllabfuhr ihn bis
+    zum Schreiben der Buchung nicht löscht.
+    """
+    if not documents:
+        return []
+    if not isinstance(documents, list) or len(documents) > MAX_DOCUMENTS:
+        raise ValueError(f"Höchstens {MAX_DOCUMENTS} Dokumente je Buchung")
+    refs = []
+    for document in documents:
+        if not isinstance(document, dict):
+            raise ValueError("Ungültiges Dokument")
+        digest = check_digest(document.get("hash"))
+        size = store.refresh(digest) if store is not None else None
+        if size is None:
+            raise ValueError(f"Dokument {digest} nicht gefunden, bitte erneut hochladen")
+        refs.append(document_ref(digest, size, document.get("name"), document.get("mime_type")))
+    return refs
+
+
+def case_document(case, digest):
+    """Verweis des Falls auf digest oder None - Downloads nur für Dokumente des Falls."""
+    for document in (case or {}).get("case", {}).get("documents") or ():
+        if isinstance(document, dict) and document.get("hash") == digest:
+            return document
+    return None
+
+
+# Verweiszähler je Blob, fortgeschrieben von Triggern in der Schreibtransaktion der
+# Buchung. Archivierte Fälle werden nicht zurückgezählt: ihre Dokumente bleiben erhalten.
+# json_each(NULL) liefert keine Zeilen - ungültiges JSON bricht die Buchung also nicht ab.
+_DOCUMENT_HASHES = """SELECT json_extract(value, '$.hash') AS digest
+        FROM json_each(CASE WHEN json_valid({ref}.case_data) THEN {ref}.case_data END, '$.documents')
+        WHERE type = 'object' AND json_extract(value, '$.hash') IS NOT NULL"""
+
+
+def _ref_upsert(ref, sign):
+    return f"""INSERT INTO blob_refs (digest, refs)
+        SELECT digest, {sign}1 FROM ({_DOCUMENT_HASHES.format(ref=ref)})
+        WHERE true
+        ON CONFLICT (digest) DO UPDATE SET refs = refs + excluded.refs;"""
+
+
+BLOB_REFS_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS blob_refs (
+        digest TEXT PRIMARY KEY,
+        refs INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID""",
+    f"""CREATE TRIGGER IF NOT EXISTS blob_refs_insert AFTER INSERT ON cases BEGIN
+        {_ref_upsert("NEW", "")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS blob_refs_update AFTER UPDATE OF case_data ON cases
+    WHEN OLD.case_data IS NOT NEW.case_data BEGIN
+        {_ref_upsert("OLD", "-")}
+        {_ref_upsert("NEW", "")}
+    END""",
+)
+
+
+def ensure_blob_refs_schema(conn):
+    for statement in BLOB_REFS_SCHEMA:
+        conn.execute(statement)
+
+
+def referenced_blobs(conn, digests):
+    """Die Hashes aus digests, auf die noch mindestens ein Fall verweist."""
+    digests = list(digests)
+    found = set()
+    for start in range(0, len(digests), GC_BATCH_SIZE):
+        batch = digests[start:start + GC_BATCH_SIZE]
+        found.update(row[0] for row in conn.execute(
+            f"SELECT digest FROM blob_refs WHERE refs > 0 AND digest IN ({', '.join('?' * len(batch))})", batch
+        ))
+    return found
+
+
+def collect_garbage(store, storage, grace=GC_GRACE_PERIOD, batch_size=GC_BATCH_SIZE, now=None):
+    """
+    Löscht Blobs ohne Verweis (storage.referenced_blobs), die älter als grace
+    Sekunden sind - jüngere gehören zu Uploads, deren Buchung noch aussteht.
+    Vor dem Löschen wird das Alter erneut geprüft: ein inzwischen erneut
+    hochgeladener Blob bleibt erhalten. Gibt die Zahl der gelöschten Blobs zurück.
+    """
+    cutoff = (time.time() if now is None else now) - grace
+    store.purge_temp(cutoff)
+    deleted = 0
+
+    def sweep(batch):
+        referenced = storage.referenced_blobs(batch)
+        return sum(store.delete(digest, older_than=cutoff) for digest in batch if digest not in referenced)
+
+    batch = []
+    for digest, mtime in store.iter_blobs():
+        if mtime < cutoff:
+            batch.append(digest)
+        if len(batch) >= batch_size:
+            deleted += sweep(batch)
+            batch = []
+    if batch:
+        deleted += sweep(batch)
+    if deleted:
+        logger.info("%d Dokumente ohne Verweis gelöscht", deleted)
+    return deleted
+
+
+def start_blob_gc(store, storage, interval=GC_INTERVAL, grace=GC_GRACE_PERIOD):
+    """Müllabfuhr im Hintergrund, alle interval Sekunden; mehrere Worker dürfen parallel laufen."""
+    def run():
+        while True:
+            try:
+                collect_garbage(store, storage, grace)
+            except Exception:
+                logger.exception("Aufräumen des Dokumentenspeichers fehlgeschlagen")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="blob-gc", daemon=True)
+    thread.start()
+    return thread
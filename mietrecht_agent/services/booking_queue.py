@@ -0,0 +1,239 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from .case_store import case_identifier_for
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.05
+MAX_BATCH = 500
+ID_BLOCK_SIZE = 100
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BookingQueue:
+    """
+    Write-Behind für Buchungen: submit() schreibt die Buchung in ein lokales Journal
+    (fsync), vergibt das Aktenzeichen aus einem vorab reservierten id-Block und kehrt
+    sofort zurück. Ein Hintergrund-Thread schreibt die gesammelten Buchungen alle
+    FLUSH_INTERVAL Sekunden gesammelt über storage.insert_reserved_cases() (SQLite:
+    eine Transaktion per executemany).
+    Gleichzeitige submit()-Aufrufe teilen sich ein fsync (Group Commit).
+
+    Journal: je Prozess ein Segment queue_dir/bookings-<pid>-<n>.jsonl. Vor jedem
+    Flush wird auf ein neues Segment gewechselt; das alte wird erst nach dem Commit
+    gelöscht. Segmente beendeter Prozesse spielt recover() beim Start erneut ein -
+    feste ids machen das idempotent. Starten mehrere Worker gleichzeitig, beansprucht
+    jeder ein Segment vorher per Umbenennung auf seine pid (bookings-<pid>-claimed-...);
+    nur einer spielt es ein, stirbt er dabei, übernimmt es der nächste Start.
+    """
+
+    def __init__(self, storage, queue_dir, on_flush=None, flush_interval=FLUSH_INTERVAL,
+                 max_batch=MAX_BATCH, id_block_size=ID_BLOCK_SIZE):
+        self.storage = storage     # SQLiteStorage oder PostgresStorage
+        self.queue_dir = queue_dir
+        self.on_flush = on_flush        # z.B. CaseEventBroker.publish(version)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.id_block_size = id_block_size
+        os.makedirs(queue_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Sperrreihenfolge: _flush_lock -> _sync_lock -> _lock
+        self._sync_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pending = []          # (Eintrag, Zeitpunkt der Annahme)
+        self._ids = iter(())       # Rest des reservierten id-Blocks
+        self._segment_no = 0
+        self._segment = None
+        self._segment_path = None
+        self._written = 0           # ins Journal geschriebene Einträge
+        self._synced = 0            # davon per fsync dauerhaft
+        self._full_segments = []    # gewechselte, noch nicht geschriebene Segmente
+
+        self._submitted = 0
+        self._flushed = 0
+        self._batches = 0
+        self._largest_batch = 0
+        self._delay_total = 0.0
+        self._delay_max = 0.0
+        self._recovered = 0
+
+    def start(self):
+        self._recovered = self.recover()
+        self._thread = threading.Thread(target=self._run, name="booking-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def _open_segment(self):
+        self._segment_no += 1
+        self._segment_path = os.path.join(self.queue_dir, f"bookings-{os.getpid()}-{self._segment_no}.jsonl")
+        self._segment = open(self._segment_path, "a", encoding="utf-8")
+
+    def _allocate_id(self):
+        row_id = next(self._ids, None)
+        if row_id is None:
+            self._ids = iter(self.storage.reserve_case_ids(self.id_block_size))
+            row_id = next(self._ids)
+        return row_id
+
+    def submit(self, timestamp, user_data, case_data, booking_data, status="Neu"):
+        """Nimmt eine Buchung dauerhaft an und gibt sofort das Aktenzeichen zurück."""
+        with self._lock:
+            if self._segment is None:
+                self._open_segment()
+            row_id = self._allocate_id()
+            entry = [row_id, timestamp, user_data, case_data, booking_data, status]
+            self._segment.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._written += 1
+            seq = self._written
+            self._pending.append((entry, time.monotonic()))
+            self._submitted += 1
+            if len(self._pending) >= self.max_batch:
+                self._wakeup.set()
+        self._sync(seq)
+        return case_identifier_for(row_id)
+
+    def _sync(self, seq):
+        """fsync bis Eintrag seq. Ein fsync deckt alle bis dahin geschriebenen Einträge ab."""
+        with self._sync_lock:
+            if self._synced >= seq:
+                return
+            with self._lock:
+                target = self._written
+                self._segment.flush()
+            os.fsync(self._segment.fileno())
+            self._synced = target
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Einträge bleiben im Journal und werden beim nächsten Durchlauf erneut versucht
+                logger.exception("Buchungen konnten nicht geschrieben werden")
+
+    def flush(self):
+        """Schreibt alle angenommenen Buchungen; gibt die Zahl der geschriebenen zurück."""
+        with self._flush_lock:
+            with self._sync_lock, self._lock:
+                batch, self._pending = self._pending, []
+                if self._segment is not None:
+                    # Segment vor dem Wechsel vollständig sichern, damit wartende
+                    # submit()-Aufrufe nicht mehr selbst synchronisieren müssen
+                    self._segment.flush()
+                    os.fsync(self._segment.fileno())
+                    self._synced = self._written
+                    self._segment.close()
+                    self._full_segments.append(self._segment_path)
+                    self._segment = None
+                segments, self._full_segments = self._full_segments, []
+            if not batch and not segments:
+                return 0
+            try:
+                for start in range(0, len(batch), self.max_batch):
+                    version = self.storage.insert_reserved_cases(
+                        [entry for entry, _ in batch[start:start + self.max_batch]]
+                    )
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = batch
+                    self._full_segments[:0] = segments
+                raise
+            for path in segments:
+                os.remove(path)
+            if batch:
+                self._record_flush(batch)
+                if self.on_flush is not None:
+                    self.on_flush(version)
+            return len(batch)
+
+    def _record_flush(self, batch):
+        now = time.monotonic()
+        delay = now - batch[0][1]       # älteste Buchung der Batch
+        with self._lock:
+            self._flushed += len(batch)
+            self._batches += 1
+            self._largest_batch = max(self._largest_batch, len(batch))
+            self._delay_total += sum(now - accepted for _, accepted in batch)
+            self._delay_max = max(self._delay_max, delay)
+
+    def _claim(self, path):
+        """
+        Benennt das Segment auf die eigene pid um; gibt den neuen Pfad zurück oder
+        None, wenn ein anderer Worker es schon beansprucht oder eingespielt hat.
+        """
+        _, pid, rest = os.path.basename(path).split("-", 2)
+        origin = rest[len("claimed-"):] if rest.startswith("claimed-") else f"{pid}-{rest}"
+        claimed = os.path.join(self.queue_dir, f"bookings-{os.getpid()}-claimed-{origin}")
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    def recover(self):
+        """Spielt Journal-Segmente beendeter Prozesse ein; gibt die Zahl der Einträge zurück."""
+        recovered = 0
+        for path in sorted(glob.glob(os.path.join(self.queue_dir, "bookings-*.jsonl"))):
+            pid = int(os.path.basename(path).split("-")[1])
+            if pid != os.getpid() and _pid_alive(pid):
+                continue
+            path = self._claim(path)
+            if path is None:
+                continue
+            entries = []
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # Abgeschnittene letzte Zeile: Buchung wurde nie bestätigt
+                        logger.warning("Unvollständiger Journal-Eintrag in %s verworfen", path)
+            if entries:
+                version = self.storage.insert_reserved_cases(entries)
+                if self.on_flush is not None:
+                    self.on_flush(version)
+            os.remove(path)
+            recovered += len(entries)
+        if recovered:
+            logger.info("%d Buchungen aus dem Journal wiederhergestellt", recovered)
+        return recovered
+
+    def close(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": len(self._pending),
+                "submitted": self._submitted,
+                "flushed": self._flushed,
+                "batches": self._batches,
+                "largest_batch": self._largest_batch,
+                "recovered": self._recovered,
+                "visibility_delay_avg_ms": round(self._delay_total / self._flushed * 1000, 3) if self._flushed else 0.0,
+                "visibility_delay_max_ms": round(self._delay_max * 1000, 3),
+            }
@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from .case_store import (
+    ARCHIVE_ALIAS, CASE_INDEXES, PROMOTED_FIELDS, PROMOTED_INDEXES, case_fields_ready
+)
+
+logger = logging.getLogger(__name__)
+
+# Abgeschlossene bzw. bezahlte Fälle wandern nach ARCHIVE_AFTER_DAYS ins Archiv
+ARCHIVE_STATUSES = ("Bezahlt", "Erledigt")
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_BATCH_SIZE = 500
+# Pause zwischen zwei Batches, damit Buchungen die Schreibsperre bekommen
+ARCHIVE_PAUSE = 0.01
+ARCHIVE_INTERVAL = 3600
+# Ab diesem Anteil freier Seiten wird das Archiv per VACUUM neu geschrieben
+COMPACT_FREE_RATIO = 0.25
+# Zeilen je Index, die ANALYZE höchstens liest
+ANALYSIS_LIMIT = 1000
+
+ARCHIVE_COLUMNS = (
+    "id", "case_identifier", "timestamp", "user_data", "case_data", "booking_data", "status",
+    "change_version", *(column for column, _, _ in PROMOTED_FIELDS.values()),
+)
+
+# Gleiche Spalten wie cases, aber ohne Trigger: das Archiv wird nur vom Archivierer
+# geschrieben. archived_at hält fest, wann ein Fall verschoben wurde.
+ARCHIVE_SCHEMA = (
+    f"""CREATE TABLE IF NOT EXISTS {ARCHIVE_ALIAS}.cases (
+        id INTEGER PRIMARY KEY,
+        case_identifier TEXT UNIQUE,
+        timestamp TEXT,
+        user_data TEXT,
+        case_data TEXT,
+        booking_data TEXT,
+        status TEXT,
+        change_version INTEGER,
+        {", ".join(f"{column} {column_type}".strip() for column, column_type, _ in PROMOTED_FIELDS.values())},
+        archived_at TEXT
+    )""",
+    # Dieselben Filter-Indizes wie im heißen Bestand, ohne den des Änderungsfeeds
+    *(statement.replace("IF NOT EXISTS ", f"IF NOT EXISTS {ARCHIVE_ALIAS}.")
+      for statement in CASE_INDEXES + PROMOTED_INDEXES if "change_version" not in statement),
+)
+
+
+def attach_archive(pool, archive_path):
+    """Hängt die Archiv-Datenbank an alle Verbindungen des Pools und legt ihr Schema an."""
+    pool.attach(ARCHIVE_ALIAS, archive_path)
+    with pool.connection() as conn:
+        # auto_vacuum wirkt nur bei einer neuen, leeren Datei und muss vor WAL gesetzt
+        # werden; erlaubt günstiges Freigeben von Seiten. WAL bleibt in der Datei gespeichert.
+        conn.execute(f"PRAGMA {ARCHIVE_ALIAS}.auto_vacuum = INCREMENTAL")
+        conn.execute(f"PRAGMA {ARCHIVE_ALIAS}.journal_mode = WAL")
+    with pool.write() as conn:
+        for statement in ARCHIVE_SCHEMA:
+            conn.execute(statement)
+
+
+def archive_cases(pool, after_days=ARCHIVE_AFTER_DAYS, statuses=ARCHIVE_STATUSES,
+                  batch_size=ARCHIVE_BATCH_SIZE, pause=ARCHIVE_PAUSE, now=None):
+    """
+    Verschiebt Fälle mit einem der statuses, deren timestamp älter als after_days
+    ist, ins Archiv. Gearbeitet wird in id-Fenstern von batch_size bis zur höchsten
+    id vor dem Stichtag, je Fenster zwei kurze Schreibtransaktionen: erst kopieren,
+    dann im heißen Bestand löschen - aber nur Zeilen, deren change_version noch der
+    Kopie entspricht. Zwischendurch geänderte Fälle bleiben, ihre veraltete Kopie
+    wird entfernt. SQLite garantiert bei WAL keine atomaren Commits über mehrere
+    Dateien; so ist jeder Zwischenstand nach einem Absturz gültig und ein erneuter
+    Lauf setzt fort. Gibt die Zahl der verschobenen Fälle zurück.
+
+    Gelöschte Zeilen tauchen im Änderungsfeed nicht auf; offene Dashboards zeigen
+    archivierte Fälle bis zum nächsten vollständigen Laden.
+    """
+    cutoff = ((now or datetime.now()) - timedelta(days=after_days)).isoformat()
+    with pool.connection() as conn:
+        # Vor dem Backfill fehlen Feldspalten, die das Archiv für seine Indizes braucht
+        if not case_fields_ready(conn):
+            return 0
+        first_id, last_id = conn.execute(
+            "SELECT MIN(id), MAX(id) FROM main.cases WHERE timestamp < ?", (cutoff,)
+        ).fetchone()
+    if first_id is None:
+        return 0
+    columns = ", ".join(ARCHIVE_COLUMNS)
+    # "+" verhindert den Status-Index: das id-Fenster über den Primärschlüssel ist enger
+    candidates = (f"id >= ? AND id < ? AND +status IN ({', '.join('?' for _ in statuses)}) "
+                  "AND +timestamp < ?")
+    moved = 0
+    for start in range(first_id, last_id + 1, batch_size):
+        window = (start, start + batch_size, *statuses, cutoff)
+        with pool.write() as conn:
+            copied = conn.execute(
+                f"INSERT OR REPLACE INTO {ARCHIVE_ALIAS}.cases ({columns}, archived_at) "
+                f"SELECT {columns}, ? FROM main.cases WHERE {candidates}",
+                (datetime.now().isoformat(timespec="seconds"), *window)
+            ).rowcount
+        if not copied:
+            continue
+        with pool.write() as conn:
+            moved += conn.execute(
+                f"DELETE FROM main.cases WHERE {candidates} AND change_version = "
+                f"(SELECT a.change_version FROM {ARCHIVE_ALIAS}.cases a WHERE a.id = main.cases.id)", window
+            ).rowcount
+            conn.execute(
+                f"DELETE FROM {ARCHIVE_ALIAS}.cases WHERE id >= ? AND id < ? "
+                f"AND EXISTS (SELECT 1 FROM main.cases m WHERE m.id = {ARCHIVE_ALIAS}.cases.id)", window[:2]
+            )
+        time.sleep(pause)
+    if moved:
+        logger.info("%d Fälle archiviert (älter als %s)", moved, cutoff)
+    return moved
+
+
+def compact_archive(pool, full=None):
+    """
+    Gibt freie Seiten des Archivs frei und aktualisiert die Planer-Statistik
+    (ANALYZE mit analysis_limit, damit es auch bei großen Archiven kurz bleibt).
+    full=None entscheidet selbst: VACUUM (schreibt die Datei neu, defragmentiert
+    die Indizes) erst ab COMPACT_FREE_RATIO freien Seiten, sonst nur
+    incremental_vacuum. VACUUM sperrt nur das Archiv, nicht den heißen Bestand.
+    Gibt die Seitenzahl (vorher, nachher) zurück.
+    """
+    with pool.connection() as conn:
+        pages = conn.execute(f"PRAGMA {ARCHIVE_ALIAS}.page_count").fetchone()[0]
+        free = conn.execute(f"PRAGMA {ARCHIVE_ALIAS}.freelist_count").fetchone()[0]
+        if full is None:
+            full = pages and free / pages >= COMPACT_FREE_RATIO
+        if full:
+            conn.execute(f"VACUUM {ARCHIVE_ALIAS}")
+        else:
+            # executescript läuft bis zum Ende; execute() gäbe nach der ersten Seite auf
+            conn.executescript(f"PRAGMA {ARCHIVE_ALIAS}.incremental_vacuum")
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        conn.execute(f"ANALYZE {ARCHIVE_ALIAS}")
+        after = conn.execute(f"PRAGMA {ARCHIVE_ALIAS}.page_count").fetchone()[0]
+    return pages, after
+
+
+def archive_stats(pool):
+    with pool.connection() as conn:
+        hot = conn.execute("SELECT COUNT(*) FROM main.cases").fetchone()[0]
+        archived = conn.execute(f"SELECT COUNT(*) FROM {ARCHIVE_ALIAS}.cases").fetchone()[0]
+    return {"hot_cases": hot, "archived_cases": archived}
+
+
+def start_case_archiver(pool, archive_path, after_days=ARCHIVE_AFTER_DAYS, interval=ARCHIVE_INTERVAL):
+    """
+    Hängt das Archiv an und startet den Hintergrund-Job: alle interval Sekunden
+    archivieren, danach verdichten. Mehrere Worker dürfen ihn parallel laufen
+    lassen - die Schreibtransaktionen serialisieren sich, ein Lauf ohne Treffer
+    kostet eine Indexabfrage.
+    """
+    attach_archive(pool, archive_path)
+
+    def run():
+        while True:
+            try:
+                if archive_cases(pool, after_days):
+                    compact_archive(pool)
+            except Exception:
+                logger.exception("Archivierung fehlgeschlagen")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="case-archiver", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,236 @@
+import json
+import logging
+import threading
+import time
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from .case_store import LIST_FIELDS, current_version
+from .sqlite_pool import get_pool
+
+try:
+    import redis
+except ImportError:     # optional, nur für das Redis-Backend
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 15.0
+POLL_INTERVAL = 0.5
+RECONNECT_DELAY_MS = 3000
+# Jeder offene Stream belegt für seine ganze Dauer einen Server-Thread (threaded Flask,
+# gunicorn gthread). Die Obergrenze je Prozess muss unter der Thread-Zahl bleiben,
+# sonst warten normale Anfragen auf einen freien Thread; darüber antwortet der Stream mit 503
+MAX_STREAMS = 48
+# Wartezeit vor dem erneuten Abonnieren nach einem Abbruch der Redis-Verbindung (verdoppelt sich)
+REDIS_RETRY_DELAY = 1.0
+REDIS_RETRY_MAX_DELAY = 30.0
+# Felder der Dashboard-Liste plus Feed-Version als Event-ID
+EVENT_FIELDS = LIST_FIELDS + ("version",)
+# Gültigkeit eines Stream-Tickets; geprüft wird nur beim Verbindungsaufbau
+STREAM_TICKET_TTL = 60
+STREAM_TICKET_SALT = "case-events"
+
+
+def issue_stream_ticket(secret, identity):
+    """
+    Kurzlebiges Ticket, das nur den Event-Stream öffnet. EventSource kann keinen
+    Authorization-Header setzen; ein JWT in der URL landete in Server-Logs und im
+    Browserverlauf.
+    """
+    return URLSafeTimedSerializer(secret, salt=STREAM_TICKET_SALT).dumps(identity)
+
+
+def check_stream_ticket(secret, ticket, max_age=STREAM_TICKET_TTL):
+    """Gibt die Identität aus dem Ticket zurück; None bei fehlendem, falschem oder abgelaufenem Ticket."""
+    if not ticket:
+        return None
+    try:
+        return URLSafeTimedSerializer(secret, salt=STREAM_TICKET_SALT).loads(ticket, max_age=max_age)
+    except BadSignature:    # auch SignatureExpired
+        return None
+
+
+class LocalBackend:
+    """Nur dieser Prozess: Änderungen kommen ausschließlich über publish() an."""
+
+    def start(self, broker):
+        pass
+
+    def notify(self, version):
+        pass
+
+
+class PollingBackend:
+    """
+    Erkennt Buchungen anderer Worker am Zähler des Änderungsfeeds. Ein Thread je
+    Prozess fragt alle POLL_INTERVAL Sekunden current_version() ab - unabhängig
+    davon, wie viele Dashboards verbunden sind. current_version ist z.B.
+    storage.current_version eines gemeinsamen PostgreSQL-Speichers.
+    """
+
+    def __init__(self, current_version, interval=POLL_INTERVAL):
+        self.current_version = current_version
+        self.interval = interval
+
+    def start(self, broker):
+        threading.Thread(target=self._run, args=(broker,), name="case-events-poll", daemon=True).start()
+
+    def _run(self, broker):
+        while True:
+            try:
+                broker.receive(self.current_version())
+            except Exception as e:
+                logger.warning("Änderungsfeed nicht lesbar: %s", e)
+            time.sleep(self.interval)
+
+    def notify(self, version):
+        pass
+
+
+class SQLitePollingBackend(PollingBackend):
+    """PollingBackend über eine SQLite-Datei: eine Zeile je Abfrage."""
+
+    def __init__(self, db_path, interval=POLL_INTERVAL):
+        self.db_path = db_path
+        super().__init__(self._read_version, interval)
+
+    def _read_version(self):
+        with get_pool(self.db_path).connection() as conn:
+            return current_version(conn)
+
+
+class RedisBackend:
+    """Verteilt neue Versionen über einen Redis-Pub/Sub-Kanal an alle Worker."""
+
+    def __init__(self, url, channel="jurismind:case-events"):
+        if redis is None:
+            raise RuntimeError("Für CASE_EVENTS_BACKEND=redis wird das Paket 'redis' benötigt")
+        self.client = redis.Redis.from_url(url)
+        self.channel = channel
+
+    def start(self, broker):
+        threading.Thread(target=self._run, args=(broker,), name="case-events-redis", daemon=True).start()
+
+    def _run(self, broker):
+        # Bricht die Verbindung ab, wird neu abonniert. Versionen aus der Lücke holen die
+        # Streams spätestens mit dem nächsten Heartbeat über fetch_changes nach
+        delay = REDIS_RETRY_DELAY
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                delay = REDIS_RETRY_DELAY
+                for message in pubsub.listen():
+                    broker.receive(int(message["data"]))
+            except Exception as e:
+                logger.warning("Redis-Pub/Sub getrennt, neuer Versuch in %.0f s: %s", delay, e)
+            time.sleep(delay)
+            delay = min(delay * 2, REDIS_RETRY_MAX_DELAY)
+
+    def notify(self, version):
+        self.client.publish(self.channel, version)
+
+
+def backend_from_config(name, db_path, redis_url=None, storage=None):
+    """Mit storage fragt das Polling dessen Feed-Version ab (auch PostgreSQL), sonst die Datei db_path."""
+    if name == "redis":
+        return RedisBackend(redis_url or "redis://localhost:6379")
+    if name == "local":
+        return LocalBackend()
+    if storage is not None:
+        return PollingBackend(storage.current_version)
+    return SQLitePollingBackend(db_path)
+
+
+class CaseEventBroker:
+    """
+    Pub/Sub im Prozess für den Änderungsfeed der Fälle. Gemeldet wird nur die neue
+    Feed-Version; wartende Streams holen die Fälle danach selbst über list_changes.
+    Ein wartender Stream belegt nur eine Condition, keine Datenbankabfrage, aber
+    einen Server-Thread; open_stream() begrenzt deshalb die Zahl offener Streams.
+    """
+
+    def __init__(self, backend=None, max_streams=MAX_STREAMS):
+        self.backend = backend or LocalBackend()
+        self.max_streams = max_streams
+        self._condition = threading.Condition()
+        self._version = 0
+        self._started = False
+        self._streams = 0
+
+    @property
+    def version(self):
+        return self._version
+
+    def _ensure_started(self):
+        with self._condition:
+            if self._started:
+                return
+            self._started = True
+        self.backend.start(self)
+
+    def receive(self, version):
+        """Neue Version (lokal oder vom Backend) - weckt alle wartenden Streams."""
+        with self._condition:
+            if version > self._version:
+                self._version = version
+                self._condition.notify_all()
+
+    def publish(self, version):
+        """Nach dem Commit einer Änderung aufrufen."""
+        self.receive(version)
+        self.backend.notify(version)
+
+    def open_stream(self):
+        """Belegt einen Platz für einen Stream; False, wenn max_streams erreicht ist."""
+        with self._condition:
+            if self.full:
+                return False
+            self._streams += 1
+            return True
+
+    def close_stream(self):
+        """Gibt den Platz frei (Response.call_on_close, auch bei Verbindungsabbruch)."""
+        with self._condition:
+            self._streams -= 1
+
+    @property
+    def full(self):
+        return self._streams >= self.max_streams
+
+    def wait(self, since, timeout):
+        """Blockiert, bis eine Version > since bekannt ist oder timeout abläuft."""
+        self._ensure_started()
+        with self._condition:
+            self._condition.wait_for(lambda: self._version > since, timeout)
+            return self._version
+
+
+def format_event(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def case_event_stream(broker, fetch_changes, since, heartbeat=HEARTBEAT_INTERVAL):
+    """
+    Server-Sent Events ab Version since. fetch_changes(since) liefert
+    (Fälle, Version, more) wie list_changes; die Fälle müssen das Feld "version"
+    enthalten, es wird zur Event-ID und damit zum Last-Event-ID beim Reconnect.
+    Ohne Änderungen wird alle heartbeat Sekunden ein Kommentar gesendet.
+    """
+    yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+    while True:
+        cases, version, more = fetch_changes(since)
+        for case in cases:
+            yield format_event(case, "case", case["version"])
+        since = version
+        if more:
+            continue
+        if broker.wait(since, heartbeat) <= since:
+            yield ": heartbeat\n\n"
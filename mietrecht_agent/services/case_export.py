@@ -0,0 +1,253 @@
+import csv
+import io
+import json
+from datetime import date
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:     # optional, nur für format=parquet/arrow
+    pyarrow = None
+
+from .case_store import ARCHIVE_ALIAS, _fields_from_arg, _projection, _to_case, case_fields_ready, has_archive
+
+# Flache Spalten für Buchhaltung/Partnerkanzleien; über fields=... änderbar
+EXPORT_FIELDS = (
+    "id", "timestamp", "status", "user.name", "user.email", "user.phone", "user.address",
+    "case.topic", "case.risk", "booking.lawyer", "booking.type", "booking.price", "booking.time",
+)
+# In Parquet/Arrow als Zahl statt Text
+NUMERIC_FIELDS = frozenset(("booking.price",))
+# Fälle je Lesetransaktion und je gesendetem Block
+EXPORT_CHUNK_SIZE = 1000
+# Zeilen je Parquet-Row-Group: große Gruppen komprimieren besser, belegen aber Speicher
+PARQUET_ROW_GROUP_SIZE = 50_000
+# Tabellenkalkulationen werten Zellen mit diesen Anfangszeichen als Formel aus (CSV-Injection)
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def iter_case_chunks(pool, fields=EXPORT_FIELDS, status=None, date_from=None, date_to=None,
+                     include_archive=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Alle passenden Fälle als Blöcke (Listen von dicts), älteste zuerst. Jeder Block
+    kommt aus einer eigenen kurzen Lesetransaktion (Keyset über id): ein langer
+    Export hält keinen WAL-Snapshot offen und blockiert keinen Checkpoint. Während
+    des Exports gebuchte Fälle erscheinen am Ende; archivierte nur mit include_archive.
+    """
+    where, params = [], []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if date_from:
+        where.append("timestamp >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("timestamp < ?")
+        params.append(date_to + "\uffff")
+    last_id = 0
+    while True:
+        with pool.connection() as conn:
+            spec = _projection(fields, case_fields_ready(conn))
+            select = f"SELECT id, {', '.join(column for column, _, _ in spec)} FROM "
+            sql = f"{select}main.cases WHERE " + " AND ".join(where + ["id > ?"])
+            args = [*params, last_id]
+            if include_archive and has_archive(conn):
+                # Fälle, die gerade verschoben werden, können kurz in beiden Tabellen liegen
+                sql += (f" UNION ALL {select}{ARCHIVE_ALIAS}.cases WHERE " + " AND ".join(where + [
+                    "id > ?", f"NOT EXISTS (SELECT 1 FROM main.cases m WHERE m.id = {ARCHIVE_ALIAS}.cases.id)"
+                ]))
+                args += [*params, last_id]
+            rows = conn.execute(sql + " ORDER BY id LIMIT ?", (*args, chunk_size)).fetchall()
+        if rows:
+            yield [_to_case(spec, row[1:]) for row in rows]
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1][0]
+
+
+def _value(case, field):
+    name, _, sub = field.partition(".")
+    value = case.get(name)
+    if sub:
+        value = (value or {}).get(sub)
+    return value
+
+
+def _text(value):
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else str(value)
+
+
+def _csv_cell(value):
+    """Text aus Nutzereingaben mit ' davor, wenn er als Formel gelesen würde."""
+    text = _text(value)
+    if isinstance(value, str) and text.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+def _number(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def csv_stream(chunks, fields=EXPORT_FIELDS):
+    """
+    CSV mit Kopfzeile; verschachtelte Werte (fields=user) als JSON-Text. Text, der
+    mit =, +, -, @, Tab oder CR beginnt, bekommt ein ' davor (siehe _csv_cell).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for chunk in chunks:
+        writer.writerows([_csv_cell(_value(case, field)) for field in fields] for case in chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    # Kopfzeile auch ohne Treffer
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def ndjson_stream(chunks, fields=EXPORT_FIELDS):
+    """Ein JSON-Objekt je Zeile, im Format von /api/cases."""
+    for chunk in chunks:
+        yield "".join(json.dumps(case, ensure_ascii=False) + "\n" for case in chunk).encode("utf-8")
+
+
+class _StreamSink:
+    """Datei-Ersatz für pyarrow: sammelt Geschriebenes bis zum nächsten drain()."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_schema(fields):
+    return pyarrow.schema([(field, pyarrow.float64() if field in NUMERIC_FIELDS else pyarrow.string())
+                           for field in fields])
+
+
+def _record_batch(chunk, fields, schema):
+    return pyarrow.RecordBatch.from_arrays(
+        [pyarrow.array([(_number if field in NUMERIC_FIELDS else _text)(_value(case, field)) for case in chunk],
+                       type=schema.field(field).type)
+         for field in fields],
+        schema=schema
+    )
+
+
+def parquet_stream(chunks, fields=EXPORT_FIELDS):
+    """
+    Parquet, Row-Group für Row-Group gesendet. Bis eine Gruppe voll ist, liegen
+    die Zeilen spaltenweise in Arrow-Puffern statt als Python-Objekte.
+    """
+    schema = _arrow_schema(fields)
+    sink = _StreamSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    batches, rows = [], 0
+    for chunk in chunks:
+        batches.append(_record_batch(chunk, fields, schema))
+        rows += len(chunk)
+        if rows >= PARQUET_ROW_GROUP_SIZE:
+            writer.write_table(pyarrow.Table.from_batches(batches, schema), row_group_size=rows)
+            batches, rows = [], 0
+            yield sink.drain()
+    if batches:
+        writer.write_table(pyarrow.Table.from_batches(batches, schema), row_group_size=rows)
+    writer.close()
+    yield sink.drain()
+
+
+def arrow_stream(chunks, fields=EXPORT_FIELDS):
+    """Arrow-IPC-Stream: ein Record-Batch je Block, z.B. für pandas/polars."""
+    schema = _arrow_schema(fields)
+    sink = _StreamSink()
+    writer = pyarrow.ipc.new_stream(sink, schema)
+    yield sink.drain()
+    for chunk in chunks:
+        writer.write_batch(_record_batch(chunk, fields, schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+# format -> (Content-Type, Dateiendung, Writer)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv", csv_stream),
+    "ndjson": ("application/x-ndjson", "ndjson", ndjson_stream),
+    "parquet": ("application/vnd.apache.parquet", "parquet", parquet_stream),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows", arrow_stream),
+}
+
+
+def export_stream(chunks, fmt="csv", fields=EXPORT_FIELDS):
+    """
+    Bytes-Generator für eine Export-Antwort; der Speicherbedarf hängt nur von der
+    Blockgröße ab, nicht von der Zahl der Fälle. Ohne pyarrow: RuntimeError für
+    parquet/arrow, schon beim Aufruf (vor dem ersten gesendeten Byte).
+    """
+    if fmt in ("parquet", "arrow") and pyarrow is None:
+        raise RuntimeError(f"Für format={fmt} wird das Paket 'pyarrow' benötigt")
+    return EXPORT_FORMATS[fmt][2](chunks, fields)
+
+
+def export_filename(fmt, date_from=None, date_to=None):
+    span = "_".join(part for part in (date_from, date_to) if part)
+    return f"faelle{'_' + span if span else ''}.{EXPORT_FORMATS[fmt][1]}"
+
+
+def _date_arg(args, name):
+    """Datum aus from/to als JJJJ-MM-TT normalisiert (fließt in Abfrage und Dateinamen)."""
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"{name} muss ein Datum im Format JJJJ-MM-TT sein")
+
+
+def export_query_from_args(args):
+    """
+    Liest format (csv, ndjson, parquet, arrow), status, from, to, fields und
+    archive=1. Gibt (format, Abfrage für export_cases) zurück; ungültige Werte: ValueError.
+    """
+    fmt = args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unbekanntes Format: {fmt}")
+    query = {
+        "status": args.get("status"),
+        "date_from": _date_arg(args, "from"),
+        "date_to": _date_arg(args, "to"),
+        "include_archive": args.get("archive") == "1",
+        "fields": _fields_from_arg(args["fields"]) if args.get("fields") else EXPORT_FIELDS,
+    }
+    return fmt, query
@@ -0,0 +1,253 @@
+import html
+import re
+import threading
+import time
+
+from .case_store import (
+    LIST_FIELDS, BACKFILL_PAUSE, _fields_from_arg, _projection, _to_case, case_fields_ready,
+    migration_done, register_migration, run_batched_migration
+)
+
+SEARCH_MIGRATION = "case_search"
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 50
+# Gewichte für bm25 in Spaltenreihenfolge: Treffer im Namen zählen am meisten
+SEARCH_COLUMNS = (
+    ("name", "user_data", "name", 10.0),
+    ("address", "user_data", "address", 5.0),
+    ("topic", "case_data", "topic", 5.0),
+    ("analysis", "case_data", "analysis", 1.0),
+    ("recommendation", "case_data", "recommendation", 1.0),
+)
+SNIPPET_TOKENS = 12
+# Sortiert wird nach Relevanz in Fenstern zu je RANK_WINDOW Treffern, neueste zuerst.
+# bm25 muss sonst jeden Treffer bewerten - bei Wörtern wie "Mieter" fast den ganzen Bestand.
+RANK_WINDOW = 1000
+# Kleinere Batches als bei den Feldspalten: FTS-Einfügungen sind teurer
+SEARCH_BACKFILL_BATCH_SIZE = 1000
+# Seiten je Merge-Schritt nach dem Backfill (eine Schreibtransaktion je Schritt)
+MERGE_PAGES = 200
+# Steuerzeichen als Trefferklammern; erst nach dem HTML-Escaping zu <mark>
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+
+def _values(prefix):
+    return ", ".join(f"json_extract({prefix}{source}, '$.{key}')" for _, source, key, _ in SEARCH_COLUMNS)
+
+
+_COLUMN_NAMES = ", ".join(column for column, _, _, _ in SEARCH_COLUMNS)
+# Zeile ist schon im Index: außerhalb des noch offenen Backfill-Bereichs. Zeilen im
+# offenen Bereich übernimmt ausschließlich der Backfill, sonst stünden sie doppelt im Index.
+_INDEXED = ("(SELECT {ref}.id > target_id OR {ref}.id <= last_id FROM case_migrations "
+            f"WHERE name = '{SEARCH_MIGRATION}')")
+
+# FTS5 mit externem Inhalt: der Index speichert keine Kopie der Texte, Snippets
+# liest FTS5 über die View aus cases. unicode61 mit remove_diacritics findet
+# "Kündigung" auch als "kundigung"; Präfix-Indizes für Suche beim Tippen.
+CASE_SEARCH_SCHEMA = (
+    f"""CREATE VIEW IF NOT EXISTS case_search_source AS
+        SELECT id, {", ".join(f"json_extract({source}, '$.{key}') AS {column}"
+                              for column, source, key, _ in SEARCH_COLUMNS)}
+        FROM cases""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS case_search USING fts5(
+        {_COLUMN_NAMES},
+        content='case_search_source', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""INSERT INTO case_search (case_search, rank)
+        VALUES ('rank', 'bm25({", ".join(str(weight) for *_, weight in SEARCH_COLUMNS)})')""",
+    f"""CREATE TRIGGER IF NOT EXISTS case_search_insert AFTER INSERT ON cases
+    WHEN {_INDEXED.format(ref="NEW")} BEGIN
+        INSERT INTO case_search (rowid, {_COLUMN_NAMES}) VALUES (NEW.id, {_values("NEW.")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS case_search_update AFTER UPDATE OF user_data, case_data ON cases
+    WHEN {_INDEXED.format(ref="OLD")} BEGIN
+        INSERT INTO case_search (case_search, rowid, {_COLUMN_NAMES}) VALUES ('delete', OLD.id, {_values("OLD.")});
+        INSERT INTO case_search (rowid, {_COLUMN_NAMES}) VALUES (NEW.id, {_values("NEW.")});
+    END""",
+    # Auch die Archivierung löscht: archivierte Fälle verlassen den Suchindex
+    f"""CREATE TRIGGER IF NOT EXISTS case_search_delete AFTER DELETE ON cases
+    WHEN {_INDEXED.format(ref="OLD")} BEGIN
+        INSERT INTO case_search (case_search, rowid, {_COLUMN_NAMES}) VALUES ('delete', OLD.id, {_values("OLD.")});
+    END""",
+)
+
+
+def ensure_case_search_schema(conn):
+    """Legt Suchindex und Trigger an; nach ensure_case_schema() aufrufen (braucht case_migrations)."""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'case_search'").fetchone()
+    for statement in CASE_SEARCH_SCHEMA:
+        if exists and statement.startswith("INSERT"):
+            continue
+        conn.execute(statement)
+    register_migration(conn, SEARCH_MIGRATION)
+
+
+def case_search_ready(conn):
+    return migration_done(conn, SEARCH_MIGRATION)
+
+
+def backfill_case_search(pool, batch_size=SEARCH_BACKFILL_BATCH_SIZE, pause=BACKFILL_PAUSE):
+    """
+    Nimmt bestehende Fälle in id-Batches in den Suchindex auf und führt danach die
+    vielen kleinen Segmente schrittweise zusammen ('merge' statt 'optimize', das den
+    ganzen Index in einer Transaktion neu schreibt). Gibt die Zahl der Batches zurück.
+    """
+    batches = run_batched_migration(
+        pool, SEARCH_MIGRATION,
+        f"INSERT INTO case_search (rowid, {_COLUMN_NAMES}) "
+        f"SELECT id, {_values('')} FROM cases WHERE id > ? AND id <= ?",
+        batch_size, pause
+    )
+    if batches is None:
+        return 0
+    # Negativer Wert beim ersten Schritt: auch Segmente verschiedener Ebenen werden
+    # zusammengeführt (wie 'optimize'), die folgenden Schritte setzen das fort
+    pages, merged = -MERGE_PAGES, True
+    while merged:
+        with pool.write() as conn:
+            before = conn.total_changes
+            conn.execute("INSERT INTO case_search (case_search, rank) VALUES ('merge', ?)", (pages,))
+            # Laut FTS5-Doku: steigt total_changes um weniger als 2, war nichts mehr zu tun
+            merged = conn.total_changes - before >= 2
+        pages = MERGE_PAGES
+        time.sleep(pause)
+    with pool.write() as conn:
+        conn.execute("UPDATE case_migrations SET done = 1 WHERE name = ?", (SEARCH_MIGRATION,))
+    return batches
+
+
+def start_case_search_backfill(pool):
+    """Startet den Aufbau des Suchindex im Hintergrund, falls noch Fälle fehlen."""
+    with pool.connection() as conn:
+        if case_search_ready(conn):
+            return None
+    thread = threading.Thread(target=backfill_case_search, args=(pool,), name="case-search-backfill", daemon=True)
+    thread.start()
+    return thread
+
+
+def search_terms(text):
+    """Wörter der Benutzereingabe; Operatoren und Sonderzeichen fallen weg. Keine Wörter: ValueError."""
+    terms = re.findall(r"\w+", text or "")
+    if not terms:
+        raise ValueError("Suchbegriff fehlt")
+    return terms
+
+
+def fts_query(text, prefix=False):
+    """
+    Macht aus einer Benutzereingabe eine FTS5-Abfrage: alle Wörter müssen
+    vorkommen, mit prefix das letzte auch als Präfix ("Schimmel Hamb" findet
+    "Hamburg"). Operatoren und Sonderzeichen der FTS5-Syntax werden nicht ausgewertet.
+    """
+    return " ".join(f'"{term}"' for term in search_terms(text)) + ("*" if prefix else "")
+
+
+def _snippet_html(text):
+    escaped = html.escape(text or "")
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def search_cases(conn, q, status=None, date_from=None, date_to=None, offset=0,
+                 limit=SEARCH_PAGE_SIZE, fields=LIST_FIELDS):
+    """
+    Volltextsuche über Mandantenname, Adresse, Thema, Analyse und Empfehlung.
+    Die Treffer kommen in Fenstern zu je RANK_WINDOW, neueste zuerst, und sind
+    innerhalb eines Fensters nach bm25 sortiert; das Blättern läuft über die
+    Fenstergrenzen hinweg bis zum ältesten Treffer weiter. Jeder Treffer
+    enthält fields plus "snippet" (HTML, Treffer in <mark>) und "score" (kleiner
+    ist besser). Gibt (Treffer, next_offset) zurück.
+
+    Gesucht wird nach ganzen Wörtern; nur wenn das nichts findet, wird das letzte
+    Wort als Präfix gelesen (Eingabe beim Tippen). Präfixabfragen muss FTS5 über
+    alle passenden Wörter zusammenführen und sind deshalb deutlich teurer.
+    """
+    limit = min(max(int(limit), 1), MAX_SEARCH_PAGE_SIZE)
+    offset = max(int(offset), 0)
+    # Filter über den Primärschlüssel je Treffer statt einer id-Liste aus cases
+    source = "FROM case_search JOIN main.cases c ON c.id = case_search.rowid WHERE case_search MATCH ?"
+    params, low, high = [], None, None
+    if status:
+        source += " AND c.status = ?"
+        params.append(status)
+    if date_from or date_to:
+        # Zeitraum zusätzlich als rowid-Bereich: FTS5 überspringt so alle Treffer außerhalb,
+        # statt sie vom neuesten an zu prüfen. Ermittelt über den Index (timestamp, id).
+        bounds = ["timestamp >= ?"] if date_from else []
+        bounds += ["timestamp < ?"] if date_to else []
+        bound_params = [value for value in (date_from, date_to and date_to + "\uffff") if value]
+        low, high = conn.execute(
+            f"SELECT MIN(id), MAX(id) FROM cases WHERE {' AND '.join(bounds)}", bound_params
+        ).fetchone()
+        if low is None:
+            return [], None
+        source += f" AND {' AND '.join('c.' + bound for bound in bounds)}"
+        params.extend(bound_params)
+
+    def rowid_range(low, high):
+        # FTS5 wertet nur eine Unter- und eine Obergrenze für rowid aus
+        return (" AND case_search.rowid >= ?" * (low is not None) + " AND case_search.rowid <= ?" * (high is not None),
+                [bound for bound in (low, high) if bound is not None])
+
+    match = fts_query(q)
+    clause, bounds = rowid_range(low, high)
+    if not conn.execute(f"SELECT 1 {source}{clause} LIMIT 1", (match, *params, *bounds)).fetchone():
+        match = fts_query(q, prefix=True)
+    hits, position = [], offset
+    while len(hits) <= limit:
+        # rowid-Grenzen des Fensters, in dem position liegt; FTS5 liefert Treffer in
+        # rowid-Reihenfolge, das kostet (Fensternummer + 1) * RANK_WINDOW Schritte
+        window, skip = divmod(position, RANK_WINDOW)
+        window_high, window_low = conn.execute(
+            f"SELECT MAX(rowid), MIN(rowid) FROM (SELECT case_search.rowid AS rowid {source}{clause} "
+            "ORDER BY case_search.rowid DESC LIMIT ? OFFSET ?)",
+            (match, *params, *bounds, RANK_WINDOW, window * RANK_WINDOW)
+        ).fetchone()
+        if window_high is None:
+            break
+        window_clause, window_bounds = rowid_range(window_low, window_high)
+        page = conn.execute(
+            f"SELECT case_search.rowid, snippet(case_search, -1, '{_MARK_START}', '{_MARK_END}', '…', "
+            f"{SNIPPET_TOKENS}), rank {source}{window_clause} ORDER BY rank LIMIT ? OFFSET ?",
+            (match, *params, *window_bounds, limit + 1 - len(hits), skip)
+        ).fetchall()
+        if not page:
+            break
+        hits += page
+        position += len(page)
+    more = len(hits) > limit
+    hits = hits[:limit]
+    if not hits:
+        return [], None
+
+    spec = _projection(fields, case_fields_ready(conn))
+    rows = conn.execute(
+        f"SELECT id, {', '.join(column for column, _, _ in spec)} FROM cases "
+        f"WHERE id IN ({', '.join('?' for _ in hits)})", [row_id for row_id, _, _ in hits]
+    ).fetchall()
+    cases = {row[0]: _to_case(spec, row[1:]) for row in rows}
+    results = []
+    for row_id, snippet, score in hits:
+        if row_id in cases:
+            case = cases[row_id]
+            case["snippet"] = _snippet_html(snippet)
+            case["score"] = round(score, 4)
+            results.append(case)
+    return results, (offset + limit if more else None)
+
+
+def search_query_from_args(args):
+    """Liest q, status, from, to, offset, limit und fields; ungültige Werte: ValueError."""
+    query = {
+        "q": args.get("q", ""),
+        "status": args.get("status"),
+        "date_from": args.get("from"),
+        "date_to": args.get("to"),
+        "offset": int(args.get("offset", 0)),
+        "limit": int(args.get("limit", SEARCH_PAGE_SIZE)),
+    }
+    search_terms(query["q"])
+    if args.get("fields"):
+        query["fields"] = _fields_from_arg(args["fields"])
+    return query
@@ -0,0 +1,208 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from .case_store import ARCHIVE_ALIAS, has_archive, migration_done, register_migration
+
+logger = logging.getLogger(__name__)
+
+STATS_MIGRATION = "case_stats"
+RECONCILE_INTERVAL = 3600
+# Kennzahlen je Dimension: (kind, Schlüsselausdruck über eine Fallzeile)
+STATS_DIMENSIONS = (
+    ("status", "{ref}.status"),
+    ("day", "substr({ref}.timestamp, 1, 10)"),       # Buchungstag aus dem ISO-Zeitstempel (UTC)
+    ("lawyer", "json_extract({ref}.booking_data, '$.lawyer')"),
+)
+_REVENUE = "IFNULL(CAST(json_extract({ref}.booking_data, '$.price') AS REAL), 0)"
+# Zähler der Abgleichsläufe; verhindert, dass zwei Worker dieselbe Abweichung doppelt korrigieren
+_RECONCILE_KEY = ("reconcile", "")
+
+
+def _upserts(ref, sign):
+    return "\n".join(
+        f"""INSERT INTO case_stats (kind, key, cases, revenue)
+        SELECT '{kind}', {key.format(ref=ref)}, {sign}1, {sign}{_REVENUE.format(ref=ref)}
+        WHERE {key.format(ref=ref)} IS NOT NULL
+        ON CONFLICT (kind, key) DO UPDATE SET
+            cases = cases + excluded.cases, revenue = revenue + excluded.revenue;"""
+        for kind, key in STATS_DIMENSIONS
+    )
+
+
+# Zähler je Status, Tag und Anwalt, von Triggern in der Schreibtransaktion der
+# Buchung bzw. Statusänderung fortgeschrieben. Gelöscht wird nicht zurückgezählt:
+# archivierte Fälle bleiben im Umsatz ihres Tages. Andere Abweichungen (z.B. Fälle
+# aus der Zeit vor den Triggern) gleicht reconcile_case_stats() aus.
+CASE_STATS_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS case_stats (
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        cases INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (kind, key)
+    ) WITHOUT ROWID""",
+    f"""CREATE TRIGGER IF NOT EXISTS case_stats_insert AFTER INSERT ON cases BEGIN
+        {_upserts("NEW", "")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS case_stats_update AFTER UPDATE OF status, timestamp, booking_data ON cases
+    WHEN OLD.status IS NOT NEW.status OR OLD.timestamp IS NOT NEW.timestamp
+        OR OLD.booking_data IS NOT NEW.booking_data BEGIN
+        {_upserts("OLD", "-")}
+        {_upserts("NEW", "")}
+    END""",
+)
+
+
+def ensure_case_stats_schema(conn):
+    """Legt Kennzahlentabelle und Trigger an; nach ensure_case_schema() aufrufen (braucht case_migrations)."""
+    for statement in CASE_STATS_SCHEMA:
+        conn.execute(statement)
+    register_migration(conn, STATS_MIGRATION)
+
+
+def case_stats_ready(conn):
+    """True nach dem ersten Abgleich (oder bei leerer Tabelle): Zähler umfassen alle Fälle."""
+    return migration_done(conn, STATS_MIGRATION)
+
+
+def _aggregate(conn):
+    """Kennzahlen frisch aus den Fällen, inklusive angehängtem Archiv: {(kind, key): [cases, revenue]}."""
+    names = [f"key{i}" for i in range(len(STATS_DIMENSIONS))]
+    columns = ", ".join(f"{key.format(ref='c')} AS {name}" for (_, key), name in zip(STATS_DIMENSIONS, names))
+    source = f"SELECT {columns}, {_REVENUE.format(ref='c')} AS revenue FROM main.cases c"
+    if has_archive(conn):
+        source += (f" UNION ALL SELECT {columns}, {_REVENUE.format(ref='c')} FROM {ARCHIVE_ALIAS}.cases c "
+                   "WHERE NOT EXISTS (SELECT 1 FROM main.cases m WHERE m.id = c.id)")
+    # Ein Durchlauf über alle Fälle, gruppiert nach allen Dimensionen zugleich
+    return _totals_from_groups(conn.execute(
+        f"SELECT {', '.join(names)}, COUNT(*), SUM(revenue) FROM ({source}) GROUP BY {', '.join(names)}"
+    ))
+
+
+def _totals_from_groups(rows):
+    """Zeilen (Schlüssel je Dimension..., Anzahl, Umsatz) -> {(kind, key): [cases, revenue]}."""
+    totals = {}
+    for *keys, cases, total in rows:
+        for (kind, _), key in zip(STATS_DIMENSIONS, keys):
+            if key is None:
+                continue
+            entry = totals.setdefault((kind, str(key)), [0, 0.0])
+            entry[0] += cases
+            entry[1] += total or 0
+    return totals
+
+
+def reconcile_case_stats(pool):
+    """
+    Gleicht die Zähler mit den Fällen ab. Gezählt wird in einer Lesetransaktion
+    (WAL-Snapshot, blockiert keine Buchungen); aus demselben Snapshot stammen die
+    Zählerstände. Geschrieben wird nur die Differenz - Trigger haben seitdem
+    eingegangene Änderungen bereits mitgezählt, die Korrektur bleibt also richtig.
+    Hat ein anderer Worker inzwischen abgeglichen, wird nichts geschrieben.
+    Gibt die Zahl der korrigierten Zähler zurück.
+    """
+    with pool.connection() as conn:
+        conn.execute("BEGIN")
+        expected = _aggregate(conn)
+        stored = {(kind, key): (cases, revenue) for kind, key, cases, revenue in conn.execute(
+            "SELECT kind, key, cases, revenue FROM case_stats WHERE kind <> ?", (_RECONCILE_KEY[0],)
+        )}
+        run = conn.execute(
+            "SELECT cases FROM case_stats WHERE kind = ? AND key = ?", _RECONCILE_KEY
+        ).fetchone()
+        conn.rollback()
+    run = run[0] if run else 0
+    deltas = _stat_deltas(expected, stored)
+
+    with pool.write() as conn:
+        current = conn.execute(
+            "SELECT cases FROM case_stats WHERE kind = ? AND key = ?", _RECONCILE_KEY
+        ).fetchone()
+        if (current[0] if current else 0) != run:
+            return 0
+        conn.executemany(
+            """INSERT INTO case_stats (kind, key, cases, revenue) VALUES (?, ?, ?, ?)
+            ON CONFLICT (kind, key) DO UPDATE SET
+                cases = cases + excluded.cases, revenue = revenue + excluded.revenue""",
+            deltas + [(*_RECONCILE_KEY, 1, 0)]
+        )
+        conn.execute("UPDATE case_migrations SET done = 1 WHERE name = ?", (STATS_MIGRATION,))
+    if deltas and run:
+        logger.warning("%d Dashboard-Zähler beim Abgleich korrigiert", len(deltas))
+    return len(deltas)
+
+
+def _stat_deltas(expected, stored):
+    """Korrekturen [(kind, key, Δcases, Δrevenue)], damit stored expected entspricht."""
+    deltas = []
+    for stat in expected.keys() | stored.keys():
+        cases, revenue = expected.get(stat, (0, 0.0))
+        stored_cases, stored_revenue = stored.get(stat, (0, 0.0))
+        if cases != stored_cases or abs(revenue - stored_revenue) >= 0.005:
+            deltas.append((*stat, cases - stored_cases, revenue - stored_revenue))
+    return deltas
+
+
+def start_case_stats_reconciler(pool, interval=RECONCILE_INTERVAL, reconcile=reconcile_case_stats):
+    """
+    Gleicht sofort (Erstbefüllung bei Bestandsdaten) und danach alle interval
+    Sekunden ab. reconcile(pool) erlaubt einen anderen Speicher (PostgresStorage).
+    """
+    def run():
+        while True:
+            try:
+                reconcile(pool)
+            except Exception:
+                logger.exception("Abgleich der Dashboard-Zähler fehlgeschlagen")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="case-stats-reconciler", daemon=True)
+    thread.start()
+    return thread
+
+
+def today_utc():
+    """
+    Heutiger Tag in UTC. Die Zeitstempel der Buchungen kommen als toISOString()
+    aus dem Browser (UTC); "heute" muss denselben Tag meinen wie die Zähler.
+    """
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def _totals(cases, revenue):
+    return {"cases": cases or 0, "revenue": round(revenue or 0, 2)}
+
+
+def dashboard_stats(conn, day=None):
+    """
+    Kopfzahlen des Anwalts-Dashboards aus den Zählern - ohne Fälle zu lesen:
+    Fälle je Status, Fälle und Umsatz des Tages day (Standard heute, UTC) und
+    seines Monats sowie je Anwalt.
+    """
+    day = day or today_utc()
+    today = conn.execute(
+        "SELECT cases, revenue FROM case_stats WHERE kind = 'day' AND key = ?", (day,)
+    ).fetchone()
+    # Höchstens ein Zähler je Tag des Monats
+    month = conn.execute(
+        "SELECT SUM(cases), SUM(revenue) FROM case_stats WHERE kind = 'day' AND key >= ? AND key <= ?",
+        (day[:7] + "-01", day)
+    ).fetchone()
+    return _stats_response(
+        day, today, month,
+        conn.execute("SELECT key, cases FROM case_stats WHERE kind = 'status' AND cases <> 0"),
+        conn.execute("SELECT key, cases, revenue FROM case_stats WHERE kind = 'lawyer' AND cases <> 0"),
+        case_stats_ready(conn)
+    )
+
+
+def _stats_response(day, today, month, status_rows, lawyer_rows, complete):
+    return {
+        "status": dict(status_rows),
+        "today": {"date": day, **_totals(*(today or (0, 0)))},
+        "month": {"month": day[:7], **_totals(*month)},
+        "lawyers": {key: _totals(cases, revenue) for key, cases, revenue in lawyer_rows},
+        "complete": complete,
+    }
@@ -0,0 +1,431 @@
+import json
+import threading
+import time
+
+CASE_ID_PREFIX = "JM-"
+# Bisheriges Schema: JM-1001 für den ersten Fall
+CASE_ID_OFFSET = 1000
+
+
+def case_identifier_for(row_id):
+    return f"{CASE_ID_PREFIX}{row_id + CASE_ID_OFFSET}"
+
+
+def insert_case(conn, timestamp, user_data, case_data, booking_data, status="Neu"):
+    """
+    Legt einen Fall an und vergibt das Aktenzeichen aus der AUTOINCREMENT-rowid.
+    INSERT und UPDATE laufen in derselben Schreibtransaktion; SQLite serialisiert
+    Schreiber prozessübergreifend, rowids werden nie wiederverwendet. Damit ist die
+    Vergabe auch über mehrere Worker eindeutig und braucht keinen COUNT(*)-Scan.
+    Der Aufrufer committet (z.B. über "with sqlite3.connect(...) as conn").
+    """
+    cursor = conn.execute('''
+        INSERT INTO cases (timestamp, user_data, case_data, booking_data, status)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (timestamp, user_data, case_data, booking_data, status))
+    case_identifier = case_identifier_for(cursor.lastrowid)
+    conn.execute("UPDATE cases SET case_identifier = ? WHERE id = ?", (case_identifier, cursor.lastrowid))
+    return case_identifier
+
+
+def reserve_case_ids(conn, count):
+    """
+    Reserviert count rowids für spätere Einfügungen mit fester id (Write-Behind).
+    Der AUTOINCREMENT-Zähler wird vorgerückt, damit auch direkte Buchungen anderer
+    Worker diese ids nie bekommen. Gibt die erste reservierte id zurück.
+    """
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'cases'").fetchone()
+    if row is None:
+        first = conn.execute("SELECT COALESCE(MAX(id), 0) FROM cases").fetchone()[0] + 1
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('cases', ?)", (first + count - 1,))
+    else:
+        first = row[0] + 1
+        conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'cases'", (first + count - 1,))
+    return first
+
+
+def insert_reserved_cases(conn, rows):
+    """
+    Fügt Fälle mit vorab reservierter id ein: rows = [(id, timestamp, user_data,
+    case_data, booking_data, status)]. Bereits vorhandene ids werden übersprungen,
+    eine Wiederholung (Recovery) ist damit unschädlich.
+    """
+    conn.executemany('''
+        INSERT OR IGNORE INTO cases (id, case_identifier, timestamp, user_data, case_data, booking_data, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', ((row_id, case_identifier_for(row_id), *rest) for row_id, *rest in rows))
+
+
+# Abfragbare Felder aus den JSON-Spalten als echte Spalten: (Feld, Unterfeld) -> Spalte.
+# Trigger halten sie bei jedem Schreiben aktuell; Bestandsdaten füllt
+# backfill_case_fields() in Batches nach.
+PROMOTED_FIELDS = {
+    ("case", "topic"): ("topic", "TEXT", "case_data"),
+    ("booking", "lawyer"): ("lawyer", "TEXT", "booking_data"),
+    ("booking", "type"): ("booking_type", "TEXT", "booking_data"),
+    ("booking", "price"): ("booking_price", "", "booking_data"),    # ohne Affinität: Zahl bleibt Zahl
+    ("booking", "time"): ("booking_time", "TEXT", "booking_data"),
+    ("user", "name"): ("user_name", "TEXT", "user_data"),
+    ("user", "email"): ("user_email", "TEXT", "user_data"),
+}
+PROMOTED_MIGRATION = "promoted_fields"
+BACKFILL_BATCH_SIZE = 5000
+# Pause zwischen zwei Batches, damit Buchungen die Schreibsperre bekommen
+BACKFILL_PAUSE = 0.01
+
+
+def _promoted_assignments(prefix=""):
+    return ", ".join(
+        f"{column} = json_extract({prefix}{source}, '$.{sub}')"
+        for (_, sub), (column, _, source) in PROMOTED_FIELDS.items()
+    )
+
+
+# Indizes für Filter + stabile Sortierung nach id
+CASE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_cases_status_id ON cases (status, id)",
+    "CREATE INDEX IF NOT EXISTS idx_cases_timestamp_id ON cases (timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS idx_cases_change_version ON cases (change_version)",
+)
+# Indizes auf den Feldspalten; bei Bestandsdaten erst nach dem Backfill angelegt
+PROMOTED_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_cases_topic ON cases (topic, id)",
+    "CREATE INDEX IF NOT EXISTS idx_cases_lawyer ON cases (lawyer, id)",
+    "CREATE INDEX IF NOT EXISTS idx_cases_user_email ON cases (user_email, id)",
+    "CREATE INDEX IF NOT EXISTS idx_cases_booking_time ON cases (booking_time, id)",
+)
+# JSON1-Ausdrucksindizes aus der Zeit vor den Spalten; dienen nur noch während des
+# Backfills und werden danach entfernt
+LEGACY_JSON_INDEXES = ("idx_cases_topic_id", "idx_cases_lawyer_id")
+
+PROMOTED_FIELDS_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS case_migrations (
+        name TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL DEFAULT 0,
+        target_id INTEGER NOT NULL DEFAULT 0,
+        done INTEGER NOT NULL DEFAULT 0
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS cases_fields_insert AFTER INSERT ON cases BEGIN
+        UPDATE cases SET {_promoted_assignments("NEW.")} WHERE id = NEW.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS cases_fields_update
+    AFTER UPDATE OF user_data, case_data, booking_data ON cases BEGIN
+        UPDATE cases SET {_promoted_assignments("NEW.")} WHERE id = NEW.id;
+    END""",
+)
+
+# Änderungsfeed: jede eingefügte oder geänderte Zeile bekommt die nächste Version
+# aus einem einzeiligen Zähler. Die Trigger laufen in der Schreibtransaktion, und
+# SQLite hat nur einen Schreiber - Versionen werden also in Commit-Reihenfolge sichtbar.
+CHANGE_FEED_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS case_change_seq (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )""",
+    "INSERT OR IGNORE INTO case_change_seq (id, version) "
+    "SELECT 1, COALESCE(MAX(change_version), 0) FROM cases",
+    """CREATE TRIGGER IF NOT EXISTS cases_change_insert AFTER INSERT ON cases BEGIN
+        UPDATE case_change_seq SET version = version + 1;
+        UPDATE cases SET change_version = (SELECT version FROM case_change_seq) WHERE id = NEW.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS cases_change_update
+    AFTER UPDATE OF case_identifier, timestamp, user_data, case_data, booking_data, status ON cases BEGIN
+        UPDATE case_change_seq SET version = version + 1;
+        UPDATE cases SET change_version = (SELECT version FROM case_change_seq) WHERE id = NEW.id;
+    END""",
+)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Alias der angehängten Archiv-Datenbank (siehe case_archive)
+ARCHIVE_ALIAS = "archive"
+
+# Öffentlicher Feldname -> Spalte; JSON-Spalten erlauben Unterfelder ("case.topic")
+SCALAR_FIELDS = {"id": "case_identifier", "timestamp": "timestamp", "status": "status", "version": "change_version"}
+JSON_FIELDS = {"user": "user_data", "case": "case_data", "booking": "booking_data"}
+ALL_FIELDS = ("id", "timestamp", "user", "case", "booking", "status")
+# Listenansicht im Dashboard: ohne Analyse- und Empfehlungstexte
+LIST_FIELDS = ("id", "timestamp", "status", "user.name", "case.topic",
+               "booking.lawyer", "booking.type", "booking.price", "booking.time")
+
+
+def ensure_case_schema(conn):
+    """
+    Ergänzt change_version (Bestand: Version = id), Änderungsfeed, die Feldspalten
+    und Indizes. Neue Feldspalten sind sofort da; bestehende Zeilen werden danach
+    von backfill_case_fields() gefüllt, bis dahin lesen Abfragen weiter aus dem JSON.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(cases)")}
+    if "change_version" not in columns:
+        conn.execute("ALTER TABLE cases ADD COLUMN change_version INTEGER")
+        conn.execute("UPDATE cases SET change_version = id")
+    for column, column_type, _ in PROMOTED_FIELDS.values():
+        if column not in columns:
+            conn.execute(f"ALTER TABLE cases ADD COLUMN {column} {column_type}")
+    for statement in CHANGE_FEED_SCHEMA + PROMOTED_FIELDS_SCHEMA + CASE_INDEXES:
+        conn.execute(statement)
+    register_migration(conn, PROMOTED_MIGRATION)
+    if case_fields_ready(conn):
+        for statement in PROMOTED_INDEXES:
+            conn.execute(statement)
+
+
+def register_migration(conn, name):
+    """
+    Legt den Fortschritt einer Bestandsdaten-Migration an. Erst nach den Triggern
+    aufrufen: alle späteren Zeilen übernimmt der Trigger, nachzuarbeiten sind nur
+    Zeilen bis zur heutigen höchsten id. Leere Tabelle: nichts zu tun.
+    """
+    target_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM cases").fetchone()[0]
+    conn.execute(
+        "INSERT OR IGNORE INTO case_migrations (name, target_id, done) VALUES (?, ?, ?)",
+        (name, target_id, 0 if target_id else 1)
+    )
+
+
+def migration_done(conn, name):
+    row = conn.execute("SELECT done FROM case_migrations WHERE name = ?", (name,)).fetchone()
+    return bool(row and row[0])
+
+
+def case_fields_ready(conn):
+    """True, sobald alle Zeilen ihre Feldspalten haben (Backfill abgeschlossen)."""
+    return migration_done(conn, PROMOTED_MIGRATION)
+
+
+def run_batched_migration(pool, name, statement, batch_size=BACKFILL_BATCH_SIZE, pause=BACKFILL_PAUSE):
+    """
+    Führt statement (Parameter: untere id exklusiv, obere id inklusiv) in id-Batches
+    bis zur target_id der Migration name aus. Jede Batch ist eine eigene
+    Schreibtransaktion, damit Buchungen dazwischen durchkommen; der Fortschritt liegt
+    in case_migrations, ein abgebrochener Lauf setzt dort wieder auf. Setzt done
+    nicht - das macht der Aufrufer nach eventuellen Abschlussarbeiten. Gibt die Zahl
+    der Batches zurück, None wenn die Migration schon abgeschlossen ist.
+    """
+    batches = 0
+    while True:
+        with pool.write() as conn:
+            state = conn.execute(
+                "SELECT last_id, target_id, done FROM case_migrations WHERE name = ?", (name,)
+            ).fetchone()
+            if state is None or state[2]:
+                return None
+            last_id, target_id, _ = state
+            if last_id >= target_id:
+                return batches
+            upper = min(last_id + batch_size, target_id)
+            conn.execute(statement, (last_id, upper))
+            conn.execute("UPDATE case_migrations SET last_id = ? WHERE name = ?", (upper, name))
+        batches += 1
+        time.sleep(pause)
+
+
+def backfill_case_fields(pool, batch_size=BACKFILL_BATCH_SIZE, pause=BACKFILL_PAUSE):
+    """
+    Füllt die Feldspalten bestehender Zeilen in id-Batches nach und legt danach die
+    Indizes an, jeden in einer eigenen Schreibtransaktion. Gibt die Zahl der
+    Batches zurück.
+    """
+    batches = run_batched_migration(
+        pool, PROMOTED_MIGRATION, f"UPDATE cases SET {_promoted_assignments()} WHERE id > ? AND id <= ?",
+        batch_size, pause
+    )
+    if batches is None:
+        return 0
+
+    for statement in PROMOTED_INDEXES:
+        with pool.write() as conn:
+            conn.execute(statement)
+        time.sleep(pause)
+    with pool.write() as conn:
+        conn.execute("UPDATE case_migrations SET done = 1 WHERE name = ?", (PROMOTED_MIGRATION,))
+        for index in LEGACY_JSON_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
+    return batches
+
+
+def start_case_fields_backfill(pool):
+    """Startet den Backfill im Hintergrund, falls noch Zeilen offen sind."""
+    with pool.connection() as conn:
+        if case_fields_ready(conn):
+            return None
+    thread = threading.Thread(target=backfill_case_fields, args=(pool,), name="case-fields-backfill", daemon=True)
+    thread.start()
+    return thread
+
+
+def _field_expression(name, sub, fields_ready):
+    promoted = PROMOTED_FIELDS.get((name, sub))
+    if promoted and fields_ready:
+        return promoted[0]
+    return f"json_extract({JSON_FIELDS[name]}, '$.{sub}')"
+
+
+def _projection(fields, fields_ready=False):
+    """
+    Übersetzt Feldnamen in [(SELECT-Ausdruck, Feld, Unterfeld)]. Unterfelder mit
+    eigener Spalte werden direkt gelesen, ohne JSON zu parsen.
+    """
+    spec = []
+    for field in fields:
+        name, _, sub = field.partition(".")
+        if name in SCALAR_FIELDS and not sub:
+            spec.append((SCALAR_FIELDS[name], name, None))
+        elif name in JSON_FIELDS and not sub:
+            spec.append((JSON_FIELDS[name], name, None))
+        elif name in JSON_FIELDS and sub.isidentifier():
+            spec.append((_field_expression(name, sub, fields_ready), name, sub))
+        else:
+            raise ValueError(f"Unbekanntes Feld: {field}")
+    return spec
+
+
+def _to_case(spec, values):
+    case = {}
+    for (_, name, sub), value in zip(spec, values):
+        if sub:
+            case.setdefault(name, {})[sub] = value
+        elif name in JSON_FIELDS:
+            case[name] = json.loads(value) if value else {}
+        else:
+            case[name] = value
+    return case
+
+
+def has_archive(conn):
+    """True, wenn auf dieser Verbindung die Archiv-Datenbank angehängt ist."""
+    return any(row[1] == ARCHIVE_ALIAS for row in conn.execute("PRAGMA database_list"))
+
+
+def list_cases(conn, status=None, topic=None, lawyer=None, email=None, booking_time=None,
+               date_from=None, date_to=None, cursor=None, limit=DEFAULT_PAGE_SIZE, fields=ALL_FIELDS,
+               include_archive=False):
+    """
+    Keyset-Paginierung über cases, neueste zuerst (id absteigend, damit stabil).
+    cursor ist die id des letzten Falls der vorherigen Seite; date_to und
+    booking_time schließen alle Werte mit diesem Präfix ein (z.B. "2026-01-31"
+    den ganzen Tag). Gibt (Fälle, next_cursor) zurück; next_cursor ist None auf
+    der letzten Seite. Archivierte Fälle nur mit include_archive (und angehängtem Archiv).
+    """
+    fields_ready = case_fields_ready(conn)
+    spec = _projection(fields, fields_ready)
+    where, params = [], []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    for (name, sub), value in ((("case", "topic"), topic), (("booking", "lawyer"), lawyer),
+                               (("user", "email"), email)):
+        if value:
+            where.append(f"{_field_expression(name, sub, fields_ready)} = ?")
+            params.append(value)
+    if booking_time:
+        column = _field_expression("booking", "time", fields_ready)
+        where.append(f"{column} >= ? AND {column} < ?")
+        params.extend((booking_time, booking_time + "\uffff"))
+    if date_from:
+        where.append("timestamp >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("timestamp < ?")
+        params.append(date_to + "\uffff")
+    if cursor is not None:
+        where.append("id < ?")
+        params.append(int(cursor))
+    limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
+    select = f"SELECT id, {', '.join(column for column, _, _ in spec)} FROM "
+    sql = select + "main.cases"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if include_archive and has_archive(conn):
+        # Fälle, die gerade verschoben werden, können kurz in beiden Tabellen liegen
+        archive_where = where + [f"NOT EXISTS (SELECT 1 FROM main.cases m WHERE m.id = {ARCHIVE_ALIAS}.cases.id)"]
+        sql += f" UNION ALL {select}{ARCHIVE_ALIAS}.cases WHERE " + " AND ".join(archive_where)
+        params = params * 2
+    sql += " ORDER BY id DESC LIMIT ?"
+    rows = conn.execute(sql, (*params, limit + 1)).fetchall()
+
+    cases = [_to_case(spec, row[1:]) for row in rows[:limit]]
+    next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+    return cases, next_cursor
+
+
+def get_case(conn, case_identifier, include_archive=False):
+    """Vollständiger Fall (inkl. Analyse) für die Detailansicht, oder None."""
+    spec = _projection(ALL_FIELDS)
+    tables = ["main"]
+    if include_archive and has_archive(conn):
+        tables.append(ARCHIVE_ALIAS)
+    for schema in tables:
+        row = conn.execute(
+            f"SELECT {', '.join(column for column, _, _ in spec)} FROM {schema}.cases WHERE case_identifier = ?",
+            (case_identifier,)
+        ).fetchone()
+        if row:
+            return _to_case(spec, row)
+    return None
+
+
+def case_query_from_args(args):
+    """
+    Liest Filter, Cursor, Seitengröße und Feldliste aus Query-Parametern
+    (status, topic, lawyer, email, booking_time, from, to, cursor, limit,
+    fields=a,b.c, archive=1).
+    Ungültige Werte lösen ValueError aus.
+    """
+    query = {
+        "status": args.get("status"),
+        "topic": args.get("topic"),
+        "lawyer": args.get("lawyer"),
+        "email": args.get("email"),
+        "booking_time": args.get("booking_time"),
+        "date_from": args.get("from"),
+        "date_to": args.get("to"),
+        "limit": int(args.get("limit", DEFAULT_PAGE_SIZE)),
+        "include_archive": args.get("archive") == "1",
+    }
+    if args.get("cursor"):
+        query["cursor"] = int(args["cursor"])
+    if args.get("fields"):
+        query["fields"] = _fields_from_arg(args["fields"])
+    return query
+
+
+def _fields_from_arg(value):
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    _projection(fields)
+    return fields
+
+
+def current_version(conn):
+    return conn.execute("SELECT version FROM case_change_seq").fetchone()[0]
+
+
+def list_changes(conn, since=0, limit=MAX_PAGE_SIZE, fields=ALL_FIELDS):
+    """
+    Seit Version since eingefügte oder geänderte Fälle, älteste Änderung zuerst.
+    Gibt (Fälle, Version, more) zurück; mit der Version wird weiter abgefragt,
+    more ist True, solange weitere Änderungen anstehen. Ohne Änderungen kostet
+    der Aufruf nur das Lesen der Zählerzeile.
+    """
+    version = current_version(conn)
+    if since >= version:
+        return [], version, False
+    spec = _projection(fields, case_fields_ready(conn))
+    limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
+    rows = conn.execute(
+        f"SELECT change_version, {', '.join(column for column, _, _ in spec)} FROM cases "
+        "WHERE change_version > ? ORDER BY change_version LIMIT ?", (since, limit + 1)
+    ).fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if more:
+        version = rows[-1][0]
+    return [_to_case(spec, row[1:]) for row in rows], version, more
+
+
+def change_query_from_args(args):
+    """Liest since, limit und fields für list_changes; ungültige Werte: ValueError."""
+    query = {"since": int(args.get("since", 0)), "limit": int(args.get("limit", MAX_PAGE_SIZE))}
+    if args.get("fields"):
+        query["fields"] = _fields_from_arg(args["fields"])
+    return query
@@ -0,0 +1,159 @@
+import re
+from array import array
+
+# Aktenzeichen: optionales Gericht, Senat/Kammer, Registerzeichen, laufende Nummer/Jahr
+# z.B. "BGH VIII ZR 185/14", "LG Berlin 63 S 112/10", "13 U 182/06"
+AKTENZEICHEN_PATTERN = re.compile(
+    r"(?:\b(?P<gericht>BGH|BVerfG|BVerwG|KG|OLG|LG|AG)(?:\s+(?P<ort>[A-ZÄÖÜ][a-zäöüß]+(?:-[A-ZÄÖÜ][a-zäöüß]+)?))?\s+)?"
+    r"\b(?P<spruchkoerper>[IVX]+|\d{1,3})\s+(?P<register>[A-Z][A-Za-z]{0,3})\s+(?P<nummer>\d{1,5})/(?P<jahr>\d{2,4})\b"
+)
+
+GESETZE = ("BGB", "EGBGB", "BetrKV", "HeizkostenV", "WoFlV", "ZPO", "StGB", "GG", "WEG", "GEG", "BauGB")
+# Normzitat: "§ 556 Abs. 3 BGB", "§§ 573, 573c BGB", "§§ 305 ff. BGB"; ohne Gesetz gilt BGB
+NORM_PATTERN = re.compile(
+    r"(?P<zeichen>§§?)\s*(?P<liste>\d+[a-z]?(?:(?:\s*(?:Abs\.|S\.|Satz|Nr\.)\s*\d+[a-z]?)|\s*ff?\.|\s*(?:,|und|bis|-|–)\s*\d+[a-z]?)*)"
+    r"(?:\s+(?:i\.\s?V\.\s?m\.\s+)?(?P<gesetz>" + "|".join(GESETZE) + r")\b)?"
+)
+NORM_UNTERGLIEDERUNG = re.compile(r"(?:Abs\.|S\.|Satz|Nr\.)\s*\d+[a-z]?")
+NORM_NUMMER = re.compile(r"\d+[a-z]?")
+DEFAULT_GESETZ = "BGB"
+
+AKTENZEICHEN = "aktenzeichen"
+NORM = "norm"
+
+
+def extract_citations(text):
+    """Liefert alle Zitate eines Textes als [(Schlüssel, Art, Anzeigetext)] in Textreihenfolge."""
+    found = []
+    for match in AKTENZEICHEN_PATTERN.finditer(text):
+        key = "{} {} {}/{}".format(*match.group("spruchkoerper", "register", "nummer", "jahr"))
+        gericht = " ".join(p for p in match.group("gericht", "ort") if p)
+        found.append((match.start(), key, AKTENZEICHEN, f"{gericht} {key}" if gericht else key))
+    for match in NORM_PATTERN.finditer(text):
+        gesetz = match.group("gesetz") or DEFAULT_GESETZ
+        liste = NORM_UNTERGLIEDERUNG.sub(" ", match.group("liste"))
+        for nummer in NORM_NUMMER.findall(liste):
+            key = f"§ {nummer} {gesetz}"
+            found.append((match.start(), key, NORM, key))
+    found.sort(key=lambda item: item[0])
+    return [(key, kind, label) for _, key, kind, label in found]
+
+
+def parse_citation(ref):
+    """Normalisiert eine einzelne Zitatangabe ("VIII ZR 185/14", "§ 536") oder None."""
+    citations = extract_citations(ref)
+    return citations[0] if citations else None
+
+
+def _csr(rows):
+    """Kompakte Adjazenz: Offsets und Ziele als int-Arrays (Zeile i = targets[offsets[i]:offsets[i+1]])."""
+    offsets = array("i", [0])
+    targets = array("i")
+    for row in rows:
+        targets.extend(row)
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+class CitationGraph:
+    """
+    Querverweisgraph zwischen Themen, Aktenzeichen und Normen der Wissensdatenbank.
+    Wird einmal je Wissensstand gebaut; Abfragen sind ein Dict-Lookup plus ein
+    Array-Ausschnitt der Länge k.
+    """
+
+    def __init__(self, wissen):
+        self.topics = list(wissen.keys())
+        self._topic_ids = {topic: i for i, topic in enumerate(self.topics)}
+        self._ids = {}          # Schlüssel -> Knoten-ID
+        self.keys = []
+        self.kinds = []
+        self.labels = []
+
+        topic_rows = []
+        for topic in self.topics:
+            text = " ".join(_field_text(value) for value in wissen[topic].values())
+            row = []
+            for key, kind, label in extract_citations(text):
+                node = self._ids.get(key)
+                if node is None:
+                    node = self._ids[key] = len(self.keys)
+                    self.keys.append(key)
+                    self.kinds.append(kind)
+                    self.labels.append(label)
+                elif kind == AKTENZEICHEN and len(label) > len(self.labels[node]):
+                    # Vollständigste Schreibweise (mit Gericht) anzeigen
+                    self.labels[node] = label
+                if node not in row:
+                    row.append(node)
+            topic_rows.append(row)
+
+        cited_by = [[] for _ in self.keys]
+        for topic_id, row in enumerate(topic_rows):
+            for node in row:
+                cited_by[node].append(topic_id)
+
+        # Verwandt = im selben Thema zitiert, nur Knoten der jeweils anderen Art,
+        # absteigend nach Anzahl gemeinsamer Themen
+        related = []
+        for node, topic_ids in enumerate(cited_by):
+            counts = {}
+            for topic_id in topic_ids:
+                for other in topic_rows[topic_id]:
+                    if self.kinds[other] != self.kinds[node]:
+                        counts[other] = counts.get(other, 0) + 1
+            related.append(sorted(counts, key=lambda other: (-counts[other], other)))
+
+        self._topic_offsets, self._topic_targets = _csr(topic_rows)
+        self._cited_offsets, self._cited_targets = _csr(cited_by)
+        self._related_offsets, self._related_targets = _csr(related)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _slice(self, offsets, targets, node):
+        return targets[offsets[node]:offsets[node + 1]]
+
+    def lookup(self, ref):
+        """Themen und verwandte Zitate zu einer Zitatangabe; None wenn unbekannt oder nicht parsebar."""
+        parsed = parse_citation(ref)
+        if parsed is None:
+            return None
+        node = self._ids.get(parsed[0])
+        if node is None:
+            return None
+        related = [self.labels[n] for n in self._slice(self._related_offsets, self._related_targets, node)]
+        return {
+            "citation": self.labels[node],
+            "kind": self.kinds[node],
+            "topics": [self.topics[t] for t in self._slice(self._cited_offsets, self._cited_targets, node)],
+            ("norms" if self.kinds[node] == AKTENZEICHEN else "decisions"): related
+        }
+
+    def citations_of(self, topic):
+        topic_id = self._topic_ids[topic]
+        return [self.labels[n] for n in self._slice(self._topic_offsets, self._topic_targets, topic_id)]
+
+    def validate(self, text):
+        """Prüft die Zitate eines (KI-)Textes gegen die Wissensdatenbank."""
+        results = []
+        seen = set()
+        for key, kind, label in extract_citations(text):
+            if key in seen:
+                continue
+            seen.add(key)
+            node = self._ids.get(key)
+            results.append({
+                "citation": label if node is None else self.labels[node],
+                "kind": kind,
+                "known": node is not None,
+                "topics": [] if node is None else
+                [self.topics[t] for t in self._slice(self._cited_offsets, self._cited_targets, node)]
+            })
+        return results
+
+
+def _field_text(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value)
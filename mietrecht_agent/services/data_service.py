@@ -1,151 +1,132 @@
-import sqlite3
 import json
 from werkzeug.security import generate_password_hash, check_password_hash
-
-MIETRECHT_WISSEN = {
-    "Kündigung": {
-        "KI-Einschätzung": "Der Kündigungsschutz im deutschen Mietrecht ist sehr stark. Eine Kündigung durch den Vermieter ist nur unter strengen Voraussetzungen möglich (z.B. Eigenbedarf oder erhebliche Pflichtverletzung).",
-        "Professionelle Analyse": "Prüfung gemäß §§ 573, 573c BGB. Bei Eigenbedarf müssen die Gründe im Kündigungsschreiben detailliert dargelegt werden. Eine Sozialklausel nach § 574 BGB kann die Kündigung verzögern oder verhindern.",
-        "Gerichtsurteile": "BGH VIII ZR 167/17 (Anforderungen an Eigenbedarfskündigung); BGH VIII ZR 107/13 (Zahlungsverzug als Kündigungsgrund).",
-        "Empfehlung": "Kündigungsschreiben auf Formfehler prüfen. Fristgerecht Widerspruch einlegen.",
-        "Risiko": "Hoch",
-        "Thema": "Kündigungsschutz"
-    },
-    "Mietminderung": {
-        "KI-Einschätzung": "Bei erheblichen Mängeln der Mietsache (z.B. Schimmel, Heizungsausfall) haben Sie das Recht, die Miete angemessen zu mindern.",
-        "Professionelle Analyse": "Rechtsgrundlage ist § 536 BGB. Die Minderung tritt kraft Gesetzes ein, sobald ein Mangel vorliegt, der die Tauglichkeit zum vertragsgemäßen Gebrauch mindert. Eine Mängelanzeige nach § 536c BGB ist zwingend.",
-        "Gerichtsurteile": "BGH VIII ZR 224/97 (Heizungsausfall im Winter); BGH VIII ZR 181/07 (Lärmbelästigung durch Nachbarn).",
-        "Empfehlung": "Mangel schriftlich anzeigen, Frist zur Behebung setzen, Miete unter Vorbehalt zahlen.",
-        "Risiko": "Mittel",
-        "Thema": "Mietminderung"
-    },
-    "Nebenkosten": {
-        "KI-Einschätzung": "Nebenkostenabrechnungen sind oft fehlerhaft. Vermieter dürfen nur die mietvertraglich vereinbarten und tatsächlich angefallenen Kosten umlegen.",
-        "Professionelle Analyse": "Gemäß § 556 BGB und der Betriebskostenverordnung (BetrKV). Die Abrechnung muss formell ordnungsgemäß sein und spätestens 12 Monate nach dem Abrechnungszeitraum vorliegen.",
-        "Gerichtsurteile": "BGH VIII ZR 1/06 (Grundsatz der Wirtschaftlichkeit); BGH VIII ZR 133/08 (Anforderungen an die Erläuterung der Umlageschlüssel).",
-        "Empfehlung": "Einsicht in die Belege fordern. Abrechnung auf unzulässige Positionen (z.B. Verwaltungskosten) prüfen.",
-        "Risiko": "Gering",
-        "Thema": "Betriebskosten"
-    }
-}
+from .knowledge_base import KnowledgeBase, DEFAULT_WISSEN_PATH
+from .booking_queue import BookingQueue
+from .case_archive import ARCHIVE_AFTER_DAYS
+from .storage import SQLiteStorage
+from .read_cache import ReadCache, cache_key
+from .blob_store import document_refs
+from .db_maintenance import BACKUP_KEEP
+from .case_stats import today_utc
 
 class DataService:
-    def __init__(self, db_path):
+    def __init__(self, db_path, wissen_path=DEFAULT_WISSEN_PATH, case_events=None, booking_queue_dir=None,
+                 archive_path=None, archive_after_days=ARCHIVE_AFTER_DAYS, storage=None, blob_store=None,
+                 backup_dir=None, backup_keep=BACKUP_KEEP):
         self.db_path = db_path
-        self._init_db()
+        # Fälle und Benutzer; ohne Angabe die SQLite-Datei db_path (siehe storage_from_config)
+        self.storage = storage or SQLiteStorage(db_path)
+        # CaseEventBroker; wird nach jeder Änderung an Fällen benachrichtigt
+        self.case_events = case_events
+        # Fallseiten und Dashboard-Zahlen je Worker, ungültig mit jeder neuen Feed-Version
+        self.read_cache = ReadCache(self.storage.current_version)
+        # Hochgeladene Dokumente (LocalBlobStore/S3BlobStore); Fälle speichern nur den Hash
+        self.blob_store = blob_store
+        self.knowledge_base = KnowledgeBase(wissen_path)
         self._seed_admin()
-
-    def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cases (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_identifier TEXT UNIQUE,
-                    timestamp TEXT,
-                    user_data TEXT,
-                    case_data TEXT,
-                    booking_data TEXT,
-                    status TEXT
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    email TEXT UNIQUE,
-                    password_hash TEXT,
-                    role TEXT
-                )
-            ''')
-            conn.commit()
+        # Backfills, Zähler-Abgleich, Datenbankwartung (ggf. mit Backups) und ggf.
+        # Hot/Cold-Archivierung alter abgeschlossener Fälle
+        self.storage.start(archive_path, archive_after_days, backup_dir, backup_keep)
+        # Write-Behind für Buchungen, nur wenn ein Journal-Verzeichnis konfiguriert ist
+        self.booking_queue = None
+        if booking_queue_dir:
+            self.booking_queue = BookingQueue(self.storage, booking_queue_dir, on_flush=self._publish_change).start()
 
     def _seed_admin(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            # Seed only if empty
-            cursor.execute("SELECT COUNT(*) FROM users")
-            if cursor.fetchone()[0] == 0:
-                pwd_hash = generate_password_hash("jurismind2026")
-                cursor.execute("INSERT INTO users (email, password_hash, role) VALUES (?, ?, ?)",
-                               ("admin@jurismind.de", pwd_hash, "partner"))
-                conn.commit()
+        # Seed only if empty
+        if not self.storage.has_users():
+            self.storage.add_user("admin@jurismind.de", generate_password_hash("jurismind2026"), "partner")
 
     def verify_user(self, email, password):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-            user = cursor.fetchone()
-            if user and check_password_hash(user['password_hash'], password):
-                return {"id": user['id'], "email": user['email'], "role": user['role']}
+        user = self.storage.get_user(email)
+        if user and check_password_hash(user['password_hash'], password):
+            return {"id": user['id'], "email": user['email'], "role": user['role']}
         return None
 
     def get_topics(self):
-        return list(MIETRECHT_WISSEN.keys())
+        return list(self.knowledge_base.snapshot.wissen.keys())
 
     def get_topic_data(self, topic_name):
-        for key in MIETRECHT_WISSEN:
+        wissen = self.knowledge_base.snapshot.wissen
+        for key in wissen:
             if key.lower() == topic_name.lower():
-                return MIETRECHT_WISSEN[key]
+                return wissen[key]
         return None
 
+    def search_topics(self, query, limit=10):
+        return self.knowledge_base.snapshot.search_index.search(query, limit)
+
     def save_booking(self, data):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM cases")
-            count = cursor.fetchone()[0]
-            case_id = f"JM-{count + 1001}"
-            
-            user_data = json.dumps({
-                "name": data.get("userName"),
-                "email": data.get("userEmail"),
-                "phone": data.get("userPhone"),
-                "address": data.get("userAddress")
-            })
-            
-            case_data = json.dumps({
-                "topic": data.get("topic"),
-                "analysis": data.get("analysis"),
-                "risk": data.get("risk"),
-                "recommendation": data.get("recommendation")
-            })
-            
-            booking_data = json.dumps({
-                "lawyer": data.get("lawyer"),
-                "type": data.get("consultationType"),
-                "price": data.get("price"),
-                "time": data.get("bookingTime")
-            })
-            
-            cursor.execute('''
-                INSERT INTO cases (case_identifier, timestamp, user_data, case_data, booking_data, status)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (case_id, data.get("timestamp"), user_data, case_data, booking_data, "Neu"))
-            conn.commit()
-            return case_id
+        user_data = json.dumps({
+            "name": data.get("userName"),
+            "email": data.get("userEmail"),
+            "phone": data.get("userPhone"),
+            "address": data.get("userAddress")
+        })
+        
+        case_data = json.dumps({
+            "topic": data.get("topic"),
+            "analysis": data.get("analysis"),
+            "risk": data.get("risk"),
+            "recommendation": data.get("recommendation"),
+            "documents": document_refs(data.get("documents"), self.blob_store)
+        })
+        
+        booking_data = json.dumps({
+            "lawyer": data.get("lawyer"),
+            "type": data.get("consultationType"),
+            "price": data.get("price"),
+            "time": data.get("bookingTime")
+        })
+        
+        if self.booking_queue is not None:
+            return self.booking_queue.submit(data.get("timestamp"), user_data, case_data, booking_data)
+
+        case_id, version = self.storage.insert_case(data.get("timestamp"), user_data, case_data, booking_data)
+        self._publish_change(version)
+        return case_id
 
     def update_case_status(self, case_id, status):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE cases SET status = ? WHERE case_identifier = ?
-            ''', (status, case_id))
-            conn.commit()
-
-    def get_all_cases(self):
-        cases = []
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM cases ORDER BY id DESC")
-            rows = cursor.fetchall()
-            for row in rows:
-                cases.append({
-                    "id": row["case_identifier"],
-                    "timestamp": row["timestamp"],
-                    "user": json.loads(row["user_data"]),
-                    "case": json.loads(row["case_data"]),
-                    "booking": json.loads(row["booking_data"]),
-                    "status": row["status"]
-                })
-        return cases
+        if self.booking_queue is not None:
+            # Die Buchung könnte noch in der Warteschlange stehen
+            self.booking_queue.flush()
+        self._publish_change(self.storage.update_case_status(case_id, status))
+
+    def _publish_change(self, version):
+        self.read_cache.observe(version)
+        if self.case_events is not None:
+            self.case_events.publish(version)
+
+    def list_cases(self, **query):
+        """Seite von Fällen, siehe case_store.list_cases: (Fälle, next_cursor, Version). Aus dem read_cache."""
+        return self.read_cache.get(cache_key("cases", query), lambda: self.storage.list_cases(**query))
+
+    def search_cases(self, **query):
+        """Volltextsuche, siehe case_search.search_cases: (Treffer, next_offset, Index vollständig)."""
+        return self.storage.search_cases(**query)
+
+    def dashboard_stats(self, day=None):
+        """Kopfzahlen für das Dashboard aus den Zählern, siehe case_stats.dashboard_stats."""
+        day = day or today_utc()
+        return self.read_cache.get(cache_key("stats", {"day": day}), lambda: self.storage.dashboard_stats(day))
+
+    def export_cases(self, **query):
+        """Blöcke von Fällen für den Streaming-Export, siehe case_export.iter_case_chunks."""
+        if self.booking_queue is not None:
+            # Angenommene Buchungen gehören in den Export
+            self.booking_queue.flush()
+        return self.storage.export_cases(**query)
+
+    def case_version(self):
+        return self.storage.current_version()
+
+    def list_changes(self, **query):
+        """Änderungen seit einer Version, siehe case_store.list_changes."""
+        return self.storage.list_changes(**query)
+
+    def get_case(self, case_id, include_archive=False):
+        case = self.storage.get_case(case_id, include_archive)
+        if case is None and self.booking_queue is not None and self.booking_queue.flush():
+            # Gerade gebuchter Fall kann noch in der Warteschlange stehen
+            case = self.storage.get_case(case_id, include_archive)
+        return case
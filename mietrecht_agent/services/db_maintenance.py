@@ -0,0 +1,320 @@
+"""
+Wartung der SQLite-Datenbank im laufenden Betrieb: Online-Backup, Planer-Statistik
+(PRAGMA optimize), inkrementelles VACUUM und WAL-Checkpoints. Alle Aufgaben laufen
+in kurzen Transaktionen bzw. Lesetransaktionen und halten Buchungen nicht auf.
+
+start_db_maintenance() prüft im Hintergrund, welche Aufgabe fällig ist. Welcher
+Worker sie ausführt, entscheidet ein Eintrag in maintenance_runs (wer ihn zuerst
+fortschreibt) - mehrere Worker oder ein Neustart führen sie also nicht doppelt
+aus. Dauer und Ergebnis stehen dort ebenfalls und erscheinen über
+maintenance_stats() in /health. Von Hand: scripts/db_maintenance.py.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from .case_archive import ANALYSIS_LIMIT
+from .case_store import ARCHIVE_ALIAS
+
+logger = logging.getLogger(__name__)
+
+# Seiten je Schritt der Backup-API (bei 4 KiB also 4 MB) und Pause dazwischen
+BACKUP_PAGES = 1024
+BACKUP_PAUSE = 0.001
+BACKUP_KEEP = 7
+# Mindestabstand je Aufgabe in Sekunden
+TASK_INTERVALS = {
+    "checkpoint": 300,
+    "optimize": 3600,
+    "vacuum": 6 * 3600,
+    "backup": 24 * 3600,
+}
+MAINTENANCE_TICK = 60
+# Ab diesem Anteil freier Seiten wird inkrementell freigegeben
+VACUUM_FREE_RATIO = 0.1
+# Seiten je Schreibtransaktion beim inkrementellen VACUUM
+VACUUM_BATCH_PAGES = 1000
+VACUUM_PAUSE = 0.01
+# Datenbanken ohne auto_vacuum werden bis zu dieser Größe einmalig per VACUUM
+# umgestellt (sperrt kurz alle Schreiber); größere per scripts/db_maintenance.py vacuum --full
+AUTO_VACUUM_CONVERT_MAX_BYTES = 32 * 1024 * 1024
+_AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+MAINTENANCE_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS maintenance_runs (
+        task TEXT PRIMARY KEY,
+        claimed_at REAL NOT NULL DEFAULT 0,
+        finished_at REAL,
+        duration_ms REAL,
+        result TEXT
+    )""",
+)
+
+
+def ensure_maintenance_schema(conn):
+    """
+    Legt maintenance_runs an. Eine neue, leere Datenbank bekommt vorher
+    auto_vacuum=INCREMENTAL - das wirkt erst nach einem VACUUM, das bei einer
+    leeren Datei nichts kostet (WAL ist durch den Pool bereits aktiv).
+    """
+    empty = conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone() is None
+    if empty and conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    for statement in MAINTENANCE_SCHEMA:
+        conn.execute(statement)
+
+
+def _wal_path(db_path):
+    return db_path + "-wal"
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def database_sizes(pool):
+    """Datei- und WAL-Größe, Seitenzahl und freie Seiten der Hauptdatenbank."""
+    with pool.connection() as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    return {
+        "db_bytes": _file_size(pool.db_path),
+        "wal_bytes": _file_size(_wal_path(pool.db_path)),
+        "page_size": page_size,
+        "pages": pages,
+        "free_pages": free,
+        "auto_vacuum": _AUTO_VACUUM_MODES.get(mode, mode),
+    }
+
+
+def checkpoint_wal(pool):
+    """
+    PASSIVE-Checkpoint: überträgt, was ohne Warten geht, und blockiert weder Leser
+    noch Schreiber. Die WAL-Datei kürzt journal_size_limit (siehe sqlite_pool).
+    """
+    with pool.connection() as conn:
+        busy, wal_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+    return {"busy": bool(busy), "wal_pages": wal_pages, "checkpointed_pages": checkpointed,
+            "wal_bytes": _file_size(_wal_path(pool.db_path))}
+
+
+def optimize_database(pool):
+    """
+    Planer-Statistik aktualisieren: beim ersten Mal ANALYZE, danach PRAGMA optimize
+    (analysiert nur Tabellen, die sich deutlich verändert haben). analysis_limit
+    hält beides auch bei großen Tabellen kurz. Gilt für alle angehängten Datenbanken.
+    """
+    with pool.write() as conn:
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        first = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is None
+        conn.execute("ANALYZE" if first else "PRAGMA optimize")
+    return {"analyze": first}
+
+
+def incremental_vacuum(pool, free_ratio=VACUUM_FREE_RATIO, batch_pages=VACUUM_BATCH_PAGES, pause=VACUUM_PAUSE,
+                       convert_max_bytes=AUTO_VACUUM_CONVERT_MAX_BYTES):
+    """
+    Gibt freie Seiten ab free_ratio in Schritten von batch_pages an das Dateisystem
+    zurück, je Schritt eine kurze Schreibtransaktion. Braucht auto_vacuum=INCREMENTAL;
+    ältere Datenbanken bis convert_max_bytes werden dafür einmalig umgestellt.
+    """
+    sizes = database_sizes(pool)
+    result = {"free_pages": sizes["free_pages"], "freed_pages": 0, "auto_vacuum": sizes["auto_vacuum"]}
+    if not sizes["pages"] or sizes["free_pages"] / sizes["pages"] < free_ratio:
+        return result
+    if sizes["auto_vacuum"] != "incremental":
+        if sizes["db_bytes"] > convert_max_bytes:
+            logger.info("%s: %d freie Seiten, auto_vacuum fehlt - einmalig "
+                        "'scripts/db_maintenance.py vacuum --full' ausführen", pool.db_path, sizes["free_pages"])
+            return result
+        before = sizes["pages"]
+        full_vacuum(pool)
+        result.update(auto_vacuum="incremental", freed_pages=before - database_sizes(pool)["pages"])
+        return result
+    remaining = sizes["free_pages"]
+    while remaining:
+        with pool.write() as conn:
+            # executescript führt das PRAGMA bis zum Ende aus; execute() gibt nach der
+            # ersten Seite auf. Die offene Transaktion wird dabei zuvor abgeschlossen,
+            # die Schreibsperre des Pools bleibt gehalten.
+            conn.executescript(f"PRAGMA incremental_vacuum({batch_pages})")
+            left = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if left >= remaining:
+            break
+        result["freed_pages"] += remaining - left
+        remaining = left
+        time.sleep(pause)
+    return result
+
+
+def full_vacuum(pool):
+    """Schreibt die Datei neu und stellt auf auto_vacuum=INCREMENTAL um. Sperrt Schreiber für die Dauer."""
+    with pool.connection() as conn:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    return database_sizes(pool)
+
+
+def _backup_schema(pool, schema, path, pages, pause):
+    target = sqlite3.connect(path)
+    try:
+        with pool.connection() as conn:
+            # Lesetransaktion über alle Schritte: die Kopie sieht einen festen Snapshot,
+            # Schreiber laufen im WAL weiter. Ohne sie begänne die Backup-API nach jeder
+            # fremden Änderung von vorn und würde bei laufenden Buchungen nie fertig.
+            conn.execute("BEGIN")
+            conn.execute(f"SELECT 1 FROM {schema}.sqlite_master LIMIT 1").fetchall()
+            steps = [0]
+            conn.backup(target, pages=pages, name=schema, sleep=pause,
+                        progress=lambda status, remaining, total: steps.__setitem__(0, steps[0] + 1))
+            conn.rollback()
+        # Eigenständige Datei ohne -wal daneben
+        target.execute("PRAGMA journal_mode = DELETE")
+        check = target.execute("PRAGMA quick_check").fetchone()[0]
+        if check != "ok":
+            raise RuntimeError(f"Backup {path} fehlerhaft: {check}")
+        copied = target.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        target.close()
+    with open(path, "rb+") as f:
+        os.fsync(f.fileno())
+    return copied, steps[0]
+
+
+def backup_database(pool, backup_dir, keep=BACKUP_KEEP, pages=BACKUP_PAGES, pause=BACKUP_PAUSE, now=None):
+    """
+    Online-Backup über die sqlite3-Backup-API, blockweise (pages Seiten je Schritt)
+    aus einem konsistenten Snapshot; ein angehängtes Archiv wird mitgesichert.
+    Jede Datei wird geprüft (quick_check) und erst fertig unter ihrem Namen
+    abgelegt: backup_dir/<name>-<Zeitstempel>.db. Ältere Stände über keep hinaus
+    werden gelöscht.
+    """
+    stamp = (now or datetime.now()).strftime("%Y%m%dT%H%M%S")
+    stem = os.path.splitext(os.path.basename(pool.db_path))[0]
+    schemas = [("main", f"{stem}-{stamp}.db")]
+    if pool.attached(ARCHIVE_ALIAS):
+        schemas.append((ARCHIVE_ALIAS, f"{stem}-{stamp}.{ARCHIVE_ALIAS}.db"))
+    os.makedirs(backup_dir, exist_ok=True)
+    result = {"files": [], "bytes": 0, "pages": 0, "steps": 0}
+    for schema, name in schemas:
+        path = os.path.join(backup_dir, name)
+        tmp = path + ".tmp"
+        try:
+            copied, steps = _backup_schema(pool, schema, tmp, pages, pause)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        result["files"].append(name)
+        result["bytes"] += _file_size(path)
+        result["pages"] += copied
+        result["steps"] += steps
+    result["removed"] = _prune_backups(backup_dir, stem, keep)
+    return result
+
+
+def _prune_backups(backup_dir, stem, keep):
+    """Löscht Backups älterer Zeitstempel über die keep neuesten hinaus."""
+    prefix = stem + "-"
+    stamps = sorted({name[len(prefix):].split(".")[0] for name in os.listdir(backup_dir)
+                     if name.startswith(prefix) and name.endswith(".db")}, reverse=True)
+    removed = 0
+    for name in os.listdir(backup_dir):
+        if (name.startswith(prefix) and name.endswith(".db")
+                and name[len(prefix):].split(".")[0] in stamps[keep:]):
+            os.unlink(os.path.join(backup_dir, name))
+            removed += 1
+    return removed
+
+
+TASKS = {
+    "checkpoint": lambda pool, options: checkpoint_wal(pool),
+    "optimize": lambda pool, options: optimize_database(pool),
+    "vacuum": lambda pool, options: incremental_vacuum(pool),
+    "backup": lambda pool, options: backup_database(pool, options["backup_dir"],
+                                                    options.get("backup_keep", BACKUP_KEEP)),
+}
+
+
+def claim_task(pool, task, interval, now=None):
+    """True, wenn task fällig war und dieser Aufruf ihn übernommen hat."""
+    now = time.time() if now is None else now
+    with pool.write() as conn:
+        conn.execute("INSERT OR IGNORE INTO maintenance_runs (task) VALUES (?)", (task,))
+        return conn.execute(
+            "UPDATE maintenance_runs SET claimed_at = ? WHERE task = ? AND claimed_at <= ?",
+            (now, task, now - interval)
+        ).rowcount == 1
+
+
+def run_task(pool, task, **options):
+    """Führt task aus und schreibt Dauer und Ergebnis nach maintenance_runs."""
+    start = time.perf_counter()
+    try:
+        result = TASKS[task](pool, options)
+    except Exception as e:
+        result = {"error": str(e)}
+        raise
+    finally:
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        with pool.write() as conn:
+            conn.execute("INSERT OR IGNORE INTO maintenance_runs (task) VALUES (?)", (task,))
+            conn.execute("UPDATE maintenance_runs SET finished_at = ?, duration_ms = ?, result = ? WHERE task = ?",
+                         (time.time(), duration_ms, json.dumps(result), task))
+    if duration_ms > 1000:
+        logger.info("Wartung %s auf %s: %.0f ms %s", task, pool.db_path, duration_ms, result)
+    return result
+
+
+def run_due_tasks(pool, backup_dir=None, backup_keep=BACKUP_KEEP, intervals=TASK_INTERVALS, now=None):
+    """Führt alle fälligen Aufgaben aus; Backups nur mit backup_dir. Gibt {Aufgabe: Ergebnis} zurück."""
+    done = {}
+    for task, interval in intervals.items():
+        if task == "backup" and not backup_dir:
+            continue
+        if not claim_task(pool, task, interval, now):
+            continue
+        try:
+            done[task] = run_task(pool, task, backup_dir=backup_dir, backup_keep=backup_keep)
+        except Exception:
+            logger.exception("Wartung %s auf %s fehlgeschlagen", task, pool.db_path)
+    return done
+
+
+def maintenance_stats(pool):
+    """Größen der Datenbank und letzter Lauf je Aufgabe (Zeitpunkt, Dauer, Ergebnis) für /health."""
+    with pool.connection() as conn:
+        rows = conn.execute(
+            "SELECT task, finished_at, duration_ms, result FROM maintenance_runs WHERE finished_at IS NOT NULL"
+        ).fetchall()
+    tasks = {
+        task: {"at": datetime.fromtimestamp(finished_at).isoformat(timespec="seconds"),
+               "duration_ms": duration_ms, **json.loads(result or "{}")}
+        for task, finished_at, duration_ms, result in rows
+    }
+    return {**database_sizes(pool), "tasks": tasks}
+
+
+def start_db_maintenance(pool, backup_dir=None, backup_keep=BACKUP_KEEP, tick=MAINTENANCE_TICK):
+    """Prüft alle tick Sekunden (erstmals nach tick), welche Wartungsaufgabe fällig ist."""
+    def run():
+        while True:
+            time.sleep(tick)
+            try:
+                run_due_tasks(pool, backup_dir, backup_keep)
+            except Exception:
+                logger.exception("Datenbankwartung fehlgeschlagen")
+
+    thread = threading.Thread(target=run, name="db-maintenance", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,325 @@
+import calendar
+import threading
+from array import array
+from datetime import date, datetime, timedelta, timezone
+
+# Kürzel der Bundesländer (ISO 3166-2:DE ohne Präfix)
+BUNDESLAENDER = (
+    "BW", "BY", "BE", "BB", "HB", "HH", "HE", "MV",
+    "NI", "NW", "RP", "SL", "SN", "ST", "SH", "TH"
+)
+
+# Zeitraum, für den die Kalender vorberechnet werden
+CALENDAR_START = date(2000, 1, 1)
+CALENDAR_END = date(2060, 12, 31)
+
+FRISTEN = {
+    "kuendigung_mieter": {
+        "label": "Kündigungsfrist (Mieter)",
+        "norm": "§ 573c Abs. 1 BGB",
+        "ereignis": "Zugang der Kündigung"
+    },
+    "nebenkosten_abrechnung": {
+        "label": "Abrechnungsfrist Nebenkosten",
+        "norm": "§ 556 Abs. 3 S. 2 BGB",
+        "ereignis": "Ende des Abrechnungszeitraums"
+    },
+    "verjaehrung_rueckgabe": {
+        "label": "Verjährung Ersatzansprüche Vermieter",
+        "norm": "§ 548 Abs. 1 BGB",
+        "ereignis": "Rückgabe der Mietsache"
+    },
+    "zustimmung_mieterhoehung": {
+        "label": "Zustimmungsfrist Mieterhöhung",
+        "norm": "§ 558b Abs. 1, 2 BGB",
+        "ereignis": "Zugang des Erhöhungsverlangens"
+    },
+    "modernisierung_ankuendigung": {
+        "label": "Modernisierungsankündigung (spätester Zugang)",
+        "norm": "§ 555c Abs. 1 BGB",
+        "ereignis": "Geplanter Beginn der Maßnahme"
+    }
+}
+
+
+def _easter_sunday(year):
+    # Gaußsche Osterformel (Gregorianischer Kalender)
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def holidays(year, land):
+    """Gesetzliche Feiertage eines Bundeslandes für ein Jahr."""
+    easter = _easter_sunday(year)
+    days = {
+        date(year, 1, 1),                   # Neujahr
+        easter - timedelta(days=2),         # Karfreitag
+        easter + timedelta(days=1),         # Ostermontag
+        date(year, 5, 1),                   # Tag der Arbeit
+        easter + timedelta(days=39),        # Christi Himmelfahrt
+        easter + timedelta(days=50),        # Pfingstmontag
+        date(year, 10, 3),                  # Tag der Deutschen Einheit
+        date(year, 12, 25),
+        date(year, 12, 26),
+    }
+    if land in ("BW", "BY", "ST"):
+        days.add(date(year, 1, 6))          # Heilige Drei Könige
+    if (land == "BE" and year >= 2019) or (land == "MV" and year >= 2023):
+        days.add(date(year, 3, 8))          # Internationaler Frauentag
+    if land in ("BW", "BY", "HE", "NW", "RP", "SL"):
+        days.add(easter + timedelta(days=60))  # Fronleichnam
+    if land == "SL":
+        days.add(date(year, 8, 15))         # Mariä Himmelfahrt
+    if land == "TH" and year >= 2019:
+        days.add(date(year, 9, 20))         # Weltkindertag
+    if (land in ("BB", "MV", "SN", "ST", "TH")
+            or (land in ("HB", "HH", "NI", "SH") and year >= 2018)
+            or year == 2017):
+        days.add(date(year, 10, 31))        # Reformationstag
+    if land in ("BW", "BY", "NW", "RP", "SL"):
+        days.add(date(year, 11, 1))         # Allerheiligen
+    if land == "SN":
+        # Buß- und Bettag: Mittwoch vor dem 23. November
+        nov22 = date(year, 11, 22)
+        days.add(nov22 - timedelta(days=(nov22.weekday() - 2) % 7))
+    return days
+
+
+def _add_months(d, months):
+    # § 188 Abs. 3 BGB: fehlt der Tag im Zielmonat, endet die Frist am Monatsletzten
+    y, m = divmod(d.month - 1 + months, 12)
+    year, month = d.year + y, m + 1
+    return date(year, month, min(d.day, calendar.monthrange(year, month)[1]))
+
+
+def _month_end(d, months=0):
+    y, m = divmod(d.month - 1 + months, 12)
+    year, month = d.year + y, m + 1
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+class WerktagKalender:
+    """
+    Vorberechneter Werktagskalender eines Bundeslandes.
+    Für jeden Tag im Kalenderzeitraum wird der nächste bzw. vorherige Werktag
+    (Mo-Fr, kein Feiertag) abgelegt, sodass die Verschiebung nach § 193 BGB
+    eine einzige Array-Abfrage ist. Daneben Mo-Sa ohne Feiertage für Fristen,
+    bei denen der Samstag als Werktag zählt (§ 573c Abs. 1 BGB).
+    """
+
+    def __init__(self, land, start=CALENDAR_START, end=CALENDAR_END):
+        self.land = land
+        self.start = start
+        self.end = end
+        self._base = start.toordinal()
+        size = end.toordinal() - self._base + 1
+
+        closed = set()
+        for year in range(start.year, end.year + 1):
+            closed.update(d.toordinal() - self._base for d in holidays(year, land))
+
+        werktag = bytearray(size)
+        werktag_samstag = bytearray(size)
+        for i in range(size):
+            # date.weekday() von CALENDAR_START aus fortgeschrieben
+            weekday = (start.weekday() + i) % 7
+            if weekday < 6 and i not in closed:
+                werktag_samstag[i] = 1
+                werktag[i] = weekday < 5
+        self._werktag = werktag
+        self._werktag_samstag = werktag_samstag
+
+        # Randwerte zeigen über das Array hinaus und werden beim Lesen abgefangen
+        self._next = array("i", [size] * size)
+        nxt = size
+        for i in range(size - 1, -1, -1):
+            if werktag[i]:
+                nxt = i
+            self._next[i] = nxt
+        self._prev = array("i", [-1] * size)
+        prv = -1
+        for i in range(size):
+            if werktag[i]:
+                prv = i
+            self._prev[i] = prv
+
+    def _index(self, d):
+        i = d.toordinal() - self._base
+        if i < 0 or i >= len(self._werktag):
+            raise ValueError(f"Datum {d.isoformat()} außerhalb des Kalenders ({self.start.year}-{self.end.year})")
+        return i
+
+    def is_werktag(self, d):
+        return bool(self._werktag[self._index(d)])
+
+    def next_werktag(self, d):
+        """Erster Werktag am oder nach d (§ 193 BGB)."""
+        i = self._next[self._index(d)]
+        if i >= len(self._werktag):
+            raise ValueError(f"Kein Werktag nach {d.isoformat()} im Kalender")
+        return date.fromordinal(self._base + i)
+
+    def previous_werktag(self, d):
+        """Letzter Werktag am oder vor d (für Rückwärtsfristen)."""
+        i = self._prev[self._index(d)]
+        if i < 0:
+            raise ValueError(f"Kein Werktag vor {d.isoformat()} im Kalender")
+        return date.fromordinal(self._base + i)
+
+    def nth_werktag_of_month(self, d, n, samstag=False):
+        """n-ter Werktag im Monat von d; mit samstag=True zählen Samstage mit (Mo-Sa)."""
+        i = self._index(d.replace(day=1))
+        if samstag:
+            days = self._werktag_samstag
+            for _ in range(n):
+                while not days[i]:
+                    i += 1
+                i += 1
+            return date.fromordinal(self._base + i - 1)
+        for _ in range(n):
+            i = self._next[i] + 1
+        return date.fromordinal(self._base + i - 1)
+
+
+def _event_args(event, land):
+    """(Frist, Datum, Bundesland) eines Ereignisses; falsche Typen als ValueError mit deutscher Meldung."""
+    frist_type, event_date = event.get("type"), event.get("date")
+    land = event.get("bundesland") or land
+    if not isinstance(frist_type, str):
+        raise ValueError("type muss eine Fristart (Text) sein")
+    if land is not None and not isinstance(land, str):
+        raise ValueError("bundesland muss ein Länderkürzel (Text) sein")
+    try:
+        return frist_type, date.fromisoformat(event_date), land
+    except (TypeError, ValueError):
+        raise ValueError("date muss ein Datum im Format JJJJ-MM-TT sein")
+
+
+class FristenService:
+    def __init__(self, default_land="BE"):
+        self.default_land = default_land
+        self._calendars = {}
+        self._lock = threading.Lock()
+
+    def calendar(self, land):
+        land = (land or self.default_land).upper()
+        if land not in BUNDESLAENDER:
+            raise ValueError(f"Unbekanntes Bundesland: {land}")
+        cal = self._calendars.get(land)
+        if cal is None:
+            with self._lock:
+                cal = self._calendars.get(land)
+                if cal is None:
+                    cal = WerktagKalender(land)
+                    self._calendars[land] = cal
+        return cal
+
+    def warmup(self, lands=BUNDESLAENDER):
+        for land in lands:
+            self.calendar(land)
+
+    def compute(self, frist_type, event_date, land=None):
+        """
+        Berechnet eine einzelne Frist.
+        event_date: date oder ISO-String (YYYY-MM-DD)
+        """
+        if frist_type not in FRISTEN:
+            raise ValueError(f"Unbekannte Frist: {frist_type}")
+        if isinstance(event_date, str):
+            event_date = date.fromisoformat(event_date)
+        cal = self.calendar(land)
+
+        if frist_type == "kuendigung_mieter":
+            # Zugang bis zum dritten Werktag -> Ablauf des übernächsten Monats.
+            # Der Samstag zählt als Werktag (BGH VIII ZR 291/09); nur wenn die Karenz
+            # an einem Samstag endet, läuft sie bis zum nächsten Werktag (§ 193 BGB).
+            # Der Kündigungstermin selbst wird nicht verschoben.
+            third = cal.next_werktag(cal.nth_werktag_of_month(event_date, 3, samstag=True))
+            raw = _month_end(event_date, 2 if event_date <= third else 3)
+            deadline = raw
+        elif frist_type == "nebenkosten_abrechnung":
+            raw = _month_end(event_date, 12)
+            deadline = cal.next_werktag(raw)
+        elif frist_type == "verjaehrung_rueckgabe":
+            raw = _add_months(event_date, 6)
+            deadline = cal.next_werktag(raw)
+        elif frist_type == "zustimmung_mieterhoehung":
+            raw = _month_end(event_date, 2)
+            deadline = cal.next_werktag(raw)
+        else:
+            # Rückwärtsfrist: vorsichtshalber auf den vorhergehenden Werktag
+            raw = _add_months(event_date, -3)
+            deadline = cal.previous_werktag(raw)
+
+        rule = FRISTEN[frist_type]
+        return {
+            "type": frist_type,
+            "label": rule["label"],
+            "norm": rule["norm"],
+            "bundesland": cal.land,
+            "event_date": event_date.isoformat(),
+            "deadline": deadline.isoformat(),
+            "shifted": deadline != raw
+        }
+
+    def compute_many(self, events, land=None):
+        """
+        Berechnet Fristen für eine Liste von Ereignissen (aus JSON, beliebige Typen).
+        Fehlerhafte Einträge liefern ein "error"-Feld statt die ganze Anfrage abzubrechen.
+        """
+        results = []
+        for event in events:
+            if not isinstance(event, dict):
+                results.append({"type": None, "event_date": None, "error": "Ereignis muss ein Objekt sein"})
+                continue
+            try:
+                result = self.compute(*_event_args(event, land))
+            except ValueError as e:
+                result = {"type": event.get("type"), "event_date": event.get("date"), "error": str(e)}
+            if "id" in event:
+                result["id"] = event["id"]
+            results.append(result)
+        return results
+
+    def to_ics(self, results):
+        """Erzeugt einen iCalendar-Export (RFC 5545) mit ganztägigen Fristterminen."""
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        lines = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//JurisMind//SmartLaw Agent//DE"
+        ]
+        for result in results:
+            if "error" in result:
+                continue
+            deadline = date.fromisoformat(result["deadline"])
+            description = (
+                f"{result['norm']}. Ereignis: {FRISTEN[result['type']]['ereignis']} "
+                f"am {result['event_date']}."
+            )
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:{result['type']}-{result['event_date']}-{result['bundesland']}@jurismind.de",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART;VALUE=DATE:{deadline.strftime('%Y%m%d')}",
+                f"DTEND;VALUE=DATE:{(deadline + timedelta(days=1)).strftime('%Y%m%d')}",
+                f"SUMMARY:{_ics_escape('Fristablauf: ' + result['label'])}",
+                f"DESCRIPTION:{_ics_escape(description)}",
+                "END:VEVENT"
+            ]
+        lines.append("END:VCALENDAR")
+        return "\r\n".join(lines) + "\r\n"
+
+
+def _ics_escape(text):
+    return (text.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
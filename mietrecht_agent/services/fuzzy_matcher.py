@@ -0,0 +1,93 @@
+from array import array
+
+from .search_service import STOPWORDS, TOKEN_PATTERN, fold
+from .topic_matcher import TOPIC_KEYWORDS, TOPIC_NAME_WEIGHT, split_stem
+
+# Mindestähnlichkeit (Dice-Koeffizient der Trigramme) für einen Treffer
+NAME_THRESHOLD = 0.5
+WORD_THRESHOLD = 0.6
+MIN_WORD_LENGTH = 5
+
+
+def trigrams(term):
+    """Zeichen-Trigramme mit Randmarkierung, damit Wortanfang und -ende zählen."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyTopicMatcher:
+    """
+    Tippfehlertolerante Themenzuordnung über einen Trigramm-Index auf Themennamen
+    und Schlüsselbegriffen. Der Index wird einmal je Wissensstand gebaut; eine Suche
+    summiert nur die Postings der Trigramme des Suchworts.
+    """
+
+    def __init__(self, wissen, keywords=TOPIC_KEYWORDS, min_score=1.5):
+        self.min_score = min_score
+        self.topics = list(wissen.keys())
+        term_topics = {}
+        for topic_id, topic in enumerate(self.topics):
+            weighted = {topic: TOPIC_NAME_WEIGHT}
+            weighted.update(keywords.get(topic, {}))
+            for word in topic.split():
+                weighted.setdefault(word, TOPIC_NAME_WEIGHT)
+            for term, weight in weighted.items():
+                folded = " ".join(fold(split_stem(term)[0]).split())
+                if len(folded) < 3 or folded in STOPWORDS:
+                    continue
+                entries = term_topics.setdefault(folded, {})
+                entries[topic_id] = max(weight, entries.get(topic_id, 0.0))
+
+        self._terms = list(term_topics)
+        self._term_topics = [list(term_topics[term].items()) for term in self._terms]
+        self._sizes = array("H")
+        postings = {}
+        for term_id, term in enumerate(self._terms):
+            grams = trigrams(term)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, array("i")).append(term_id)
+        self._postings = postings
+
+    def similar_terms(self, word, threshold=NAME_THRESHOLD):
+        """[(Begriffs-ID, Ähnlichkeit)] aller Begriffe mit Dice-Koeffizient >= threshold."""
+        grams = trigrams(" ".join(fold(word).split()))
+        common = {}
+        for gram in grams:
+            for term_id in self._postings.get(gram, ()):
+                common[term_id] = common.get(term_id, 0) + 1
+        size = len(grams)
+        result = []
+        for term_id, count in common.items():
+            score = 2.0 * count / (size + self._sizes[term_id])
+            if score >= threshold:
+                result.append((term_id, score))
+        return result
+
+    def match(self, name, limit=3):
+        """Beste Themen zu einem (vertippten) Themen- oder Begriffsnamen: [(Thema, Ähnlichkeit)]."""
+        best = {}
+        for term_id, score in self.similar_terms(name):
+            for topic_id, _ in self._term_topics[term_id]:
+                if score > best.get(topic_id, 0.0):
+                    best[topic_id] = score
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(self.topics[topic_id], round(score, 3)) for topic_id, score in ranked]
+
+    def rank(self, text, limit=None):
+        """Themen zu einem Freitext, gewichtet wie TopicMatcher, aber tippfehlertolerant."""
+        scores = {}
+        for word in set(TOKEN_PATTERN.findall(fold(text))):
+            if len(word) < MIN_WORD_LENGTH or word in STOPWORDS:
+                continue
+            best = {}
+            for term_id, similarity in self.similar_terms(word, WORD_THRESHOLD):
+                for topic_id, weight in self._term_topics[term_id]:
+                    best[topic_id] = max(best.get(topic_id, 0.0), weight * similarity)
+            for topic_id, score in best.items():
+                scores[topic_id] = scores.get(topic_id, 0.0) + score
+        ranked = sorted(
+            ((self.topics[t], round(s, 3)) for t, s in scores.items() if s >= self.min_score),
+            key=lambda item: item[1], reverse=True
+        )
+        return ranked[:limit] if limit else ranked
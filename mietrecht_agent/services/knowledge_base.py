@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from .citation_graph import CitationGraph
+from .fuzzy_matcher import FuzzyTopicMatcher
+from .search_service import SearchIndex
+from .suggest_service import SuggestIndex
+from .topic_cache import TopicResponseCache
+from .topic_matcher import TopicMatcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WISSEN_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "mietrecht_wissen.json")
+# Wie oft (Sekunden) die Datei höchstens auf Änderungen geprüft wird
+RELOAD_CHECK_INTERVAL = 2.0
+
+
+class KnowledgeSnapshot:
+    """
+    Unveränderlicher Stand der Wissensdatenbank samt aller abgeleiteten Indizes.
+    Wird als Ganzes ersetzt und darf von Lesern nicht verändert werden.
+    """
+
+    def __init__(self, wissen, version, fragen=None):
+        self.wissen = wissen
+        self.version = version
+        self.search_index = SearchIndex(wissen)
+        self.topic_matcher = TopicMatcher(wissen)
+        self.fuzzy_matcher = FuzzyTopicMatcher(wissen)
+        self.topic_cache = TopicResponseCache(wissen)
+        self.citation_graph = CitationGraph(wissen)
+        self.suggest_index = SuggestIndex(wissen, fragen, self.citation_graph)
+
+
+def load_snapshot(path):
+    """Liest die Datendatei und baut alle Indizes; Version = Dateiversion + Inhaltshash."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw.decode("utf-8"))
+    wissen = data["topics"]
+    if not isinstance(wissen, dict) or not all(isinstance(c, dict) for c in wissen.values()):
+        raise ValueError("'topics' muss ein Objekt Thema -> Inhalte sein")
+    digest = hashlib.sha256(raw).hexdigest()[:8]
+    return KnowledgeSnapshot(wissen, f"{data.get('version', '0')}+{digest}", data.get("fragen"))
+
+
+class KnowledgeBase:
+    """
+    Versionierte Wissensdatenbank aus einer Datendatei mit Hot Reload.
+    Ändert sich die Datei (mtime/Größe), baut genau ein Thread den neuen Snapshot,
+    während alle anderen weiter den bisherigen lesen; der Tausch ist eine
+    einzelne Referenzzuweisung. Eine fehlerhafte Datei lässt den alten Stand aktiv.
+    """
+
+    def __init__(self, path=DEFAULT_WISSEN_PATH, check_interval=RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stamp = self._file_stamp()
+        self._snapshot = load_snapshot(path)
+        self._next_check = time.monotonic() + check_interval
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @property
+    def snapshot(self):
+        if time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    def _maybe_reload(self):
+        # Nicht blockieren: lädt bereits ein anderer Thread, wird der alte Stand geliefert
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                stamp = self._file_stamp()
+            except OSError as e:
+                logger.warning("Wissensdatenbank nicht lesbar: %s", e)
+                return
+            if stamp != self._stamp:
+                self._stamp = stamp
+                self._reload()
+        finally:
+            self._lock.release()
+
+    def _reload(self):
+        try:
+            snapshot = load_snapshot(self.path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.error("Wissensdatenbank %s nicht geladen, behalte Version %s: %s",
+                         self.path, self._snapshot.version, e)
+            return False
+        self._snapshot = snapshot
+        logger.info("Wissensdatenbank neu geladen: Version %s", snapshot.version)
+        return True
+
+    def reload(self):
+        """Erzwingt ein Neuladen (z.B. nach einem Deployment der Datendatei)."""
+        with self._lock:
+            self._stamp = self._file_stamp()
+            self._next_check = time.monotonic() + self.check_interval
+            return self._reload()
@@ -0,0 +1,366 @@
+import csv
+import io
+import re
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+from .fristen_service import FristenService
+
+# Kategorien nach § 2 BetrKV (Nr. 1-17) sowie nicht umlagefähige Kosten nach § 1 Abs. 2 BetrKV.
+# Reihenfolge ist relevant: nicht umlagefähige Positionen werden zuerst geprüft,
+# damit z.B. "Reparatur Aufzug" nicht als Aufzugskosten durchgeht.
+KATEGORIE_VERWALTUNG = 90
+KATEGORIE_INSTANDHALTUNG = 91
+KATEGORIE_SONSTIGE_NICHT_UMLAGEFAEHIG = 92
+KATEGORIE_UNBEKANNT = 0
+
+KATEGORIEN = [
+    (KATEGORIE_VERWALTUNG, "Verwaltungskosten", ("verwaltung", "hausverwalt", "porto", "telefon")),
+    (KATEGORIE_INSTANDHALTUNG, "Instandhaltung / Instandsetzung",
+     ("instandhalt", "instandsetz", "reparatur", "erneuerung", "sanierung", "austausch")),
+    (KATEGORIE_SONSTIGE_NICHT_UMLAGEFAEHIG, "Sonstige nicht umlagefähige Kosten",
+     ("bankgebuehr", "kontofuehrung", "ruecklage", "leerstand", "mietausfall")),
+    (1, "Grundsteuer", ("grundsteuer", "grundbesitzabgabe")),
+    (3, "Entwässerung", ("entwaesserung", "abwasser", "schmutzwasser", "niederschlagswasser", "kanal")),
+    (5, "Warmwasserversorgung", ("warmwasser",)),
+    (2, "Wasserversorgung", ("frischwasser", "kaltwasser", "wasserversorgung", "wasserzaehler", "wasser")),
+    (4, "Heizung", ("heizung", "heizkosten", "brennstoff", "fernwaerme", "heizoel", "erdgas")),
+    (6, "Verbundene Heizungs- und Warmwasseranlagen", ("verbundene anlage",)),
+    (7, "Aufzug", ("aufzug", "fahrstuhl", "lift")),
+    (8, "Straßenreinigung und Müllbeseitigung", ("strassenreinigung", "muell", "abfall", "winterdienst")),
+    (9, "Gebäudereinigung und Ungezieferbekämpfung", ("gebaeudereinigung", "treppenhaus", "hausreinigung", "ungeziefer")),
+    (10, "Gartenpflege", ("garten", "gruenanlage", "gruenflaeche")),
+    (11, "Beleuchtung", ("beleuchtung", "allgemeinstrom", "hausstrom")),
+    (12, "Schornsteinreinigung", ("schornstein", "kaminkehrer", "kehrgebuehr")),
+    (13, "Sach- und Haftpflichtversicherung", ("versicherung",)),
+    (14, "Hauswart", ("hauswart", "hausmeister")),
+    (15, "Gemeinschaftsantenne / Breitbandnetz", ("antenne", "kabel", "breitband")),
+    (16, "Wäschepflege", ("waesche", "waschmaschine", "trockner")),
+    (17, "Sonstige Betriebskosten", ("sonstige", "dachrinne", "wartung", "pruefung"))
+]
+
+KATEGORIE_NAMEN = {code: name for code, name, _ in KATEGORIEN}
+KATEGORIE_NAMEN[KATEGORIE_UNBEKANNT] = "Unbekannt"
+
+UMLAGESCHLUESSEL = {
+    "wohnflaeche": "Wohnfläche",
+    "flaeche": "Wohnfläche",
+    "qm": "Wohnfläche",
+    "m²": "Wohnfläche",
+    "personen": "Personen",
+    "personenzahl": "Personen",
+    "einheiten": "Wohneinheiten",
+    "wohneinheiten": "Wohneinheiten",
+    "we": "Wohneinheiten",
+    "verbrauch": "Verbrauch",
+    "miteigentumsanteile": "Miteigentumsanteile",
+    "mea": "Miteigentumsanteile"
+}
+
+HEADER_ALIASES = {
+    "kostenart": "kostenart",
+    "position": "kostenart",
+    "bezeichnung": "kostenart",
+    "gesamtkosten": "gesamt",
+    "gesamt": "gesamt",
+    "betrag": "gesamt",
+    "umlageschluessel": "schluessel",
+    "schluessel": "schluessel",
+    "verteilerschluessel": "schluessel",
+    "anteil": "anteil",
+    "ihr anteil": "anteil",
+    "mieteranteil": "anteil",
+    "einheiten gesamt": "einheiten_gesamt",
+    "gesamteinheiten": "einheiten_gesamt",
+    "einheiten mieter": "einheiten_mieter",
+    "ihre einheiten": "einheiten_mieter"
+}
+
+# Zeile aus extrahiertem PDF-Text: "Grundsteuer  1.234,56 €  Wohnfläche  123,45 €"
+TEXT_LINE = re.compile(
+    r"^\s*(?P<kostenart>[^\d€]+?)\s+(?P<gesamt>-?[\d.]+,\d{2})\s*€?"
+    r"\s+(?P<schluessel>[^\d€]+?)?\s*(?P<anteil>-?[\d.]+,\d{2})\s*€?\s*$"
+)
+SUMMEN_ZEILE = ("summe", "gesamtsumme", "gesamtbetrag", "total")
+SUMMEN_TEXT = re.compile(
+    r"^\s*(?:summe|gesamtsumme|gesamtbetrag|total)\b.*?(?P<betrag>-?[\d.]+,\d{2})\s*€?\s*$",
+    re.IGNORECASE
+)
+
+# Betrag ohne Komma mit Punkten als Tausendertrennzeichen: "1.234", "1.234.567"
+TAUSENDER = re.compile(r"-?\d{1,3}(?:\.\d{3})+")
+
+# Toleranz für Rundungsdifferenzen in Euro
+RUNDUNGSTOLERANZ = 0.05
+MAX_STATEMENTS = 1000
+
+
+def _fold(text):
+    text = text.lower().strip()
+    for src, dst in (("ä", "ae"), ("ö", "oe"), ("ü", "ue"), ("ß", "ss")):
+        text = text.replace(src, dst)
+    return text
+
+
+def _parse_amount(value):
+    value = (value or "").replace("€", "").replace(" ", "").strip()
+    if not value:
+        return np.nan
+    if "," in value or TAUSENDER.fullmatch(value):
+        value = value.replace(".", "").replace(",", ".")
+    return float(value)
+
+
+@lru_cache(maxsize=4096)
+def map_kategorie(kostenart):
+    """Ordnet eine Kostenart einer BetrKV-Kategorie zu."""
+    folded = _fold(kostenart)
+    for code, _, keywords in KATEGORIEN:
+        if any(kw in folded for kw in keywords):
+            return code
+    return KATEGORIE_UNBEKANNT
+
+
+def _normalize_schluessel(schluessel):
+    folded = _fold(schluessel or "").rstrip(".")
+    return UMLAGESCHLUESSEL.get(folded, schluessel.strip() if schluessel else "")
+
+
+class NebenkostenChecker:
+    def __init__(self, fristen_service=None):
+        self.fristen_service = fristen_service or FristenService()
+
+    def parse_csv(self, content):
+        """Liest Positionen aus einer CSV-Datei (Trennzeichen ; oder ,)."""
+        first_line = content.split("\n", 1)[0]
+        delimiter = ";" if ";" in first_line else ","
+        reader = csv.reader(io.StringIO(content), delimiter=delimiter)
+        header = [HEADER_ALIASES.get(_fold(col), _fold(col)) for col in next(reader, [])]
+        if "kostenart" not in header or "gesamt" not in header:
+            raise ValueError("CSV benötigt mindestens die Spalten Kostenart und Gesamtkosten")
+
+        items = []
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            record = dict(zip(header, row))
+            items.append({
+                "kostenart": record.get("kostenart", "").strip(),
+                "gesamt": _parse_amount(record.get("gesamt")),
+                "schluessel": record.get("schluessel", ""),
+                "anteil": _parse_amount(record.get("anteil")),
+                "einheiten_gesamt": _parse_amount(record.get("einheiten_gesamt")),
+                "einheiten_mieter": _parse_amount(record.get("einheiten_mieter"))
+            })
+        return items
+
+    def parse_text(self, content):
+        """Liest Positionen aus extrahiertem PDF-Text, eine Position pro Zeile."""
+        items = []
+        for line in content.splitlines():
+            total = SUMMEN_TEXT.match(line)
+            if total:
+                items.append({
+                    "kostenart": "Summe",
+                    "gesamt": np.nan,
+                    "schluessel": "",
+                    "anteil": _parse_amount(total.group("betrag")),
+                    "einheiten_gesamt": np.nan,
+                    "einheiten_mieter": np.nan
+                })
+                continue
+            match = TEXT_LINE.match(line)
+            if not match:
+                continue
+            items.append({
+                "kostenart": match.group("kostenart").strip(),
+                "gesamt": _parse_amount(match.group("gesamt")),
+                "schluessel": match.group("schluessel") or "",
+                "anteil": _parse_amount(match.group("anteil")),
+                "einheiten_gesamt": np.nan,
+                "einheiten_mieter": np.nan
+            })
+        return items
+
+    def _parse_statement(self, statement):
+        # Aus JSON beliebiger Typ: Fehler gehen als "error" in das Ergebnis dieser Abrechnung
+        if not isinstance(statement, dict):
+            raise ValueError("Abrechnung muss ein Objekt sein")
+        content = statement.get("content", "")
+        if not isinstance(content, str):
+            raise ValueError("content muss Text sein")
+        if statement.get("format", "csv") == "csv":
+            items = self.parse_csv(content)
+        else:
+            items = self.parse_text(content)
+
+        positions, summe = [], None
+        for item in items:
+            if _fold(item["kostenart"]).startswith(SUMMEN_ZEILE):
+                summe = item["anteil"]
+                continue
+            item["schluessel"] = _normalize_schluessel(item["schluessel"])
+            item["kategorie"] = map_kategorie(item["kostenart"])
+            positions.append(item)
+        if statement.get("summe") is not None:
+            try:
+                summe = float(statement["summe"])
+            except (TypeError, ValueError):
+                raise ValueError("summe muss eine Zahl sein")
+        return positions, summe
+
+    def check_batch(self, statements):
+        """
+        Prüft eine Liste von Abrechnungen. Alle Positionen werden in flache
+        NumPy-Arrays überführt und die Regeln einmal über den gesamten Stapel ausgewertet.
+        """
+        results = []
+        parsed = []
+        for idx, statement in enumerate(statements):
+            statement_id = statement.get("id", idx) if isinstance(statement, dict) else idx
+            result = {"id": statement_id, "positionen": [], "findings": []}
+            try:
+                positions, summe = self._parse_statement(statement)
+            except (ValueError, KeyError) as e:
+                result["error"] = str(e)
+                positions, summe = [], None
+            result["positionen"] = [
+                {
+                    "kostenart": p["kostenart"],
+                    "kategorie": KATEGORIE_NAMEN[p["kategorie"]],
+                    "betrkv_nr": p["kategorie"] if 0 < p["kategorie"] < 90 else None,
+                    "gesamt": None if np.isnan(p["gesamt"]) else p["gesamt"],
+                    "schluessel": p["schluessel"],
+                    "anteil": None if np.isnan(p["anteil"]) else p["anteil"]
+                }
+                for p in positions
+            ]
+            results.append(result)
+            parsed.append((positions, summe))
+
+        counts = np.array([len(p) for p, _ in parsed], dtype=np.int64)
+        flat = [p for positions, _ in parsed for p in positions]
+        if flat:
+            stmt = np.repeat(np.arange(len(parsed)), counts)
+            pos = np.concatenate([np.arange(c) for c in counts])
+            kategorie = np.fromiter((p["kategorie"] for p in flat), dtype=np.int16, count=len(flat))
+            gesamt = np.fromiter((p["gesamt"] for p in flat), dtype=np.float64, count=len(flat))
+            anteil = np.fromiter((p["anteil"] for p in flat), dtype=np.float64, count=len(flat))
+            eg = np.fromiter((p["einheiten_gesamt"] for p in flat), dtype=np.float64, count=len(flat))
+            em = np.fromiter((p["einheiten_mieter"] for p in flat), dtype=np.float64, count=len(flat))
+            schluessel = np.array([p["schluessel"] for p in flat])
+
+            self._check_positions(results, flat, stmt, pos, kategorie, gesamt, anteil, eg, em, schluessel)
+            self._check_summen(results, parsed, stmt, anteil)
+
+        self._check_fristen(results, statements)
+        for result in results:
+            result["summe_anteil"] = round(sum(p["anteil"] or 0 for p in result["positionen"]), 2)
+            result["ok"] = "error" not in result and not any(
+                f["severity"] == "fehler" for f in result["findings"])
+        return results
+
+    def _finding(self, results, s, p, flat_item, rule, severity, message, norm):
+        results[s]["findings"].append({
+            "position": p,
+            "kostenart": flat_item["kostenart"] if flat_item else None,
+            "rule": rule,
+            "severity": severity,
+            "message": message,
+            "norm": norm
+        })
+
+    def _check_positions(self, results, flat, stmt, pos, kategorie, gesamt, anteil, eg, em, schluessel):
+        def emit(mask, rule, severity, message, norm):
+            for i in np.flatnonzero(mask):
+                self._finding(results, int(stmt[i]), int(pos[i]), flat[i], rule, severity, message, norm)
+
+        emit(kategorie == KATEGORIE_VERWALTUNG, "nicht_umlagefaehig", "fehler",
+             "Verwaltungskosten sind keine Betriebskosten und dürfen nicht umgelegt werden.",
+             "§ 1 Abs. 2 Nr. 1 BetrKV")
+        emit(kategorie == KATEGORIE_INSTANDHALTUNG, "nicht_umlagefaehig", "fehler",
+             "Instandhaltungs- und Instandsetzungskosten dürfen nicht umgelegt werden.",
+             "§ 1 Abs. 2 Nr. 2 BetrKV")
+        emit(kategorie == KATEGORIE_SONSTIGE_NICHT_UMLAGEFAEHIG, "nicht_umlagefaehig", "fehler",
+             "Diese Kosten sind nicht als Betriebskosten umlagefähig.", "§ 1 BetrKV")
+        emit(kategorie == 17, "sonstige_betriebskosten", "hinweis",
+             "Sonstige Betriebskosten sind nur umlagefähig, wenn sie im Mietvertrag einzeln benannt sind.",
+             "§ 2 Nr. 17 BetrKV")
+        emit(kategorie == KATEGORIE_UNBEKANNT, "unbekannte_kostenart", "hinweis",
+             "Kostenart konnte keiner BetrKV-Kategorie zugeordnet werden.", "§ 2 BetrKV")
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            emit((gesamt < 0) | (anteil < 0), "negativer_betrag", "fehler",
+                 "Negative Beträge sind als Kostenposition nicht plausibel.", "§ 259 BGB")
+            emit(anteil > gesamt + RUNDUNGSTOLERANZ, "anteil_ueber_gesamt", "fehler",
+                 "Der Mieteranteil übersteigt die Gesamtkosten.", "§ 556 Abs. 3 BGB")
+
+            # Rechenprüfung: Anteil = Gesamtkosten * Einheiten Mieter / Einheiten Gesamt
+            expected = gesamt * em / eg
+            emit(np.isfinite(expected) & (np.abs(anteil - expected) > RUNDUNGSTOLERANZ),
+                 "rechenfehler", "fehler",
+                 "Der Mieteranteil entspricht nicht dem Umlageschlüssel (Rechenfehler).",
+                 "§ 556a BGB")
+
+            # Schlüsselkonsistenz: gleicher Schlüssel -> gleiche Quote innerhalb einer Abrechnung.
+            # Verbrauchswerte schwanken naturgemäß je Position und bleiben außen vor.
+            ratio = anteil / gesamt
+            candidate = np.isfinite(ratio) & (schluessel != "") & (schluessel != "Verbrauch")
+            idx = np.flatnonzero(candidate)
+            if idx.size:
+                _, group = np.unique(
+                    np.char.add(stmt[idx].astype(str), np.char.add("|", schluessel[idx])),
+                    return_inverse=True)
+                order = np.lexsort((ratio[idx], group))
+                sorted_groups = group[order]
+                starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+                sizes = np.diff(np.r_[starts, sorted_groups.size])
+                median = ratio[idx][order][starts + sizes // 2]
+                deviation = np.abs(ratio[idx] - median[group]) > np.maximum(0.005, 0.02 * median[group])
+                mask = np.zeros(ratio.size, dtype=bool)
+                mask[idx] = deviation & (sizes[group] > 1)
+                emit(mask, "schluessel_inkonsistent", "warnung",
+                     "Die Umlagequote weicht von anderen Positionen mit demselben Schlüssel ab.",
+                     "§ 556a Abs. 1 BGB")
+
+        unknown_key = np.isin(schluessel, list(set(UMLAGESCHLUESSEL.values())), invert=True) & (schluessel != "")
+        emit(unknown_key, "unbekannter_schluessel", "hinweis",
+             "Der Umlageschlüssel ist nicht gebräuchlich und sollte erläutert werden.",
+             "§ 556a BGB")
+
+    def _check_summen(self, results, parsed, stmt, anteil):
+        totals = np.bincount(stmt, weights=np.nan_to_num(anteil), minlength=len(parsed))
+        for s, (_, summe) in enumerate(parsed):
+            if summe is not None and not np.isnan(summe) and abs(totals[s] - summe) > RUNDUNGSTOLERANZ:
+                self._finding(results, s, None, None, "summenfehler", "fehler",
+                              f"Die ausgewiesene Summe ({summe:.2f} €) weicht von der Summe der "
+                              f"Positionen ({totals[s]:.2f} €) ab.", "§ 259 BGB")
+
+    def _check_fristen(self, results, statements):
+        for s, statement in enumerate(statements):
+            if not isinstance(statement, dict):
+                continue
+            ende, zugang = statement.get("zeitraum_ende"), statement.get("zugang")
+            if not ende or not zugang:
+                continue
+            try:
+                if not all(isinstance(v, str) for v in (ende, zugang, statement.get("bundesland") or "")):
+                    raise ValueError("zeitraum_ende, zugang und bundesland müssen Text sein")
+                frist = self.fristen_service.compute(
+                    "nebenkosten_abrechnung", ende, statement.get("bundesland"))
+                late = date.fromisoformat(zugang) > date.fromisoformat(frist["deadline"])
+            except ValueError as e:
+                results[s]["findings"].append({
+                    "position": None, "kostenart": None, "rule": "abrechnungsfrist",
+                    "severity": "hinweis", "message": f"Frist nicht prüfbar: {e}",
+                    "norm": "§ 556 Abs. 3 BGB"
+                })
+                continue
+            results[s]["abrechnungsfrist"] = frist["deadline"]
+            if late:
+                self._finding(results, s, None, None, "abrechnungsfrist", "fehler",
+                              f"Die Abrechnung ging nach Ablauf der Abrechnungsfrist "
+                              f"({frist['deadline']}) zu. Nachforderungen sind ausgeschlossen.",
+                              "§ 556 Abs. 3 S. 3 BGB")
@@ -0,0 +1,596 @@
+import logging
+import re
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+try:
+    import psycopg2
+    import psycopg2.extras
+    import psycopg2.pool
+except ImportError:     # optional, nur für den PostgreSQL-Treiber
+    psycopg2 = None
+
+from .case_store import (
+    ALL_FIELDS, LIST_FIELDS, SCALAR_FIELDS, JSON_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE,
+    CASE_ID_PREFIX, CASE_ID_OFFSET, _projection
+)
+from .case_search import (
+    SEARCH_PAGE_SIZE, MAX_SEARCH_PAGE_SIZE, RANK_WINDOW, SNIPPET_TOKENS, _MARK_START, _MARK_END,
+    _snippet_html, search_terms
+)
+from .case_export import EXPORT_FIELDS, EXPORT_CHUNK_SIZE
+from .case_stats import (
+    STATS_DIMENSIONS, _RECONCILE_KEY, _stat_deltas, _stats_response, _totals_from_groups,
+    start_case_stats_reconciler, today_utc
+)
+
+logger = logging.getLogger(__name__)
+
+MIN_CONNECTIONS = 1
+# Obergrenze je App-Prozess; Summe über alle Knoten unter max_connections des Servers halten
+MAX_CONNECTIONS = 10
+# Wartezeit auf eine freie Verbindung, danach scheitert der Request
+POOL_TIMEOUT = 5.0
+# Zeilen je INSERT beim Sammelschreiben (execute_values)
+WRITE_BATCH_SIZE = 500
+# Transaktionssperre der Schreiber auf cases, siehe cases_change_version()
+WRITE_LOCK_KEY = 42001
+# Eigenes Schema: die Datenbank aus docker-compose nutzt auch das Node-Backend
+# (Prisma-Tabellen cases, users in public); search_path wird je Verbindung gesetzt
+DEFAULT_SCHEMA = "mietrecht"
+_IDENTIFIER = re.compile(r"[a-z_][a-z0-9_]*\Z")
+SEARCH_CONFIG = "german"
+# ts_rank-Gewichte {D, C, B, A}: Name (A) zählt doppelt so viel wie Adresse/Thema (B),
+# zehnmal so viel wie Analyse/Empfehlung (D) - wie die bm25-Gewichte der SQLite-Suche
+SEARCH_WEIGHTS = "{0.1, 0.2, 0.5, 1.0}"
+_SEARCH_SOURCES = (
+    ("user_data", "name", "A"),
+    ("user_data", "address", "B"),
+    ("case_data", "topic", "B"),
+    ("case_data", "analysis", "D"),
+    ("case_data", "recommendation", "D"),
+)
+# Präfix-Bereichsabfragen (from/to, booking_time) brauchen Byte-Reihenfolge statt Locale
+_TEXT_C = 'TEXT COLLATE "C"'
+
+
+def _json_text(name, sub):
+    return f"({JSON_FIELDS[name]} ->> '{sub}')"
+
+
+_REVENUE = ("CASE WHEN jsonb_typeof({ref}.booking_data -> 'price') = 'number' "
+            "THEN ({ref}.booking_data ->> 'price')::float8 ELSE 0 END")
+_STATS_KEYS = {"status": "{ref}.status", "day": "substr({ref}.timestamp, 1, 10)",
+               "lawyer": "{ref}.booking_data ->> 'lawyer'"}
+assert tuple(_STATS_KEYS) == tuple(kind for kind, _ in STATS_DIMENSIONS)
+
+SCHEMA = (
+    f"""CREATE TABLE IF NOT EXISTS cases (
+        id BIGSERIAL PRIMARY KEY,
+        case_identifier TEXT UNIQUE,
+        timestamp {_TEXT_C},
+        user_data JSONB,
+        case_data JSONB,
+        booking_data JSONB,
+        status TEXT,
+        change_version BIGINT,
+        search tsvector GENERATED ALWAYS AS ({" || ".join(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column} ->> '{key}', '')), '{weight}')"
+            for column, key, weight in _SEARCH_SOURCES)}) STORED
+    )""",
+    """CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        email TEXT UNIQUE,
+        password_hash TEXT,
+        role TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS case_stats (
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        cases BIGINT NOT NULL DEFAULT 0,
+        revenue DOUBLE PRECISION NOT NULL DEFAULT 0,
+        PRIMARY KEY (kind, key)
+    )""",
+    "CREATE SEQUENCE IF NOT EXISTS case_change_seq",
+    "CREATE INDEX IF NOT EXISTS idx_cases_status_id ON cases (status, id)",
+    "CREATE INDEX IF NOT EXISTS idx_cases_timestamp_id ON cases (timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS idx_cases_change_version ON cases (change_version)",
+    f"CREATE INDEX IF NOT EXISTS idx_cases_topic ON cases ({_json_text('case', 'topic')}, id)",
+    f"CREATE INDEX IF NOT EXISTS idx_cases_lawyer ON cases ({_json_text('booking', 'lawyer')}, id)",
+    f"CREATE INDEX IF NOT EXISTS idx_cases_user_email ON cases ({_json_text('user', 'email')}, id)",
+    f"""CREATE INDEX IF NOT EXISTS idx_cases_booking_time
+        ON cases (({_json_text('booking', 'time')} COLLATE "C"), id)""",
+    "CREATE INDEX IF NOT EXISTS idx_cases_search ON cases USING GIN (search)",
+    # Änderungsfeed: Versionen aus einer Sequenz. Die Transaktionssperre serialisiert die
+    # Schreiber auf cases bis zum Commit - so werden Versionen in Commit-Reihenfolge
+    # sichtbar und der Feed überspringt nichts (wie der eine Schreiber bei SQLite).
+    f"""CREATE OR REPLACE FUNCTION cases_change_version() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_advisory_xact_lock({WRITE_LOCK_KEY});
+        NEW.change_version := nextval('case_change_seq');
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS cases_change_version ON cases",
+    """CREATE TRIGGER cases_change_version
+    BEFORE INSERT OR UPDATE OF case_identifier, timestamp, user_data, case_data, booking_data, status ON cases
+    FOR EACH ROW EXECUTE FUNCTION cases_change_version()""",
+    # Dashboard-Zähler wie case_stats, in derselben Transaktion fortgeschrieben
+    f"""CREATE OR REPLACE FUNCTION case_stats_apply(r cases, sign INTEGER) RETURNS void AS $$
+        INSERT INTO case_stats (kind, key, cases, revenue)
+        SELECT kind, key, sign, sign * {_REVENUE.format(ref="r")}
+        FROM (VALUES {", ".join(f"('{kind}', {key.format(ref='r')})" for kind, key in _STATS_KEYS.items())})
+            AS stat (kind, key)
+        WHERE key IS NOT NULL
+        ON CONFLICT (kind, key) DO UPDATE SET
+            cases = case_stats.cases + excluded.cases, revenue = case_stats.revenue + excluded.revenue
+    $$ LANGUAGE sql""",
+    """CREATE OR REPLACE FUNCTION case_stats_count() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' THEN
+            IF (OLD.status, OLD.timestamp, OLD.booking_data)
+                IS NOT DISTINCT FROM (NEW.status, NEW.timestamp, NEW.booking_data) THEN
+                RETURN NULL;
+            END IF;
+            PERFORM case_stats_apply(OLD, -1);
+        END IF;
+        PERFORM case_stats_apply(NEW, 1);
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS case_stats_count ON cases",
+    """CREATE TRIGGER case_stats_count AFTER INSERT OR UPDATE OF status, timestamp, booking_data ON cases
+    FOR EACH ROW EXECUTE FUNCTION case_stats_count()""",
+    # Verweiszähler des Dokumentenspeichers wie blob_store.BLOB_REFS_SCHEMA; je Hash eine
+    # Zeile im INSERT (ON CONFLICT darf eine Zeile nicht zweimal ändern)
+    """CREATE TABLE IF NOT EXISTS blob_refs (
+        digest TEXT PRIMARY KEY,
+        refs BIGINT NOT NULL DEFAULT 0
+    )""",
+    """CREATE OR REPLACE FUNCTION blob_refs_apply(doc jsonb, sign INTEGER) RETURNS void AS $$
+        INSERT INTO blob_refs (digest, refs)
+        SELECT d ->> 'hash', sign * COUNT(*)
+        FROM jsonb_array_elements(CASE WHEN jsonb_typeof(doc -> 'documents') = 'array'
+                                       THEN doc -> 'documents' ELSE '[]'::jsonb END) AS d
+        WHERE jsonb_typeof(d) = 'object' AND d ->> 'hash' IS NOT NULL
+        GROUP BY 1
+        ON CONFLICT (digest) DO UPDATE SET refs = blob_refs.refs + excluded.refs
+    $$ LANGUAGE sql""",
+    """CREATE OR REPLACE FUNCTION blob_refs_count() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' THEN
+            IF OLD.case_data IS NOT DISTINCT FROM NEW.case_data THEN
+                RETURN NULL;
+            END IF;
+            PERFORM blob_refs_apply(OLD.case_data, -1);
+        END IF;
+        PERFORM blob_refs_apply(NEW.case_data, 1);
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS blob_refs_count ON cases",
+    """CREATE TRIGGER blob_refs_count AFTER INSERT OR UPDATE OF case_data ON cases
+    FOR EACH ROW EXECUTE FUNCTION blob_refs_count()""",
+)
+
+# Häufige Statements mit festem Text: je Verbindung einmal vorbereitet (PREPARE),
+# danach nur noch EXECUTE - Parsen und Planen entfallen. Name -> (Parametertypen, SQL)
+STATEMENTS = {
+    "insert_case": ("text, jsonb, jsonb, jsonb, text", f"""
+        WITH next AS (SELECT nextval(pg_get_serial_sequence('cases', 'id')) AS id)
+        INSERT INTO cases (id, case_identifier, timestamp, user_data, case_data, booking_data, status)
+        SELECT id, '{CASE_ID_PREFIX}' || (id + {CASE_ID_OFFSET}), $1, $2, $3, $4, $5 FROM next
+        RETURNING case_identifier, change_version"""),
+    "update_status": ("text, text",
+                      "UPDATE cases SET status = $2 WHERE case_identifier = $1 RETURNING change_version"),
+    "current_version": ("", "SELECT COALESCE(MAX(change_version), 0) FROM cases"),
+    "get_case": ("text", "SELECT case_identifier, timestamp, user_data, case_data, booking_data, status "
+                         "FROM cases WHERE case_identifier = $1"),
+    "get_user": ("text", "SELECT id, email, password_hash, role FROM users WHERE email = $1"),
+    "stats_day": ("text", "SELECT cases, revenue FROM case_stats WHERE kind = 'day' AND key = $1"),
+    "stats_days": ("text, text", "SELECT SUM(cases)::bigint, SUM(revenue) FROM case_stats "
+                                 "WHERE kind = 'day' AND key >= $1 AND key <= $2"),
+    "stats_kind": ("text", "SELECT key, cases, revenue FROM case_stats WHERE kind = $1 AND cases <> 0"),
+}
+
+
+def _pg_projection(fields):
+    """Wie case_store._projection, mit jsonb-Operatoren statt json_extract."""
+    spec = []
+    for _, name, sub in _projection(fields):
+        if sub:
+            spec.append((f"{JSON_FIELDS[name]} -> '{sub}'", name, sub))
+        else:
+            spec.append((SCALAR_FIELDS.get(name) or JSON_FIELDS[name], name, None))
+    return spec
+
+
+def _to_case(spec, values):
+    # psycopg2 liefert jsonb bereits als Python-Objekte
+    case = {}
+    for (_, name, sub), value in zip(spec, values):
+        if sub:
+            case.setdefault(name, {})[sub] = value
+        elif name in JSON_FIELDS:
+            case[name] = value or {}
+        else:
+            case[name] = value
+    return case
+
+
+class PostgresStorage:
+    """
+    Fälle und Benutzer in PostgreSQL; mehrere App-Knoten teilen sich die Datenbank.
+    Alle Tabellen, Funktionen und Trigger liegen im Schema schema (Standard
+    "mietrecht"), getrennt von den Tabellen anderer Anwendungen in public.
+    Verbindungen kommen aus einem begrenzten Pool (höchstens max_connections je
+    Prozess, Wartende bis zu timeout Sekunden); häufige Statements sind je
+    Verbindung vorbereitet, Write-Behind-Batches gehen per execute_values in
+    wenigen INSERTs. Suche über eine tsvector-Spalte mit GIN-Index, Dashboard-Zähler
+    und Dokument-Verweise per Trigger wie bei SQLite. Eine Archiv-Datenbank gibt es hier nicht.
+    """
+
+    def __init__(self, url, min_connections=MIN_CONNECTIONS, max_connections=MAX_CONNECTIONS,
+                 timeout=POOL_TIMEOUT, schema=DEFAULT_SCHEMA):
+        if psycopg2 is None:
+            raise RuntimeError("Für DATABASE_URL=postgresql://... wird das Paket 'psycopg2' benötigt")
+        if not _IDENTIFIER.match(schema):
+            raise ValueError(f"Ungültiger Schemaname: {schema!r}")
+        self.url = url
+        self.schema = schema
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._pool = psycopg2.pool.ThreadedConnectionPool(
+            min_connections, max_connections, url, options=f"-c search_path={schema}"
+        )
+        # ThreadedConnectionPool wirft bei Erschöpfung sofort; die Semaphore lässt warten
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._prepared = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        with self._cursor() as cur:
+            cur.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+            for statement in SCHEMA:
+                cur.execute(statement)
+
+    @contextmanager
+    def _cursor(self, name=None):
+        """
+        Cursor auf einer geliehenen Verbindung; Commit bei Erfolg, Rollback bei Fehler.
+        Mit name ein serverseitiger Cursor: Zeilen kommen erst beim fetchmany().
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise RuntimeError(f"Keine freie Datenbankverbindung nach {self.timeout:.0f} s")
+        self._record_wait(time.perf_counter() - start)
+        try:
+            conn = self._pool.getconn()
+            try:
+                with conn.cursor(name=name) as cur:
+                    yield cur
+                conn.commit()
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+            finally:
+                # Abgebrochene Verbindungen nicht zurücklegen
+                self._pool.putconn(conn, close=bool(conn.closed))
+        finally:
+            self._slots.release()
+
+    def _record_wait(self, waited):
+        with self._lock:
+            self._waits += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+    def _execute(self, cur, name, params=()):
+        """Führt ein Statement aus STATEMENTS aus; beim ersten Mal je Verbindung mit PREPARE."""
+        prepared = self._prepared.setdefault(cur.connection, set())
+        if name not in prepared:
+            types, sql = STATEMENTS[name]
+            cur.execute(f"PREPARE {name} ({types}) AS {sql}" if types else f"PREPARE {name} AS {sql}")
+            prepared.add(name)
+        cur.execute(f"EXECUTE {name} ({', '.join('%s' for _ in params)})" if params else f"EXECUTE {name}",
+                    params)
+
+    def start(self, archive_path=None, archive_after_days=None, backup_dir=None, backup_keep=None):
+        """
+        Startet den Abgleich der Dashboard-Zähler im Hintergrund. Wartung übernimmt
+        der Server (autovacuum/autoanalyze), Backups pg_dump bzw. pg_basebackup.
+        """
+        if archive_path:
+            raise ValueError("Die Archiv-Datenbank (CASE_ARCHIVE_PATH) gibt es nur mit SQLite")
+        if backup_dir:
+            raise ValueError("Online-Backups (DB_BACKUP_DIR) gibt es nur mit SQLite")
+        start_case_stats_reconciler(self, reconcile=PostgresStorage.reconcile_stats)
+        return self
+
+    def insert_case(self, timestamp, user_data, case_data, booking_data, status="Neu"):
+        with self._cursor() as cur:
+            self._execute(cur, "insert_case", (timestamp, user_data, case_data, booking_data, status))
+            return cur.fetchone()
+
+    def reserve_case_ids(self, count):
+        # Einzelne Werte der Sequenz; anders als bei SQLite nicht unbedingt lückenlos
+        with self._cursor() as cur:
+            cur.execute("SELECT nextval(pg_get_serial_sequence('cases', 'id')) FROM generate_series(1, %s)",
+                        (count,))
+            return [row[0] for row in cur.fetchall()]
+
+    def insert_reserved_cases(self, rows):
+        """Wie case_store.insert_reserved_cases: vorhandene ids werden übersprungen."""
+        with self._cursor() as cur:
+            psycopg2.extras.execute_values(
+                cur,
+                "INSERT INTO cases (id, case_identifier, timestamp, user_data, case_data, booking_data, status) "
+                "VALUES %s ON CONFLICT (id) DO NOTHING",
+                [(row_id, f"{CASE_ID_PREFIX}{row_id + CASE_ID_OFFSET}", *rest) for row_id, *rest in rows],
+                template="(%s, %s, %s, %s::jsonb, %s::jsonb, %s::jsonb, %s)", page_size=WRITE_BATCH_SIZE
+            )
+            self._execute(cur, "current_version")
+            return cur.fetchone()[0]
+
+    def update_case_status(self, case_identifier, status):
+        with self._cursor() as cur:
+            self._execute(cur, "update_status", (case_identifier, status))
+            row = cur.fetchone()
+            if row is None:
+                self._execute(cur, "current_version")
+                row = cur.fetchone()
+            return row[0]
+
+    def current_version(self):
+        with self._cursor() as cur:
+            # Höchste sichtbare Version statt last_value der Sequenz: die kann noch
+            # nicht committeten Schreibern gehören
+            self._execute(cur, "current_version")
+            return cur.fetchone()[0]
+
+    def list_cases(self, status=None, topic=None, lawyer=None, email=None, booking_time=None,
+                   date_from=None, date_to=None, cursor=None, limit=DEFAULT_PAGE_SIZE, fields=ALL_FIELDS,
+                   include_archive=False):
+        """Wie case_store.list_cases, plus Version: (Fälle, next_cursor, Version). Ohne Archiv."""
+        spec = _pg_projection(fields)
+        where, params = [], []
+        if status:
+            where.append("status = %s")
+            params.append(status)
+        for (name, sub), value in ((("case", "topic"), topic), (("booking", "lawyer"), lawyer),
+                                   (("user", "email"), email)):
+            if value:
+                where.append(f"{_json_text(name, sub)} = %s")
+                params.append(value)
+        if booking_time:
+            column = f'({_json_text("booking", "time")} COLLATE "C")'
+            where.append(f"{column} >= %s AND {column} < %s")
+            params.extend((booking_time, booking_time + "\uffff"))
+        if date_from:
+            where.append("timestamp >= %s")
+            params.append(date_from)
+        if date_to:
+            where.append("timestamp < %s")
+            params.append(date_to + "\uffff")
+        if cursor is not None:
+            where.append("id < %s")
+            params.append(int(cursor))
+        limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
+        sql = f"SELECT id, {', '.join(column for column, _, _ in spec)} FROM cases"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._cursor() as cur:
+            self._execute(cur, "current_version")
+            version = cur.fetchone()[0]
+            cur.execute(sql + " ORDER BY id DESC LIMIT %s", (*params, limit + 1))
+            rows = cur.fetchall()
+        cases = [_to_case(spec, row[1:]) for row in rows[:limit]]
+        next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+        return cases, next_cursor, version
+
+    def get_case(self, case_identifier, include_archive=False):
+        with self._cursor() as cur:
+            self._execute(cur, "get_case", (case_identifier,))
+            row = cur.fetchone()
+        return _to_case(_pg_projection(ALL_FIELDS), row) if row else None
+
+    def list_changes(self, since=0, limit=MAX_PAGE_SIZE, fields=ALL_FIELDS):
+        """Wie case_store.list_changes: (Fälle, Version, more)."""
+        spec = _pg_projection(fields)
+        limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
+        with self._cursor() as cur:
+            self._execute(cur, "current_version")
+            version = cur.fetchone()[0]
+            if since >= version:
+                return [], version, False
+            cur.execute(
+                f"SELECT change_version, {', '.join(column for column, _, _ in spec)} FROM cases "
+                "WHERE change_version > %s AND change_version <= %s ORDER BY change_version LIMIT %s",
+                (since, version, limit + 1)
+            )
+            rows = cur.fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if more:
+            version = rows[-1][0]
+        return [_to_case(spec, row[1:]) for row in rows], version, more
+
+    def search_cases(self, q, status=None, date_from=None, date_to=None, offset=0,
+                     limit=SEARCH_PAGE_SIZE, fields=LIST_FIELDS):
+        """
+        Wie case_search.search_cases, über die tsvector-Spalte: ganze Wörter zuerst,
+        sonst das letzte als Präfix; Rang (ts_rank) in Fenstern zu je RANK_WINDOW
+        Treffern, neueste zuerst. Gibt (Treffer, next_offset, True) zurück.
+        """
+        limit = min(max(int(limit), 1), MAX_SEARCH_PAGE_SIZE)
+        offset = max(int(offset), 0)
+        terms = search_terms(q)
+        where, params = "search @@ to_tsquery(%s, %s)", []
+        if status:
+            where += " AND status = %s"
+            params.append(status)
+        if date_from:
+            where += " AND timestamp >= %s"
+            params.append(date_from)
+        if date_to:
+            where += " AND timestamp < %s"
+            params.append(date_to + "\uffff")
+        spec = _pg_projection(fields)
+        headline = " || ' … ' || ".join(f"coalesce({column} ->> '{key}', '')" for column, key, _ in _SEARCH_SOURCES)
+        with self._cursor() as cur:
+            query = " & ".join(terms)
+            cur.execute(f"SELECT 1 FROM cases WHERE {where} LIMIT 1", (SEARCH_CONFIG, query, *params))
+            if cur.fetchone() is None:
+                query += ":*"
+            # Nur die Fenster bis einschließlich der angefragten Seite werden bewertet
+            windows = (offset + limit) // RANK_WINDOW + 1
+            cur.execute(
+                f"""WITH hits AS (
+                    SELECT id, search, (row_number() OVER (ORDER BY id DESC) - 1) / {RANK_WINDOW} AS window_no
+                    FROM cases WHERE {where} ORDER BY id DESC LIMIT %s
+                )
+                SELECT id, ts_rank(%s, search, to_tsquery(%s, %s)) AS rank FROM hits
+                ORDER BY window_no, rank DESC, id DESC LIMIT %s OFFSET %s""",
+                (SEARCH_CONFIG, query, *params, windows * RANK_WINDOW, SEARCH_WEIGHTS, SEARCH_CONFIG, query,
+                 limit + 1, offset)
+            )
+            hits = cur.fetchall()
+            more = len(hits) > limit
+            hits = hits[:limit]
+            if not hits:
+                return [], None, True
+            cur.execute(
+                f"""SELECT id, {', '.join(column for column, _, _ in spec)},
+                    ts_headline(%s, {headline}, to_tsquery(%s, %s), %s)
+                FROM cases WHERE id = ANY(%s)""",
+                (SEARCH_CONFIG, SEARCH_CONFIG, query,
+                 f'StartSel="{_MARK_START}", StopSel="{_MARK_END}", MaxWords={SNIPPET_TOKENS}, MinWords=4',
+                 [row_id for row_id, _ in hits])
+            )
+            rows = {row[0]: row[1:] for row in cur.fetchall()}
+        results = []
+        for row_id, rank in hits:
+            if row_id in rows:
+                case = _to_case(spec, rows[row_id][:-1])
+                case["snippet"] = _snippet_html(rows[row_id][-1])
+                # Wie bei bm25: kleiner ist besser
+                case["score"] = round(-rank, 4)
+                results.append(case)
+        return results, (offset + limit if more else None), True
+
+    def export_cases(self, fields=EXPORT_FIELDS, status=None, date_from=None, date_to=None,
+                     include_archive=False, chunk_size=EXPORT_CHUNK_SIZE):
+        """
+        Wie case_export.iter_case_chunks, über einen serverseitigen Cursor in einer
+        Lesetransaktion (konsistenter Snapshot). Belegt für die Dauer des Exports
+        eine Verbindung des Pools; beim Abbruch des Downloads wird sie zurückgegeben.
+        """
+        spec = _pg_projection(fields)
+        where, params = [], []
+        if status:
+            where.append("status = %s")
+            params.append(status)
+        if date_from:
+            where.append("timestamp >= %s")
+            params.append(date_from)
+        if date_to:
+            where.append("timestamp < %s")
+            params.append(date_to + "\uffff")
+        sql = f"SELECT {', '.join(column for column, _, _ in spec)} FROM cases"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._cursor(name="case_export") as cur:
+            cur.itersize = chunk_size
+            cur.execute(sql + " ORDER BY id", params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield [_to_case(spec, row) for row in rows]
+
+    def referenced_blobs(self, digests):
+        with self._cursor() as cur:
+            cur.execute("SELECT digest FROM blob_refs WHERE refs > 0 AND digest = ANY(%s)", (list(digests),))
+            return {row[0] for row in cur.fetchall()}
+
+    def dashboard_stats(self, day=None):
+        day = day or today_utc()
+        with self._cursor() as cur:
+            self._execute(cur, "stats_day", (day,))
+            today = cur.fetchone()
+            self._execute(cur, "stats_days", (day[:7] + "-01", day))
+            month = cur.fetchone()
+            self._execute(cur, "stats_kind", ("status",))
+            status = [(key, cases) for key, cases, _ in cur.fetchall()]
+            self._execute(cur, "stats_kind", ("lawyer",))
+            lawyers = cur.fetchall()
+        # Zähler entstehen mit der Tabelle; Bestandsdaten kamen über dieselben Trigger
+        return _stats_response(day, today, month, status, lawyers, True)
+
+    def reconcile_stats(self):
+        """
+        Wie case_stats.reconcile_case_stats: Zählen in einem REPEATABLE-READ-Snapshot,
+        danach nur die Differenz schreiben. Gibt die Zahl der korrigierten Zähler zurück.
+        """
+        keys = [key.format(ref="c") for key in _STATS_KEYS.values()]
+        with self._cursor() as cur:
+            cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            cur.execute(
+                f"SELECT {', '.join(keys)}, COUNT(*), SUM({_REVENUE.format(ref='c')}) FROM cases c "
+                f"GROUP BY {', '.join(str(i + 1) for i in range(len(keys)))}"
+            )
+            expected = _totals_from_groups(cur.fetchall())
+            cur.execute("SELECT kind, key, cases, revenue FROM case_stats")
+            stored = {(kind, key): (cases, revenue) for kind, key, cases, revenue in cur.fetchall()}
+        run = stored.pop(_RECONCILE_KEY, (0, 0))[0]
+        deltas = _stat_deltas(expected, stored)
+
+        with self._cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (WRITE_LOCK_KEY,))
+            cur.execute("SELECT cases FROM case_stats WHERE kind = %s AND key = %s", _RECONCILE_KEY)
+            current = cur.fetchone()
+            if (current[0] if current else 0) != run:
+                return 0
+            psycopg2.extras.execute_values(
+                cur,
+                "INSERT INTO case_stats (kind, key, cases, revenue) VALUES %s ON CONFLICT (kind, key) "
+                "DO UPDATE SET cases = case_stats.cases + excluded.cases, "
+                "revenue = case_stats.revenue + excluded.revenue",
+                deltas + [(*_RECONCILE_KEY, 1, 0)]
+            )
+        if deltas and run:
+            logger.warning("%d Dashboard-Zähler beim Abgleich korrigiert", len(deltas))
+        return len(deltas)
+
+    def get_user(self, email):
+        with self._cursor() as cur:
+            self._execute(cur, "get_user", (email,))
+            row = cur.fetchone()
+        return dict(zip(("id", "email", "password_hash", "role"), row)) if row else None
+
+    def add_user(self, email, password_hash, role):
+        with self._cursor() as cur:
+            cur.execute("INSERT INTO users (email, password_hash, role) VALUES (%s, %s, %s) "
+                        "ON CONFLICT (email) DO NOTHING", (email, password_hash, role))
+
+    def has_users(self):
+        with self._cursor() as cur:
+            cur.execute("SELECT 1 FROM users LIMIT 1")
+            return cur.fetchone() is not None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_connections": self.max_connections,
+                "checkouts": self._waits,
+                "wait_avg_ms": round(self._wait_total / self._waits * 1000, 3) if self._waits else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+                "timeouts": self._timeouts,
+            }
+
+    def close(self):
+        self._pool.closeall()
@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = 256
+# Höchstens so oft je Worker die Feed-Version lesen (eine Zeile), egal wie viele Dashboards pollen
+VERSION_CHECK_INTERVAL = 0.1
+# Sicherheitsnetz für Änderungen ohne neue Feed-Version (Archivierung, Zählerabgleich)
+MAX_AGE = 60.0
+
+
+def cache_key(kind, query):
+    """Hashbarer Schlüssel aus Art und Abfrage-dict; Listen (fields) werden zu Tupeln."""
+    return (kind, tuple(sorted((name, tuple(value) if isinstance(value, list) else value)
+                               for name, value in query.items())))
+
+
+class _Entry:
+    __slots__ = ("value", "version", "loaded_at", "refreshing")
+
+    def __init__(self, value, version, loaded_at):
+        self.value = value
+        self.version = version
+        self.loaded_at = loaded_at
+        self.refreshing = False
+
+
+class ReadCache:
+    """
+    Read-Through-Cache je Worker für häufig gepollte Lesezugriffe (Fallseiten,
+    Dashboard-Zahlen). Gültig ist ein Eintrag, solange die Feed-Version
+    (current_version(), bei SQLite eine Zeile in case_change_seq) nicht gestiegen
+    ist - das erkennt auch Schreibzugriffe anderer Worker und Knoten. Gelesen
+    wird sie höchstens alle check_interval Sekunden; eigene Änderungen meldet
+    observe() sofort.
+
+    Veraltete Einträge werden noch ausgeliefert und einmal im Hintergrund neu
+    geladen (stale-while-revalidate); gleichzeitige Fehlzugriffe auf denselben
+    Schlüssel warten auf eine Abfrage. Die Datenbanklast folgt damit den
+    Schreibzugriffen statt der Zahl der Dashboards. Werte werden geteilt und
+    dürfen nicht verändert werden.
+    """
+
+    def __init__(self, current_version, max_entries=MAX_ENTRIES, check_interval=VERSION_CHECK_INTERVAL,
+                 max_age=MAX_AGE, clock=time.monotonic, spawn=None):
+        self._current_version = current_version
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._clock = clock
+        self._spawn = spawn or (lambda target: threading.Thread(
+            target=target, name="read-cache-refresh", daemon=True).start())
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._loading = {}          # Schlüssel -> Event, solange eine Abfrage läuft
+        self._version = None
+        self._checked_at = None
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._refreshes = 0
+        self._errors = 0
+
+    def observe(self, version):
+        """Neue Feed-Version, z.B. nach einer eigenen Buchung - ohne Datenbankabfrage."""
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._version = version
+
+    def _known_version(self):
+        now = self._clock()
+        with self._lock:
+            if (self._version is not None and self._checked_at is not None
+                    and now - self._checked_at < self.check_interval):
+                return self._version
+            # Nur ein Thread liest; die übrigen nehmen bis dahin die bekannte Version
+            self._checked_at = now
+        try:
+            self.observe(self._current_version())
+        except Exception:
+            with self._lock:
+                self._checked_at = None
+            raise
+        with self._lock:
+            return self._version
+
+    def get(self, key, loader):
+        """Wert für key aus dem Cache oder über loader() (ohne Argumente)."""
+        version = self._known_version()
+        now = self._clock()
+        value, stale, refresh, waiting = None, False, False, None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.loaded_at < self.max_age:
+                self._entries.move_to_end(key)
+                if entry.version >= version:
+                    self._hits += 1
+                    return entry.value
+                self._stale_hits += 1
+                value, stale = entry.value, True
+                if not entry.refreshing:
+                    entry.refreshing = refresh = True
+            else:
+                waiting = self._loading.get(key)
+                if waiting is None:
+                    self._loading[key] = threading.Event()
+                    self._misses += 1
+                else:
+                    self._coalesced += 1
+        if stale:
+            if refresh:
+                self._spawn(lambda: self._refresh(key, loader))
+            return value
+        if waiting is not None:
+            waiting.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+            # Abfrage des anderen Threads fehlgeschlagen: selbst laden
+            return entry.value if entry is not None else loader()
+        try:
+            return self._load(key, loader, version)
+        finally:
+            with self._lock:
+                self._loading.pop(key).set()
+
+    def _load(self, key, loader, version):
+        # version stammt von vor der Abfrage: eine gleichzeitige Änderung macht den Eintrag veraltet
+        value = loader()
+        with self._lock:
+            self._entries[key] = _Entry(value, version, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def _refresh(self, key, loader):
+        try:
+            self._load(key, loader, self._known_version())
+            with self._lock:
+                self._refreshes += 1
+        except Exception:
+            logger.exception("Cache-Eintrag %s konnte nicht neu geladen werden", key[0])
+            with self._lock:
+                self._errors += 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            served = self._hits + self._stale_hits + self._coalesced
+            total = served + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "coalesced": self._coalesced,
+                "misses": self._misses,
+                "refreshes": self._refreshes,
+                "errors": self._errors,
+                "hit_rate": round(served / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,185 @@
+import html
+import math
+import re
+from functools import lru_cache
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+WORD_PATTERN = re.compile(r"\w+")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?;])\s+")
+
+FOLDING = (("ä", "a"), ("ö", "o"), ("ü", "u"), ("ß", "ss"),
+           ("ae", "a"), ("oe", "o"), ("ue", "u"))
+
+STOPWORDS = frozenset("""
+aber alle allem allen aller alles als also am an ander andere anderen auch auf aus bei bin bis
+bist da damit dann das dass dein deine dem den der des dessen die dies diese diesem diesen dieser
+dieses doch dort du durch ein eine einem einen einer eines er es etwas fur gegen hab habe haben hat
+hatte ich ihr ihre ihrem ihren ihrer im in ist ja jede jedem jeden jeder jedes kann kein keine
+keinem keinen man mein meine mich mir mit muss nach nicht nichts noch nur ob oder ohne sehr sein
+seine sich sie sind so soll sollte sondern um und uns unser unter vom von vor war waren was weil
+welche wenn wer werden wie wir wird wo zu zum zur uber bzw z b
+""".split())
+
+# Gewichtung der Felder (BM25F)
+FIELD_BOOSTS = {
+    "Thema": 3.0,
+    "KI-Einschätzung": 1.0,
+    "Professionelle Analyse": 1.2,
+    "Gerichtsurteile": 1.5
+}
+DEFAULT_BOOST = 1.0
+
+
+def fold(text):
+    text = text.lower()
+    for src, dst in FOLDING:
+        text = text.replace(src, dst)
+    return text
+
+
+def stem(token):
+    """Leichter deutscher Stemmer (angelehnt an CISTEM)."""
+    while len(token) > 3:
+        if len(token) > 5 and token[-2:] in ("em", "er", "nd"):
+            token = token[:-2]
+        elif len(token) > 4 and token[-1] in "tesn":
+            token = token[:-1]
+        else:
+            break
+    return token
+
+
+@lru_cache(maxsize=65536)
+def _analyze_word(word):
+    terms = analyze(word)
+    return terms[0] if terms else None
+
+
+def analyze(text):
+    """Zerlegt Text in normalisierte Suchterme (Faltung, Stoppwörter, Stemming)."""
+    return [stem(t) for t in TOKEN_PATTERN.findall(fold(text)) if t not in STOPWORDS]
+
+
+def _field_text(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+class SearchIndex:
+    """
+    Invertierter Index über alle Felder der Wissensdatenbank mit BM25F-Ranking.
+    Die Beiträge je Term und Dokument werden beim Aufbau vorberechnet und je Term
+    als NumPy-Arrays abgelegt, sodass eine Anfrage nur noch die Postings der
+    Suchterme vektorisiert aufsummiert.
+    """
+
+    def __init__(self, wissen, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.topics = list(wissen.keys())
+        self._fields = []       # je Dokument: [(Feldname, Originaltext)]
+        self._sentences = []    # je Dokument: [(Feldname, Satz, Termmenge)]
+        self.postings = {}
+        self._build(wissen)
+
+    def _build(self, wissen):
+        field_lengths = {}
+        doc_field_tf = []
+        for topic in self.topics:
+            fields = [("Thema", topic)] + [
+                (name, _field_text(value)) for name, value in wissen[topic].items()
+            ]
+            self._fields.append(fields)
+            tf_by_field = {}
+            sentences = []
+            for name, text in fields:
+                terms = analyze(text)
+                field_lengths.setdefault(name, []).append(len(terms))
+                counts = tf_by_field.setdefault(name, {})
+                for term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+                if name != "Thema":
+                    for sentence in SENTENCE_PATTERN.split(text):
+                        sentences.append((name, sentence, frozenset(analyze(sentence))))
+            self._sentences.append(sentences)
+            doc_field_tf.append(tf_by_field)
+
+        avg_length = {name: (sum(lengths) / len(lengths)) or 1.0 for name, lengths in field_lengths.items()}
+        doc_freq = {}
+        weighted_tf = []
+        for tf_by_field in doc_field_tf:
+            combined = {}
+            for name, counts in tf_by_field.items():
+                length = sum(counts.values())
+                norm = 1 - self.b + self.b * length / avg_length[name]
+                boost = FIELD_BOOSTS.get(name, DEFAULT_BOOST)
+                for term, tf in counts.items():
+                    combined[term] = combined.get(term, 0.0) + boost * tf / norm
+            for term in combined:
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+            weighted_tf.append(combined)
+
+        n = len(self.topics)
+        postings = {}
+        for doc_id, combined in enumerate(weighted_tf):
+            for term, tf in combined.items():
+                idf = math.log(1 + (n - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                postings.setdefault(term, []).append((doc_id, idf * tf / (self.k1 + tf)))
+        # Term -> (Dokument-IDs, Beiträge)
+        self.postings = {
+            term: (np.array([d for d, _ in entries], dtype=np.intp), np.array([s for _, s in entries]))
+            for term, entries in postings.items()
+        }
+
+    def search(self, query, limit=10):
+        terms = set(analyze(query))
+        scores = np.zeros(len(self.topics))
+        for term in terms:
+            if term in self.postings:
+                doc_ids, contributions = self.postings[term]
+                scores[doc_ids] += contributions
+        # Beiträge sind positiv: Score 0 heißt kein Treffer
+        hits = np.flatnonzero(scores)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+        # Absteigend nach Score, bei Gleichstand das frühere Thema zuerst
+        ranked = hits[np.lexsort((hits, -scores[hits]))]
+        return [
+            {
+                "topic": self.topics[doc_id],
+                "score": round(float(scores[doc_id]), 4),
+                **self._snippet(doc_id, terms)
+            }
+            for doc_id in ranked.tolist()
+        ]
+
+    def _snippet(self, doc_id, terms):
+        best, best_hits = None, 0
+        for name, sentence, sentence_terms in self._sentences[doc_id]:
+            hits = len(terms & sentence_terms)
+            if hits > best_hits:
+                best, best_hits = (name, sentence), hits
+        if best is None:
+            # Treffer nur im Thema: Anfang der Kurzeinschätzung anzeigen
+            name, text = self._fields[doc_id][1] if len(self._fields[doc_id]) > 1 else self._fields[doc_id][0]
+            best = (name, SENTENCE_PATTERN.split(text)[0])
+        return {"field": best[0], "snippet": highlight(best[1], terms)}
+
+
+def highlight(text, terms):
+    """Markiert Wörter, deren Suchterm in terms enthalten ist (HTML-escaped)."""
+    parts = []
+    last = 0
+    for match in WORD_PATTERN.finditer(text):
+        parts.append(html.escape(text[last:match.start()]))
+        word = match.group(0)
+        if _analyze_word(word) in terms:
+            parts.append(f"<mark>{html.escape(word)}</mark>")
+        else:
+            parts.append(html.escape(word))
+        last = match.end()
+    parts.append(html.escape(text[last:]))
+    return "".join(parts)
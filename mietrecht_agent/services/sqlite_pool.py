@@ -0,0 +1,204 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Wartezeit auf Sperren, bevor SQLite "database is locked" meldet
+BUSY_TIMEOUT = 5.0
+# Vorbereitete Statements je Verbindung (sqlite3-Standard: 128)
+STATEMENT_CACHE_SIZE = 256
+MAX_IDLE_CONNECTIONS = 8
+# Schreibsperren, auf die länger gewartet wurde, werden protokolliert
+SLOW_LOCK_WAIT = 0.1
+
+# WAL: Leser blockieren Schreiber nicht mehr; synchronous=NORMAL ist in WAL
+# absturzsicher (nur die letzten Commits können bei Stromausfall fehlen)
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -16000),         # KiB, also ca. 16 MB Seitencache je Verbindung
+    ("mmap_size", 268435456),       # 256 MB
+    ("temp_store", "MEMORY"),
+    # WAL-Datei nach einem vollständigen Checkpoint auf höchstens 64 MB kürzen
+    ("journal_size_limit", 67108864),
+)
+
+
+class ConnectionPool:
+    """
+    Wiederverwendbare SQLite-Verbindungen je Datenbank und Worker-Prozess.
+    Verbindungen werden beim Ausleihen exklusiv an einen Thread gegeben und danach
+    zurückgelegt - so profitieren auch Server mit einem Thread je Request vom
+    Statement-Cache. Nach fork() (neuer gunicorn-Worker) beginnt der Pool leer.
+
+        with pool.connection() as conn:   # Lesen; Commit/Rollback wie sqlite3
+        with pool.write() as conn:        # Schreiben mit BEGIN IMMEDIATE + Messung
+
+    Mit attach() angehängte Datenbanken (z.B. das Fall-Archiv) sind auf jeder
+    Verbindung des Pools unter ihrem Alias verfügbar.
+    """
+
+    def __init__(self, db_path, max_idle=MAX_IDLE_CONNECTIONS, timeout=BUSY_TIMEOUT,
+                 cached_statements=STATEMENT_CACHE_SIZE, pragmas=PRAGMAS):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.pragmas = pragmas
+        self._lock = threading.Lock()
+        # Schreiber eines Prozesses warten in einer Schlange statt im Busy-Handler
+        # von SQLite, der mit wachsenden Pausen (bis 100 ms) erneut versucht
+        self._write_lock = threading.Lock()
+        self._idle = []
+        self._attached = {}
+        # Verbindungen, die vor dem letzten attach() geöffnet wurden, werden verworfen
+        self._generation = 0
+        self._generations = {}
+        self._pid = os.getpid()
+        self._opened = 0
+        self._lock_waits = 0
+        self._lock_wait_total = 0.0
+        self._lock_wait_max = 0.0
+        self._slow_lock_waits = 0
+        self._busy_errors = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.timeout, cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        for name, value in self.pragmas:
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            attached, generation = dict(self._attached), self._generation
+        for alias, path in attached.items():
+            conn.execute("ATTACH DATABASE ? AS " + alias, (path,))
+        with self._lock:
+            self._generations[conn] = generation
+        return conn
+
+    def _acquire(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Geerbte Verbindungen gehören dem Elternprozess und dürfen nicht benutzt werden
+                self._idle, self._pid, self._opened, self._generations = [], os.getpid(), 0, {}
+            if self._idle:
+                return self._idle.pop()
+            self._opened += 1
+        return self._connect()
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            current = self._generations.get(conn) == self._generation
+            if self._pid == os.getpid() and current and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self._generations.pop(conn, None)
+            self._opened -= 1
+        conn.close()
+
+    def attach(self, alias, path):
+        """Hängt path als alias an alle künftig ausgeliehenen Verbindungen an (ATTACH DATABASE)."""
+        if not alias.isidentifier():
+            raise ValueError(f"Ungültiger Alias: {alias}")
+        with self._lock:
+            self._attached[alias] = path
+            self._generation += 1
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            for conn in idle:
+                self._generations.pop(conn, None)
+        for conn in idle:
+            conn.close()
+
+    def attached(self, alias):
+        with self._lock:
+            return alias in self._attached
+
+    @contextmanager
+    def connection(self):
+        """Leiht eine Verbindung aus; Commit bei Erfolg, Rollback bei Fehler."""
+        conn = self._acquire()
+        try:
+            with conn:
+                yield conn
+        except sqlite3.OperationalError as e:
+            self._count_busy(e)
+            raise
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def write(self):
+        """
+        Schreibtransaktion: BEGIN IMMEDIATE holt die Schreibsperre sofort, die Wartezeit
+        darauf (prozessintern und in SQLite) wird gemessen. Commit am Ende, Rollback bei Fehler.
+        """
+        conn = self._acquire()
+        start = time.perf_counter()
+        try:
+            with self._write_lock:
+                conn.execute("BEGIN IMMEDIATE")
+                self._record_lock_wait(time.perf_counter() - start)
+                with conn:
+                    yield conn
+        except sqlite3.OperationalError as e:
+            self._count_busy(e)
+            raise
+        finally:
+            self._release(conn)
+
+    def _record_lock_wait(self, waited):
+        with self._lock:
+            self._lock_waits += 1
+            self._lock_wait_total += waited
+            self._lock_wait_max = max(self._lock_wait_max, waited)
+            if waited >= SLOW_LOCK_WAIT:
+                self._slow_lock_waits += 1
+        if waited >= SLOW_LOCK_WAIT:
+            logger.warning("Schreibsperre auf %s erst nach %.0f ms erhalten", self.db_path, waited * 1000)
+
+    def _count_busy(self, error):
+        if "locked" in str(error) or "busy" in str(error):
+            with self._lock:
+                self._busy_errors += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "connections": self._opened,
+                "idle": len(self._idle),
+                "writes": self._lock_waits,
+                "lock_wait_avg_ms": round(self._lock_wait_total / self._lock_waits * 1000, 3) if self._lock_waits else 0.0,
+                "lock_wait_max_ms": round(self._lock_wait_max * 1000, 3),
+                "slow_lock_waits": self._slow_lock_waits,
+                "busy_errors": self._busy_errors,
+            }
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            for conn in idle:
+                self._generations.pop(conn, None)
+        for conn in idle:
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path):
+    """Gemeinsamer Pool je Datenbankdatei, damit alle Dienste eines Workers ihn teilen."""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(db_path)
+        return _pools[key]
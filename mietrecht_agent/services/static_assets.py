@@ -0,0 +1,252 @@
+"""
+Build und Auslieferung der Oberfläche (Startseite, Anwalts-Dashboard). Die
+Quellen liegen in frontend/, je Seite <name>.html, <name>.css und <name>.js.
+Die HTML-Datei lädt Tailwind vom CDN und ihre Dateien über /assets/<datei>;
+so läuft sie auch ohne Build (Entwicklung).
+
+build_bundle() (scripts/build_assets.py) schreibt nach static/dist/:
+    - je Seite ein CSS aus der Tailwind-CLI mit nur den Klassen, die in HTML
+      und JS der Seite vorkommen, plus dem Seiten-CSS; das CDN-Skript entfällt
+    - Dateinamen mit Inhalts-Hash (home.3f2a9c1b7d4e.js), die Verweise im
+      HTML werden umgeschrieben
+    - .gz und (mit dem Paket brotli) .br neben jeder Datei
+    - manifest.json mit Seiten, ETags und Varianten
+
+AssetBundle lädt den Build beim Start in den Speicher; eine Anfrage ist ein
+Dict-Lookup. Gehashte Dateien sind ein Jahr immutable, die Seiten selbst
+werden über das ETag revalidiert (304). Ohne Build werden die Quellen
+ungehasht und mit no-cache ausgeliefert.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+import tempfile
+
+from .topic_cache import BROTLI_QUALITY, GZIP_LEVEL, _accepted_encodings, _etag_matches, brotli
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+DEFAULT_SOURCE_DIR = os.path.join(_ROOT, "frontend")
+DEFAULT_BUILD_DIR = os.path.join(_ROOT, "static", "dist")
+MANIFEST_NAME = "manifest.json"
+PAGES = ("home", "lawyer")
+HASH_LENGTH = 12
+# Gehashte Dateien ändern nie ihren Inhalt; Seiten bei jedem Aufruf revalidieren
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PAGE_CACHE_CONTROL = "no-cache"
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+}
+COMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+TAILWIND_CDN = re.compile(r'[ \t]*<script src="https://cdn\.tailwindcss\.com"></script>\n?')
+TAILWIND_DIRECTIVES = "@tailwind base;\n@tailwind components;\n@tailwind utilities;\n"
+_ASSET_REF = re.compile(r'(?:href|src)="/assets/([\w.-]+)"')
+_IMPORT = re.compile(r"^@import [^;]+;\n?", re.M)
+
+
+def hashed_name(name, content):
+    """home.js -> home.<Hash>.js"""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def run_tailwind(command, css, content_files, workdir):
+    """
+    Tailwind-CLI (v3) über css: Preflight, nur die in content_files benutzten
+    Utilities und danach css, minifiziert. @import-Zeilen wandern nach oben,
+    weil sie nur am Anfang eines Stylesheets gelten.
+    """
+    source = os.path.join(workdir, "input.css")
+    output = os.path.join(workdir, "output.css")
+    with open(source, "w", encoding="utf-8") as f:
+        f.write("".join(_IMPORT.findall(css)) + TAILWIND_DIRECTIVES + _IMPORT.sub("", css))
+    try:
+        subprocess.run(
+            [*command, "-i", source, "-o", output, "--content", ",".join(content_files), "--minify"],
+            check=True, capture_output=True, text=True
+        )
+    except FileNotFoundError:
+        raise RuntimeError(f"Tailwind-CLI nicht gefunden: {command[0]}")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Tailwind-CLI fehlgeschlagen: {e.stderr.strip()}")
+    with open(output, "rb") as f:
+        return f.read()
+
+
+def _write_file(build_dir, name, content):
+    """Schreibt content und die komprimierten Varianten; gibt den Manifest-Eintrag zurück."""
+    variants = {None: content, "gzip": gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(content, quality=BROTLI_QUALITY)
+    encodings = []
+    for encoding, body in variants.items():
+        if encoding and len(body) >= len(content):
+            continue
+        path = os.path.join(build_dir, name + COMPRESSED_SUFFIXES.get(encoding, ""))
+        with open(path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+        if encoding:
+            encodings.append(encoding)
+    return {"etag": hashlib.sha256(content).hexdigest()[:20], "size": len(content), "encodings": sorted(encodings)}
+
+
+def _prune_build(build_dir, keep):
+    """Löscht Dateien, die weder im neuen noch im vorigen Build vorkommen."""
+    keep = {name + suffix for name in keep for suffix in ("", *COMPRESSED_SUFFIXES.values())}
+    keep.add(MANIFEST_NAME)
+    removed = 0
+    for name in os.listdir(build_dir):
+        if name not in keep:
+            os.remove(os.path.join(build_dir, name))
+            removed += 1
+    return removed
+
+
+def build_bundle(source_dir=DEFAULT_SOURCE_DIR, build_dir=DEFAULT_BUILD_DIR, tailwind=None, pages=PAGES):
+    """
+    Baut die Seiten aus source_dir nach build_dir und gibt das Manifest zurück.
+    tailwind: Aufruf der Tailwind-CLI als Liste (["tailwindcss"],
+    ["npx", "tailwindcss"]); None behält das CDN-Skript in den Seiten.
+    Dateien des vorigen Builds bleiben liegen, damit Clients mit der alten
+    Seite deren Assets während eines Deployments noch laden können.
+    """
+    os.makedirs(build_dir, exist_ok=True)
+    manifest_path = os.path.join(build_dir, MANIFEST_NAME)
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f).get("files", {})
+
+    files, page_files = {}, {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for page in pages:
+            html_path = os.path.join(source_dir, f"{page}.html")
+            with open(html_path, encoding="utf-8") as f:
+                html = f.read()
+            refs = list(dict.fromkeys(_ASSET_REF.findall(html)))
+            scripts = [os.path.join(source_dir, ref) for ref in refs if ref.endswith(".js")]
+            for ref in refs:
+                with open(os.path.join(source_dir, ref), "rb") as f:
+                    content = f.read()
+                if tailwind and ref.endswith(".css"):
+                    content = run_tailwind(tailwind, content.decode("utf-8"), [html_path, *scripts], workdir)
+                name = hashed_name(ref, content)
+                files[name] = _write_file(build_dir, name, content)
+                html = html.replace(f'"/assets/{ref}"', f'"/assets/{name}"')
+            if tailwind:
+                html = TAILWIND_CDN.sub("", html)
+            page_files[page] = f"{page}.html"
+            files[page_files[page]] = _write_file(build_dir, page_files[page], html.encode("utf-8"))
+
+    manifest = {"pages": page_files, "files": files, "tailwind": bool(tailwind)}
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    manifest["removed"] = _prune_build(build_dir, set(files) | set(previous))
+    return manifest
+
+
+class StaticFile:
+    """Datei mit ihren komprimierten Varianten im Speicher und starken ETags je Variante."""
+
+    def __init__(self, name, variants, etag, cache_control):
+        self.name = name
+        self.content_type = CONTENT_TYPES.get(os.path.splitext(name)[1], "application/octet-stream")
+        self.cache_control = cache_control
+        self.variants = {None: (variants[None], f'"{etag}"')}
+        for encoding, body in variants.items():
+            if encoding:
+                self.variants[encoding] = (body, f'"{etag}-{COMPRESSED_SUFFIXES[encoding][1:]}"')
+        self.etags = {tag for _, tag in self.variants.values()}
+
+    @classmethod
+    def load(cls, build_dir, name, info, cache_control):
+        variants = {}
+        for encoding in (None, *info["encodings"]):
+            with open(os.path.join(build_dir, name + COMPRESSED_SUFFIXES.get(encoding, "")), "rb") as f:
+                variants[encoding] = f.read()
+        return cls(name, variants, info["etag"], cache_control)
+
+    @property
+    def size(self):
+        return len(self.variants[None][0])
+
+    def respond(self, if_none_match=None, accept_encoding=None):
+        """Gibt (Status, Body, Header) passend zu den Request-Headern zurück."""
+        accepted = _accepted_encodings(accept_encoding)
+        encoding = next((e for e in ("br", "gzip") if e in self.variants and e in accepted), None)
+        body, etag = self.variants[encoding]
+        headers = {"ETag": etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if _etag_matches(if_none_match, self.etags):
+            return 304, b"", headers
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return 200, body, headers
+
+
+class AssetBundle:
+    """
+    Seiten und Assets aus dem Build in build_dir (siehe build_bundle). Fehlt
+    der Build, werden die Quellen aus source_dir bei jedem Aufruf gelesen und
+    ohne Kompression, mit no-cache ausgeliefert.
+    """
+
+    def __init__(self, build_dir=DEFAULT_BUILD_DIR, source_dir=DEFAULT_SOURCE_DIR):
+        self.build_dir = build_dir
+        self.source_dir = source_dir
+        self._pages, self._files, self.tailwind = {}, {}, False
+        manifest_path = os.path.join(build_dir, MANIFEST_NAME)
+        self.built = os.path.exists(manifest_path)
+        if not self.built:
+            logger.warning("Kein Asset-Build in %s - Quellen aus %s werden ungehasht ausgeliefert",
+                           build_dir, source_dir)
+            return
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        self._pages = manifest["pages"]
+        self.tailwind = manifest.get("tailwind", False)
+        page_files = set(self._pages.values())
+        for name, info in manifest["files"].items():
+            cache_control = PAGE_CACHE_CONTROL if name in page_files else ASSET_CACHE_CONTROL
+            self._files[name] = StaticFile.load(build_dir, name, info, cache_control)
+
+    def page(self, name):
+        if self.built:
+            return self._files.get(self._pages.get(name))
+        return self._source(f"{name}.html")
+
+    def asset(self, filename):
+        """Gehashte Datei unter /assets/; Seiten gibt es nur über ihre Route (nicht immutable)."""
+        if self.built:
+            if filename in self._pages.values():
+                return None
+            return self._files.get(filename)
+        if filename.endswith(".html"):
+            return None
+        return self._source(filename)
+
+    def _source(self, filename):
+        if os.path.basename(filename) != filename:
+            return None
+        try:
+            with open(os.path.join(self.source_dir, filename), "rb") as f:
+                content = f.read()
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+        return StaticFile(filename, {None: content}, hashlib.sha256(content).hexdigest()[:20], PAGE_CACHE_CONTROL)
+
+    def stats(self):
+        return {
+            "built": self.built,
+            "tailwind_purged": self.tailwind,
+            "files": len(self._files),
+            "bytes": sum(f.size for f in self._files.values()),
+        }
@@ -0,0 +1,173 @@
+"""
+Persistenz für Fälle und Benutzer hinter einer gemeinsamen Schnittstelle. Treiber:
+SQLiteStorage (Standard, eine Datei je Knoten) und PostgresStorage (siehe
+postgres_storage, mehrere App-Knoten teilen sich eine Datenbank). Beide bieten:
+
+    start(archive_path=None, archive_after_days=..., backup_dir=None, backup_keep=...)
+                                                       Hintergrundjobs starten
+    insert_case(timestamp, user_data, case_data, booking_data, status="Neu")
+                                                       -> (Aktenzeichen, Version)
+    reserve_case_ids(count), insert_reserved_cases(rows)
+                                                       -> ids bzw. Version (Write-Behind)
+    update_case_status(case_identifier, status)        -> Version
+    current_version(), list_cases(**query), get_case(case_identifier, include_archive),
+    list_changes(**query), search_cases(**query), dashboard_stats(day)
+    export_cases(**query)                              -> Blöcke von Fällen (Streaming-Export)
+    referenced_blobs(digests)                          -> Hashes mit Verweis aus einem Fall
+    get_user(email), add_user(email, password_hash, role), has_users()
+    stats(), close()
+
+JSON-Spalten werden als JSON-Text übergeben; Fälle kommen als dict zurück, im
+selben Format wie bei case_store.
+"""
+from .case_store import (
+    insert_case, insert_reserved_cases, reserve_case_ids, ensure_case_schema, list_cases, get_case,
+    current_version, list_changes, start_case_fields_backfill
+)
+from .case_archive import start_case_archiver, ARCHIVE_AFTER_DAYS
+from .case_search import ensure_case_search_schema, start_case_search_backfill, search_cases, case_search_ready
+from .case_stats import ensure_case_stats_schema, start_case_stats_reconciler, dashboard_stats
+from .case_export import iter_case_chunks
+from .blob_store import ensure_blob_refs_schema, referenced_blobs
+from .db_maintenance import ensure_maintenance_schema, maintenance_stats, start_db_maintenance, BACKUP_KEEP
+from .postgres_storage import PostgresStorage
+from .sqlite_pool import get_pool
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS cases (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        case_identifier TEXT UNIQUE,
+        timestamp TEXT,
+        user_data TEXT,
+        case_data TEXT,
+        booking_data TEXT,
+        status TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT UNIQUE,
+        password_hash TEXT,
+        role TEXT
+    )""",
+)
+
+
+class SQLiteStorage:
+    """
+    Fälle in einer SQLite-Datei über den gemeinsamen Verbindungspool. Nur hier:
+    Archiv-Datenbank (ATTACH) und FTS5-Suche; das Schreiben serialisiert SQLite
+    auf einen Schreiber je Datei.
+    """
+
+    def __init__(self, db_path, pool=None):
+        self.db_path = db_path
+        self.pool = pool or get_pool(db_path)
+        with self.pool.connection() as conn:
+            ensure_maintenance_schema(conn)
+            for statement in SCHEMA:
+                conn.execute(statement)
+            ensure_case_schema(conn)
+            ensure_case_search_schema(conn)
+            ensure_case_stats_schema(conn)
+            ensure_blob_refs_schema(conn)
+
+    def start(self, archive_path=None, archive_after_days=ARCHIVE_AFTER_DAYS, backup_dir=None,
+              backup_keep=BACKUP_KEEP):
+        """
+        Backfills, Abgleich der Dashboard-Zähler, Datenbankwartung (Checkpoints,
+        ANALYZE, VACUUM, mit backup_dir auch Online-Backups) und ggf. den
+        Archivierer im Hintergrund starten.
+        """
+        start_case_fields_backfill(self.pool)
+        start_case_search_backfill(self.pool)
+        start_case_stats_reconciler(self.pool)
+        if archive_path:
+            start_case_archiver(self.pool, archive_path, archive_after_days)
+        start_db_maintenance(self.pool, backup_dir, backup_keep)
+        return self
+
+    def insert_case(self, timestamp, user_data, case_data, booking_data, status="Neu"):
+        with self.pool.write() as conn:
+            case_identifier = insert_case(conn, timestamp, user_data, case_data, booking_data, status)
+            return case_identifier, current_version(conn)
+
+    def reserve_case_ids(self, count):
+        with self.pool.write() as conn:
+            first = reserve_case_ids(conn, count)
+        return range(first, first + count)
+
+    def insert_reserved_cases(self, rows):
+        with self.pool.write() as conn:
+            insert_reserved_cases(conn, rows)
+            return current_version(conn)
+
+    def update_case_status(self, case_identifier, status):
+        with self.pool.write() as conn:
+            conn.execute("UPDATE cases SET status = ? WHERE case_identifier = ?", (status, case_identifier))
+            return current_version(conn)
+
+    def current_version(self):
+        with self.pool.connection() as conn:
+            return current_version(conn)
+
+    def list_cases(self, **query):
+        """Seite von Fällen, siehe case_store.list_cases: (Fälle, next_cursor, Version)."""
+        with self.pool.connection() as conn:
+            # Version vor der Liste lesen: spätere Änderungen liefert list_changes
+            version = current_version(conn)
+            cases, next_cursor = list_cases(conn, **query)
+            return cases, next_cursor, version
+
+    def get_case(self, case_identifier, include_archive=False):
+        with self.pool.connection() as conn:
+            return get_case(conn, case_identifier, include_archive)
+
+    def list_changes(self, **query):
+        with self.pool.connection() as conn:
+            return list_changes(conn, **query)
+
+    def search_cases(self, **query):
+        """Volltextsuche, siehe case_search.search_cases: (Treffer, next_offset, Index vollständig)."""
+        with self.pool.connection() as conn:
+            cases, next_offset = search_cases(conn, **query)
+            return cases, next_offset, case_search_ready(conn)
+
+    def dashboard_stats(self, day=None):
+        with self.pool.connection() as conn:
+            return dashboard_stats(conn, day)
+
+    def export_cases(self, **query):
+        """Alle passenden Fälle in Blöcken, siehe case_export.iter_case_chunks."""
+        return iter_case_chunks(self.pool, **query)
+
+    def referenced_blobs(self, digests):
+        """Dokument-Hashes aus digests, auf die ein Fall verweist (Müllabfuhr des Dokumentenspeichers)."""
+        with self.pool.connection() as conn:
+            return referenced_blobs(conn, digests)
+
+    def get_user(self, email):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT id, email, password_hash, role FROM users WHERE email = ?", (email,)).fetchone()
+        return dict(zip(("id", "email", "password_hash", "role"), row)) if row else None
+
+    def add_user(self, email, password_hash, role):
+        with self.pool.write() as conn:
+            conn.execute("INSERT OR IGNORE INTO users (email, password_hash, role) VALUES (?, ?, ?)",
+                         (email, password_hash, role))
+
+    def has_users(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is not None
+
+    def stats(self):
+        return {**self.pool.stats(), "maintenance": maintenance_stats(self.pool)}
+
+    def close(self):
+        self.pool.close()
+
+
+def storage_from_config(database_url, db_path):
+    """PostgreSQL bei postgres(ql)://-URL, sonst die SQLite-Datei db_path."""
+    if database_url and database_url.startswith(("postgres://", "postgresql://")):
+        return PostgresStorage(database_url)
+    return SQLiteStorage(db_path)
@@ -0,0 +1,76 @@
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+
+from .search_service import fold
+
+WORD_START = re.compile(r"(?<![\w§/])[\w§]")
+# Obergrenze der untersuchten Schlüssel je Anfrage (sehr kurze Präfixe)
+MAX_SCAN = 2000
+MAX_QUERY_LENGTH = 100
+
+# Grundgewicht je Eintragsart; Auswahlzähler kommen logarithmisch hinzu
+BASE_WEIGHTS = {"topic": 3.0, "question": 2.0, "aktenzeichen": 1.0, "norm": 1.0}
+FULL_PREFIX_BONUS = 0.5
+
+
+def _normalize(text):
+    return " ".join(fold(text).split())
+
+
+class SuggestIndex:
+    """
+    Vorschläge für die Eingabezeile aus Themen, häufigen Fragen, Normen und Aktenzeichen.
+    Jeder Wortanfang eines Eintrags ist ein Schlüssel in einem sortierten Array;
+    ein Präfix ist damit eine Binärsuche plus ein Scan über die Treffer.
+    """
+
+    def __init__(self, wissen, fragen=None, citation_graph=None):
+        self.entries = []       # (Text, Art, Ziel-Thema)
+        for topic in wissen:
+            self.entries.append((topic, "topic", topic))
+        for topic, questions in (fragen or {}).items():
+            if topic in wissen:
+                self.entries.extend((question, "question", topic) for question in questions)
+        if citation_graph is not None:
+            for label in citation_graph.labels:
+                info = citation_graph.lookup(label)
+                if info and info["topics"]:
+                    self.entries.append((info["citation"], info["kind"], info["topics"][0]))
+        self._by_text = {text: i for i, (text, _, _) in enumerate(self.entries)}
+
+        keys = []
+        for entry_id, (text, _, _) in enumerate(self.entries):
+            normalized = _normalize(text)
+            for match in WORD_START.finditer(normalized):
+                keys.append((normalized[match.start():], entry_id, match.start() == 0))
+        keys.sort()
+        self._keys = [key for key, _, _ in keys]
+        self._entry_ids = array("i", (entry_id for _, entry_id, _ in keys))
+        self._full = array("b", (full for _, _, full in keys))
+
+    def __contains__(self, text):
+        return text in self._by_text
+
+    def suggest(self, query, limit=8, popularity=None):
+        """Gibt [{"text", "kind", "topic"}] nach Gewicht und Auswahlhäufigkeit zurück."""
+        prefix = _normalize(query[:MAX_QUERY_LENGTH])
+        if not prefix:
+            return []
+        lo = bisect_left(self._keys, prefix)
+        hi = min(bisect_left(self._keys, prefix + "\uffff", lo), lo + MAX_SCAN)
+        popularity = popularity or {}
+        scores = {}
+        for i in range(lo, hi):
+            entry_id = self._entry_ids[i]
+            text, kind, _ = self.entries[entry_id]
+            score = BASE_WEIGHTS[kind] + math.log1p(popularity.get(text, 0)) + (FULL_PREFIX_BONUS if self._full[i] else 0.0)
+            if score > scores.get(entry_id, 0.0):
+                scores[entry_id] = score
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -len(self.entries[item[0]][0])))
+        return [
+            {"text": self.entries[entry_id][0], "kind": self.entries[entry_id][1], "topic": self.entries[entry_id][2]}
+            for entry_id, _ in ranked
+        ]
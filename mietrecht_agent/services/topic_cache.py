@@ -0,0 +1,100 @@
+import gzip
+import hashlib
+import json
+import unicodedata
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Die Wissensbasis lädt im laufenden Betrieb neu (hot reload): Clients dürfen die Antwort
+# speichern, fragen aber jedes Mal per If-None-Match nach (304 ohne Body, solange das ETag passt)
+CACHE_CONTROL = "no-cache"
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def normalize_topic(name):
+    """Schlüssel für die Themensuche: NFC-normalisiert und ohne Groß-/Kleinschreibung."""
+    return unicodedata.normalize("NFC", name).casefold()
+
+
+def _accepted_encodings(accept_encoding):
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def _etag_matches(if_none_match, etags):
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
+
+
+class CachedResponse:
+    """Vorab serialisierte JSON-Antwort mit komprimierten Varianten und starken ETags."""
+
+    def __init__(self, payload):
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        self.variants = {None: (body, f'"{digest}"')}
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(compressed) < len(body):
+            self.variants["gzip"] = (compressed, f'"{digest}-gz"')
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+            if len(compressed) < len(body):
+                self.variants["br"] = (compressed, f'"{digest}-br"')
+        self.etags = {etag for _, etag in self.variants.values()}
+
+    @property
+    def body(self):
+        return self.variants[None][0]
+
+    def respond(self, if_none_match=None, accept_encoding=None):
+        """Gibt (Status, Body, Header) passend zu den Request-Headern zurück."""
+        accepted = _accepted_encodings(accept_encoding)
+        encoding = next((e for e in ("br", "gzip") if e in self.variants and e in accepted), None)
+        body, etag = self.variants[encoding]
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if _etag_matches(if_none_match, self.etags):
+            return 304, b"", headers
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return 200, body, headers
+
+
+class TopicResponseCache:
+    """
+    Vorberechnete Antworten für /api/topics und /api/topic/<name>.
+    Serialisierung, Kompression und ETag entstehen einmal beim Start; eine Anfrage
+    ist nur noch ein Dict-Lookup über den normalisierten Themennamen.
+    """
+
+    def __init__(self, wissen):
+        self.topic_list = CachedResponse(list(wissen.keys()))
+        self.all_topics = CachedResponse(wissen)
+        self._topics = {normalize_topic(name): CachedResponse(content) for name, content in wissen.items()}
+
+    def topic(self, name):
+        return self._topics.get(normalize_topic(name))
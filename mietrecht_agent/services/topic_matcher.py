@@ -0,0 +1,218 @@
+from collections import deque
+
+from .search_service import STOPWORDS, fold
+
+# Kuratierte Schlüsselbegriffe je Thema mit Gewichtung.
+# Begriffe matchen als ganzes Wort. Mit * am Ende sind sie Wortstämme und treffen auch
+# Ableitungen und Komposita: "mieterhöhung*" trifft "Mieterhöhungsverlangen", "hund"
+# dagegen nicht "hundert".
+TOPIC_KEYWORDS = {
+    "Kündigung": {
+        "kündigung*": 3.0, "kündige*": 3.0, "kündigt*": 3.0, "gekündigt*": 3.0, "kündigungsfrist*": 3.0,
+        "eigenbedarf*": 3.0, "fristlos*": 2.0, "sozialklausel*": 2.0, "härtefall*": 1.0,
+        "ausziehen": 1.0, "mietverhältnis beenden": 2.0
+    },
+    "Mietminderung": {
+        "mietminderung*": 3.0, "minderung*": 3.0, "mindern": 3.0, "miete kürzen": 3.0,
+        "kürzen": 1.5, "mangel*": 2.0, "mängel*": 2.0, "schimmel*": 2.5,
+        "heizungsausfall*": 2.5, "heizung*": 1.0, "kaputt*": 1.0
+    },
+    "Kaution": {
+        "kaution*": 3.0, "mietkaution*": 3.0, "mietsicherheit*": 3.0, "kautionskonto*": 3.0
+    },
+    "Nebenkosten": {
+        "nebenkosten*": 3.0, "betriebskosten*": 3.0, "abrechnung*": 1.5,
+        "heizkostenabrechnung*": 2.5, "nachzahlung*": 2.0, "umlageschlüssel*": 2.0
+    },
+    "Wohnrecht": {
+        "wohnrecht*": 3.0, "nießbrauch*": 2.0, "grundbuch*": 1.5
+    },
+    "Renovierung": {
+        "renovierung*": 3.0, "renovieren": 3.0, "schönheitsreparatur*": 3.0,
+        "streichen": 2.0, "tapezieren": 2.0
+    },
+    "Modernisierung": {
+        "modernisierung*": 3.0, "modernisieren": 3.0, "dämmung*": 2.0,
+        "neue fenster": 2.0, "sanierung*": 1.5
+    },
+    "Rückzahlung": {
+        "rückzahlung*": 3.0, "zurückzahlen": 2.0, "guthaben*": 2.5, "zu viel gezahlt": 2.0
+    },
+    "Hausordnung": {
+        "hausordnung*": 3.0, "ruhezeit*": 2.0, "treppenhausreinigung*": 2.0, "grillen": 2.0,
+        "besuchsverbot*": 2.5
+    },
+    "Tierhaltung": {
+        "tierhaltung*": 3.0, "hund": 3.0, "hunde": 3.0, "katze*": 3.0, "haustier*": 3.0, "tiere": 2.0
+    },
+    "Wohnfläche": {
+        "wohnfläche*": 3.0, "quadratmeter*": 2.0, "flächenabweichung*": 3.0,
+        "kleiner als im vertrag": 2.0
+    },
+    "Wasserschaden": {
+        "wasserschaden*": 3.0, "rohrbruch*": 3.0, "überschwemmung*": 2.0,
+        "feuchtigkeit*": 1.5, "trocknungsgerät*": 2.0
+    },
+    "Lärm": {
+        "lärm*": 3.0, "laut": 1.5, "nachbarn": 1.5, "baustelle*": 2.0,
+        "ruhestörung*": 3.0, "nachtruhe*": 2.0
+    },
+    "Räumung": {
+        "räumung*": 3.0, "zwangsräumung*": 3.0, "gerichtsvollzieher*": 3.0,
+        "kalte räumung*": 3.0, "schloss ausgetauscht": 2.0
+    },
+    "Mietvertrag": {
+        "mietvertrag*": 3.0, "befristet*": 2.0, "befristung*": 2.0, "mündlich*": 1.5
+    },
+    "Mieterhöhung": {
+        "mieterhöhung*": 3.0, "miete erhöhen": 3.0, "erhöhung*": 2.0, "erhöhen": 1.5,
+        "mietspiegel*": 2.5, "vergleichsmiete*": 3.0, "kappungsgrenze*": 3.0
+    },
+    "Unwirksame Klauseln": {
+        "klausel*": 3.0, "unwirksam*": 2.0, "agb": 2.0
+    },
+    "Kleinreparaturen": {
+        "kleinreparatur*": 3.0, "reparatur*": 1.5, "wasserhahn*": 1.5
+    },
+    "Kündigungsverzicht": {
+        "kündigungsverzicht*": 3.0, "verzicht*": 2.0, "mindestmietdauer*": 3.0, "mindestlaufzeit*": 2.0
+    },
+    "Pauschalen": {
+        "pauschale*": 3.0, "pauschal*": 2.0, "nebenkostenpauschale*": 3.5, "heizkostenpauschale*": 3.5
+    },
+    "Wohnungsschlüssel": {
+        "schlüssel*": 3.0, "zweitschlüssel*": 3.0, "schließzylinder*": 3.0,
+        "wohnung betreten": 3.0, "betreten": 2.0
+    },
+    "Wohnungsübergabe": {
+        "übergabe*": 3.0, "übergabeprotokoll*": 3.0, "wohnungsübergabe*": 3.0,
+        "protokoll*": 1.5, "auszug*": 1.5
+    },
+    "Untervermietung": {
+        "untervermietung*": 3.0, "untervermieten": 3.0, "untermieter*": 3.0, "airbnb*": 2.5
+    },
+    "Eigentümerwechsel": {
+        "eigentümerwechsel*": 3.0, "verkauft": 2.5, "neuer eigentümer": 3.0,
+        "neuer vermieter": 2.5, "kauf bricht nicht miete": 3.0, "zwangsversteigerung*": 2.0
+    },
+    "Mietpreis": {
+        "mietpreisbremse*": 3.0, "mietpreis*": 3.0, "zu hohe miete": 2.0,
+        "ortsübliche*": 1.5, "neubau*": 1.0
+    },
+    "Vermieterfragen": {
+        "selbstauskunft*": 3.0, "schwangerschaft*": 2.5, "religion*": 2.0,
+        "besichtigung*": 1.5, "einkommen*": 1.5, "wohnungsbewerbung*": 2.0
+    }
+}
+
+# Gewicht der aus dem Themennamen abgeleiteten Begriffe (für Themen ohne Kuratierung);
+# sie gelten als Wortstämme ("Lärm" trifft "Lärmbelästigung")
+TOPIC_NAME_WEIGHT = 3.0
+STEM_MARK = "*"
+
+
+def split_stem(keyword):
+    """"mangel*" -> ("mangel", True), "hund" -> ("hund", False)"""
+    if keyword.endswith(STEM_MARK):
+        return keyword[:-len(STEM_MARK)], True
+    return keyword, False
+
+
+class AhoCorasick:
+    """Aho-Corasick-Automat für die Mehrmustersuche in einem Durchlauf."""
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((pattern_id, len(pattern)))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter(self, text):
+        """Liefert (Startposition, Muster-ID, Länge) für alle Treffer."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for pos, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id, length in out[state]:
+                yield pos - length + 1, pattern_id, length
+
+
+class TopicMatcher:
+    """
+    Ordnet eine Freitextfrage den Themen der Wissensdatenbank zu.
+    Der Automat wird einmal beim Start gebaut; eine Anfrage ist ein einziger Durchlauf.
+    """
+
+    def __init__(self, wissen, keywords=TOPIC_KEYWORDS, min_score=1.5):
+        self.min_score = min_score
+        self.topics = list(wissen.keys())
+        # (Begriff, Stamm?) -> [(Themen-ID, Gewicht)]; derselbe Begriff kann mehreren Themen zählen
+        pattern_topics = {}
+        for topic_id, topic in enumerate(self.topics):
+            weighted = dict(keywords.get(topic, {}))
+            for word in topic.split():
+                weighted.setdefault(word.lower() + STEM_MARK, TOPIC_NAME_WEIGHT)
+            for keyword, weight in weighted.items():
+                keyword, stem = split_stem(keyword)
+                folded = fold(keyword).strip()
+                if len(folded) < 3 or folded in STOPWORDS:
+                    continue
+                pattern_topics.setdefault((folded, stem), []).append((topic_id, weight))
+        keys = list(pattern_topics)
+        self._pattern_stems = [stem for _, stem in keys]
+        self._pattern_topics = [pattern_topics[key] for key in keys]
+        self._automaton = AhoCorasick([pattern for pattern, _ in keys])
+
+    def rank(self, question, limit=None):
+        """Gibt [(Thema, Score)] absteigend sortiert zurück."""
+        text = fold(question)
+        longest = {}
+        for start, pattern_id, length in self._automaton.iter(text):
+            # Nur Treffer am Wortanfang und, außer bei Stämmen, am Wortende;
+            # je Startposition gewinnt der längste Begriff
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            end = start + length
+            if not self._pattern_stems[pattern_id] and end < len(text) and text[end].isalnum():
+                continue
+            if length > longest.get(start, (0, None))[0]:
+                longest[start] = (length, pattern_id)
+
+        scores = {}
+        seen = set()
+        for _, pattern_id in longest.values():
+            if pattern_id in seen:
+                continue
+            seen.add(pattern_id)
+            for topic_id, weight in self._pattern_topics[pattern_id]:
+                scores[topic_id] = scores.get(topic_id, 0.0) + weight
+
+        ranked = sorted(
+            ((self.topics[t], s) for t, s in scores.items() if s >= self.min_score),
+            key=lambda item: item[1], reverse=True
+        )
+        return ranked[:limit] if limit else ranked
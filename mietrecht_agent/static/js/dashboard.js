@@ -1,63 +1,219 @@
-async function loadCases() {
+// Listenansicht ohne Analysetexte; Details werden beim Öffnen einzeln geladen
+const CASE_FIELDS = 'id,timestamp,status,user.name,case.topic,booking.type,booking.price,booking.time';
+const CASE_LIST_URL = `/api/cases?fields=${CASE_FIELDS}&limit=50`;
+let nextCaseCursor = null;
+// Stand des Änderungsfeeds, bis zu dem die Tabelle aktuell ist
+let caseVersion = null;
+// Während einer Suche zeigt die Tabelle Treffer statt der neuesten Fälle
+let caseSearchActive = false;
+let caseSearchTimer = null;
+let statsTimer = null;
+
+async function fetchWithToken(url, options = {}) {
     const token = localStorage.getItem('jm_token');
     if (!token) {
         window.location.href = '/login';
-        return;
+        return null;
     }
+    const res = await fetch(url, {
+        ...options,
+        headers: {
+            'Authorization': `Bearer ${token}`
+        }
+    });
+    if (res.status === 401) {
+        localStorage.removeItem('jm_token');
+        window.location.href = '/login';
+        return null;
+    }
+    return res;
+}
+
+function caseNumber(caseId) {
+    return Number(caseId.split('-')[1]);
+}
+
+function renderCaseRow(c) {
+    const row = document.createElement('tr');
+    row.dataset.caseId = c.id;
+    row.className = 'border-b border-slate-50 hover:bg-slate-50/50 transition-colors cursor-pointer';
+    row.innerHTML = `
+        <td class="p-6 font-black text-slate-400 text-xs">${c.id}</td>
+        <td class="p-6">
+            <p class="font-bold text-slate-900">${c.user.name}</p>
+            <p class="text-[10px] text-blue-600 font-bold uppercase tracking-wider">${c.case.topic}</p>
+            ${c.snippet ? `<p class="text-xs text-slate-500 mt-2">${c.snippet}</p>` : ''}
+        </td>
+        <td class="p-6">
+            <p class="text-sm font-bold text-slate-700">${c.booking.type}</p>
+            <p class="text-[10px] font-black text-slate-400 uppercase tracking-widest">${c.booking.price} €</p>
+        </td>
+        <td class="p-6">
+            <span class="px-3 py-1 bg-blue-50 text-blue-600 text-[10px] font-black rounded-full uppercase tracking-widest">${c.booking.time}</span>
+        </td>
+        <td class="p-6">
+            <span class="px-3 py-1 bg-green-50 text-green-600 text-[10px] font-black rounded-full uppercase tracking-widest">${c.status}</span>
+        </td>
+        <td class="p-6">
+            <button onclick="showCase('${c.id}')" class="w-10 h-10 bg-slate-900 text-white rounded-xl hover:bg-blue-600 transition-colors">
+                <i class="fas fa-eye"></i>
+            </button>
+        </td>
+    `;
+    return row;
+}
 
+// Kopfzahlen vom Server (Zähler je Tag und Monat) statt aus der geladenen Liste
+async function loadStats() {
     try {
-        const res = await fetch('/api/cases', {
-            headers: {
-                'Authorization': `Bearer ${token}`
-            }
-        });
-
-        if (res.status === 401) {
-            localStorage.removeItem('jm_token');
-            window.location.href = '/login';
-            return;
+        const res = await fetchWithToken('/api/dashboard/stats');
+        if (!res || !res.ok) return;
+        const stats = await res.json();
+        const statNew = document.getElementById('stat-new');
+        const statRevenue = document.getElementById('stat-revenue');
+        if (statNew) statNew.innerText = stats.today.cases;
+        if (statRevenue) {
+            statRevenue.innerText = stats.month.revenue.toLocaleString('de-DE', { style: 'currency', currency: 'EUR' });
         }
+    } catch (err) {
+        console.error('Error loading stats:', err);
+    }
+}
 
-        const cases = await res.json();
+// Bei vielen Änderungen hintereinander höchstens einmal je Sekunde nachladen
+function scheduleStats() {
+    if (!statsTimer) statsTimer = setTimeout(() => { statsTimer = null; loadStats(); }, 1000);
+}
+
+async function loadCases(more = false) {
+    try {
+        const url = more && nextCaseCursor ? `${CASE_LIST_URL}&cursor=${nextCaseCursor}` : CASE_LIST_URL;
+        const res = await fetchWithToken(url);
+        if (!res) return;
+
+        const page = await res.json();
         const body = document.getElementById('case-table-body');
-        const statNew = document.getElementById('stat-new');
+        const loadMore = document.getElementById('load-more-cases');
 
-        if (statNew) statNew.innerText = cases.length;
+        if (!more) {
+            caseSearchActive = false;
+            const search = document.getElementById('case-search');
+            if (search) search.value = '';
+        }
+        nextCaseCursor = page.next_cursor;
+        if (!more) caseVersion = page.version;
+        if (loadMore) loadMore.classList.toggle('hidden', !nextCaseCursor);
         if (body) {
-            body.innerHTML = '';
-            cases.reverse().forEach(c => {
-                const row = document.createElement('tr');
-                row.className = 'border-b border-slate-50 hover:bg-slate-50/50 transition-colors cursor-pointer';
-                row.innerHTML = `
-                    <td class="p-6 font-black text-slate-400 text-xs">${c.id}</td>
-                    <td class="p-6">
-                        <p class="font-bold text-slate-900">${c.user.name}</p>
-                        <p class="text-[10px] text-blue-600 font-bold uppercase tracking-wider">${c.case.topic}</p>
-                    </td>
-                    <td class="p-6">
-                        <p class="text-sm font-bold text-slate-700">${c.booking.type}</p>
-                        <p class="text-[10px] font-black text-slate-400 uppercase tracking-widest">${c.booking.price} €</p>
-                    </td>
-                    <td class="p-6">
-                        <span class="px-3 py-1 bg-blue-50 text-blue-600 text-[10px] font-black rounded-full uppercase tracking-widest">${c.booking.time}</span>
-                    </td>
-                    <td class="p-6">
-                        <span class="px-3 py-1 bg-green-50 text-green-600 text-[10px] font-black rounded-full uppercase tracking-widest">${c.status}</span>
-                    </td>
-                    <td class="p-6">
-                        <button onclick="alert('Fall-Details:\\\nTopic: ' + '${c.case.topic}' + '\\\nAnalyse: ' + '${c.case.analysis?.substring(0, 100).replace(/\n/g, ' ')}...')" class="w-10 h-10 bg-slate-900 text-white rounded-xl hover:bg-blue-600 transition-colors">
-                            <i class="fas fa-eye"></i>
-                        </button>
-                    </td>
-                `;
-                body.appendChild(row);
-            });
+            if (!more) body.innerHTML = '';
+            page.cases.forEach(c => body.appendChild(renderCaseRow(c)));
         }
     } catch (err) {
         console.error('Error loading cases:', err);
     }
 }
 
+function onCaseSearch(value) {
+    clearTimeout(caseSearchTimer);
+    caseSearchTimer = setTimeout(() => searchCases(value.trim()), 250);
+}
+
+// Volltextsuche über alle Fälle, Treffer nach Relevanz mit hervorgehobenem Ausschnitt
+async function searchCases(q) {
+    if (!q) return loadCases();
+    try {
+        const res = await fetchWithToken(`/api/cases/search?q=${encodeURIComponent(q)}&limit=50`);
+        if (!res || !res.ok) return;
+        const result = await res.json();
+        const body = document.getElementById('case-table-body');
+        const loadMore = document.getElementById('load-more-cases');
+        caseSearchActive = true;
+        if (loadMore) loadMore.classList.add('hidden');
+        if (body) {
+            body.innerHTML = '';
+            result.cases.forEach(c => body.appendChild(renderCaseRow(c)));
+        }
+    } catch (err) {
+        console.error('Error searching cases:', err);
+    }
+}
+
+function applyCaseChange(c) {
+    if (caseSearchActive) return;
+    const body = document.getElementById('case-table-body');
+    if (!body) return;
+    const existing = body.querySelector(`tr[data-case-id="${c.id}"]`);
+    if (existing) {
+        existing.replaceWith(renderCaseRow(c));
+    } else {
+        // Unbekannter Fall: an seine Stelle in der id-Reihenfolge wie nach einem Neuladen.
+        // Worker vergeben ids blockweise, ein neuer Fall steht daher nicht immer oben.
+        // Liegt er hinter der letzten geladenen Zeile, kommt er über "Mehr laden"
+        const number = caseNumber(c.id);
+        const next = [...body.children].find(row => caseNumber(row.dataset.caseId) < number);
+        if (next) body.insertBefore(renderCaseRow(c), next);
+        else if (!nextCaseCursor) body.appendChild(renderCaseRow(c));
+    }
+}
+
+// Holt nur Änderungen seit caseVersion und patcht die betroffenen Zeilen
+async function syncCases() {
+    if (caseVersion === null) return loadCases();
+    try {
+        let more = true;
+        while (more) {
+            const res = await fetchWithToken(`/api/cases/changes?since=${caseVersion}&fields=${CASE_FIELDS}`);
+            if (!res) return;
+            const feed = await res.json();
+            feed.cases.forEach(applyCaseChange);
+            caseVersion = feed.version;
+            more = feed.more;
+            if (feed.cases.length) scheduleStats();
+        }
+    } catch (err) {
+        console.error('Error syncing cases:', err);
+    }
+}
+
+// Server-Push: der Server meldet neue Buchungen und Statusänderungen selbst.
+// Kurze Abbrüche überbrückt der Browser (Last-Event-ID); ohne SSE wird gepollt.
+// Das JWT bleibt aus der URL: der Stream öffnet sich mit einem kurzlebigen Ticket.
+async function subscribeCases() {
+    if (!window.EventSource) {
+        setInterval(syncCases, 10000);
+        return;
+    }
+    const res = await fetchWithToken('/api/cases/events/ticket', { method: 'POST' });
+    if (!res) return;
+    if (!res.ok) {
+        setInterval(syncCases, 10000);
+        return;
+    }
+    const { ticket } = await res.json();
+    const source = new EventSource(`/api/cases/events?since=${caseVersion}&ticket=${encodeURIComponent(ticket)}`);
+    source.addEventListener('case', event => {
+        applyCaseChange(JSON.parse(event.data));
+        caseVersion = Number(event.lastEventId);
+        scheduleStats();
+    });
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+            // z.B. Ticket beim Reconnect abgelaufen: neues Ticket holen, ab caseVersion weiter
+            setTimeout(subscribeCases, 3000);
+        }
+    };
+}
+
+async function showCase(caseId) {
+    try {
+        const res = await fetchWithToken(`/api/cases/${encodeURIComponent(caseId)}`);
+        if (!res || !res.ok) return;
+        const c = await res.json();
+        alert(`Fall-Details:\nTopic: ${c.case.topic}\nAnalyse: ${(c.case.analysis || '').substring(0, 100).replace(/\n/g, ' ')}...`);
+    } catch (err) {
+        console.error('Error loading case:', err);
+    }
+}
+
 function logout() {
     localStorage.removeItem('jm_token');
     localStorage.removeItem('jm_role');
@@ -65,6 +221,6 @@ function logout() {
 }
 
 document.addEventListener('DOMContentLoaded', () => {
-    loadCases();
-    setInterval(loadCases, 10000);
+    loadStats();
+    loadCases().then(subscribeCases);
 });
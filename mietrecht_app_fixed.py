@@ -5,9 +5,10 @@ import base64
 import requests
 from openai import OpenAI
 from dotenv import load_dotenv
-import sqlite3
 import json
 import logging
+from mietrecht_agent.services.knowledge_base import KnowledgeBase, DEFAULT_WISSEN_PATH
+from mietrecht_agent.services.sqlite_pool import get_pool
 
 # Logging konfigurieren
 logging.basicConfig(level=logging.INFO)
@@ -51,11 +52,12 @@ except Exception as e:
 
 # Database Configuration
 DB_PATH = "juris_mind.db"
+db_pool = get_pool(DB_PATH)
 
 def init_db():
     """Initialisiert die Datenbank"""
     try:
-        with sqlite3.connect(DB_PATH) as conn:
+        with db_pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS cases (
@@ -75,57 +77,20 @@ def init_db():
 
 init_db()
 
-# Mietrecht-Wissensdatenbank
-MIETRECHT_WISSEN = {
-    "Mieterhöhung": {
-        "KI-Einschätzung": "Der Vermieter darf die Miete bis zur ortsüblichen Vergleichsmiete erhöhen. Dies muss er schriftlich begründen (z.B. mit dem Mietspiegel). Es gelten Kappungsgrenzen (oft 15-20% in drei Jahren). Eine Mieterhöhung ist frühestens 15 Monate nach Einzug oder der letzten Erhöhung möglich.",
-        "Professionelle Analyse": "Mieterhöhung bis zur ortsüblichen Vergleichsmiete nach § 558 BGB. Beachtung der Jahressperrfrist (15 Monate seit Einzug/letzter Erhöhung) und der Kappungsgrenze nach Landesverordnung. Auskunftspflicht des Vermieters über die Datengrundlage. Die Erhöhung muss schriftlich verlangt und begründet werden.",
-        "Gerichtsurteile": "BGH VIII ZR 261/17 (Verwendung veralteter Mietspiegel); BGH VIII ZR 110/19 (Erhöhung nach Modernisierung vs. Vergleichsmiete).",
-        "Handlungsempfehlungen": [
-            "Prüfen Sie die Begründung der Mieterhöhung",
-            "Vergleichen Sie mit dem aktuellen Mietspiegel",
-            "Beachten Sie die 15-Monats-Sperrfrist",
-            "Bei Zweifeln: Widerspruch innerhalb von 2 Monaten"
-        ]
-    },
-    "Kündigung": {
-        "KI-Einschätzung": "Eine Kündigung des Mietverhältnisses muss zwingend schriftlich erfolgen (Brief mit Originalunterschrift). Die Kündigungsfrist für Mieter beträgt in der Regel drei Monate. Eine Kündigung per E-Mail, Fax oder SMS ist rechtlich unwirksam.",
-        "Professionelle Analyse": "Die ordentliche Kündigung durch den Mieter richtet sich nach § 573c BGB. Die Schriftform ist gemäß § 568 BGB zwingende Wirksamkeitsvoraussetzung. Bei einer Vermieterkündigung ist ein berechtigtes Interesse (§ 573 BGB) erforderlich. Mieter können gemäß § 574 BGB (Sozialklausel) widersprechen, wenn die Beendigung eine unzumutbare Härte darstellt.",
-        "Gerichtsurteile": "BGH VIII ZR 107/13 (Präzisierung der Schriftform); BGH VIII ZR 270/15 (Anforderungen an die Begründung von Eigenbedarf).",
-        "Handlungsempfehlungen": [
-            "Kündigung immer schriftlich mit Originalunterschrift",
-            "Kündigungsfrist beachten (meist 3 Monate)",
-            "Bei Vermieterkündigung: Begründung prüfen",
-            "Widerspruch bei Härtefall möglich"
-        ]
-    },
-    "Mietminderung": {
-        "KI-Einschätzung": "Wenn Ihre Wohnung Mängel aufweist (z.B. Schimmel, Heizungsausfall), dürfen Sie die Miete kürzen. Wichtig: Informieren Sie den Vermieter sofort schriftlich über den Mangel und kündigen Sie die Minderung an. Dokumentieren Sie den Mangel mit Fotos.",
-        "Professionelle Analyse": "Der Minderungsanspruch ergibt sich unmittelbar aus § 536 BGB bei Vorliegen eines Sach- oder Rechtsmangels, der die Tauglichkeit zum vertragsgemäßen Gebrauch aufhebt oder mindert. Die Minderung tritt kraft Gesetzes ein. Eine Mängelanzeige gemäß § 536c BGB ist jedoch Voraussetzung für die Geltendmachung; unterbleibt sie, kann der Mieter schadenersatzpflichtig werden.",
-        "Gerichtsurteile": "BGH VIII ZR 224/10 (Minderung bei Flächenabweichung > 10%); BGH VIII ZR 155/11 (Minderung bei Lärmbelästigung durch Nachbarn).",
-        "Handlungsempfehlungen": [
-            "Mangel sofort schriftlich dem Vermieter melden",
-            "Mangel dokumentieren (Fotos, Zeugen)",
-            "Angemessene Frist zur Beseitigung setzen",
-            "Minderung erst nach Fristablauf"
-        ]
-    }
-}
+# Mietrecht-Wissensdatenbank (gemeinsame Datendatei mit Hot Reload)
+MAX_RELEVANT_TOPICS = 2
+knowledge_base = KnowledgeBase(os.environ.get("MIETRECHT_WISSEN_PATH", DEFAULT_WISSEN_PATH))
 
 def analyze_legal_question(question):
     """Analysiert eine Rechtsfrage und gibt eine strukturierte Antwort zurück"""
     try:
-        # Suche nach relevanten Themen in der Wissensdatenbank
-        relevant_topics = []
-        question_lower = question.lower()
-        
-        for topic, content in MIETRECHT_WISSEN.items():
-            if any(keyword in question_lower for keyword in [
-                topic.lower(),
-                *[word for word in topic.lower().split()],
-                *[word for word in content["KI-Einschätzung"].lower().split()[:10]]
-            ]):
-                relevant_topics.append((topic, content))
+        # Themen nach Relevanz geordnet (gewichtete Schlagworttreffer)
+        snapshot = knowledge_base.snapshot
+        ranked = snapshot.topic_matcher.rank(question, limit=MAX_RELEVANT_TOPICS)
+        if not ranked:
+            # Tippfehlertolerant nachfassen, bevor auf die allgemeine Antwort zurückgefallen wird
+            ranked = snapshot.fuzzy_matcher.rank(question, limit=MAX_RELEVANT_TOPICS)
+        relevant_topics = [(topic, snapshot.wissen[topic]) for topic, _ in ranked]
         
         if not relevant_topics:
             # Fallback: Verwende das erste Thema als Beispiel
@@ -139,10 +104,11 @@ def analyze_legal_question(question):
         response = {
             "status": "success",
             "question": question,
+            "kb_version": snapshot.version,
             "relevant_topics": []
         }
         
-        for topic, content in relevant_topics[:2]:  # Maximal 2 relevante Themen
+        for topic, content in relevant_topics:
             topic_response = {
                 "topic": topic,
                 "ki_einschaetzung": content["KI-Einschätzung"],
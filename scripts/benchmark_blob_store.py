@@ -0,0 +1,81 @@
+"""
+Benchmark: Dokument als base64 im Fall-JSON gegen LocalBlobStore. Gemessen
+werden Zeit und Python-Speicherspitze (tracemalloc) für Ablegen und Ausliefern
+einer Datei sowie die Größe der Fallzeile. Ausgeliefert wird über Flask
+send_file wie in /api/cases/<case_id>/documents/<hash>; ein Server mit
+wsgi.file_wrapper (gunicorn) schickt die Datei dabei per sendfile.
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_blob_store.py [--mb 100]
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from flask import Flask, send_file
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.blob_store import LocalBlobStore, MAX_BLOB_SIZE
+
+
+def measure(label, action):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed * 1000:>9.1f} ms   Spitze {peak / 1024 / 1024:>8.1f} MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "upload.pdf")
+        with open(source, "wb") as f:
+            for _ in range(args.mb):
+                f.write(os.urandom(1024 * 1024))
+        store = LocalBlobStore(os.path.join(tmp, "blobs"))
+
+        def inline():
+            with open(source, "rb") as f:
+                return json.dumps({"topic": "Mietvertrag", "file": base64.b64encode(f.read()).decode()})
+
+        def streamed():
+            with open(source, "rb") as f:
+                return store.put(f, max_size=max(MAX_BLOB_SIZE, args.mb * 1024 * 1024 + 1))
+
+        case_data = measure("base64 im Fall: ablegen", inline)
+        digest, _ = measure("LocalBlobStore: ablegen", streamed)
+        print(f"Fallzeile: base64 {len(case_data) / 1024 / 1024:.1f} MB, "
+              f"mit Verweis {len(json.dumps({'topic': 'Mietvertrag', 'documents': [{'hash': digest}]}))} Bytes")
+
+        measure("base64 im Fall: ausliefern", lambda: len(base64.b64decode(json.loads(case_data)["file"])))
+        app = Flask(__name__)
+
+        @app.route("/doc")
+        def doc():
+            return send_file(store.local_path(digest), as_attachment=True, download_name="upload.pdf")
+
+        client = app.test_client()
+
+        def download():
+            response = client.get("/doc", buffered=False)
+            size = sum(len(chunk) for chunk in response.response)
+            response.close()
+            return size
+
+        measure("send_file: ausliefern", download)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: Buchungsspitzen mit und ohne Write-Behind-Warteschlange.
+Mehrere Threads buchen gleichzeitig (wie der threaded Flask-Server bei einer
+Kampagne). "direkt" schreibt jede Buchung in einer eigenen Transaktion über den
+ConnectionPool, "queue" nimmt sie über BookingQueue an (Journal + fsync) und
+schreibt sie gebündelt. Gemessen werden Durchsatz, p99 der Antwortzeit und die
+Verzögerung, bis eine Buchung in der Datenbank sichtbar ist.
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_booking_queue.py [--rows 100000] [--threads 16] [--bookings 200]
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.booking_queue import BookingQueue
+from mietrecht_agent.services.case_store import insert_case, ensure_case_schema, case_fields_ready, backfill_case_fields
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from mietrecht_agent.services.storage import SQLiteStorage
+from benchmark_case_ids import PAYLOAD, create_db
+
+
+def prepare(path, rows):
+    create_db(path, rows)
+    pool = ConnectionPool(path)
+    with pool.write() as conn:
+        ensure_case_schema(conn)
+        ready = case_fields_ready(conn)
+    if not ready:
+        backfill_case_fields(pool, pause=0)
+    return pool
+
+
+def run(pool, book, threads, bookings):
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        own = []
+        for _ in range(bookings):
+            start = time.perf_counter()
+            book()
+            own.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(own)
+
+    workers = [threading.Thread(target=client) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, latencies[int(len(latencies) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--bookings", type=int, default=200)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = prepare(os.path.join(tmp, "direct.db"), args.rows)
+
+        def direct():
+            with pool.write() as conn:
+                insert_case(conn, "2026-01-01T00:00:00", *PAYLOAD)
+
+        rate, p99 = run(pool, direct, args.threads, args.bookings)
+        print(f"direkt  {rate:>8.0f} Buchungen/s   p99 {p99:>8.2f} ms   sichtbar sofort")
+
+        pool = prepare(os.path.join(tmp, "queue.db"), args.rows)
+        queue = BookingQueue(SQLiteStorage(pool.db_path, pool), os.path.join(tmp, "queue")).start()
+        rate, p99 = run(pool, lambda: queue.submit("2026-01-01T00:00:00", *PAYLOAD), args.threads, args.bookings)
+        queue.close()
+        stats = queue.stats()
+        with pool.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+        print(f"queue   {rate:>8.0f} Buchungen/s   p99 {p99:>8.2f} ms   "
+              f"sichtbar nach avg {stats['visibility_delay_avg_ms']:.1f} ms / max {stats['visibility_delay_max_ms']:.1f} ms   "
+              f"{stats['batches']} Batches (max {stats['largest_batch']})")
+        assert count == args.rows + args.threads * args.bookings, "Buchungen fehlen"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: Hot/Cold-Aufteilung der Fälle. Legt N Fälle über fünf Jahre an (ältere
+überwiegend bezahlt/erledigt), misst Dashboard-Abfragen und Buchungen, archiviert
+alles Abgeschlossene älter als 365 Tage (inkl. Verdichtung) und misst erneut - einmal nur der heiße
+Bestand, einmal mit ?archive=1.
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_case_archive.py [--rows 500000] [--repeat 20]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.case_archive import attach_archive, archive_cases, archive_stats, compact_archive
+from mietrecht_agent.services.case_store import (
+    case_identifier_for, ensure_case_schema, insert_case, list_cases, LIST_FIELDS
+)
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from benchmark_case_ids import SCHEMA
+from benchmark_case_fields import TOPICS, LAWYERS
+
+NOW = datetime(2026, 10, 1)
+QUERIES = {
+    "Seite 1": {},
+    "Status Neu": {"status": "Neu"},
+    "Thema+Zeitraum": {"topic": "Schimmel", "date_from": "2026-01-01"},
+    "E-Mail": {"email": "mandant123@example.de"},
+}
+
+
+def create_db(path, rows):
+    rng = random.Random(1)
+    span = 5 * 365 * 86400
+    with sqlite3.connect(path) as conn:
+        conn.execute(SCHEMA)
+        ensure_case_schema(conn)
+        conn.executemany(
+            "INSERT INTO cases (case_identifier, timestamp, user_data, case_data, booking_data, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((case_identifier_for(i), (NOW - timedelta(seconds=span * (rows - i) / rows)).isoformat(),
+              json.dumps({"name": f"Mandant {i}", "email": f"mandant{i}@example.de"}),
+              json.dumps({"topic": rng.choice(TOPICS), "analysis": "Analyse " * 60}),
+              json.dumps({"lawyer": rng.choice(LAWYERS), "type": "Video", "price": 89}),
+              rng.choice(("Neu",) + ("Bezahlt", "Erledigt") * (4 if i < rows * 0.8 else 1)))
+             for i in range(1, rows + 1))
+        )
+
+
+def median_ms(action, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return durations[len(durations) // 2] * 1000
+
+
+def measure(pool, label, repeat, include_archive=False):
+    with pool.connection() as conn:
+        results = [
+            f"{name} {median_ms(lambda: list_cases(conn, limit=50, fields=LIST_FIELDS, include_archive=include_archive, **query), repeat):.2f} ms"
+            for name, query in QUERIES.items()
+        ]
+        count = median_ms(lambda: conn.execute("SELECT status, COUNT(*) FROM cases GROUP BY status").fetchall(), 3)
+
+    def book():
+        with pool.write() as conn:
+            insert_case(conn, NOW.isoformat(), "{}", "{}", "{}")
+
+    booking = median_ms(book, repeat)
+    print(f"{label:<14} {' | '.join(results)} | Zählung je Status {count:.1f} ms | Buchung {booking:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cases.db")
+        create_db(path, args.rows)
+        pool = ConnectionPool(path)
+        attach_archive(pool, os.path.join(tmp, "archive.db"))
+        measure(pool, "vorher", args.repeat)
+
+        start = time.perf_counter()
+        moved = archive_cases(pool, after_days=365, pause=0, now=NOW)
+        compact_archive(pool)
+        print(f"{moved} Fälle archiviert in {time.perf_counter() - start:.1f} s, "
+              f"längste Wartezeit einer Schreibsperre {pool.stats()['lock_wait_max_ms']:.1f} ms: {archive_stats(pool)}")
+
+        measure(pool, "nachher", args.repeat)
+        measure(pool, "mit Archiv", args.repeat, include_archive=True)
+
+
+if __name__ == "__main__":
+    main()
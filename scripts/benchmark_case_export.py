@@ -0,0 +1,123 @@
+"""
+Benchmark: Export aller Fälle, Speicherbedarf und Dauer. Jede Variante läuft in
+einem eigenen Prozess und meldet ihr Spitzen-RSS (VmHWM; ru_maxrss enthielte
+nach fork/exec noch den Elternprozess) sowie den größten privaten Anteil
+(RssAnon, nach jedem Block gemessen). Die Differenz sind vor allem die per
+mmap gelesenen Datenbankseiten (mmap_size im Pool): Seitencache des Systems,
+von allen Workern geteilt und jederzeit freigebbar.
+
+  - "liste": bisheriger Weg, alle Seiten von list_cases sammeln und als ein
+    JSON-Dokument serialisieren (wie jsonify über die ganze Liste)
+  - csv, ndjson, parquet, arrow: export_stream() über iter_case_chunks(),
+    geschrieben nach /dev/null (parquet/arrow nur mit pyarrow)
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_case_export.py [--rows 1000000]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.case_export import EXPORT_FIELDS, export_stream, iter_case_chunks, pyarrow
+from mietrecht_agent.services.case_store import (
+    case_identifier_for, ensure_case_schema, list_cases, backfill_case_fields, MAX_PAGE_SIZE
+)
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from benchmark_case_ids import SCHEMA
+from benchmark_case_fields import TOPICS, LAWYERS
+
+
+def create_db(path, rows):
+    rng = random.Random(1)
+    with sqlite3.connect(path) as conn:
+        conn.execute(SCHEMA)
+        conn.executemany(
+            "INSERT INTO cases (case_identifier, timestamp, user_data, case_data, booking_data, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((case_identifier_for(i), f"2026-{i * 12 // (rows + 1) + 1:02d}-{rng.randint(1, 28):02d}T10:00:00",
+              json.dumps({"name": f"Mandant {i}", "email": f"mandant{i}@example.de", "phone": "040 123456",
+                          "address": f"Musterstraße {i % 200}, 20095 Hamburg"}),
+              json.dumps({"topic": rng.choice(TOPICS), "risk": "mittel",
+                          "analysis": "Mietminderung wegen Mangel nach § 536 BGB " * 5,
+                          "recommendation": "Mangel schriftlich anzeigen und Frist setzen."}),
+              json.dumps({"lawyer": rng.choice(LAWYERS), "type": "Video", "price": rng.choice((49, 89, 129)),
+                          "time": "2026-05-04 14:00"}),
+              rng.choice(("Neu", "Bezahlt", "Erledigt")))
+             for i in range(1, rows + 1))
+        )
+    pool = ConnectionPool(path)
+    with pool.write() as conn:
+        ensure_case_schema(conn)
+    backfill_case_fields(pool, pause=0)
+    pool.close()
+
+
+def _status_mb(key):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(key + ":"):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+def rss_mb():
+    return _status_mb("VmHWM") or resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode, path):
+    pool = ConnectionPool(path)
+    baseline = rss_mb()
+    start = time.perf_counter()
+    size, anon = 0, 0.0
+    if mode == "liste":
+        cases, cursor = [], None
+        with pool.connection() as conn:
+            while True:
+                page, cursor = list_cases(conn, cursor=cursor, limit=MAX_PAGE_SIZE, fields=EXPORT_FIELDS)
+                cases.extend(page)
+                if cursor is None:
+                    break
+        size = len(json.dumps({"cases": cases}, ensure_ascii=False).encode("utf-8"))
+        anon = _status_mb("RssAnon") or 0.0
+    else:
+        with open(os.devnull, "wb") as out:
+            for data in export_stream(iter_case_chunks(pool), mode):
+                out.write(data)
+                size += len(data)
+                anon = max(anon, _status_mb("RssAnon") or 0.0)
+    print(json.dumps({"seconds": time.perf_counter() - start, "baseline_mb": baseline,
+                      "peak_mb": rss_mb(), "anon_mb": anon, "size_mb": size / 1024 / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "DB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    modes = ["liste", "csv", "ndjson"] + (["parquet", "arrow"] if pyarrow is not None else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cases.db")
+        create_db(path, args.rows)
+        print(f"{args.rows} Fälle")
+        for mode in modes:
+            result = json.loads(subprocess.run(
+                [sys.executable, __file__, "--child", mode, path], capture_output=True, text=True, check=True
+            ).stdout)
+            print(f"{mode:<8} {result['seconds']:>7.1f} s   {result['size_mb']:>8.1f} MB Ausgabe   "
+                  f"RSS {result['baseline_mb']:.0f} -> {result['peak_mb']:.0f} MB, privat max {result['anon_mb']:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
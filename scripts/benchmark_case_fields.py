@@ -0,0 +1,151 @@
+"""
+Benchmark: Fall-Listen mit Filtern bei 1 Mio. Fällen - JSON-Spalten vs. Feldspalten.
+
+  1. json      Filter/Projektion über json_extract ohne Index (Stand vor den Indizes)
+  2. json-idx  JSON1-Ausdrucksindizes für Thema/Anwalt, Projektion weiter über JSON
+  3. columns   nach ensure_case_schema() + backfill_case_fields(): Feldspalten mit Indizes
+
+Zwischen 2 und 3 läuft die Migration, während ein Thread weiter bucht; gemessen
+werden Dauer und die längste Wartezeit einer Buchung. Zu jeder Abfrage wird der
+Query-Plan ausgegeben.
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_case_fields.py [--rows 1000000] [--repeat 20]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.case_store import (
+    case_identifier_for, ensure_case_schema, backfill_case_fields, insert_case, list_cases, LIST_FIELDS,
+    CASE_INDEXES, CHANGE_FEED_SCHEMA
+)
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from benchmark_case_ids import SCHEMA
+
+TOPICS = ["Kaution", "Mietminderung", "Kündigung", "Nebenkosten", "Schimmel", "Eigenbedarf", "Renovierung"]
+LAWYERS = ["Dr. Schulze", "Meyer", "Yilmaz", "Nowak", "Hoffmann"]
+LEGACY_JSON_INDEXES = (
+    "CREATE INDEX idx_cases_topic_id ON cases (json_extract(case_data, '$.topic'), id)",
+    "CREATE INDEX idx_cases_lawyer_id ON cases (json_extract(booking_data, '$.lawyer'), id)",
+)
+QUERIES = {
+    "Seite 1": {},
+    "Thema": {"topic": "Schimmel"},
+    "Anwalt+Status": {"lawyer": "Nowak", "status": "Neu"},
+    "E-Mail": {"email": "mandant123456@example.de"},
+    "Termin": {"booking_time": "2026-03-02"},
+}
+
+
+def create_db(path, rows):
+    rng = random.Random(1)
+    with sqlite3.connect(path) as conn:
+        conn.execute(SCHEMA)
+        conn.executemany(
+            "INSERT INTO cases (case_identifier, timestamp, user_data, case_data, booking_data, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((case_identifier_for(i), f"2026-01-01T00:00:{i % 60:02d}",
+              json.dumps({"name": f"Mandant {i}", "email": f"mandant{i}@example.de", "phone": "030 123456"}),
+              json.dumps({"topic": rng.choice(TOPICS), "analysis": "Analyse " * 60, "risk": "mittel"}),
+              json.dumps({"lawyer": rng.choice(LAWYERS), "type": "Video", "price": 89,
+                          "time": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00"}),
+              rng.choice(("Neu", "Bezahlt", "Erledigt")))
+             for i in range(1, rows + 1))
+        )
+
+
+def timed(conn, query, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list_cases(conn, limit=50, fields=LIST_FIELDS, **query)
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return durations[len(durations) // 2] * 1000
+
+
+def query_plan(conn, query):
+    # Gleiche SQL wie list_cases, nur mit EXPLAIN QUERY PLAN
+    captured = []
+    conn.set_trace_callback(captured.append)
+    list_cases(conn, limit=50, fields=LIST_FIELDS, **query)
+    conn.set_trace_callback(None)
+    sql = captured[-1]
+    return "; ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql))
+
+
+def run_queries(label, conn, repeat):
+    for name, query in QUERIES.items():
+        print(f"{label:<9} {name:<14} {timed(conn, query, repeat):>9.2f} ms   {query_plan(conn, query)}")
+
+
+def migrate_while_booking(pool):
+    waits, stop = [], threading.Event()
+
+    def book():
+        while not stop.is_set():
+            start = time.perf_counter()
+            with pool.write() as conn:
+                insert_case(conn, "2026-02-01T00:00:00", '{"name": "Neu"}', '{"topic": "Kaution"}', '{"lawyer": "Meyer"}')
+            waits.append(time.perf_counter() - start)
+            time.sleep(0.005)
+
+    booker = threading.Thread(target=book)
+    booker.start()
+    start = time.perf_counter()
+    with pool.write() as conn:
+        ensure_case_schema(conn)
+    schema_time = time.perf_counter() - start
+    batches = backfill_case_fields(pool)
+    total = time.perf_counter() - start
+    stop.set()
+    booker.join()
+    waits.sort()
+    print(f"Migration: Schema {schema_time:.2f} s, Backfill {batches} Batches + Indizes, gesamt {total:.1f} s; "
+          f"{len(waits)} Buchungen parallel, p99 {waits[int(len(waits) * 0.99)] * 1000:.0f} ms, "
+          f"längste {waits[-1] * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.getLogger("mietrecht_agent.services.sqlite_pool").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cases.db")
+        start = time.perf_counter()
+        create_db(path, args.rows)
+        print(f"{args.rows} Fälle angelegt in {time.perf_counter() - start:.1f} s")
+        pool = ConnectionPool(path)
+
+        with pool.connection() as conn:
+            # list_cases liest vor der Migration über JSON, wie bisher
+            conn.execute("CREATE TABLE case_migrations (name TEXT PRIMARY KEY, last_id INTEGER, done INTEGER)")
+            run_queries("json", conn, max(args.repeat // 10, 1))
+            # Stand vor den Feldspalten: Änderungsfeed und JSON1-Ausdrucksindizes
+            conn.execute("ALTER TABLE cases ADD COLUMN change_version INTEGER")
+            conn.execute("UPDATE cases SET change_version = id")
+            for statement in CHANGE_FEED_SCHEMA + CASE_INDEXES + LEGACY_JSON_INDEXES:
+                conn.execute(statement)
+            run_queries("json-idx", conn, max(args.repeat // 10, 1))
+            conn.execute("DROP TABLE case_migrations")
+
+        migrate_while_booking(pool)
+        with pool.connection() as conn:
+            run_queries("columns", conn, args.repeat)
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
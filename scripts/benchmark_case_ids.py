@@ -0,0 +1,111 @@
+"""
+Nebenläufigkeits-Benchmark: Vergabe der Aktenzeichen (JM-xxxx) bei Buchungen.
+Vergleicht die bisherige Vergabe über SELECT COUNT(*) mit insert_case() (rowid in
+derselben Transaktion). Mehrere Prozesse buchen parallel in eine Datenbank mit
+1 Mio. bestehenden Fällen, wie mehrere gunicorn-Worker.
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_case_ids.py [--rows 1000000] [--workers 4] [--bookings 200]
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.case_store import insert_case, case_identifier_for
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS cases (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        case_identifier TEXT UNIQUE,
+        timestamp TEXT,
+        user_data TEXT,
+        case_data TEXT,
+        booking_data TEXT,
+        status TEXT
+    )
+'''
+PAYLOAD = ('{"name": "Test"}', '{"topic": "Kaution"}', '{"lawyer": "Meyer"}')
+
+
+def create_db(path, rows):
+    with sqlite3.connect(path) as conn:
+        conn.execute(SCHEMA)
+        conn.executemany(
+            "INSERT INTO cases (case_identifier, timestamp, user_data, case_data, booking_data, status) "
+            "VALUES (?, '2026-01-01T00:00:00', ?, ?, ?, 'Neu')",
+            ((case_identifier_for(i), *PAYLOAD) for i in range(1, rows + 1))
+        )
+
+
+def legacy_booking(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM cases")
+    case_identifier = f"JM-{cursor.fetchone()[0] + 1001}"
+    cursor.execute(
+        "INSERT INTO cases (case_identifier, timestamp, user_data, case_data, booking_data, status) "
+        "VALUES (?, '2026-01-01T00:00:00', ?, ?, ?, 'Neu')", (case_identifier, *PAYLOAD)
+    )
+    conn.commit()
+
+
+def new_booking(conn):
+    insert_case(conn, "2026-01-01T00:00:00", *PAYLOAD)
+    conn.commit()
+
+
+def worker(path, strategy, bookings, results):
+    booking = legacy_booking if strategy == "legacy" else new_booking
+    conn = sqlite3.connect(path, timeout=30)
+    latencies, conflicts = [], 0
+    for _ in range(bookings):
+        start = time.perf_counter()
+        try:
+            booking(conn)
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            conflicts += 1
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    results.put((latencies, conflicts))
+
+
+def run(path, strategy, workers, bookings):
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=worker, args=(path, strategy, bookings, results)) for _ in range(workers)]
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    collected = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - start
+    latencies = sorted(l for lat, _ in collected for l in lat)
+    conflicts = sum(c for _, c in collected)
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{strategy:<8} {len(latencies) / elapsed:>10.0f} Buchungen/s   p99 {p99:>8.2f} ms   "
+          f"UNIQUE-Konflikte {conflicts}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--bookings", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for strategy in ("legacy", "rowid"):
+            path = os.path.join(tmp, f"{strategy}.db")
+            start = time.perf_counter()
+            create_db(path, args.rows)
+            print(f"{args.rows} Fälle angelegt in {time.perf_counter() - start:.1f} s")
+            run(path, strategy, args.workers, args.bookings)
+
+
+if __name__ == "__main__":
+    main()
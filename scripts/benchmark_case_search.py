@@ -0,0 +1,120 @@
+"""
+Benchmark: Volltextsuche (FTS5) über N Fälle.
+
+  1. Aufbau des Suchindex für Bestandsfälle per backfill_case_search(), während
+     ein Thread weiter bucht (Dauer, längste Wartezeit einer Buchung)
+  2. Suchanfragen von selten bis häufig, mit und ohne Zeitraum (Median, Maximum)
+  3. Buchung mit Such-Triggern vs. ohne
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_case_search.py [--rows 500000] [--repeat 20]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.case_search import ensure_case_search_schema, backfill_case_search, search_cases
+from mietrecht_agent.services.case_store import case_identifier_for, ensure_case_schema, insert_case
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from benchmark_case_ids import SCHEMA
+from benchmark_case_fields import TOPICS
+
+FIRST_NAMES = ["Anna", "Jonas", "Eva", "Mehmet", "Lena", "Paul", "Sofia", "Lukas", "Marie", "Ali"]
+LAST_NAMES = ["Schmidt", "Weber", "Yilmaz", "Nowak", "Hoffmann", "Becker", "Wagner", "Schulz", "Krüger", "Wolf"]
+CITIES = ["Hamburg", "Berlin", "München", "Köln", "Leipzig", "Dresden", "Bremen", "Hannover", "Stuttgart", "Essen"]
+WORDS = ("Vermieter Mieter Wohnung Frist Kündigung Mängel Heizung Feuchtigkeit Wasserschaden Kaution "
+         "Nebenkostenabrechnung Abmahnung Modernisierung Mieterhöhung Vergleichsmiete Schönheitsreparaturen "
+         "Lärm Nachbar Räumung Zahlungsverzug Mietspiegel Instandhaltung Gutachten Fotos Protokoll").split()
+QUERIES = ["Wasserschaden", "Schimmel Hamburg", "Krüger Leipzig", "Kündigung", "Mieter", "Schmi"]
+SPRING = {"date_from": "2026-03-01", "date_to": "2026-05-31"}
+
+
+def create_db(path, rows):
+    rng = random.Random(1)
+    with sqlite3.connect(path) as conn:
+        conn.execute(SCHEMA)
+        ensure_case_schema(conn)
+        conn.executemany(
+            "INSERT INTO cases (case_identifier, timestamp, user_data, case_data, booking_data, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((case_identifier_for(i), f"2026-{i * 12 // rows + 1:02d}-{rng.randint(1, 28):02d}T10:00:00",
+              json.dumps({"name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                          "address": f"Hauptstr. {rng.randint(1, 200)}, {rng.choice(CITIES)}"}),
+              json.dumps({"topic": rng.choice(TOPICS),
+                          "analysis": " ".join(rng.choice(WORDS) for _ in range(60)),
+                          "recommendation": " ".join(rng.choice(WORDS) for _ in range(15))}),
+              json.dumps({"lawyer": "Meyer", "type": "Video", "price": 89}), "Neu")
+             for i in range(1, rows + 1))
+        )
+
+
+def median_max(action, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return durations[len(durations) // 2] * 1000, durations[-1] * 1000
+
+
+def book(pool):
+    with pool.write() as conn:
+        insert_case(conn, "2026-06-01T10:00:00", json.dumps({"name": "Neu Kunde", "address": "Hamburg"}),
+                    json.dumps({"topic": "Schimmel", "analysis": " ".join(WORDS)}), "{}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cases.db")
+        create_db(path, args.rows)
+        pool = ConnectionPool(path)
+        without, _ = median_max(lambda: book(pool), args.repeat)
+        with pool.write() as conn:
+            ensure_case_search_schema(conn)
+
+        stop, waits = threading.Event(), []
+
+        def booking_load():
+            while not stop.is_set():
+                start = time.perf_counter()
+                book(pool)
+                waits.append(time.perf_counter() - start)
+                time.sleep(0.01)
+
+        writer = threading.Thread(target=booking_load)
+        writer.start()
+        start = time.perf_counter()
+        batches = backfill_case_search(pool)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        writer.join()
+        print(f"Suchindex für {args.rows} Fälle in {elapsed:.1f} s ({batches} Batches); "
+              f"{len(waits)} Buchungen währenddessen, längste {max(waits) * 1000:.1f} ms")
+        with_fts, _ = median_max(lambda: book(pool), args.repeat)
+        print(f"Buchung ohne Suchindex {without:.2f} ms, mit Such-Triggern {with_fts:.2f} ms (Median)")
+
+        with pool.connection() as conn:
+            for q in QUERIES:
+                for label, filters in (("", {}), (" Frühjahr", SPRING)):
+                    hits = len(search_cases(conn, q, limit=20, **filters)[0])
+                    median, worst = median_max(lambda: search_cases(conn, q, limit=20, **filters), args.repeat)
+                    print(f"{q + label:<28} {median:>8.2f} ms (max {worst:.2f})   {hits} Treffer auf Seite 1")
+
+
+if __name__ == "__main__":
+    main()
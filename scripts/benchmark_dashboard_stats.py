@@ -0,0 +1,128 @@
+"""
+Benchmark: Kopfzahlen des Anwalts-Dashboards über N Fälle.
+
+  1. Bisher: alle Fälle seitenweise laden und zählen bzw. aggregieren
+     vs. dashboard_stats() aus den Zählern (Median, Maximum)
+  2. Buchung mit Zähler-Triggern vs. ohne
+  3. Abgleich per reconcile_case_stats() (Erstbefüllung der Bestandsfälle),
+     während ein Thread weiter bucht (Dauer, längste Wartezeit einer Buchung)
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_dashboard_stats.py [--rows 500000] [--repeat 20]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.case_stats import ensure_case_stats_schema, reconcile_case_stats, dashboard_stats
+from mietrecht_agent.services.case_store import (
+    case_identifier_for, ensure_case_schema, insert_case, list_cases, MAX_PAGE_SIZE
+)
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from benchmark_case_ids import SCHEMA
+
+LAWYERS = ["Meyer", "Schulz", "Aydin", "Nowak", "Hoffmann"]
+STATUSES = ["Neu", "Bezahlt", "Erledigt"]
+
+
+def create_db(path, rows):
+    rng = random.Random(1)
+    with sqlite3.connect(path) as conn:
+        conn.execute(SCHEMA)
+        ensure_case_schema(conn)
+        conn.executemany(
+            "INSERT INTO cases (case_identifier, timestamp, user_data, case_data, booking_data, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((case_identifier_for(i), f"2026-{i * 12 // rows + 1:02d}-{rng.randint(1, 28):02d}T10:00:00",
+              json.dumps({"name": "Anna Schmidt"}), json.dumps({"topic": "Schimmel"}),
+              json.dumps({"lawyer": rng.choice(LAWYERS), "type": "Video", "price": rng.choice((49, 89, 129))}),
+              rng.choice(STATUSES))
+             for i in range(1, rows + 1))
+        )
+
+
+def median_max(action, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return durations[len(durations) // 2] * 1000, durations[-1] * 1000
+
+
+def book(pool):
+    with pool.write() as conn:
+        insert_case(conn, date.today().isoformat() + "T10:00:00", json.dumps({"name": "Neu Kunde"}),
+                    json.dumps({"topic": "Schimmel"}), json.dumps({"lawyer": "Meyer", "price": 89}))
+
+
+def count_from_list(pool):
+    """Bisheriger Weg des Dashboards: alle Fälle laden und im Client zählen."""
+    new, revenue, cursor = 0, 0.0, None
+    with pool.connection() as conn:
+        while True:
+            cases, cursor = list_cases(conn, cursor=cursor, limit=MAX_PAGE_SIZE,
+                                       fields=["id", "status", "timestamp", "booking.price"])
+            new += sum(c["status"] == "Neu" for c in cases)
+            revenue += sum(c["booking"]["price"] or 0 for c in cases if c["timestamp"] >= "2026-06")
+            if cursor is None:
+                return new, revenue
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cases.db")
+        create_db(path, args.rows)
+        pool = ConnectionPool(path)
+        without, _ = median_max(lambda: book(pool), args.repeat)
+        with pool.write() as conn:
+            ensure_case_stats_schema(conn)
+
+        stop, waits = threading.Event(), []
+
+        def booking_load():
+            while not stop.is_set():
+                start = time.perf_counter()
+                book(pool)
+                waits.append(time.perf_counter() - start)
+                time.sleep(0.01)
+
+        writer = threading.Thread(target=booking_load)
+        writer.start()
+        start = time.perf_counter()
+        corrected = reconcile_case_stats(pool)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        writer.join()
+        print(f"Abgleich über {args.rows} Fälle in {elapsed:.2f} s ({corrected} Zähler gesetzt); "
+              f"{len(waits)} Buchungen währenddessen, längste {max(waits) * 1000:.1f} ms")
+        with_stats, _ = median_max(lambda: book(pool), args.repeat)
+        print(f"Buchung ohne Zähler {without:.2f} ms, mit Zähler-Triggern {with_stats:.2f} ms (Median)")
+
+        median, worst = median_max(lambda: count_from_list(pool), max(args.repeat // 10, 1))
+        print(f"{'Alle Fälle laden und zählen':<32} {median:>9.2f} ms (max {worst:.2f})")
+        with pool.connection() as conn:
+            median, worst = median_max(lambda: dashboard_stats(conn), args.repeat)
+        print(f"{'dashboard_stats()':<32} {median:>9.2f} ms (max {worst:.2f})")
+        # Kontrolle: der Abgleich unter Last hat nichts übersehen
+        print(f"Zweiter Abgleich korrigiert {reconcile_case_stats(pool)} Zähler")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: Datenbankwartung neben laufenden Buchungen. Ein Thread bucht im
+Takt, währenddessen läuft je eine Wartungsaufgabe. Gemessen werden Dauer und
+Ergebnis der Aufgabe sowie Median/p99/Maximum der Buchungslatenz:
+
+    ohne Wartung              Vergleichswert
+    Backup (Snapshot)         backup_database(): Backup-API blockweise in einer Lesetransaktion
+    Backup-API ohne Snapshot  dieselben Schritte ohne Lesetransaktion - beginnt nach
+                              jeder Buchung von vorn
+    VACUUM                    volle Neuschreibung, sperrt Schreiber
+    incremental_vacuum        freie Seiten in kurzen Schreibtransaktionen freigeben
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_db_maintenance.py [--rows 200000] [--bookings-per-s 50]
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.case_store import insert_case
+from mietrecht_agent.services.db_maintenance import (
+    BACKUP_PAGES, BACKUP_PAUSE, backup_database, database_sizes, full_vacuum, incremental_vacuum
+)
+from mietrecht_agent.services.storage import SQLiteStorage
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from benchmark_dashboard_stats import create_db
+
+# Höchstdauer für die Backup-API ohne Snapshot, falls sie nie fertig wird
+UNSNAPSHOTTED_LIMIT = 30.0
+
+
+def with_bookings(pool, bookings_per_s, action):
+    """Führt action() aus, während gebucht wird: (Ergebnis, Dauer s, [Latenzen s])."""
+    latencies, stop = [], threading.Event()
+
+    def booker():
+        while not stop.wait(1 / bookings_per_s):
+            start = time.perf_counter()
+            with pool.write() as conn:
+                insert_case(conn, "2026-10-19T10:00:00", json.dumps({"name": "Neu"}), "{}", '{"price": 89}')
+            latencies.append(time.perf_counter() - start)
+
+    thread = threading.Thread(target=booker)
+    thread.start()
+    time.sleep(0.5)
+    start = time.perf_counter()
+    try:
+        result = action()
+    finally:
+        elapsed = time.perf_counter() - start
+        time.sleep(0.5)
+        stop.set()
+        thread.join()
+    return result, elapsed, sorted(latencies)
+
+
+def backup_without_snapshot(pool, path):
+    steps = [0]
+
+    def progress(status, remaining, total):
+        steps[0] += 1
+        if time.perf_counter() - start > UNSNAPSHOTTED_LIMIT:
+            raise TimeoutError
+    target = sqlite3.connect(path)
+    start = time.perf_counter()
+    try:
+        with pool.connection() as conn:
+            conn.backup(target, pages=BACKUP_PAGES, sleep=BACKUP_PAUSE, progress=progress)
+        return {"steps": steps[0]}
+    except TimeoutError:
+        return {"steps": steps[0], "abgebrochen": True}
+    finally:
+        target.close()
+
+
+def report(label, result, elapsed, latencies):
+    pick = lambda q: latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+    print(f"{label:<26} {elapsed * 1000:>9.0f} ms   Buchungen {len(latencies):>5}   "
+          f"Median {pick(0.5):6.2f} ms   p99 {pick(0.99):7.2f} ms   max {latencies[-1] * 1000:7.2f} ms")
+    if result:
+        print(f"{'':<26} {result}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--bookings-per-s", type=float, default=50)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cases.db")
+        create_db(path, args.rows)
+        storage = SQLiteStorage(path, ConnectionPool(path))
+        pool = storage.pool
+        print(f"{args.rows} Fälle, {database_sizes(pool)['db_bytes'] / 1024 / 1024:.0f} MB")
+        backups = os.path.join(tmp, "backups")
+
+        report("ohne Wartung", *with_bookings(pool, args.bookings_per_s, lambda: time.sleep(2)))
+        report("Backup (Snapshot)", *with_bookings(pool, args.bookings_per_s,
+                                                    lambda: backup_database(pool, backups)))
+        report("Backup-API ohne Snapshot", *with_bookings(
+            pool, args.bookings_per_s, lambda: backup_without_snapshot(pool, os.path.join(tmp, "plain.db"))))
+
+        # Zusammenhängende ID-Bereiche löschen, damit ganze Seiten frei werden
+        def free(first, last):
+            with pool.write() as conn:
+                conn.execute("DELETE FROM cases WHERE id BETWEEN ? AND ?", (first, last))
+        free(1, args.rows // 4)
+        report("VACUUM", *with_bookings(pool, args.bookings_per_s, lambda: full_vacuum(pool)))
+        free(args.rows // 4 + 1, args.rows // 2)
+        report("incremental_vacuum", *with_bookings(
+            pool, args.bookings_per_s, lambda: incremental_vacuum(pool, free_ratio=0)))
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: viele Dashboards pollen gleichzeitig Fallliste und Kopfzahlen, ein
+Thread bucht nebenher. Ohne Cache läuft jede Abfrage gegen SQLite, mit ReadCache
+nur eine je Schlüssel und neuer Feed-Version. Gemessen werden Anfragen/s,
+Datenbankabfragen, Median/p99 der Antwortzeit und die Trefferquote.
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_read_cache.py [--rows 200000] [--viewers 50] [--seconds 10] [--bookings-per-s 2]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.case_store import LIST_FIELDS
+from mietrecht_agent.services.read_cache import ReadCache, cache_key
+from mietrecht_agent.services.storage import SQLiteStorage
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from benchmark_dashboard_stats import create_db
+
+PAGE = {"limit": 50, "fields": list(LIST_FIELDS)}
+STATS_DAY = "2026-06-15"
+
+
+def run(storage, cache, viewers, seconds, bookings_per_s):
+    queries, latencies, stop = [0], [], threading.Event()
+    lock = threading.Lock()
+
+    def counted(load):
+        def loader():
+            with lock:
+                queries[0] += 1
+            return load()
+        return loader
+
+    def page():
+        return storage.list_cases(**PAGE)
+
+    def stats():
+        return storage.dashboard_stats(STATS_DAY)
+
+    def viewer():
+        own = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            if cache is None:
+                counted(page)()
+                counted(stats)()
+            else:
+                cache.get(cache_key("cases", PAGE), counted(page))
+                cache.get(cache_key("stats", {"day": STATS_DAY}), counted(stats))
+            own.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(own)
+
+    def booker():
+        while not stop.wait(1 / bookings_per_s):
+            _, version = storage.insert_case(f"{STATS_DAY}T10:00:00", '{"name": "Neu"}', "{}", '{"price": 89}')
+            if cache is not None:
+                cache.observe(version)
+
+    threads = [threading.Thread(target=viewer) for _ in range(viewers)] + [threading.Thread(target=booker)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return (len(latencies) / seconds, queries[0] / seconds, latencies[len(latencies) // 2] * 1000,
+            latencies[int(len(latencies) * 0.99)] * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--viewers", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--bookings-per-s", type=float, default=2)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cases.db")
+        create_db(path, args.rows)
+        storage = SQLiteStorage(path, ConnectionPool(path))
+        for label, cache in (("ohne Cache", None), ("ReadCache", ReadCache(storage.current_version))):
+            rate, db_rate, median, p99 = run(storage, cache, args.viewers, args.seconds, args.bookings_per_s)
+            print(f"{label:<11} {rate:>8.0f} Polls/s   {db_rate:>8.0f} DB-Abfragen/s   "
+                  f"Median {median:.2f} ms   p99 {p99:.2f} ms")
+            if cache is not None:
+                print(f"            {cache.stats()}")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
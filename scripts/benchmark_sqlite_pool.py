@@ -0,0 +1,108 @@
+"""
+Benchmark: parallele Buchungen und Dashboard-Abfragen auf einer SQLite-Datenbank.
+Vergleicht das bisherige Muster (neue Verbindung je Zugriff, Rollback-Journal)
+mit dem gemeinsamen ConnectionPool (WAL, PRAGMAs, Statement-Cache, BEGIN IMMEDIATE).
+Schreiber und Leser laufen als Threads, wie im threaded Flask-Server.
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_sqlite_pool.py [--rows 100000] [--writers 4] [--readers 8] [--seconds 5]
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.case_store import insert_case, ensure_case_schema, list_cases, LIST_FIELDS
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from benchmark_case_ids import SCHEMA, PAYLOAD, create_db
+
+
+class LegacyAccess:
+    """Wie bisher: sqlite3.connect() je Zugriff, Standard-Journal, 5 s Timeout."""
+
+    def __init__(self, path):
+        self.path = path
+
+    @contextmanager
+    def connection(self):
+        with sqlite3.connect(self.path) as conn:
+            yield conn
+        conn.close()
+
+    write = connection
+
+    def stats(self):
+        return {}
+
+
+def run(access, seconds, writers, readers):
+    stop = time.perf_counter() + seconds
+    results = {"write": [], "read": [], "errors": 0}
+    lock = threading.Lock()
+
+    def loop(kind):
+        latencies, errors = [], 0
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                if kind == "write":
+                    with access.write() as conn:
+                        insert_case(conn, "2026-01-01T00:00:00", *PAYLOAD)
+                else:
+                    with access.connection() as conn:
+                        list_cases(conn, limit=50, fields=LIST_FIELDS)
+            except sqlite3.OperationalError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        with lock:
+            results[kind].extend(latencies)
+            results["errors"] += errors
+
+    threads = [threading.Thread(target=loop, args=("write",)) for _ in range(writers)]
+    threads += [threading.Thread(target=loop, args=("read",)) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def report(name, results, seconds, stats):
+    for kind in ("write", "read"):
+        latencies = sorted(results[kind])
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan")
+        label = "Buchungen" if kind == "write" else "Listen"
+        print(f"{name:<7} {label:<10} {len(latencies) / seconds:>9.0f}/s   p99 {p99:>8.2f} ms")
+    print(f"{name:<7} Fehler (locked) {results['errors']}   {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    # Langsame Sperren stehen in den Statistiken, nicht als einzelne Warnungen
+    logging.getLogger("mietrecht_agent.services.sqlite_pool").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("legacy", "pool"):
+            path = os.path.join(tmp, f"{name}.db")
+            create_db(path, args.rows)
+            with sqlite3.connect(path) as conn:
+                ensure_case_schema(conn)
+            access = LegacyAccess(path) if name == "legacy" else ConnectionPool(path)
+            results = run(access, args.seconds, args.writers, args.readers)
+            report(name, results, args.seconds, access.stats())
+
+
+if __name__ == "__main__":
+    main()
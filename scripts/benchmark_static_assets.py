@@ -0,0 +1,137 @@
+"""
+Benchmark: Startseite und Anwalts-Dashboard als Python-String (alt: HTML mit
+CSS und JS inline, ohne ETag und Kompression) gegen den Build aus
+scripts/build_assets.py (gehasht, vorkomprimiert, immutable / 304).
+
+Gemessen werden eigene Bytes je Besuch (erster Besuch mit leerem Cache,
+wiederholter Besuch), Anfragen pro Sekunde im Flask-Testclient und als
+Näherung für den First Paint die Übertragungszeit der render-blockierenden
+eigenen Bytes (HTML und CSS) bei --mbit/--rtt: eine Runde für das HTML, eine
+weitere für das CSS. Einen Browser braucht es dafür nicht.
+Fremde Dateien (Font Awesome, Google Fonts) sind in beiden Varianten gleich;
+die alte Variante lädt zusätzlich die Tailwind-Laufzeit vom CDN, die vor dem
+ersten Paint das CSS im Browser erzeugt - sie ist hier nicht mitgezählt.
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_static_assets.py [--tailwind tailwindcss] [--mbit 1.6] [--rtt 0.15]
+"""
+import argparse
+import gzip
+import os
+import re
+import shlex
+import sys
+import tempfile
+import time
+
+from flask import Flask, Response, request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.static_assets import DEFAULT_SOURCE_DIR, PAGES, AssetBundle, build_bundle
+
+ACCEPT = {"Accept-Encoding": "gzip, br"}
+
+
+def inline_page(page):
+    """Die Seite, wie home()/lawyer_dashboard() sie früher als String zurückgaben."""
+    def read(name):
+        with open(os.path.join(DEFAULT_SOURCE_DIR, name), encoding="utf-8") as f:
+            return f.read()
+    html = read(f"{page}.html")
+    html = html.replace(f'<link rel="stylesheet" href="/assets/{page}.css">', f"<style>\n{read(page + '.css')}</style>")
+    return html.replace(f'<script src="/assets/{page}.js"></script>', f"<script>\n{read(page + '.js')}</script>")
+
+
+def create_app(bundle):
+    app = Flask(__name__)
+    pages = {page: inline_page(page) for page in PAGES}
+
+    def respond(entry):
+        status, body, headers = entry.respond(request.headers.get("If-None-Match"), request.headers.get("Accept-Encoding"))
+        return Response(body, status=status, headers=headers, content_type=entry.content_type)
+
+    @app.route("/alt/<page>")
+    def old_page(page):
+        return pages[page]
+
+    @app.route("/neu/<page>")
+    def new_page(page):
+        return respond(bundle.page(page))
+
+    @app.route("/assets/<filename>")
+    def asset(filename):
+        return respond(bundle.asset(filename))
+
+    return app
+
+
+def visit(client, path, cache):
+    """
+    Lädt Seite und eigene Assets wie ein Browser mit cache:
+    (Bytes gesamt, HTML-Bytes, CSS-Bytes, Anfragen). Render-blockierend sind
+    HTML und CSS; das Skript steht am Ende von <body>.
+    """
+    headers = dict(ACCEPT)
+    if path in cache:
+        headers["If-None-Match"] = cache[path]
+    response = client.get(path, headers=headers)
+    if "ETag" in response.headers:
+        cache[path] = response.headers["ETag"]
+    total, requests = len(response.data), 1
+    html = response.get_data() if response.status_code == 200 else b""
+    # Gehashte Assets: im Cache liegt die Datei, immutable - keine Anfrage
+    css_bytes = asset_bytes = 0
+    for ref in re.findall(rb'(?:href|src)="(/assets/[^"]+)"', gzip.decompress(html) if html[:2] == b"\x1f\x8b" else html):
+        ref = ref.decode()
+        if ref in cache:
+            continue
+        asset = client.get(ref, headers=ACCEPT)
+        cache[ref] = asset.headers["ETag"]
+        asset_bytes += len(asset.data)
+        css_bytes += len(asset.data) if ref.endswith(".css") else 0
+        requests += 1
+    return total + asset_bytes, total, css_bytes, requests
+
+
+def per_second(client, path, headers, seconds=1.0):
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        client.get(path, headers=headers)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tailwind", help="Aufruf der Tailwind-CLI; ohne bleibt das CDN-Skript im Build")
+    parser.add_argument("--mbit", type=float, default=1.6, help="Bandbreite für das First-Paint-Modell")
+    parser.add_argument("--rtt", type=float, default=0.15, help="Round-Trip-Zeit in Sekunden")
+    args = parser.parse_args()
+    bytes_per_s = args.mbit * 1_000_000 / 8
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_bundle(build_dir=tmp, tailwind=shlex.split(args.tailwind) if args.tailwind else None)
+        client = create_app(AssetBundle(tmp)).test_client()
+        for page in PAGES:
+            old = len(client.get(f"/alt/{page}", headers=ACCEPT).data)
+            old_gzip = len(gzip.compress(inline_page(page).encode("utf-8")))
+            cache = {}
+            first, first_html, first_css, first_requests = visit(client, f"/neu/{page}", cache)
+            again, *_ , again_requests = visit(client, f"/neu/{page}", cache)
+            print(f"{page}")
+            print(f"  alt  Besuch: {old:>8} Bytes (mit gzip am Proxy {old_gzip}), Wiederholung ebenso, 1 Anfrage")
+            print(f"  neu  erster Besuch: {first:>8} Bytes (HTML {first_html}, CSS {first_css}), "
+                  f"{first_requests} Anfragen; Wiederholung: {again} Bytes (304), {again_requests} Anfrage")
+            # Alt: ein Dokument mit allem; neu: HTML, dann das CSS in einer weiteren Runde
+            old_paint = args.rtt + old_gzip / bytes_per_s
+            new_paint = 2 * args.rtt + (first_html + first_css) / bytes_per_s
+            print(f"  First Paint (Modell, {args.mbit} Mbit/s, RTT {args.rtt * 1000:.0f} ms): "
+                  f"alt {old_paint * 1000:.0f} ms + Tailwind-CDN, neu {new_paint * 1000:.0f} ms, "
+                  f"Wiederholung neu {(args.rtt + again / bytes_per_s) * 1000:.0f} ms")
+            print(f"  Anfragen/s (Testclient): alt {per_second(client, f'/alt/{page}', ACCEPT):.0f}, "
+                  f"neu {per_second(client, f'/neu/{page}', ACCEPT):.0f}, "
+                  f"neu 304 {per_second(client, f'/neu/{page}', {'If-None-Match': cache[f'/neu/{page}']}):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Micro-Benchmark: Themenzuordnung in analyze_legal_question().
+Vergleicht die bisherige Substring-Suche (Schlagwortliste je Anfrage neu aufgebaut)
+mit dem vorkompilierten Aho-Corasick-Automaten.
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/benchmark_topic_matcher.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+# Nur die Datendatei laden: mietrecht_full würde die Datenbank öffnen/migrieren und Threads starten
+from mietrecht_agent.services.knowledge_base import DEFAULT_WISSEN_PATH, load_snapshot
+from mietrecht_agent.services.topic_matcher import TopicMatcher
+
+MIETRECHT_WISSEN = load_snapshot(DEFAULT_WISSEN_PATH).wissen
+
+QUESTIONS = [
+    "Wann darf der Vermieter die Miete erhöhen?",
+    "Im Bad ist Schimmel, darf ich die Miete kürzen?",
+    "Der Vermieter hat mir wegen Eigenbedarf gekündigt, was kann ich tun?",
+    "Die Nebenkostenabrechnung kam erst nach 14 Monaten, muss ich nachzahlen?",
+    "Darf ich einen Hund halten, obwohl im Mietvertrag ein generelles Verbot steht? "
+    "Der Vermieter droht mit Kündigung und will die Kaution einbehalten.",
+]
+
+
+def legacy_match(question):
+    relevant_topics = []
+    question_lower = question.lower()
+    for topic, content in MIETRECHT_WISSEN.items():
+        if any(keyword in question_lower for keyword in [
+            topic.lower(),
+            *[word for word in topic.lower().split()],
+            *[word for word in content["KI-Einschätzung"].lower().split()[:10]]
+        ]):
+            relevant_topics.append((topic, content))
+    return relevant_topics[:2]
+
+
+def main(number=2000):
+    matcher = TopicMatcher(MIETRECHT_WISSEN)
+    build = timeit.timeit(lambda: TopicMatcher(MIETRECHT_WISSEN), number=10) / 10
+    print(f"Themen: {len(MIETRECHT_WISSEN)}, Automat aufgebaut in {build * 1000:.2f} ms")
+    print(f"{'Frage':<50} {'alt (µs)':>10} {'neu (µs)':>10}  Treffer alt -> neu")
+    for question in QUESTIONS:
+        legacy = timeit.timeit(lambda: legacy_match(question), number=number) / number
+        new = timeit.timeit(lambda: matcher.rank(question, limit=2), number=number) / number
+        old_topics = [t for t, _ in legacy_match(question)]
+        new_topics = [t for t, _ in matcher.rank(question, limit=2)]
+        print(f"{question[:48]:<50} {legacy * 1e6:>10.1f} {new * 1e6:>10.1f}  {old_topics} -> {new_topics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Baut die Oberfläche aus frontend/ nach static/dist/ (siehe
+mietrecht_agent/services/static_assets.py): Tailwind purged, Dateinamen mit
+Inhalts-Hash, gzip- und Brotli-Varianten (Brotli mit dem Paket brotli).
+
+Tailwind: das Standalone-Binary tailwindcss (v3) im PATH, sonst --tailwind
+"npx tailwindcss@3". --keep-tailwind-cdn baut ohne CLI und lässt das
+CDN-Skript in den Seiten (nur für Tests ohne Node/Binary).
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/build_assets.py [--tailwind "npx tailwindcss@3"] [--out static/dist]
+"""
+import argparse
+import json
+import os
+import shlex
+import shutil
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.static_assets import DEFAULT_BUILD_DIR, DEFAULT_SOURCE_DIR, build_bundle, brotli
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", default=DEFAULT_SOURCE_DIR)
+    parser.add_argument("--out", default=DEFAULT_BUILD_DIR)
+    parser.add_argument("--tailwind", default=os.environ.get("TAILWIND_CMD") or shutil.which("tailwindcss"),
+                        help="Aufruf der Tailwind-CLI")
+    parser.add_argument("--keep-tailwind-cdn", action="store_true")
+    args = parser.parse_args()
+    if not args.tailwind and not args.keep_tailwind_cdn:
+        parser.error("Tailwind-CLI nicht gefunden: --tailwind angeben oder --keep-tailwind-cdn")
+    if brotli is None:
+        print("Paket brotli fehlt - nur gzip-Varianten", file=sys.stderr)
+
+    tailwind = None if args.keep_tailwind_cdn else shlex.split(args.tailwind)
+    manifest = build_bundle(args.source, args.out, tailwind)
+    for name, info in sorted(manifest["files"].items()):
+        print(f"{name:<32} {info['size']:>8} Bytes   {', '.join(info['encodings']) or '-'}")
+    print(json.dumps({"pages": manifest["pages"], "tailwind": manifest["tailwind"], "removed": manifest["removed"]}))
+
+
+if __name__ == "__main__":
+    main()
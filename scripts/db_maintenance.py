@@ -0,0 +1,53 @@
+"""
+Datenbankwartung von Hand, z.B. per cron statt im App-Prozess oder vor einem
+Update. Dieselben Aufgaben wie start_db_maintenance(); Dauer und Ergebnis
+landen ebenso in maintenance_runs und damit in /health.
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/db_maintenance.py backup --backup-dir backups [--keep 7] [--db juris_mind.db] [--archive archiv.db]
+    python scripts/db_maintenance.py optimize | checkpoint | status
+    python scripts/db_maintenance.py vacuum [--full]
+
+vacuum --full schreibt die Datei neu und stellt auf auto_vacuum=INCREMENTAL um;
+Schreiber warten währenddessen, daher außerhalb der Geschäftszeiten ausführen.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.case_archive import attach_archive
+from mietrecht_agent.services.db_maintenance import BACKUP_KEEP, TASKS, full_vacuum, maintenance_stats, run_task
+from mietrecht_agent.services.storage import SQLiteStorage
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("task", choices=sorted(TASKS) + ["status"])
+    parser.add_argument("--db", default="juris_mind.db")
+    parser.add_argument("--archive", help="Archiv-Datenbank mitsichern bzw. mitwarten")
+    parser.add_argument("--backup-dir", default=os.environ.get("DB_BACKUP_DIR"))
+    parser.add_argument("--keep", type=int, default=BACKUP_KEEP)
+    parser.add_argument("--full", action="store_true", help="vacuum: komplett neu schreiben")
+    args = parser.parse_args()
+    if args.task == "backup" and not args.backup_dir:
+        parser.error("backup braucht --backup-dir oder DB_BACKUP_DIR")
+
+    storage = SQLiteStorage(args.db)
+    try:
+        if args.archive:
+            attach_archive(storage.pool, args.archive)
+        if args.task == "status":
+            result = maintenance_stats(storage.pool)
+        elif args.task == "vacuum" and args.full:
+            result = full_vacuum(storage.pool)
+        else:
+            result = run_task(storage.pool, args.task, backup_dir=args.backup_dir, backup_keep=args.keep)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
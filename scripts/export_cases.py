@@ -0,0 +1,55 @@
+"""
+Export aller Fälle für Buchhaltung und Partnerkanzleien, ohne laufenden Server.
+Liest blockweise (wie /api/cases/export) und schreibt direkt in die Ausgabedatei,
+der Speicherbedarf bleibt auch bei Millionen Fällen konstant.
+
+Aufruf aus dem Projektverzeichnis:
+    python scripts/export_cases.py [--db juris_mind.db | --database-url postgresql://...]
+        [--format csv|ndjson|parquet|arrow] [--from 2026-01-01] [--to 2026-03-31]
+        [--status Bezahlt] [--fields id,timestamp,booking.price] [--archive archiv.db]
+        [--output faelle.csv]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from mietrecht_agent.services.case_archive import attach_archive
+from mietrecht_agent.services.case_export import EXPORT_FORMATS, export_query_from_args, export_stream
+from mietrecht_agent.services.storage import storage_from_config
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="juris_mind.db")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--from", dest="date_from")
+    parser.add_argument("--to", dest="date_to")
+    parser.add_argument("--status")
+    parser.add_argument("--fields")
+    parser.add_argument("--archive", help="Archiv-Datenbank mit exportieren (nur SQLite)")
+    parser.add_argument("--output", help="Zieldatei, sonst stdout")
+    args = parser.parse_args()
+    if args.archive and args.database_url:
+        parser.error("--archive gibt es nur mit SQLite")
+
+    fmt, query = export_query_from_args({
+        "format": args.format, "from": args.date_from, "to": args.date_to, "status": args.status,
+        "fields": args.fields, "archive": "1" if args.archive else None,
+    })
+    storage = storage_from_config(args.database_url, args.db)
+    if args.archive:
+        attach_archive(storage.pool, args.archive)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for data in export_stream(storage.export_cases(**query), fmt, query["fields"]):
+            out.write(data)
+    finally:
+        if args.output:
+            out.close()
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -49,8 +49,84 @@ document.addEventListener('DOMContentLoaded', () => {
 
     const dateElem = document.getElementById('current-date');
     if (dateElem) dateElem.innerText = new Date().toLocaleDateString('de-DE');
+
+    const questionInput = document.getElementById('question');
+    if (questionInput) {
+        questionInput.addEventListener('input', () => {
+            clearTimeout(suggestTimer);
+            suggestTimer = setTimeout(() => loadSuggestions(questionInput.value), 120);
+        });
+        questionInput.addEventListener('blur', () => setTimeout(hideSuggestions, 200));
+    }
 });
 
+// Eingabevorschläge: Auswahl führt direkt zur kuratierten Themenantwort
+let suggestTimer = null;
+
+function hideSuggestions() {
+    const box = document.getElementById('question-suggestions');
+    if (box) box.classList.add('hidden');
+}
+
+async function loadSuggestions(q) {
+    const box = document.getElementById('question-suggestions');
+    if (!box || q.trim().length < 2) {
+        hideSuggestions();
+        return;
+    }
+    try {
+        const res = await fetch(`/api/suggest?q=${encodeURIComponent(q)}`);
+        const data = await res.json();
+        if (document.getElementById('question').value !== q) return;
+        if (!data.suggestions.length) {
+            hideSuggestions();
+            return;
+        }
+        box.innerHTML = '';
+        data.suggestions.forEach(s => {
+            const item = document.createElement('button');
+            item.type = 'button';
+            item.className = 'w-full text-left px-6 py-3 text-sm font-medium text-slate-700 hover:bg-blue-50 flex items-center justify-between';
+            item.innerHTML = `<span></span><span class="text-[10px] font-black uppercase tracking-widest text-slate-400"></span>`;
+            item.firstChild.textContent = s.text;
+            item.lastChild.textContent = s.topic;
+            item.onmousedown = (e) => {
+                e.preventDefault();
+                pickSuggestion(s);
+            };
+            box.appendChild(item);
+        });
+        box.classList.remove('hidden');
+    } catch (err) {
+        hideSuggestions();
+    }
+}
+
+function pickSuggestion(s) {
+    hideSuggestions();
+    document.getElementById('question').value = s.text;
+    fetch('/api/suggest/pick', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ text: s.text })
+    }).catch(() => {});
+    loadTopic(s.topic);
+}
+
+// Alle Themen mit einer (per ETag revalidierten) Anfrage laden
+let allTopicsPromise = null;
+function loadAllTopics() {
+    if (!allTopicsPromise) {
+        allTopicsPromise = fetch('/api/topics?include=all')
+            .then(res => res.ok ? res.json() : {})
+            .catch(() => {
+                allTopicsPromise = null;
+                return {};
+            });
+    }
+    return allTopicsPromise;
+}
+
 async function loadTopic(id) {
     currentSelectedTopic = id;
     lastTopic = id;
@@ -58,8 +134,8 @@ async function loadTopic(id) {
     results.innerHTML = '<div class="animate-pulse flex flex-col items-center py-6"><div class="w-8 h-8 bg-blue-100 rounded-full mb-2"></div><div class="h-2 w-24 bg-blue-100 rounded"></div></div>';
 
     try {
-        const res = await fetch(`/api/topic/${id}`);
-        const data = await res.json();
+        const all = await loadAllTopics();
+        const data = all[id] || await (await fetch(`/api/topic/${encodeURIComponent(id)}`)).json();
         lastAnalysisData = data;
         displayResults(id, data);
     } catch (err) {
@@ -459,11 +535,15 @@ function downloadICS() {
         'END:VCALENDAR'
     ].join('\n');
 
+    saveICS(icsContent, 'JurisMind_Termin.ics');
+}
+
+function saveICS(icsContent, filename) {
     const blob = new Blob([icsContent], { type: 'text/calendar;charset=utf-8' });
     const url = window.URL.createObjectURL(blob);
     const a = document.createElement('a');
     a.href = url;
-    a.download = 'JurisMind_Termin.ics';
+    a.download = filename;
     document.body.appendChild(a);
     a.click();
     window.URL.revokeObjectURL(url);
@@ -0,0 +1,252 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.append('.')
+import app_sandbox  # noqa: F401 - vor mietrecht_full
+from mietrecht_agent.services.blob_store import (
+    boto3, LocalBlobStore, S3BlobStore, blob_store_from_config, case_document, collect_garbage, document_refs
+)
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from mietrecht_agent.services.storage import SQLiteStorage
+
+try:
+    import moto
+except ImportError:
+    moto = None
+
+# S3-kompatibler Endpunkt für die S3-Tests, z.B. http://localhost:9000 (MinIO aus docker-compose.dev.yml);
+# ohne Angabe wird moto verwendet, falls installiert
+TEST_S3_ENDPOINT = os.environ.get("TEST_S3_ENDPOINT")
+TEST_S3_BUCKET = os.environ.get("TEST_S3_BUCKET", "jurismind-test")
+CONTENT = b"Mietvertrag " * 200_000     # mehrere Blöcke
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+class BlobStoreContract:
+    """Gemeinsames Verhalten aller Backends; die Unterklasse setzt self.store."""
+
+    def test_put_hashes_while_streaming(self):
+        digest, size = self.store.put(io.BytesIO(CONTENT))
+        self.assertEqual((digest, size), (DIGEST, len(CONTENT)))
+        self.assertTrue(self.store.exists(DIGEST))
+        self.assertEqual(b"".join(self.store.iter_chunks(DIGEST)), CONTENT)
+        self.assertEqual([digest for digest, _ in self.store.iter_blobs()], [DIGEST])
+
+    def test_identical_uploads_are_stored_once(self):
+        self.store.put(io.BytesIO(CONTENT))
+        self.store.put(io.BytesIO(CONTENT))
+        self.assertEqual(len(list(self.store.iter_blobs())), 1)
+        self.assertEqual(self.store.stats()["deduplicated"], 1)
+
+    def test_rejects_oversized_upload(self):
+        with self.assertRaises(ValueError):
+            self.store.put(io.BytesIO(CONTENT), max_size=1024)
+        self.assertEqual(list(self.store.iter_blobs()), [])
+
+    def test_invalid_digest(self):
+        for digest in ("../../etc/passwd", "A" * 64, DIGEST[:-1]):
+            with self.assertRaises(ValueError):
+                self.store.exists(digest)
+
+    def test_refresh_and_delete(self):
+        self.assertIsNone(self.store.refresh(DIGEST))
+        self.store.put(io.BytesIO(CONTENT))
+        self.assertEqual(self.store.refresh(DIGEST), len(CONTENT))
+        # Gerade erneuert: nicht älter als jetzt minus eine Stunde
+        self.assertFalse(self.store.delete(DIGEST, older_than=time.time() - 3600))
+        self.assertTrue(self.store.delete(DIGEST))
+        self.assertFalse(self.store.exists(DIGEST))
+        self.assertFalse(self.store.delete(DIGEST))
+
+
+class TestLocalBlobStore(BlobStoreContract, unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = LocalBlobStore(os.path.join(self.tmpdir, "blobs"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_sharded_layout(self):
+        self.assertEqual(list(self.store.iter_blobs()), [])
+        self.store.put(io.BytesIO(CONTENT))
+        path = self.store.local_path(DIGEST)
+        self.assertEqual(path, os.path.join(self.tmpdir, "blobs", DIGEST[:2], DIGEST[2:4], DIGEST))
+        self.assertEqual(os.listdir(os.path.join(self.tmpdir, "blobs", "tmp")), [])
+        self.assertIsNone(self.store.local_path("0" * 64))
+
+    def test_purge_abandoned_uploads(self):
+        self.store.put(io.BytesIO(b"x"))
+        leftover = os.path.join(self.tmpdir, "blobs", "tmp", "abgebrochen")
+        with open(leftover, "wb") as f:
+            f.write(b"halb")
+        self.assertEqual(self.store.purge_temp(time.time() - 3600), 0)
+        os.utime(leftover, (0, 0))
+        self.assertEqual(self.store.purge_temp(time.time() - 3600), 1)
+        self.assertFalse(os.path.exists(leftover))
+
+    def test_from_config(self):
+        self.assertIsInstance(blob_store_from_config(self.tmpdir), LocalBlobStore)
+
+
+@unittest.skipUnless(boto3 and (moto or TEST_S3_ENDPOINT), "boto3 und moto oder TEST_S3_ENDPOINT nötig")
+class TestS3BlobStore(BlobStoreContract, unittest.TestCase):
+    def setUp(self):
+        if TEST_S3_ENDPOINT:
+            client = boto3.client("s3", endpoint_url=TEST_S3_ENDPOINT)
+        else:
+            self.mock = moto.mock_aws()
+            self.mock.start()
+            self.addCleanup(self.mock.stop)
+            client = boto3.client("s3", region_name="us-east-1")
+        try:
+            client.create_bucket(Bucket=TEST_S3_BUCKET)
+        except client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+        self.store = S3BlobStore(TEST_S3_BUCKET, f"test-{os.getpid()}-{id(self)}/", client=client)
+        self.addCleanup(self.empty_prefix)
+
+    def empty_prefix(self):
+        for digest, _ in list(self.store.iter_blobs()):
+            self.store.delete(digest)
+
+    def test_no_local_path(self):
+        self.store.put(io.BytesIO(CONTENT))
+        self.assertIsNone(self.store.local_path(DIGEST))
+
+
+class TestGarbageCollection(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = LocalBlobStore(os.path.join(self.tmpdir, "blobs"))
+        path = os.path.join(self.tmpdir, "cases.db")
+        self.storage = SQLiteStorage(path, ConnectionPool(path))
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.tmpdir)
+
+    def upload(self, content, age=0):
+        digest, _ = self.store.put(io.BytesIO(content))
+        if age:
+            mtime = time.time() - age
+            os.utime(self.store.path(digest), (mtime, mtime))
+        return digest
+
+    def book(self, *digests):
+        documents = [{"hash": digest} for digest in digests]
+        case_id, _ = self.storage.insert_case("2026-04-12T10:00:00", "{}",
+                                              json.dumps({"documents": document_refs(documents, self.store)}), "{}")
+        return case_id
+
+    def test_deletes_only_old_unreferenced_blobs(self):
+        day = 24 * 3600
+        referenced = self.upload(b"Mietvertrag", age=2 * day)
+        orphaned = self.upload(b"Abgebrochene Buchung", age=2 * day)
+        fresh = self.upload(b"Buchung folgt gleich", age=60)
+        self.book(referenced)
+        # document_refs erneuert die Frist; für den Test wieder alt machen
+        os.utime(self.store.path(referenced), (time.time() - 2 * day,) * 2)
+        self.assertEqual(collect_garbage(self.store, self.storage, grace=day, batch_size=1), 1)
+        self.assertEqual({digest for digest, _ in self.store.iter_blobs()}, {referenced, fresh})
+        self.assertFalse(self.store.exists(orphaned))
+
+    def test_removed_reference_releases_blob(self):
+        digest = self.upload(b"Kuendigung")
+        case_id = self.book(digest)
+        with self.storage.pool.write() as conn:
+            conn.execute("UPDATE cases SET case_data = '{}' WHERE case_identifier = ?", (case_id,))
+        self.assertEqual(collect_garbage(self.store, self.storage, grace=0, now=time.time() + 1), 1)
+
+    def test_reupload_survives_collection(self):
+        digest = self.upload(b"Nebenkostenabrechnung", age=3 * 24 * 3600)
+        self.upload(b"Nebenkostenabrechnung")
+        self.assertEqual(collect_garbage(self.store, self.storage), 0)
+        self.assertTrue(self.store.exists(digest))
+
+
+class TestDocumentRefs(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = LocalBlobStore(self.tmpdir)
+        self.digest, _ = self.store.put(io.BytesIO(b"%PDF-1.7"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_valid_reference(self):
+        refs = document_refs([{"hash": self.digest, "name": "../Vertrag.pdf", "mime_type": "application/pdf",
+                               "size": 999}], self.store)
+        self.assertEqual(refs, [{"hash": self.digest, "name": "Vertrag.pdf", "mime_type": "application/pdf",
+                                 "size": 8}])
+        self.assertEqual(document_refs(None, self.store), [])
+        self.assertEqual(case_document({"case": {"documents": refs}}, self.digest), refs[0])
+        self.assertIsNone(case_document({"case": {}}, self.digest))
+
+    def test_invalid_references(self):
+        for documents in ("abc", [{"hash": "0" * 64}], [{"hash": "x"}], ["abc"], [{"hash": self.digest}] * 21):
+            with self.assertRaises(ValueError):
+                document_refs(documents, self.store)
+
+    def test_unsafe_mime_type_falls_back(self):
+        ref, = document_refs([{"hash": self.digest, "mime_type": "text/html; charset=x\r\nX: y"}], self.store)
+        self.assertEqual(ref["mime_type"], "application/octet-stream")
+
+
+class TestDocumentRoutes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import mietrecht_full
+        cls.app = mietrecht_full
+        cls.client = mietrecht_full.app.test_client()
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.original_store = mietrecht_full.blob_store
+        mietrecht_full.blob_store = LocalBlobStore(cls.tmpdir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.app.blob_store = cls.original_store
+        shutil.rmtree(cls.tmpdir)
+
+    def upload(self, content=b"%PDF-1.7 Mietvertrag", name="Mietvertrag.pdf"):
+        response = self.client.post("/api/documents", data={"file": (io.BytesIO(content), name, "application/pdf")},
+                                    content_type="multipart/form-data")
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()
+
+    def test_upload_book_and_download(self):
+        document = self.upload()
+        self.assertEqual(document["hash"], hashlib.sha256(b"%PDF-1.7 Mietvertrag").hexdigest())
+        response = self.client.post("/api/book", json={"timestamp": "2000-01-01T10:00:00", "documents": [document]})
+        case_id = response.get_json()["case_id"]
+        self.assertIn(document["hash"], self.app.storage.referenced_blobs([document["hash"]]))
+
+        url = f"/api/cases/{case_id}/documents/{document['hash']}"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(), b"%PDF-1.7 Mietvertrag")
+        self.assertEqual(response.mimetype, "application/pdf")
+        self.assertIn("Mietvertrag.pdf", response.headers["Content-Disposition"])
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": f'"{document["hash"]}"'}).status_code, 304)
+        response.close()
+
+    def test_download_requires_reference_from_case(self):
+        other = self.upload(b"fremdes Dokument")
+        case_id = self.client.post("/api/book", json={"timestamp": "2000-01-01T10:00:00"}).get_json()["case_id"]
+        self.assertEqual(self.client.get(f"/api/cases/{case_id}/documents/{other['hash']}").status_code, 404)
+        self.assertEqual(self.client.get(f"/api/cases/{case_id}/documents/abc").status_code, 400)
+
+    def test_booking_rejects_unknown_document(self):
+        response = self.client.post("/api/book", json={"documents": [{"hash": "0" * 64}]})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
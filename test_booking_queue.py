@@ -0,0 +1,112 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append('.')
+from mietrecht_agent.services import booking_queue
+from mietrecht_agent.services.booking_queue import BookingQueue
+from mietrecht_agent.services.case_store import ensure_case_schema, insert_case
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from mietrecht_agent.services.storage import SQLiteStorage
+from test_case_store import SCHEMA
+
+
+class TestBookingQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.queue_dir = os.path.join(self.tmpdir, "queue")
+        self.pool = ConnectionPool(os.path.join(self.tmpdir, "cases.db"))
+        with self.pool.connection() as conn:
+            conn.execute(SCHEMA)
+            ensure_case_schema(conn)
+        self.versions = []
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmpdir)
+
+    def make_queue(self):
+        # Ohne start(): kein Hintergrund-Thread, Flush nur explizit
+        return BookingQueue(SQLiteStorage(self.pool.db_path, self.pool), self.queue_dir, on_flush=self.versions.append, id_block_size=3)
+
+    def identifiers(self):
+        with self.pool.connection() as conn:
+            return [row[0] for row in conn.execute("SELECT case_identifier FROM cases ORDER BY id")]
+
+    def test_submit_returns_identifier_before_flush(self):
+        queue = self.make_queue()
+        first = queue.submit("2026-01-01", "{}", "{}", "{}")
+        second = queue.submit("2026-01-02", "{}", "{}", "{}")
+        self.assertEqual((first, second), ("JM-1001", "JM-1002"))
+        self.assertEqual(self.identifiers(), [])
+        self.assertEqual(queue.stats()["queued"], 2)
+
+        self.assertEqual(queue.flush(), 2)
+        self.assertEqual(self.identifiers(), ["JM-1001", "JM-1002"])
+        self.assertEqual(len(self.versions), 1)
+        self.assertEqual(os.listdir(self.queue_dir), [])
+        stats = queue.stats()
+        self.assertEqual((stats["queued"], stats["flushed"], stats["batches"]), (0, 2, 1))
+
+    def test_reserved_ids_do_not_collide_with_direct_inserts(self):
+        queue = self.make_queue()
+        queued = [queue.submit("2026-01-01", "{}", "{}", "{}") for _ in range(4)]
+        with self.pool.write() as conn:
+            direct = insert_case(conn, "2026-01-01", "{}", "{}", "{}")
+        queue.flush()
+        self.assertNotIn(direct, queued)
+        self.assertEqual(len(set(self.identifiers())), 5)
+
+    def test_recover_replays_journal_idempotently(self):
+        os.makedirs(self.queue_dir)
+        entries = [[7, "2026-01-01", "{}", '{"topic": "Kaution"}', "{}", "Neu"],
+                   [8, "2026-01-02", "{}", "{}", "{}", "Neu"]]
+        # Segment eines beendeten Prozesses mit abgeschnittener letzter Zeile
+        path = os.path.join(self.queue_dir, "bookings-999999999-1.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries) + '[9, "2026')
+        with self.pool.write() as conn:
+            conn.execute("INSERT INTO cases (id, case_identifier, status) VALUES (7, 'JM-1007', 'Neu')")
+
+        queue = self.make_queue()
+        self.assertEqual(queue.recover(), 2)
+        self.assertEqual(self.identifiers(), ["JM-1007", "JM-1008"])
+        self.assertFalse(os.path.exists(path))
+
+    def test_concurrent_recovery_replays_each_segment_once(self):
+        os.makedirs(self.queue_dir)
+        paths = []
+        for n, row_id in enumerate((7, 8), 1):
+            paths.append(os.path.join(self.queue_dir, f"bookings-999999999-{n}.jsonl"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.write(json.dumps([row_id, "2026-01-01", "{}", "{}", "{}", "Neu"]) + "\n")
+        # Ein zweiter Worker hat dieselben Segmente gelistet, bevor der erste sie einspielt
+        listed = sorted(paths)
+        self.assertEqual(self.make_queue().recover(), 2)
+        with mock.patch.object(booking_queue.glob, "glob", return_value=listed):
+            self.assertEqual(self.make_queue().recover(), 0)
+        self.assertEqual(self.identifiers(), ["JM-1007", "JM-1008"])
+        self.assertEqual(os.listdir(self.queue_dir), [])
+
+    def test_segment_of_dead_claimer_is_recovered(self):
+        os.makedirs(self.queue_dir)
+        path = os.path.join(self.queue_dir, "bookings-999999999-claimed-999999998-1.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps([7, "2026-01-01", "{}", "{}", "{}", "Neu"]) + "\n")
+        self.assertEqual(self.make_queue().recover(), 1)
+        self.assertEqual(self.identifiers(), ["JM-1007"])
+        self.assertEqual(os.listdir(self.queue_dir), [])
+
+    def test_close_flushes_pending_bookings(self):
+        queue = self.make_queue().start()
+        queue.submit("2026-01-01", "{}", "{}", "{}")
+        queue.close()
+        self.assertEqual(self.identifiers(), ["JM-1001"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.append('.')
+from mietrecht_agent.services.case_archive import attach_archive, archive_cases, compact_archive, archive_stats
+from mietrecht_agent.services.case_store import insert_case, ensure_case_schema, list_cases, get_case
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from test_case_store import SCHEMA
+
+NOW = datetime(2026, 10, 1)
+
+
+class TestCaseArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.pool = ConnectionPool(os.path.join(self.tmpdir, "cases.db"))
+        with self.pool.write() as conn:
+            conn.execute(SCHEMA)
+            ensure_case_schema(conn)
+            # 2024: alt, 2026-09: jung; jeder dritte Fall noch offen
+            for i in range(12):
+                year = "2024-03" if i < 8 else "2026-09"
+                insert_case(
+                    conn, f"{year}-{i + 1:02d}T10:00:00", json.dumps({"email": f"m{i}@example.com"}),
+                    json.dumps({"topic": "Kaution"}), json.dumps({"lawyer": "Meyer"}),
+                    "Neu" if i % 3 == 0 else "Bezahlt"
+                )
+        attach_archive(self.pool, os.path.join(self.tmpdir, "archive.db"))
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmpdir)
+
+    def ids(self, include_archive=False):
+        with self.pool.connection() as conn:
+            cases, _ = list_cases(conn, fields=["id"], include_archive=include_archive)
+        return [c["id"] for c in cases]
+
+    def test_moves_only_old_closed_cases(self):
+        # Alte Fälle 0..7, davon offen: 0, 3, 6
+        self.assertEqual(archive_cases(self.pool, after_days=365, batch_size=2, pause=0, now=NOW), 5)
+        self.assertEqual(archive_stats(self.pool), {"hot_cases": 7, "archived_cases": 5})
+        archived = {"JM-1002", "JM-1003", "JM-1005", "JM-1006", "JM-1008"}
+        self.assertFalse(archived & set(self.ids()))
+        self.assertEqual(len(self.ids(include_archive=True)), 12)
+        # Zweiter Lauf findet nichts mehr
+        self.assertEqual(archive_cases(self.pool, after_days=365, pause=0, now=NOW), 0)
+
+    def test_archive_read_path_is_explicit(self):
+        archive_cases(self.pool, after_days=365, pause=0, now=NOW)
+        with self.pool.connection() as conn:
+            self.assertIsNone(get_case(conn, "JM-1002"))
+            case = get_case(conn, "JM-1002", include_archive=True)
+            self.assertEqual(case["user"]["email"], "m1@example.com")
+            cases, _ = list_cases(conn, email="m1@example.com", include_archive=True)
+            self.assertEqual([c["id"] for c in cases], ["JM-1002"])
+
+    def test_pagination_spans_hot_and_archive(self):
+        archive_cases(self.pool, after_days=365, pause=0, now=NOW)
+        seen, cursor = [], None
+        with self.pool.connection() as conn:
+            while True:
+                cases, cursor = list_cases(conn, cursor=cursor, limit=5, fields=["id"], include_archive=True)
+                seen.extend(c["id"] for c in cases)
+                if cursor is None:
+                    break
+        self.assertEqual(seen, [f"JM-{1000 + i}" for i in range(12, 0, -1)])
+
+    def test_case_in_both_tables_is_listed_once(self):
+        # Zustand nach einem Abbruch zwischen Kopieren und Löschen
+        with self.pool.write() as conn:
+            conn.execute("INSERT INTO archive.cases (id, case_identifier, status) "
+                         "SELECT id, case_identifier, status FROM main.cases WHERE id = 2")
+        self.assertEqual(len(self.ids(include_archive=True)), 12)
+
+    def test_new_ids_are_not_reused_after_archival(self):
+        archive_cases(self.pool, after_days=0, pause=0, now=NOW)
+        with self.pool.write() as conn:
+            self.assertEqual(insert_case(conn, "2026-10-01", "{}", "{}", "{}"), "JM-1013")
+
+    def test_compact(self):
+        archive_cases(self.pool, after_days=0, pause=0, now=NOW)
+        with self.pool.write() as conn:
+            conn.execute("DELETE FROM archive.cases WHERE id > 3")
+        compact_archive(self.pool)
+        with self.pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA archive.freelist_count").fetchone()[0], 0)
+            # Planer-Statistik für die Archiv-Indizes
+            self.assertTrue(conn.execute("SELECT COUNT(*) FROM archive.sqlite_stat1").fetchone()[0])
+
+    def test_incremental_compact_frees_all_pages(self):
+        archive_cases(self.pool, after_days=0, pause=0, now=NOW)
+        with self.pool.write() as conn:
+            conn.execute("UPDATE archive.cases SET case_data = ?", ("Mietvertrag " * 2000,))
+            conn.execute("DELETE FROM archive.cases")
+        compact_archive(self.pool, full=False)
+        with self.pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA archive.freelist_count").fetchone()[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.append('.')
+from mietrecht_agent.services.case_store import insert_case, ensure_case_schema, current_version, list_changes
+from mietrecht_agent.services.case_events import (
+    CaseEventBroker, SQLitePollingBackend, case_event_stream, EVENT_FIELDS, check_stream_ticket, issue_stream_ticket
+)
+from test_case_store import SCHEMA
+
+
+class TestCaseEvents(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "cases.db")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(SCHEMA)
+            ensure_case_schema(conn)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def book(self, broker=None):
+        with sqlite3.connect(self.db_path) as conn:
+            case_id = insert_case(conn, "2026-01-01", '{"name": "A"}', '{"topic": "Kaution"}', '{"type": "Video"}')
+            conn.commit()
+            if broker:
+                broker.publish(current_version(conn))
+        return case_id
+
+    def fetch(self, since):
+        with sqlite3.connect(self.db_path) as conn:
+            return list_changes(conn, since=since, fields=EVENT_FIELDS)
+
+    def test_publish_wakes_stream(self):
+        broker = CaseEventBroker()
+        stream = case_event_stream(broker, self.fetch, since=0, heartbeat=5)
+        self.assertTrue(next(stream).startswith("retry:"))
+        threading.Timer(0.05, self.book, args=(broker,)).start()
+        start = time.monotonic()
+        event = next(stream)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertIn("event: case", event)
+        self.assertIn('"id": "JM-1001"', event)
+
+    def test_heartbeat_when_idle(self):
+        stream = case_event_stream(CaseEventBroker(), self.fetch, since=0, heartbeat=0.05)
+        next(stream)
+        self.assertEqual(next(stream), ": heartbeat\n\n")
+
+    def test_resume_from_last_event_id(self):
+        self.book()
+        with sqlite3.connect(self.db_path) as conn:
+            last_event_id = current_version(conn)
+        self.book()
+        stream = case_event_stream(CaseEventBroker(), self.fetch, since=last_event_id, heartbeat=0.05)
+        next(stream)
+        event = next(stream)
+        self.assertIn('"id": "JM-1002"', event)
+        self.assertEqual(next(stream), ": heartbeat\n\n")
+
+    def test_stream_limit(self):
+        broker = CaseEventBroker(max_streams=2)
+        self.assertTrue(broker.open_stream())
+        self.assertTrue(broker.open_stream())
+        self.assertTrue(broker.full)
+        self.assertFalse(broker.open_stream())
+        broker.close_stream()
+        self.assertTrue(broker.open_stream())
+
+    def test_polling_backend_sees_other_workers(self):
+        broker = CaseEventBroker(SQLitePollingBackend(self.db_path, interval=0.02))
+        broker.wait(0, 0.05)
+        self.book()    # anderer Worker: kein publish() in diesem Prozess
+        self.assertGreater(broker.wait(0, 1.0), 0)
+
+
+
+class TestStreamTicket(unittest.TestCase):
+    def test_ticket_opens_stream_only_while_valid(self):
+        ticket = issue_stream_ticket("geheim", "anwalt@jurismind.de")
+        self.assertEqual(check_stream_ticket("geheim", ticket), "anwalt@jurismind.de")
+        self.assertIsNone(check_stream_ticket("anderes-geheimnis", ticket))
+        self.assertIsNone(check_stream_ticket("geheim", ticket[:-2]))
+        self.assertIsNone(check_stream_ticket("geheim", None))
+        time.sleep(1.1)
+        self.assertIsNone(check_stream_ticket("geheim", ticket, max_age=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.append('.')
+import app_sandbox  # noqa: F401 - vor mietrecht_full
+from mietrecht_agent.services.case_archive import attach_archive, archive_cases
+from mietrecht_agent.services.case_export import (
+    EXPORT_FIELDS, export_filename, export_query_from_args, export_stream, iter_case_chunks, pyarrow
+)
+from mietrecht_agent.services.storage import SQLiteStorage
+
+
+class TestCaseExport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.storage = SQLiteStorage(os.path.join(self.tmpdir, "cases.db"))
+        self.ids = [self.book(f"2026-0{month}-15T10:00:00", price) for month, price in
+                    ((1, 49), (2, "89"), (3, None), (4, 129), (5, 49))]
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.tmpdir)
+
+    def book(self, timestamp, price, status="Neu"):
+        case_id, _ = self.storage.insert_case(
+            timestamp, json.dumps({"name": "Müller, Anna", "email": "anna@example.de"}),
+            json.dumps({"topic": "Schimmel"}), json.dumps({"lawyer": "Meyer", "price": price}), status
+        )
+        return case_id
+
+    def export(self, fmt="csv", chunk_size=2, **query):
+        fields = query.pop("fields", EXPORT_FIELDS)
+        chunks = iter_case_chunks(self.storage.pool, fields=fields, chunk_size=chunk_size, **query)
+        return b"".join(export_stream(chunks, fmt, fields))
+
+    def test_chunks_cover_all_cases_oldest_first(self):
+        chunks = list(iter_case_chunks(self.storage.pool, fields=["id"], chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual([case["id"] for chunk in chunks for case in chunk], self.ids)
+
+    def test_csv_has_header_and_flat_columns(self):
+        rows = list(csv.reader(io.StringIO(self.export(date_from="2026-02-01", date_to="2026-04-15").decode())))
+        self.assertEqual(rows[0], list(EXPORT_FIELDS))
+        self.assertEqual([row[0] for row in rows[1:]], self.ids[1:4])
+        row = dict(zip(rows[0], rows[2]))
+        self.assertEqual((row["user.name"], row["booking.price"], row["case.risk"]), ("Müller, Anna", "", ""))
+
+    def test_csv_neutralizes_formulas(self):
+        names = ["=HYPERLINK(\"http://x\")", "+49 30 1234", "-1+2", "@SUM(A1)", "\tTab", "\rCR", "Anna"]
+        for name in names:
+            self.storage.insert_case("2026-07-01T10:00:00", json.dumps({"name": name}), "{}",
+                                     json.dumps({"price": -5}))
+        rows = list(csv.DictReader(io.StringIO(self.export(date_from="2026-07-01").decode(), newline="")))
+        self.assertEqual([row["user.name"] for row in rows], ["'" + name for name in names[:-1]] + ["Anna"])
+        self.assertEqual({row["booking.price"] for row in rows}, {"-5"})
+
+    def test_csv_without_matches_is_only_header(self):
+        self.assertEqual(self.export(status="Erledigt").decode().splitlines(), [",".join(EXPORT_FIELDS)])
+
+    def test_ndjson_keeps_case_format(self):
+        lines = self.export("ndjson", fields=["id", "booking"]).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[1]), {"id": self.ids[1], "booking": {"lawyer": "Meyer", "price": "89"}})
+
+    def test_archived_cases_only_on_request(self):
+        self.book("2024-01-10T10:00:00", 49, status="Erledigt")
+        attach_archive(self.storage.pool, os.path.join(self.tmpdir, "archive.db"))
+        self.assertEqual(archive_cases(self.storage.pool, after_days=365, pause=0, now=datetime(2026, 10, 1)), 1)
+        self.assertEqual(len(self.export("ndjson").splitlines()), 5)
+        self.assertEqual(len(self.export("ndjson", include_archive=True).splitlines()), 6)
+
+    def test_query_from_args(self):
+        fmt, query = export_query_from_args({"format": "ndjson", "from": "2026-01-01", "fields": "id,booking.price"})
+        self.assertEqual(fmt, "ndjson")
+        self.assertEqual(query["fields"], ["id", "booking.price"])
+        self.assertEqual(export_filename(fmt, query["date_from"], query["date_to"]), "faelle_2026-01-01.ndjson")
+        with self.assertRaises(ValueError):
+            export_query_from_args({"format": "xlsx"})
+        with self.assertRaises(ValueError):
+            export_query_from_args({"fields": "id,passwort"})
+        for bad in ("2025-01-01\r\nX", "a b;x", "2025-13-01"):
+            with self.assertRaises(ValueError):
+                export_query_from_args({"from": bad})
+            with self.assertRaises(ValueError):
+                export_query_from_args({"to": bad})
+
+    @unittest.skipIf(pyarrow is not None, "pyarrow installiert")
+    def test_columnar_formats_need_pyarrow(self):
+        with self.assertRaises(RuntimeError):
+            export_stream(iter([]), "parquet")
+
+    @unittest.skipUnless(pyarrow, "pyarrow nicht installiert")
+    def test_parquet_and_arrow(self):
+        import pyarrow.parquet
+        table = pyarrow.parquet.read_table(io.BytesIO(self.export("parquet")))
+        self.assertEqual(table.column("id").to_pylist(), self.ids)
+        self.assertEqual(table.column("booking.price").to_pylist(), [49.0, 89.0, None, 129.0, 49.0])
+        table = pyarrow.ipc.open_stream(self.export("arrow")).read_all()
+        self.assertEqual(table.num_rows, 5)
+
+
+class TestExportRoute(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from mietrecht_full import app
+        cls.client = app.test_client()
+
+    def test_csv_download_is_streamed(self):
+        response = self.client.get("/api/cases/export?from=2099-01-01")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, "text/csv")
+        self.assertIn("attachment; filename*=UTF-8''faelle_2099-01-01.csv", response.headers["Content-Disposition"])
+        self.assertEqual(response.get_data(as_text=True).splitlines(), [",".join(EXPORT_FIELDS)])
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get("/api/cases/export?format=xlsx").status_code, 400)
+
+    def test_invalid_dates(self):
+        self.assertEqual(self.client.get("/api/cases/export?from=2025-01-01%0d%0aX").status_code, 400)
+        self.assertEqual(self.client.get("/api/cases/export?to=a%20b;x").status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.append('.')
+from mietrecht_agent.services.case_search import (
+    ensure_case_search_schema, backfill_case_search, case_search_ready, search_cases, fts_query,
+    search_query_from_args
+)
+from mietrecht_agent.services.case_store import insert_case, ensure_case_schema
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from test_case_store import SCHEMA
+
+
+def book(conn, name, address, topic, analysis, timestamp="2026-04-01T10:00:00"):
+    return insert_case(
+        conn, timestamp, json.dumps({"name": name, "address": address}),
+        json.dumps({"topic": topic, "analysis": analysis, "recommendation": "Fristen prüfen"}),
+        json.dumps({"lawyer": "Meyer", "type": "Video", "price": 49})
+    )
+
+
+class TestCaseSearch(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(SCHEMA)
+        ensure_case_schema(self.conn)
+        ensure_case_search_schema(self.conn)
+        self.hamburg = book(self.conn, "Anna Schmidt", "Elbchaussee 1, Hamburg", "Schimmel",
+                            "Schimmelbefall im Bad, Mietminderung möglich", "2026-04-12T10:00:00")
+        book(self.conn, "Jonas Weber", "Karl-Marx-Allee 5, Berlin", "Schimmel",
+             "Feuchtigkeit durch Lüftungsverhalten?", "2025-11-02T10:00:00")
+        book(self.conn, "Eva Hamburger", "Hauptstr. 3, München", "Kündigung", "Eigenbedarf <script>")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def ids(self, q, **filters):
+        cases, _ = search_cases(self.conn, q, **filters)
+        return [c["id"] for c in cases]
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.ids("Schimmel Hamburg"), [self.hamburg])
+
+    def test_prefix_fallback_and_umlauts_fold(self):
+        self.assertEqual(set(self.ids("Hamb")), {self.hamburg, "JM-1003"})
+        # Ganze Wörter zuerst: "Hamburg" findet nicht "Hamburger"
+        self.assertEqual(self.ids("Hamburg"), [self.hamburg])
+        self.assertEqual(self.ids("kundigung"), ["JM-1003"])
+
+    def test_name_ranks_above_analysis(self):
+        book(self.conn, "Max Mustermann", "", "Nebenkosten", "Rückfrage an Frau Schmidt")
+        self.assertEqual(self.ids("Schmidt")[0], self.hamburg)
+
+    def test_snippet_marks_hits_and_escapes_html(self):
+        cases, _ = search_cases(self.conn, "Eigenbedarf")
+        self.assertIn("<mark>Eigenbedarf</mark>", cases[0]["snippet"])
+        self.assertIn("&lt;script&gt;", cases[0]["snippet"])
+        self.assertEqual(cases[0]["case"]["topic"], "Kündigung")
+
+    def test_date_filter(self):
+        self.assertEqual(self.ids("Schimmel", date_from="2026-03-01", date_to="2026-05-31"), [self.hamburg])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.conn.execute(
+            "UPDATE cases SET case_data = json_set(case_data, '$.topic', 'Kaution') WHERE case_identifier = ?",
+            (self.hamburg,)
+        )
+        self.assertEqual(self.ids("Kaution"), [self.hamburg])
+        self.assertEqual(self.ids("Schimmel Hamburg"), [])
+        self.conn.execute("DELETE FROM cases WHERE case_identifier = ?", (self.hamburg,))
+        self.assertEqual(self.ids("Kaution"), [])
+        self.conn.execute("INSERT INTO case_search (case_search) VALUES ('integrity-check')")
+
+    def test_pagination(self):
+        for i in range(5):
+            book(self.conn, f"Mandant {i}", "", "Schimmel", "")
+        first, offset = search_cases(self.conn, "Schimmel", limit=4)
+        second, end = search_cases(self.conn, "Schimmel", offset=offset, limit=4)
+        self.assertEqual((len(first), len(second), end), (4, 3, None))
+        self.assertFalse({c["id"] for c in first} & {c["id"] for c in second})
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(fts_query('Schimmel OR "Bad', prefix=True), '"Schimmel" "OR" "Bad"*')
+        with self.assertRaises(ValueError):
+            search_query_from_args({"q": "  -- "})
+
+
+class TestCaseSearchBackfill(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.pool = ConnectionPool(os.path.join(self.tmpdir, "cases.db"))
+        with self.pool.write() as conn:
+            conn.execute(SCHEMA)
+            ensure_case_schema(conn)
+            for i in range(25):
+                book(conn, f"Mandant {i}", "Hamburg", "Schimmel", "")
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_existing_cases_are_indexed_in_batches(self):
+        with self.pool.write() as conn:
+            ensure_case_search_schema(conn)
+            # Während des Backfills: neue Fälle über den Trigger, alte Fälle geändert
+            book(conn, "Neu Gebucht", "Hamburg", "Schimmel", "")
+            conn.execute("UPDATE cases SET user_data = json_set(user_data, '$.name', 'Umbenannt') WHERE id = 3")
+            self.assertFalse(case_search_ready(conn))
+        self.assertEqual(backfill_case_search(self.pool, batch_size=10, pause=0), 3)
+        with self.pool.connection() as conn:
+            self.assertTrue(case_search_ready(conn))
+            cases, _ = search_cases(conn, "Hamburg", limit=50)
+            self.assertEqual(len(cases), 26)
+            self.assertEqual([c["id"] for c in search_cases(conn, "Umbenannt")[0]], ["JM-1003"])
+            conn.execute("INSERT INTO case_search (case_search) VALUES ('integrity-check')")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+sys.path.append('.')
+from mietrecht_agent.services.case_stats import (
+    ensure_case_stats_schema, reconcile_case_stats, dashboard_stats, case_stats_ready
+)
+from mietrecht_agent.services.case_archive import attach_archive, archive_cases
+from mietrecht_agent.services.case_store import insert_case, ensure_case_schema
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from test_case_store import SCHEMA
+
+DAY = "2026-04-12"
+
+
+def book(conn, lawyer="Meyer", price=49, timestamp=f"{DAY}T10:00:00", status="Neu"):
+    return insert_case(
+        conn, timestamp, json.dumps({"name": "Anna Schmidt"}), json.dumps({"topic": "Schimmel"}),
+        json.dumps({"lawyer": lawyer, "type": "Video", "price": price}), status
+    )
+
+
+class TestCaseStats(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.pool = ConnectionPool(os.path.join(self.tmpdir, "cases.db"))
+        with self.pool.write() as conn:
+            conn.execute(SCHEMA)
+            ensure_case_schema(conn)
+            ensure_case_stats_schema(conn)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmpdir)
+
+    def stats(self, day=DAY):
+        with self.pool.connection() as conn:
+            return dashboard_stats(conn, day)
+
+    def test_counters_follow_bookings_and_status_changes(self):
+        with self.pool.write() as conn:
+            first = book(conn)
+            book(conn, lawyer="Schulz", price=89.5)
+            book(conn, timestamp="2026-04-01T09:00:00")
+            book(conn, price=None, timestamp="2026-03-31T09:00:00")
+            conn.execute("UPDATE cases SET status = 'Bezahlt' WHERE case_identifier = ?", (first,))
+        stats = self.stats()
+        self.assertEqual(stats["status"], {"Neu": 3, "Bezahlt": 1})
+        self.assertEqual(stats["today"], {"date": DAY, "cases": 2, "revenue": 138.5})
+        self.assertEqual(stats["month"], {"month": "2026-04", "cases": 3, "revenue": 187.5})
+        self.assertEqual(stats["lawyers"], {"Meyer": {"cases": 3, "revenue": 98.0},
+                                            "Schulz": {"cases": 1, "revenue": 89.5}})
+        self.assertTrue(stats["complete"])
+
+    def test_default_day_is_the_utc_booking_day(self):
+        # toISOString() kurz vor Mitternacht UTC - in Berlin ist es schon der nächste Tag
+        with self.pool.write() as conn:
+            book(conn, timestamp=f"{DAY}T23:30:00.000Z")
+        with mock.patch("mietrecht_agent.services.case_stats.datetime") as clock:
+            clock.now.return_value = datetime(2026, 4, 12, 23, 45, tzinfo=timezone.utc)
+            self.assertEqual(self.stats(day=None)["today"], {"date": DAY, "cases": 1, "revenue": 49.0})
+        clock.now.assert_called_with(timezone.utc)
+
+    def test_rebooking_moves_revenue(self):
+        with self.pool.write() as conn:
+            case_id = book(conn)
+            conn.execute(
+                "UPDATE cases SET booking_data = json_set(booking_data, '$.lawyer', 'Schulz', '$.price', 129) "
+                "WHERE case_identifier = ?", (case_id,)
+            )
+        stats = self.stats()
+        self.assertEqual(stats["lawyers"], {"Schulz": {"cases": 1, "revenue": 129.0}})
+        self.assertEqual(stats["today"]["revenue"], 129.0)
+
+    def test_reconcile_fills_existing_cases_and_fixes_drift(self):
+        with self.pool.write() as conn:
+            conn.execute("DROP TRIGGER case_stats_insert")
+            for _ in range(3):
+                book(conn)
+        with self.pool.write() as conn:
+            ensure_case_stats_schema(conn)
+            book(conn, lawyer="Schulz")
+        self.assertEqual(self.stats()["status"], {"Neu": 1})
+        self.assertEqual(reconcile_case_stats(self.pool), 3)
+        stats = self.stats()
+        self.assertEqual(stats["status"], {"Neu": 4})
+        self.assertEqual(stats["lawyers"]["Meyer"], {"cases": 3, "revenue": 147.0})
+        # Abweichung von außen (z.B. Trigger fehlte): der nächste Abgleich korrigiert nur diese
+        with self.pool.write() as conn:
+            conn.execute("UPDATE case_stats SET cases = cases + 5 WHERE kind = 'status'")
+        self.assertEqual(reconcile_case_stats(self.pool), 1)
+        self.assertEqual(self.stats()["status"], {"Neu": 4})
+        self.assertEqual(reconcile_case_stats(self.pool), 0)
+
+    def test_new_database_with_cases_is_incomplete_until_reconciled(self):
+        with self.pool.write() as conn:
+            conn.execute("DELETE FROM case_migrations WHERE name = 'case_stats'")
+            book(conn)
+            ensure_case_stats_schema(conn)
+        self.assertFalse(self.stats()["complete"])
+        reconcile_case_stats(self.pool)
+        self.assertTrue(self.stats()["complete"])
+
+    def test_archived_cases_stay_counted(self):
+        with self.pool.write() as conn:
+            for _ in range(2):
+                book(conn, timestamp="2024-03-01T10:00:00", status="Erledigt")
+            book(conn)
+        attach_archive(self.pool, os.path.join(self.tmpdir, "archive.db"))
+        self.assertEqual(archive_cases(self.pool, after_days=365, pause=0, now=datetime(2026, 10, 1)), 2)
+        self.assertEqual(reconcile_case_stats(self.pool), 0)
+        self.assertEqual(self.stats()["status"], {"Neu": 1, "Erledigt": 2})
+        with self.pool.connection() as conn:
+            self.assertTrue(case_stats_ready(conn))
+
+
+if __name__ == '__main__':
+    unittest.main()
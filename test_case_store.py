@@ -0,0 +1,70 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append('.')
+from mietrecht_agent.services.case_store import insert_case
+
+SCHEMA = '''
+    CREATE TABLE cases (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        case_identifier TEXT UNIQUE,
+        timestamp TEXT,
+        user_data TEXT,
+        case_data TEXT,
+        booking_data TEXT,
+        status TEXT
+    )
+'''
+
+
+class TestCaseIdentifiers(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "cases.db")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(SCHEMA)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def book(self):
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            return insert_case(conn, "2026-01-01", "{}", "{}", "{}")
+
+    def test_sequence_continues_legacy_numbering(self):
+        self.assertEqual([self.book(), self.book()], ["JM-1001", "JM-1002"])
+
+    def test_deleted_numbers_are_not_reused(self):
+        self.book()
+        second = self.book()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM cases WHERE case_identifier = ?", (second,))
+        self.assertEqual(self.book(), "JM-1003")
+
+    def test_concurrent_bookings_are_unique(self):
+        ids = []
+        errors = []
+
+        def run():
+            for _ in range(25):
+                try:
+                    ids.append(self.book())
+                except sqlite3.Error as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(set(ids)), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.append('.')
+from mietrecht_agent.services.case_store import (
+    insert_case, ensure_case_schema, list_cases, get_case, case_query_from_args,
+    current_version, list_changes, change_query_from_args, case_fields_ready, backfill_case_fields, LIST_FIELDS
+)
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from test_case_store import SCHEMA
+
+TOPICS = ("Kaution", "Mietminderung", "Kündigung")
+LAWYERS = ("Dr. Schulze", "Meyer")
+
+
+class TestListCases(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(SCHEMA)
+        ensure_case_schema(self.conn)
+        for i in range(30):
+            insert_case(
+                self.conn, f"2026-01-{i % 28 + 1:02d}T10:00:00.000Z",
+                json.dumps({"name": f"Mandant {i}"}),
+                json.dumps({"topic": TOPICS[i % 3], "analysis": "Langer Analysetext"}),
+                json.dumps({"lawyer": LAWYERS[i % 2], "type": "Video", "price": 49}),
+                "Neu" if i % 5 else "Erledigt"
+            )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_pages_cover_all_cases_newest_first(self):
+        seen, cursor = [], None
+        while True:
+            cases, cursor = list_cases(self.conn, cursor=cursor, limit=7, fields=["id"])
+            seen.extend(c["id"] for c in cases)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [f"JM-{1000 + i}" for i in range(30, 0, -1)])
+
+    def test_filters(self):
+        cases, _ = list_cases(self.conn, topic="Kaution", lawyer="Meyer", status="Neu")
+        self.assertTrue(cases)
+        for case in cases:
+            self.assertEqual(case["case"]["topic"], "Kaution")
+            self.assertEqual(case["booking"]["lawyer"], "Meyer")
+            self.assertEqual(case["status"], "Neu")
+
+    def test_date_range_includes_whole_end_day(self):
+        cases, _ = list_cases(self.conn, date_from="2026-01-02", date_to="2026-01-03", fields=["timestamp"])
+        self.assertEqual(sorted(c["timestamp"][:10] for c in cases), ["2026-01-02", "2026-01-02", "2026-01-03"])
+
+    def test_projection_skips_analysis(self):
+        cases, _ = list_cases(self.conn, limit=1, fields=["id", "user.name", "case.topic"])
+        self.assertEqual(cases[0], {"id": "JM-1030", "user": {"name": "Mandant 29"}, "case": {"topic": "Kündigung"}})
+
+    def test_unknown_field_rejected(self):
+        with self.assertRaises(ValueError):
+            list_cases(self.conn, fields=["case.topic') OR 1=1 --"])
+        with self.assertRaises(ValueError):
+            case_query_from_args({"fields": "id,password"})
+
+    def test_list_fields_read_columns_only(self):
+        plan = " ".join(row[-1] for row in self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id, user_name, topic, lawyer FROM cases WHERE topic = 'Kaution' "
+            "ORDER BY id DESC LIMIT 50"))
+        self.assertIn("idx_cases_topic", plan)
+        cases, _ = list_cases(self.conn, limit=1, fields=LIST_FIELDS)
+        self.assertEqual(cases[0]["booking"], {"lawyer": "Meyer", "type": "Video", "price": 49, "time": None})
+
+    def test_updated_json_updates_columns(self):
+        self.conn.execute("""UPDATE cases SET booking_data = json_set(booking_data, '$.lawyer', 'Neu')
+                             WHERE case_identifier = 'JM-1001'""")
+        cases, _ = list_cases(self.conn, lawyer="Neu", fields=["id"])
+        self.assertEqual(cases, [{"id": "JM-1001"}])
+
+    def test_get_case(self):
+        case = get_case(self.conn, "JM-1001")
+        self.assertEqual(case["case"]["analysis"], "Langer Analysetext")
+        self.assertIsNone(get_case(self.conn, "JM-9999"))
+
+    def test_filters_use_indexes(self):
+        for column, value in (("status", "'Neu'"), ("topic", "'Kaution'"), ("lawyer", "'Meyer'"),
+                              ("user_email", "'a@example.de'")):
+            plan = " ".join(row[-1] for row in self.conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT id FROM cases WHERE {column} = {value} AND id < 100 "
+                "ORDER BY id DESC LIMIT 50"))
+            self.assertIn("INDEX idx_cases_", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+class TestCaseFieldsMigration(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.pool = ConnectionPool(os.path.join(self.tmpdir, "cases.db"))
+        with self.pool.write() as conn:
+            conn.execute(SCHEMA)
+            conn.executemany(
+                "INSERT INTO cases (case_identifier, timestamp, user_data, case_data, booking_data, status) "
+                "VALUES (?, '2026-01-01', ?, ?, '{\"lawyer\": \"Meyer\"}', 'Neu')",
+                ((f"JM-{1000 + i}", json.dumps({"email": f"m{i}@example.de"}), json.dumps({"topic": TOPICS[i % 3]}))
+                 for i in range(1, 26))
+            )
+            ensure_case_schema(conn)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_reads_before_and_after_backfill(self):
+        with self.pool.connection() as conn:
+            self.assertFalse(case_fields_ready(conn))
+            before, _ = list_cases(conn, topic="Kaution", fields=["id", "user.email"])
+        self.assertEqual(backfill_case_fields(self.pool, batch_size=10, pause=0), 3)
+        with self.pool.connection() as conn:
+            self.assertTrue(case_fields_ready(conn))
+            after, _ = list_cases(conn, topic="Kaution", fields=["id", "user.email"])
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM cases WHERE lawyer = 'Meyer'").fetchone()[0], 25)
+        self.assertEqual(before, after)
+        self.assertEqual(len(after), 8)
+        # Erneuter Aufruf ist ein No-op
+        self.assertEqual(backfill_case_fields(self.pool), 0)
+
+    def test_new_rows_during_backfill_are_filled_by_trigger(self):
+        with self.pool.write() as conn:
+            insert_case(conn, "2026-01-02", "{}", json.dumps({"topic": "Schimmel"}), "{}")
+            self.assertEqual(conn.execute("SELECT topic FROM cases ORDER BY id DESC LIMIT 1").fetchone()[0], "Schimmel")
+
+
+class TestChangeFeed(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(SCHEMA)
+        ensure_case_schema(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def book(self, topic="Kaution"):
+        return insert_case(self.conn, "2026-01-01", "{}", json.dumps({"topic": topic}), "{}")
+
+    def test_idle_poll_returns_nothing(self):
+        self.book()
+        version = current_version(self.conn)
+        self.assertEqual(list_changes(self.conn, since=version), ([], version, False))
+
+    def test_inserts_and_updates_since_version(self):
+        first = self.book()
+        version = current_version(self.conn)
+        second = self.book("Schimmel")
+        self.conn.execute("UPDATE cases SET status = 'In Bearbeitung' WHERE case_identifier = ?", (first,))
+        cases, new_version, more = list_changes(self.conn, since=version, fields=["id", "status"])
+        self.assertEqual(cases, [{"id": second, "status": "Neu"}, {"id": first, "status": "In Bearbeitung"}])
+        self.assertGreater(new_version, version)
+        self.assertFalse(more)
+        self.assertEqual(list_changes(self.conn, since=new_version)[0], [])
+
+    def test_batches_continue_from_returned_version(self):
+        for _ in range(5):
+            self.book()
+        seen, since, more = [], 0, True
+        while more:
+            cases, since, more = list_changes(self.conn, since=since, limit=2, fields=["id"])
+            seen.extend(c["id"] for c in cases)
+        self.assertEqual(seen, [f"JM-{1000 + i}" for i in range(1, 6)])
+
+    def test_existing_rows_are_migrated(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute(SCHEMA)
+        insert_case(conn, "2026-01-01", "{}", "{}", "{}")
+        ensure_case_schema(conn)
+        self.assertEqual(current_version(conn), 1)
+        insert_case(conn, "2026-01-02", "{}", "{}", "{}")
+        cases, _, _ = list_changes(conn, since=1, fields=["id"])
+        self.assertEqual(cases, [{"id": "JM-1002"}])
+        conn.close()
+
+    def test_query_args(self):
+        self.assertEqual(change_query_from_args({"since": "7", "fields": "id, status"}),
+                         {"since": 7, "limit": 200, "fields": ["id", "status"]})
+        with self.assertRaises(ValueError):
+            change_query_from_args({"since": "gestern"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import unittest
+from flask import json
+
+sys.path.append('.')
+import app_sandbox  # noqa: F401 - vor mietrecht_full
+from mietrecht_full import app, MIETRECHT_WISSEN
+from mietrecht_agent.services.citation_graph import CitationGraph, extract_citations
+
+
+class TestCitationExtraction(unittest.TestCase):
+    def test_aktenzeichen(self):
+        self.assertEqual(
+            extract_citations("BGH VIII ZR 185/14 und LG Berlin 63 S 112/10"),
+            [("VIII ZR 185/14", "aktenzeichen", "BGH VIII ZR 185/14"),
+             ("63 S 112/10", "aktenzeichen", "LG Berlin 63 S 112/10")]
+        )
+
+    def test_norms(self):
+        keys = [key for key, _, _ in extract_citations(
+            "§§ 573, 573c BGB, § 556 Abs. 3 S. 2 BGB, § 2 Nr. 17 BetrKV und § 536")]
+        self.assertEqual(keys, ["§ 573 BGB", "§ 573c BGB", "§ 556 BGB", "§ 2 BetrKV", "§ 536 BGB"])
+
+
+class TestCitationGraph(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.graph = CitationGraph(MIETRECHT_WISSEN)
+
+    def test_topics_citing_decision(self):
+        result = self.graph.lookup("VIII ZR 185/14")
+        self.assertIn("Renovierung", result["topics"])
+        self.assertIn("§ 307 BGB", result["norms"])
+
+    def test_decisions_related_to_norm(self):
+        result = self.graph.lookup("§ 536")
+        self.assertEqual(result["citation"], "§ 536 BGB")
+        self.assertIn("Mietminderung", result["topics"])
+        self.assertIn("BGH VIII ZR 224/10", result["decisions"])
+
+    def test_unknown_citation(self):
+        self.assertIsNone(self.graph.lookup("VIII ZR 999/99"))
+
+    def test_validate(self):
+        checked = self.graph.validate("Nach § 536 BGB (BGH VIII ZR 999/99) mindert sich die Miete.")
+        self.assertEqual([(c["citation"], c["known"]) for c in checked],
+                         [("§ 536 BGB", True), ("BGH VIII ZR 999/99", False)])
+
+
+class TestCitationEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+
+    def test_lookup(self):
+        response = self.app.get('/api/citations?ref=VIII ZR 185/14')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Renovierung", json.loads(response.data)["topics"])
+
+    def test_errors(self):
+        self.assertEqual(self.app.get('/api/citations?ref=Schimmel').status_code, 400)
+        self.assertEqual(self.app.get('/api/citations?ref=VIII ZR 999/99').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
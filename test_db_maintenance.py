@@ -0,0 +1,169 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+sys.path.append('.')
+from mietrecht_agent.services.case_archive import attach_archive
+from mietrecht_agent.services.db_maintenance import (
+    backup_database, checkpoint_wal, claim_task, database_sizes, incremental_vacuum, optimize_database,
+    run_due_tasks
+)
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from mietrecht_agent.services.storage import SQLiteStorage
+
+
+class MaintenanceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "cases.db")
+        self.storage = SQLiteStorage(self.path, ConnectionPool(self.path))
+        self.pool = self.storage.pool
+        self.backup_dir = os.path.join(self.tmpdir, "backups")
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.tmpdir)
+
+    def book(self, count, analysis="x"):
+        with self.pool.write() as conn:
+            conn.executemany(
+                "INSERT INTO cases (timestamp, user_data, case_data, booking_data, status) VALUES (?, '{}', ?, '{}', 'Neu')",
+                [("2026-04-12T10:00:00", f'{{"analysis": "{analysis}"}}')] * count
+            )
+
+    def count_cases(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+        finally:
+            conn.close()
+
+
+class TestBackup(MaintenanceTestCase):
+    def test_backup_is_consistent_while_writers_continue(self):
+        self.book(2000, "Mietminderung " * 20)
+        stop, written = threading.Event(), [0]
+
+        def writer():
+            while not stop.is_set():
+                self.book(1)
+                written[0] += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            result = backup_database(self.pool, self.backup_dir, pages=5, pause=0.001)
+        finally:
+            stop.set()
+            thread.join()
+        name, = result["files"]
+        path = os.path.join(self.backup_dir, name)
+        self.assertGreater(written[0], 0)
+        # Snapshot: alle Fälle vom Beginn, keine halben Seiten (quick_check lief bereits)
+        self.assertGreaterEqual(self.count_cases(path), 2000)
+        self.assertLessEqual(self.count_cases(path), 2000 + written[0])
+        self.assertGreater(result["steps"], 1)
+        self.assertEqual(result["bytes"], os.path.getsize(path))
+        self.assertEqual(os.listdir(self.backup_dir), [name])
+        conn = sqlite3.connect(path)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+        conn.close()
+
+    def test_archive_is_backed_up_and_old_backups_pruned(self):
+        attach_archive(self.pool, os.path.join(self.tmpdir, "archiv.db"))
+        self.book(3)
+        for day in range(1, 5):
+            result = backup_database(self.pool, self.backup_dir, keep=2, now=datetime(2026, 4, day, 3, 0))
+        self.assertEqual(result["files"], ["cases-20260404T030000.db", "cases-20260404T030000.archive.db"])
+        self.assertEqual(result["removed"], 2)
+        self.assertEqual(sorted(os.listdir(self.backup_dir)), [
+            "cases-20260403T030000.archive.db", "cases-20260403T030000.db",
+            "cases-20260404T030000.archive.db", "cases-20260404T030000.db",
+        ])
+        self.assertEqual(self.count_cases(os.path.join(self.backup_dir, "cases-20260404T030000.db")), 3)
+
+
+class TestVacuumAndOptimize(MaintenanceTestCase):
+    def test_new_database_uses_incremental_auto_vacuum(self):
+        self.assertEqual(database_sizes(self.pool)["auto_vacuum"], "incremental")
+
+    def test_incremental_vacuum_frees_pages(self):
+        self.book(3000, "Schimmel " * 100)
+        with self.pool.write() as conn:
+            conn.execute("DELETE FROM cases")
+        before = database_sizes(self.pool)
+        result = incremental_vacuum(self.pool, batch_pages=100, pause=0)
+        after = database_sizes(self.pool)
+        self.assertEqual(result["freed_pages"], before["free_pages"])
+        self.assertEqual(after["free_pages"], 0)
+        self.assertLess(after["pages"], before["pages"])
+
+    def test_small_database_without_auto_vacuum_is_converted(self):
+        path = os.path.join(self.tmpdir, "alt.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE notizen (id INTEGER PRIMARY KEY)")
+        conn.close()
+        storage = SQLiteStorage(path, ConnectionPool(path))
+        try:
+            self.assertEqual(database_sizes(storage.pool)["auto_vacuum"], "none")
+            with storage.pool.write() as conn:
+                conn.executemany("INSERT INTO users (email, password_hash) VALUES (?, ?)",
+                                 [(str(i), "x" * 2000) for i in range(500)])
+                conn.execute("DELETE FROM users")
+            result = incremental_vacuum(storage.pool)
+            self.assertEqual(result["auto_vacuum"], "incremental")
+            self.assertGreater(result["freed_pages"], 0)
+            self.assertEqual(database_sizes(storage.pool)["free_pages"], 0)
+        finally:
+            storage.close()
+
+    def test_optimize_analyzes_once_then_optimizes(self):
+        self.book(10)
+        self.assertEqual(optimize_database(self.pool), {"analyze": True})
+        self.assertEqual(optimize_database(self.pool), {"analyze": False})
+        with self.pool.connection() as conn:
+            self.assertTrue(conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0])
+
+    def test_checkpoint(self):
+        self.book(100)
+        result = checkpoint_wal(self.pool)
+        self.assertFalse(result["busy"])
+        self.assertEqual(result["checkpointed_pages"], result["wal_pages"])
+
+
+class TestScheduling(MaintenanceTestCase):
+    def test_due_tasks_run_once_across_workers(self):
+        self.book(10)
+        done = run_due_tasks(self.pool, self.backup_dir, now=1_000_000)
+        self.assertEqual(sorted(done), ["backup", "checkpoint", "optimize", "vacuum"])
+        # Zweiter Worker mit eigenem Pool: nichts mehr fällig
+        other = ConnectionPool(self.path)
+        try:
+            self.assertEqual(run_due_tasks(other, self.backup_dir, now=1_000_100), {})
+            self.assertEqual(sorted(run_due_tasks(other, self.backup_dir, now=1_000_400)), ["checkpoint"])
+        finally:
+            other.close()
+        self.assertFalse(claim_task(self.pool, "backup", 24 * 3600, now=1_000_400))
+
+    def test_stats_report_durations_and_sizes(self):
+        run_due_tasks(self.pool, self.backup_dir)
+        stats = self.storage.stats()["maintenance"]
+        self.assertGreater(stats["db_bytes"], 0)
+        self.assertIn("wal_bytes", stats)
+        backup = stats["tasks"]["backup"]
+        self.assertGreaterEqual(backup["duration_ms"], 0)
+        self.assertGreater(backup["bytes"], 0)
+        self.assertIn("analyze", stats["tasks"]["optimize"])
+
+    def test_without_backup_dir_no_backup(self):
+        self.assertNotIn("backup", run_due_tasks(self.pool))
+        self.assertFalse(os.path.exists(self.backup_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import sys
+import time
+import unittest
+from datetime import date
+
+sys.path.append('.')
+from mietrecht_agent.services.fristen_service import FristenService, holidays
+
+
+class TestFristenService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = FristenService()
+
+    def test_holidays_by_state(self):
+        self.assertIn(date(2025, 1, 6), holidays(2025, "BY"))
+        self.assertNotIn(date(2025, 1, 6), holidays(2025, "BE"))
+        self.assertIn(date(2025, 3, 8), holidays(2025, "BE"))
+        self.assertIn(date(2025, 11, 19), holidays(2025, "SN"))
+        self.assertIn(date(2025, 4, 18), holidays(2025, "HH"))
+
+    def test_kuendigung_third_werktag(self):
+        # Dritter Werktag (Mo-Sa) ist Samstag, der 04.01.2025 -> Karenz bis zum nächsten
+        # Werktag: in Bayern ist der 06.01. Feiertag, also Dienstag, der 07.01.
+        result = self.service.compute("kuendigung_mieter", "2025-01-07", "BY")
+        self.assertEqual(result["deadline"], "2025-03-31")
+        result = self.service.compute("kuendigung_mieter", "2025-01-07", "BE")
+        self.assertEqual(result["deadline"], "2025-04-30")
+        result = self.service.compute("kuendigung_mieter", "2025-01-06", "BE")
+        self.assertEqual(result["deadline"], "2025-03-31")
+
+    def test_kuendigung_saturday_counts_as_werktag(self):
+        # März 2025 beginnt an einem Samstag: Werktage 01., 03., 04.03. (nicht 05.03.)
+        result = self.service.compute("kuendigung_mieter", "2025-03-04", "BE")
+        self.assertEqual(result["deadline"], "2025-05-31")
+        self.assertFalse(result["shifted"])
+        result = self.service.compute("kuendigung_mieter", "2025-03-05", "BE")
+        self.assertEqual(result["deadline"], "2025-06-30")
+
+    def test_paragraph_193_shift(self):
+        # 31.05.2025 ist ein Samstag -> Montag, 02.06.2025
+        result = self.service.compute("zustimmung_mieterhoehung", "2025-03-15", "BE")
+        self.assertEqual(result["deadline"], "2025-06-02")
+        self.assertTrue(result["shifted"])
+
+    def test_verjaehrung_month_end(self):
+        # 31.08. + 6 Monate -> 28.02.2026 (Samstag) -> Montag, 02.03.2026
+        result = self.service.compute("verjaehrung_rueckgabe", "2025-08-31", "BE")
+        self.assertEqual(result["deadline"], "2026-03-02")
+
+    def test_bulk_reports_errors_per_event(self):
+        results = self.service.compute_many([
+            {"id": 1, "type": "nebenkosten_abrechnung", "date": "2024-12-31"},
+            {"id": 2, "type": "unbekannt", "date": "2024-12-31"},
+            {"id": 3, "type": "nebenkosten_abrechnung", "date": "kein-datum"}
+        ], "NW")
+        self.assertEqual(results[0]["deadline"], "2025-12-31")
+        self.assertIn("error", results[1])
+        self.assertIn("error", results[2])
+        self.assertEqual([r["id"] for r in results], [1, 2, 3])
+
+    def test_bulk_rejects_wrong_types_per_event(self):
+        results = self.service.compute_many([
+            1,
+            {"type": ["verjaehrung_rueckgabe"], "date": "2025-04-30"},
+            {"type": "verjaehrung_rueckgabe", "date": 20250430},
+            {"type": "verjaehrung_rueckgabe", "date": "2025-04-30", "bundesland": 5},
+            {"type": "verjaehrung_rueckgabe", "date": "2025-04-30"}
+        ], "BE")
+        self.assertEqual([r.get("error") for r in results], [
+            "Ereignis muss ein Objekt sein",
+            "type muss eine Fristart (Text) sein",
+            "date muss ein Datum im Format JJJJ-MM-TT sein",
+            "bundesland muss ein Länderkürzel (Text) sein",
+            None
+        ])
+        self.assertIn("error", self.service.compute_many([{"type": "verjaehrung_rueckgabe", "date": "2025-04-30"}], 5)[0])
+
+    def test_ics_export(self):
+        results = self.service.compute_many([
+            {"type": "verjaehrung_rueckgabe", "date": "2025-04-30"}
+        ], "BE")
+        ics = self.service.to_ics(results)
+        self.assertTrue(ics.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertIn("DTSTART;VALUE=DATE:20251030", ics)
+        self.assertIn("§ 548 Abs. 1 BGB", ics)
+
+    def test_throughput(self):
+        events = [{"type": "verjaehrung_rueckgabe", "date": f"2025-04-{d % 28 + 1:02d}"} for d in range(5000)]
+        start = time.perf_counter()
+        self.service.compute_many(events, "BY")
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import time
+import unittest
+from urllib.parse import unquote
+from flask import json
+
+sys.path.append('.')
+import app_sandbox  # noqa: F401 - vor mietrecht_full
+from mietrecht_full import app, MIETRECHT_WISSEN
+from mietrecht_agent.services.fuzzy_matcher import FuzzyTopicMatcher, trigrams
+
+TYPO_CASES = [
+    ("Mitminderung", "Mietminderung"),
+    ("Kaustion", "Kaution"),
+    ("Nebenkostenabrechung", "Nebenkosten"),
+    ("Mieterhoung", "Mieterhöhung"),
+    ("Tierhaltng", "Tierhaltung"),
+    ("Kuendigung", "Kündigung"),
+]
+
+
+class TestFuzzyTopicMatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.matcher = FuzzyTopicMatcher(MIETRECHT_WISSEN)
+
+    def test_trigrams_mark_word_boundaries(self):
+        self.assertEqual(trigrams("abc"), {"  a", " ab", "abc", "bc "})
+
+    def test_typos(self):
+        for typo, expected in TYPO_CASES:
+            self.assertEqual(self.matcher.match(typo, limit=1)[0][0], expected, typo)
+
+    def test_no_match_for_unrelated_terms(self):
+        self.assertEqual(self.matcher.match("Garage"), [])
+
+    def test_rank_free_text(self):
+        self.assertEqual(self.matcher.rank("Die Kaustion wird nicht zurückgezahlt", limit=1)[0][0], "Kaution")
+        self.assertEqual(self.matcher.rank("Wie lange dauert das?"), [])
+
+    def test_latency(self):
+        start = time.perf_counter()
+        for _ in range(200):
+            self.matcher.match("Nebenkostenabrechung")
+        self.assertLess((time.perf_counter() - start) / 200, 0.001)
+
+
+class TestTopicFallback(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+
+    def test_topic_with_typo(self):
+        response = self.app.get('/api/topic/Mitminderung')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(unquote(response.headers["X-Resolved-Topic"]), "Mietminderung")
+        self.assertEqual(json.loads(response.data), MIETRECHT_WISSEN["Mietminderung"])
+
+
+if __name__ == '__main__':
+    unittest.main()
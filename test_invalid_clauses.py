@@ -4,6 +4,7 @@ from flask import json
 
 # Append path to import mietrecht_full
 sys.path.append('.')
+import app_sandbox  # noqa: F401 - vor mietrecht_full
 from mietrecht_full import app, MIETRECHT_WISSEN
 
 class TestInvalidClauses(unittest.TestCase):
@@ -0,0 +1,69 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append('.')
+from mietrecht_agent.services.knowledge_base import KnowledgeBase, DEFAULT_WISSEN_PATH
+
+
+def write_wissen(path, version, topics):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "topics": topics}, f, ensure_ascii=False)
+
+
+class TestKnowledgeBase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "wissen.json")
+        write_wissen(self.path, "1", {"Kaution": {"KI-Einschätzung": "Höchstens drei Nettokaltmieten."}})
+        self.kb = KnowledgeBase(self.path, check_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_shipped_data_file(self):
+        snapshot = KnowledgeBase(DEFAULT_WISSEN_PATH).snapshot
+        self.assertIn("Kündigung", snapshot.wissen)
+        self.assertEqual(snapshot.search_index.search("Kaution")[0]["topic"], "Kaution")
+        self.assertEqual(snapshot.topic_matcher.rank("Mietkaution zurück", limit=1)[0][0], "Kaution")
+
+    def test_hot_reload_swaps_snapshot(self):
+        old = self.kb.snapshot
+        self.assertTrue(old.version.startswith("1+"))
+        write_wissen(self.path, "2", {"Kaution": {"KI-Einschätzung": "Neu"}, "Lärm": {"KI-Einschätzung": "Ruhezeiten"}})
+        os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 10**9))
+        new = self.kb.snapshot
+        self.assertIsNot(new, old)
+        self.assertTrue(new.version.startswith("2+"))
+        self.assertIsNotNone(new.topic_cache.topic("lärm"))
+        # Alter Snapshot bleibt für laufende Leser vollständig nutzbar
+        self.assertIsNone(old.topic_cache.topic("lärm"))
+
+    def test_invalid_file_keeps_previous_version(self):
+        version = self.kb.version
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{kaputt")
+        os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 10**9))
+        with self.assertLogs("mietrecht_agent.services.knowledge_base", level="ERROR"):
+            self.assertEqual(self.kb.version, version)
+
+    def test_readers_do_not_block_during_reload(self):
+        old = self.kb.snapshot
+        self.kb._lock.acquire()
+        try:
+            os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 10**9))
+            result = []
+            reader = threading.Thread(target=lambda: result.append(self.kb.snapshot))
+            reader.start()
+            reader.join(timeout=1)
+            self.assertEqual(result, [old])
+        finally:
+            self.kb._lock.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
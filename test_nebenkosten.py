@@ -0,0 +1,107 @@
+import sys
+import time
+import unittest
+
+sys.path.append('.')
+from mietrecht_agent.services.nebenkosten_service import NebenkostenChecker, _parse_amount, map_kategorie
+
+CSV_ABRECHNUNG = """Kostenart;Gesamtkosten;Umlageschlüssel;Anteil;Einheiten gesamt;Einheiten Mieter
+Grundsteuer;1.200,00;Wohnfläche;120,00;1000;100
+Abwasser;800,00;Wohnfläche;80,00;1000;100
+Hausverwaltung;600,00;Wohnfläche;60,00;1000;100
+Reparatur Aufzug;300,00;Wohneinheiten;30,00;10;1
+Gebäudeversicherung;500,00;Wohnfläche;65,00;1000;100
+Summe;;;355,00;;
+"""
+
+TEXT_ABRECHNUNG = """Betriebskostenabrechnung 2024
+Grundsteuer  1.200,00 €  Wohnfläche  120,00 €
+Müllabfuhr  900,00 €  Personen  90,00 €
+Summe 210,00 €
+"""
+
+
+class TestNebenkostenChecker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.checker = NebenkostenChecker()
+
+    def rules(self, result):
+        return {(f["position"], f["rule"]) for f in result["findings"]}
+
+    def test_map_kategorie(self):
+        self.assertEqual(map_kategorie("Abwassergebühren"), 3)
+        self.assertEqual(map_kategorie("Warmwasser"), 5)
+        self.assertEqual(map_kategorie("Wartung Heizung"), 4)
+        self.assertEqual(map_kategorie("Reparatur Aufzug"), 91)
+        self.assertEqual(map_kategorie("Verwaltungskosten"), 90)
+
+    def test_parse_amount(self):
+        self.assertEqual(_parse_amount("1.234,56 €"), 1234.56)
+        self.assertEqual(_parse_amount("1.234"), 1234.0)
+        self.assertEqual(_parse_amount("1.234.567"), 1234567.0)
+        self.assertEqual(_parse_amount("-2.500"), -2500.0)
+        self.assertEqual(_parse_amount("12.5"), 12.5)
+        self.assertEqual(_parse_amount("1234"), 1234.0)
+
+    def test_csv_findings(self):
+        result = self.checker.check_batch([{"format": "csv", "content": CSV_ABRECHNUNG}])[0]
+        rules = self.rules(result)
+        self.assertIn((2, "nicht_umlagefaehig"), rules)
+        self.assertIn((3, "nicht_umlagefaehig"), rules)
+        self.assertIn((4, "rechenfehler"), rules)
+        self.assertIn((4, "schluessel_inkonsistent"), rules)
+        self.assertNotIn((0, "rechenfehler"), rules)
+        self.assertNotIn((None, "summenfehler"), rules)
+        self.assertFalse(result["ok"])
+
+    def test_text_statement_is_clean(self):
+        result = self.checker.check_batch([{"format": "text", "content": TEXT_ABRECHNUNG}])[0]
+        self.assertEqual(len(result["positionen"]), 2)
+        self.assertEqual(result["positionen"][1]["betrkv_nr"], 8)
+        self.assertEqual(result["findings"], [])
+        self.assertTrue(result["ok"])
+
+    def test_abrechnungsfrist(self):
+        late, timely = self.checker.check_batch([
+            {"format": "text", "content": TEXT_ABRECHNUNG, "zeitraum_ende": "2023-12-31", "zugang": "2025-01-02"},
+            {"format": "text", "content": TEXT_ABRECHNUNG, "zeitraum_ende": "2023-12-31", "zugang": "2024-11-30"}
+        ])
+        self.assertIn((None, "abrechnungsfrist"), self.rules(late))
+        self.assertEqual(timely["abrechnungsfrist"], "2024-12-31")
+        self.assertTrue(timely["ok"])
+
+    def test_invalid_statement_does_not_break_batch(self):
+        broken, ok = self.checker.check_batch([
+            {"format": "csv", "content": "foo;bar\n1;2\n"},
+            {"format": "text", "content": TEXT_ABRECHNUNG}
+        ])
+        self.assertIn("error", broken)
+        self.assertTrue(ok["ok"])
+
+    def test_wrong_types_are_reported_per_statement(self):
+        results = self.checker.check_batch([
+            "keine Abrechnung",
+            {"format": "csv", "content": ["Grundsteuer;120"]},
+            {"format": "text", "content": TEXT_ABRECHNUNG, "summe": {"betrag": 1}},
+            {"format": "text", "content": TEXT_ABRECHNUNG, "zeitraum_ende": 2023, "zugang": "2024-11-30"},
+            {"id": "ok", "format": "text", "content": TEXT_ABRECHNUNG}
+        ])
+        self.assertEqual([r.get("error") for r in results[:3]], [
+            "Abrechnung muss ein Objekt sein", "content muss Text sein", "summe muss eine Zahl sein"
+        ])
+        self.assertEqual(results[0]["id"], 0)
+        self.assertIn((None, "abrechnungsfrist"), self.rules(results[3]))
+        self.assertEqual(results[4]["id"], "ok")
+        self.assertTrue(results[4]["ok"])
+
+    def test_batch_of_500(self):
+        statements = [{"format": "csv", "content": CSV_ABRECHNUNG}] * 500
+        start = time.perf_counter()
+        results = self.checker.check_batch(statements)
+        self.assertEqual(len(results), 500)
+        self.assertLess(time.perf_counter() - start, 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
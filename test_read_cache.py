@@ -0,0 +1,174 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append('.')
+import app_sandbox  # noqa: F401 - vor mietrecht_full
+from mietrecht_agent.services.read_cache import ReadCache, cache_key
+from mietrecht_agent.services.sqlite_pool import ConnectionPool
+from mietrecht_agent.services.storage import SQLiteStorage
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestReadCache(unittest.TestCase):
+    def setUp(self):
+        self.version = 1
+        self.version_reads = 0
+        self.loads = 0
+        self.clock = Clock()
+        self.refreshes = []
+        self.cache = ReadCache(self.current_version, check_interval=0.1, max_age=60, clock=self.clock,
+                               spawn=self.refreshes.append)
+
+    def current_version(self):
+        self.version_reads += 1
+        return self.version
+
+    def loader(self):
+        self.loads += 1
+        return f"Seite {self.loads}"
+
+    def test_hits_until_version_changes(self):
+        key = cache_key("cases", {"status": "Neu", "fields": ["id", "status"]})
+        self.assertEqual(self.cache.get(key, self.loader), "Seite 1")
+        for _ in range(5):
+            self.assertEqual(self.cache.get(key, self.loader), "Seite 1")
+        self.assertEqual((self.loads, self.version_reads), (1, 1))
+        self.assertEqual(self.cache.stats()["hits"], 5)
+
+    def test_version_is_checked_at_most_every_interval(self):
+        self.cache.get("k", self.loader)
+        self.version = 2
+        self.assertEqual(self.cache.get("k", self.loader), "Seite 1")
+        self.assertEqual(self.refreshes, [])
+        self.clock.now += 0.2
+        # Veraltet: sofort den alten Wert, einmal im Hintergrund neu laden
+        self.assertEqual(self.cache.get("k", self.loader), "Seite 1")
+        self.assertEqual(self.cache.get("k", self.loader), "Seite 1")
+        self.assertEqual(len(self.refreshes), 1)
+        self.refreshes.pop()()
+        self.assertEqual(self.cache.get("k", self.loader), "Seite 2")
+        stats = self.cache.stats()
+        self.assertEqual((stats["stale_hits"], stats["refreshes"], stats["misses"]), (2, 1, 1))
+
+    def test_observe_invalidates_without_query(self):
+        self.cache.get("k", self.loader)
+        self.cache.observe(5)
+        self.cache.get("k", self.loader)
+        self.assertEqual(len(self.refreshes), 1)
+        self.assertEqual(self.version_reads, 1)
+
+    def test_entries_expire_after_max_age(self):
+        self.cache.get("k", self.loader)
+        self.clock.now += 61
+        self.assertEqual(self.cache.get("k", self.loader), "Seite 2")
+        self.assertEqual(self.refreshes, [])
+
+    def test_failed_refresh_keeps_stale_value(self):
+        self.cache.get("k", self.loader)
+        self.cache.observe(2)
+        self.cache.get("k", lambda: 1 / 0)
+        with self.assertLogs("mietrecht_agent.services.read_cache", "ERROR"):
+            self.refreshes.pop()()
+        self.assertEqual(self.cache.get("k", self.loader), "Seite 1")
+        self.assertEqual(self.cache.stats()["errors"], 1)
+        self.assertEqual(len(self.refreshes), 1)
+
+    def test_concurrent_misses_share_one_load(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_loader():
+            started.set()
+            release.wait()
+            return self.loader()
+
+        results = []
+        first = threading.Thread(target=lambda: results.append(self.cache.get("k", slow_loader)))
+        first.start()
+        started.wait()
+        others = [threading.Thread(target=lambda: results.append(self.cache.get("k", self.loader)))
+                  for _ in range(3)]
+        for thread in others:
+            thread.start()
+        release.set()
+        for thread in [first, *others]:
+            thread.join()
+        self.assertEqual(results, ["Seite 1"] * 4)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(self.cache.stats()["hit_rate"], 0.75)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ReadCache(self.current_version, max_entries=2, clock=self.clock)
+        for key in ("a", "b", "a", "c"):
+            cache.get(key, self.loader)
+        self.assertEqual(cache.stats()["entries"], 2)
+        cache.get("b", self.loader)
+        self.assertEqual(self.loads, 4)
+
+
+class TestReadCacheWithStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "cases.db")
+        self.storage = SQLiteStorage(self.path, ConnectionPool(self.path))
+        self.cache = ReadCache(self.storage.current_version, check_interval=0, spawn=lambda target: target())
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.tmpdir)
+
+    def page(self):
+        query = {"fields": ["id"]}
+        return self.cache.get(cache_key("cases", query), lambda: self.storage.list_cases(**query))
+
+    def test_write_from_another_worker_invalidates(self):
+        self.storage.insert_case("2026-04-12T10:00:00", "{}", "{}", json.dumps({"price": 49}))
+        cases, _, version = self.page()
+        self.assertEqual(len(cases), 1)
+        # Eigener Pool wie in einem zweiten Worker-Prozess
+        other = SQLiteStorage(self.path, ConnectionPool(self.path))
+        try:
+            other.insert_case("2026-04-12T11:00:00", "{}", "{}", "{}")
+        finally:
+            other.close()
+        # Einmal veraltet ausgeliefert - Version passt zu den Fällen, das Dashboard holt den Rest über den Feed
+        self.assertEqual(self.page()[2], version)
+        cases, _, newer = self.page()
+        self.assertEqual(len(cases), 2)
+        self.assertGreater(newer, version)
+
+
+class TestBookingRoute(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import mietrecht_full
+        cls.app = mietrecht_full
+        cls.client = mietrecht_full.app.test_client()
+
+    def test_booking_invalidates_cached_list(self):
+        cache = self.app.read_cache
+        self.client.get("/api/cases?limit=1")
+        # Nur die eigene Buchung (observe) darf den Eintrag veralten lassen
+        interval, cache.check_interval = cache.check_interval, 3600
+        try:
+            stale = cache.stats()["stale_hits"]
+            response = self.client.post("/api/book", json={"timestamp": "2000-01-01T10:00:00", "userName": "Test"})
+            self.assertEqual(response.status_code, 200)
+            self.client.get("/api/cases?limit=1")
+            self.assertEqual(cache.stats()["stale_hits"], stale + 1)
+        finally:
+            cache.check_interval = interval
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import statistics
+import sys
+import time
+import unittest
+from flask import json
+
+sys.path.append('.')
+import app_sandbox  # noqa: F401 - vor mietrecht_full
+from mietrecht_full import app, MIETRECHT_WISSEN
+from mietrecht_agent.services.search_service import SearchIndex, analyze, highlight
+
+# Zielwert je Suchanfrage bei 3000 Themen
+SEARCH_BUDGET = 0.001
+
+
+class TestSearchIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = SearchIndex(MIETRECHT_WISSEN)
+
+    def test_analyze_folds_umlauts(self):
+        self.assertEqual(analyze("Kündigung"), analyze("Kuendigung"))
+        self.assertEqual(analyze("Gebühren"), analyze("gebuehren"))
+        self.assertEqual(analyze("der die das"), [])
+
+    def test_stemming_matches_inflections(self):
+        self.assertEqual(analyze("Hunde")[0], analyze("Hund")[0])
+
+    def test_ranking(self):
+        self.assertEqual(self.index.search("Schimmel in der Wohnung, Miete kürzen")[0]["topic"], "Mietminderung")
+        self.assertEqual(self.index.search("Kuendigung per E-Mail")[0]["topic"], "Kündigung")
+        self.assertEqual(self.index.search("Hund halten")[0]["topic"], "Tierhaltung")
+
+    def test_snippet_is_highlighted_and_escaped(self):
+        result = self.index.search("Kaution")[0]
+        self.assertIn("<mark>Kaution</mark>", result["snippet"])
+        self.assertEqual(highlight("<b>Kaution</b>", set(analyze("Kaution"))), "&lt;b&gt;<mark>Kaution</mark>&lt;/b&gt;")
+
+    def test_large_knowledge_base_latency(self):
+        wissen = {}
+        for i in range(3000):
+            for topic, content in MIETRECHT_WISSEN.items():
+                wissen[f"{topic} {i}"] = content
+                if len(wissen) >= 3000:
+                    break
+            if len(wissen) >= 3000:
+                break
+        index = SearchIndex(wissen)
+        timings = []
+        # Seltene und häufige Terme; der Median ist robust gegen einzelne Ausreißer
+        for query in ("Kaution zurückzahlen", "Mieter", "Schimmel Wohnung Miete kürzen"):
+            for _ in range(50):
+                start = time.perf_counter()
+                index.search(query, limit=10)
+                timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        self.assertLess(median, SEARCH_BUDGET,
+                        f"Median {median * 1000:.3f} ms, Budget {SEARCH_BUDGET * 1000:.0f} ms")
+
+
+class TestSearchEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+
+    def test_search_endpoint(self):
+        response = self.app.get('/api/search?q=Mietpreisbremse&limit=3')
+        data = json.loads(response.data)
+        self.assertEqual(data["results"][0]["topic"], "Mietpreis")
+        self.assertLessEqual(len(data["results"]), 3)
+
+    def test_search_requires_query(self):
+        self.assertEqual(self.app.get('/api/search').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append('.')
+from mietrecht_agent.services.sqlite_pool import ConnectionPool, get_pool
+from mietrecht_agent.services.case_store import insert_case
+from test_case_store import SCHEMA
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "cases.db")
+        self.pool = ConnectionPool(self.db_path)
+        with self.pool.connection() as conn:
+            conn.execute(SCHEMA)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_wal_and_pragmas(self):
+        with self.pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)    # NORMAL
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+
+    def test_connections_are_reused(self):
+        with self.pool.connection() as first:
+            pass
+        with self.pool.connection() as second:
+            self.assertIs(first, second)
+        self.assertEqual(self.pool.stats()["connections"], 1)
+
+    def test_write_commits_and_rolls_back(self):
+        with self.pool.write() as conn:
+            insert_case(conn, "2026-01-01", "{}", "{}", "{}")
+        with self.assertRaises(ValueError):
+            with self.pool.write() as conn:
+                insert_case(conn, "2026-01-02", "{}", "{}", "{}")
+                raise ValueError("Abbruch")
+        with self.pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0], 1)
+            self.assertFalse(conn.in_transaction)
+
+    def test_readers_do_not_block_writer(self):
+        reader = sqlite3.connect(self.db_path)
+        reader.execute("BEGIN")
+        reader.execute("SELECT COUNT(*) FROM cases").fetchone()
+        with self.pool.write() as conn:
+            insert_case(conn, "2026-01-01", "{}", "{}", "{}")
+        reader.rollback()
+        reader.close()
+
+    def test_concurrent_writes_are_counted(self):
+        def book():
+            for _ in range(20):
+                with self.pool.write() as conn:
+                    insert_case(conn, "2026-01-01", "{}", "{}", "{}")
+        threads = [threading.Thread(target=book) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = self.pool.stats()
+        self.assertEqual(stats["writes"], 80)
+        self.assertEqual(stats["busy_errors"], 0)
+        self.assertLessEqual(stats["connections"], 4)
+
+    def test_shared_pool_per_file(self):
+        self.assertIs(get_pool(self.db_path), get_pool(os.path.join(self.tmpdir, ".", "cases.db")))
+
+
+if __name__ == '__main__':
+    unittest.main()
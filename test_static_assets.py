@@ -0,0 +1,157 @@
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append('.')
+import app_sandbox  # noqa: F401 - vor mietrecht_full
+from mietrecht_full import app
+from mietrecht_agent.services.static_assets import (
+    ASSET_CACHE_CONTROL, DEFAULT_SOURCE_DIR, PAGE_CACHE_CONTROL, AssetBundle, build_bundle
+)
+
+# Ersatz für die Tailwind-CLI: schreibt ein festes Utility und die Eingabe (ohne Direktiven) nach -o
+FAKE_TAILWIND = [sys.executable, "-c", (
+    "import sys; a = sys.argv; css = open(a[a.index('-i') + 1]).read();"
+    "open(a[a.index('-o') + 1], 'w').write('.p-8{padding:2rem}' + css.replace('@tailwind', '/*tw*/'))"
+)]
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <script src="https://cdn.tailwindcss.com"></script>
+    <link rel="stylesheet" href="/assets/seite.css">
+</head>
+<body class="p-8">
+    <script src="/assets/seite.js"></script>
+</body>
+</html>
+"""
+
+
+class BundleTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmpdir, "frontend")
+        self.build = os.path.join(self.tmpdir, "dist")
+        os.makedirs(self.source)
+        self.write_source("seite.html", PAGE)
+        self.write_source("seite.css", "@import url('https://fonts.example/inter.css');\nbody { color: red; }\n")
+        self.write_source("seite.js", "console.log('Mietrecht');\n" * 50)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_source(self, name, text):
+        with open(os.path.join(self.source, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def built_page(self):
+        with open(os.path.join(self.build, "seite.html"), encoding="utf-8") as f:
+            return f.read()
+
+
+class TestBuildBundle(BundleTestCase):
+    def test_hashed_names_and_gzip_variants(self):
+        manifest = build_bundle(self.source, self.build, pages=("seite",))
+        html = self.built_page()
+        js_name, = [name for name in manifest["files"] if name.endswith(".js")]
+        self.assertRegex(js_name, r"^seite\.[0-9a-f]{12}\.js$")
+        self.assertIn(f'src="/assets/{js_name}"', html)
+        self.assertNotIn('"/assets/seite.css"', html)
+        self.assertIn("cdn.tailwindcss.com", html)
+        self.assertFalse(manifest["tailwind"])
+        with open(os.path.join(self.build, js_name + ".gz"), "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), b"console.log('Mietrecht');\n" * 50)
+        self.assertIn("gzip", manifest["files"][js_name]["encodings"])
+
+    def test_tailwind_replaces_cdn(self):
+        manifest = build_bundle(self.source, self.build, tailwind=FAKE_TAILWIND, pages=("seite",))
+        html = self.built_page()
+        self.assertNotIn("cdn.tailwindcss.com", html)
+        css_name, = [name for name in manifest["files"] if name.endswith(".css")]
+        with open(os.path.join(self.build, css_name), encoding="utf-8") as f:
+            css = f.read()
+        # @import muss vor den Tailwind-Regeln stehen, sonst ignoriert der Browser ihn
+        self.assertTrue(css.startswith(".p-8{padding:2rem}@import url("), css)
+        self.assertLess(css.index("/*tw*/"), css.index("body { color: red; }"))
+
+    def test_changed_source_gets_new_name_and_old_files_survive_one_build(self):
+        first = build_bundle(self.source, self.build, pages=("seite",))
+        self.write_source("seite.js", "console.log('Kündigung');\n")
+        second = build_bundle(self.source, self.build, pages=("seite",))
+        old_js, = [name for name in first["files"] if name.endswith(".js")]
+        new_js, = [name for name in second["files"] if name.endswith(".js")]
+        self.assertNotEqual(old_js, new_js)
+        self.assertTrue(os.path.exists(os.path.join(self.build, old_js)))
+        self.write_source("seite.js", "console.log('Mietminderung');\n")
+        third = build_bundle(self.source, self.build, pages=("seite",))
+        self.assertFalse(os.path.exists(os.path.join(self.build, old_js)))
+        # Datei und ihre Varianten (.gz, mit brotli auch .br)
+        self.assertEqual(third["removed"], 1 + len(first["files"][old_js]["encodings"]))
+
+    def test_frontend_sources_build(self):
+        manifest = build_bundle(DEFAULT_SOURCE_DIR, self.build)
+        self.assertEqual(manifest["pages"], {"home": "home.html", "lawyer": "lawyer.html"})
+        self.assertEqual(len(manifest["files"]), 6)
+
+
+class TestAssetBundle(BundleTestCase):
+    def test_built_assets_are_immutable_and_revalidate(self):
+        manifest = build_bundle(self.source, self.build, pages=("seite",))
+        bundle = AssetBundle(self.build, self.source)
+        js_name, = [name for name in manifest["files"] if name.endswith(".js")]
+        status, body, headers = bundle.asset(js_name).respond(accept_encoding="gzip, deflate")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Cache-Control"], ASSET_CACHE_CONTROL)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(body), b"console.log('Mietrecht');\n" * 50)
+        status, body, _ = bundle.asset(js_name).respond(if_none_match=headers["ETag"])
+        self.assertEqual((status, body), (304, b""))
+
+        status, _, headers = bundle.page("seite").respond()
+        self.assertEqual(headers["Cache-Control"], PAGE_CACHE_CONTROL)
+        self.assertEqual(bundle.page("seite").respond(if_none_match=headers["ETag"])[0], 304)
+        self.assertIsNone(bundle.asset("seite.html"))
+        self.assertIsNone(bundle.asset("seite.js"))
+        self.assertEqual(bundle.stats()["files"], 3)
+
+    def test_without_build_sources_are_served(self):
+        bundle = AssetBundle(self.build, self.source)
+        self.assertFalse(bundle.built)
+        status, body, headers = bundle.page("seite").respond(accept_encoding="gzip")
+        self.assertEqual(body.decode("utf-8"), PAGE)
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(headers["Cache-Control"], PAGE_CACHE_CONTROL)
+        self.assertIsNotNone(bundle.asset("seite.css"))
+        self.assertIsNone(bundle.asset("seite.html"))
+        self.assertIsNone(bundle.asset("../seite.css"))
+
+
+class TestPageRoutes(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+
+    def test_pages_and_their_assets(self):
+        for path in ("/", "/lawyer"):
+            response = self.app.get(path)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.content_type.startswith("text/html"))
+            refs = [ref for ref in response.get_data(as_text=True).split('"') if ref.startswith("/assets/")]
+            self.assertEqual(len(refs), 2)
+            for ref in refs:
+                self.assertEqual(self.app.get(ref).status_code, 200)
+            revalidated = self.app.get(path, headers={"If-None-Match": response.headers["ETag"]})
+            self.assertEqual(revalidated.status_code, 304)
+
+    def test_unknown_asset(self):
+        self.assertEqual(self.app.get("/assets/gibt-es-nicht.js").status_code, 404)
+        self.assertIn("assets", json.loads(self.app.get("/health").data))
+
+
+if __name__ == '__main__':
+    unittest.main()
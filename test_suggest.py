@@ -0,0 +1,55 @@
+import sys
+import time
+import unittest
+from flask import json
+
+sys.path.append('.')
+import app_sandbox  # noqa: F401 - vor mietrecht_full
+from mietrecht_full import app, knowledge_base
+from mietrecht_agent.services.suggest_service import SuggestIndex
+
+
+class TestSuggestIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = knowledge_base.snapshot.suggest_index
+
+    def test_topic_question_and_citation_entries(self):
+        self.assertEqual(self.index.suggest("kau", limit=1), [{"text": "Kaution", "kind": "topic", "topic": "Kaution"}])
+        self.assertIn("Darf ich einen Hund in der Mietwohnung halten?", [s["text"] for s in self.index.suggest("hund")])
+        self.assertEqual(self.index.suggest("536", limit=1)[0]["text"], "§ 536 BGB")
+        self.assertEqual(self.index.suggest("VIII ZR 185", limit=1)[0]["kind"], "aktenzeichen")
+
+    def test_umlaut_folding(self):
+        self.assertEqual(self.index.suggest("Kuendigung", limit=1)[0]["text"], "Kündigung")
+
+    def test_popularity_ranking(self):
+        index = SuggestIndex({"Mietvertrag": {}, "Mietminderung": {}})
+        self.assertEqual(index.suggest("miet")[0]["text"], "Mietvertrag")
+        self.assertEqual(index.suggest("miet", popularity={"Mietminderung": 3})[0]["text"], "Mietminderung")
+
+    def test_latency(self):
+        timings = []
+        for query in ["m", "mi", "ki", "wie", "§ 5", "viii zr"] * 200:
+            start = time.perf_counter()
+            self.index.suggest(query)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        self.assertLess(timings[int(len(timings) * 0.99)], 0.001)
+
+
+class TestSuggestEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+
+    def test_suggest_and_pick(self):
+        data = json.loads(self.app.get('/api/suggest?q=mietm').data)
+        self.assertEqual(data["suggestions"][0]["topic"], "Mietminderung")
+        response = self.app.post('/api/suggest/pick', json={"text": "Mietminderung"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.app.post('/api/suggest/pick', json={"text": "beliebig"}).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import gzip
+import sys
+import unittest
+from flask import json
+
+sys.path.append('.')
+import app_sandbox  # noqa: F401 - vor mietrecht_full
+from mietrecht_full import app, MIETRECHT_WISSEN
+from mietrecht_agent.services.topic_cache import CachedResponse, TopicResponseCache
+
+
+class TestTopicResponseCache(unittest.TestCase):
+    def test_lookup_is_case_insensitive(self):
+        cache = TopicResponseCache(MIETRECHT_WISSEN)
+        self.assertIs(cache.topic("kündigung"), cache.topic("KÜNDIGUNG"))
+        self.assertIsNone(cache.topic("Garage"))
+
+    def test_encoding_negotiation(self):
+        entry = CachedResponse({"text": "Mietrecht " * 100})
+        status, body, headers = entry.respond(accept_encoding="gzip;q=0, deflate")
+        self.assertEqual(status, 200)
+        self.assertNotIn("Content-Encoding", headers)
+        status, body, headers = entry.respond(accept_encoding="deflate, gzip")
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(body), entry.body)
+
+    def test_etag_is_stable(self):
+        self.assertEqual(CachedResponse({"a": 1}).respond()[2]["ETag"], CachedResponse({"a": 1}).respond()[2]["ETag"])
+        self.assertNotEqual(CachedResponse({"a": 1}).respond()[2]["ETag"], CachedResponse({"a": 2}).respond()[2]["ETag"])
+
+
+class TestTopicEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+
+    def test_topic_and_revalidation(self):
+        response = self.app.get('/api/topic/mietminderung')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data), MIETRECHT_WISSEN["Mietminderung"])
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        etag = response.headers["ETag"]
+
+        response = self.app.get('/api/topic/mietminderung', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+
+    def test_gzip_variant(self):
+        response = self.app.get('/api/topics?include=all', headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+        self.assertEqual(json.loads(gzip.decompress(response.data)), MIETRECHT_WISSEN)
+
+    def test_topic_list(self):
+        response = self.app.get('/api/topics')
+        self.assertEqual(json.loads(response.data), list(MIETRECHT_WISSEN.keys()))
+
+    def test_unknown_topic(self):
+        self.assertEqual(self.app.get('/api/topic/Garage').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import sys
+import unittest
+
+sys.path.append('.')
+import app_sandbox  # noqa: F401 - vor mietrecht_full
+from mietrecht_full import MIETRECHT_WISSEN
+from mietrecht_agent.services.topic_matcher import AhoCorasick, TopicMatcher
+
+# Relevanz-Testset: Frage -> erwartetes bestes Thema
+RELEVANCE_CASES = [
+    ("Wann darf der Vermieter die Miete erhöhen?", "Mieterhöhung"),
+    ("Ich habe ein Mieterhöhungsverlangen mit Verweis auf den Mietspiegel bekommen", "Mieterhöhung"),
+    ("Wie kündige ich meinen Mietvertrag richtig? Reicht eine E-Mail für die Kündigung?", "Kündigung"),
+    ("Der Vermieter hat mir wegen Eigenbedarf gekündigt", "Kündigung"),
+    ("Im Bad ist Schimmel, darf ich die Miete kürzen?", "Mietminderung"),
+    ("Die Heizung ist seit zwei Wochen kaputt, kann ich mindern?", "Mietminderung"),
+    ("Wie hoch darf die Mietkaution sein?", "Kaution"),
+    ("Die Nebenkostenabrechnung kam erst nach 14 Monaten", "Nebenkosten"),
+    ("Muss ich die Betriebskosten-Nachzahlung zahlen?", "Nebenkosten"),
+    ("Ich habe ein lebenslanges Wohnrecht im Grundbuch", "Wohnrecht"),
+    ("Muss ich beim Auszug streichen und tapezieren?", "Renovierung"),
+    ("Der Vermieter kündigt eine Modernisierung mit neuer Dämmung an", "Modernisierung"),
+    ("Wann bekomme ich mein Guthaben aus der Abrechnung zurück?", "Rückzahlung"),
+    ("Darf die Hausordnung das Grillen auf dem Balkon verbieten?", "Hausordnung"),
+    ("Darf ich einen Hund in meiner Mietwohnung halten?", "Tierhaltung"),
+    ("Meine Wohnfläche ist kleiner als im Vertrag angegeben", "Wohnfläche"),
+    ("Nach einem Rohrbruch habe ich einen Wasserschaden in der Küche", "Wasserschaden"),
+    ("Die Nachbarn machen jede Nacht Lärm", "Lärm"),
+    ("Der Vermieter droht mit Zwangsräumung durch den Gerichtsvollzieher", "Räumung"),
+    ("Ist ein befristeter Mietvertrag wirksam?", "Mietvertrag"),
+    ("Ist diese Klausel in meinem Vertrag unwirksam?", "Unwirksame Klauseln"),
+    ("Muss ich die Kleinreparatur am Wasserhahn bezahlen?", "Kleinreparaturen"),
+    ("Im Vertrag steht ein Kündigungsverzicht von fünf Jahren", "Kündigungsverzicht"),
+    ("Ist eine Heizkostenpauschale erlaubt?", "Pauschalen"),
+    ("Der Vermieter hat einen Zweitschlüssel und will die Wohnung betreten", "Wohnungsschlüssel"),
+    ("Was muss ins Übergabeprotokoll?", "Wohnungsübergabe"),
+    ("Darf ich ein Zimmer untervermieten?", "Untervermietung"),
+    ("Das Haus wurde verkauft, was passiert mit meinem Vertrag beim neuen Eigentümer?", "Eigentümerwechsel"),
+    ("Gilt die Mietpreisbremse auch für meine Wohnung?", "Mietpreis"),
+    ("Darf der Vermieter in der Selbstauskunft nach einer Schwangerschaft fragen?", "Vermieterfragen"),
+    ("Meine Hunde bellen tagsüber", "Tierhaltung"),
+    ("Wie lange dauert eine Kündigungsfrist bei Lärmbelästigung?", "Kündigung"),
+]
+
+# Fragen ohne passendes Thema: Begriffe dürfen nicht als Wortanfang eines anderen Wortes greifen
+NEGATIVE_CASES = [
+    "Ich zahle hundert Euro mehr",
+    "Der Vertrag lautet anders",
+    "Brauche ich eine Erlaubnis für meinen Urlaub?",
+]
+
+
+class TestAhoCorasick(unittest.TestCase):
+    def test_overlapping_matches(self):
+        automaton = AhoCorasick(["he", "she", "his", "hers"])
+        self.assertEqual(sorted(automaton.iter("ushers")), [(1, 1, 3), (2, 0, 2), (2, 3, 4)])
+
+
+class TestTopicMatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.matcher = TopicMatcher(MIETRECHT_WISSEN)
+
+    def test_relevance_set(self):
+        misses = [
+            (question, expected, self.matcher.rank(question, limit=1))
+            for question, expected in RELEVANCE_CASES
+            if [t for t, _ in self.matcher.rank(question, limit=1)] != [expected]
+        ]
+        self.assertEqual(misses, [])
+
+    def test_stopwords_do_not_match(self):
+        self.assertEqual(self.matcher.rank("der die das und oder"), [])
+
+    def test_negative_set(self):
+        hits = [(question, self.matcher.rank(question)) for question in NEGATIVE_CASES]
+        self.assertEqual([hit for hit in hits if hit[1]], [])
+
+    def test_stems_match_compounds(self):
+        # "mieterhöhung*" ist ein Stamm, "hund" nicht
+        self.assertEqual(self.matcher.rank("Mieterhöhungsverlangen", limit=1)[0][0], "Mieterhöhung")
+        self.assertEqual(
+            TopicMatcher({"Tiere": {}}, keywords={"Tiere": {"hund": 3.0}}).rank("Hundesalon"), [])
+        self.assertEqual(
+            TopicMatcher({"Tiere": {}}, keywords={"Tiere": {"hund*": 3.0}}).rank("Hundesalon"), [("Tiere", 3.0)])
+
+    def test_ranking_is_sorted(self):
+        ranked = self.matcher.rank("Schimmel nach Wasserschaden, darf ich die Miete mindern?")
+        self.assertEqual(ranked[0][0], "Mietminderung")
+        self.assertEqual([s for _, s in ranked], sorted((s for _, s in ranked), reverse=True))
+
+    def test_uncurated_topic_uses_name(self):
+        matcher = TopicMatcher({"Garagenmiete": {}})
+        self.assertEqual(matcher.rank("Frage zur Garagenmiete"), [("Garagenmiete", 3.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()